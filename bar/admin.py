@@ -1,22 +1,147 @@
 from django.contrib import admin
-from bar.models import Coquetel
-from bar.models import Servico
-from bar.models import Pacote
-from bar.models import Funcionario
-from bar.models import Cliente
-from bar.models import Reserva
-from bar.models import Fornecedor
-from bar.models import Produto
-
-from bar.models import Evento
-
-
-admin.site.register(Coquetel)
-admin.site.register(Servico)
-admin.site.register(Pacote)
-admin.site.register(Funcionario)
-admin.site.register(Cliente)
-admin.site.register(Reserva)
-admin.site.register(Fornecedor)
-admin.site.register(Produto)
-admin.site.register(Evento)
+
+from bar.busca import LIMITE_MAXIMO as LIMITE_BUSCA, buscar_clientes
+from bar.models import (
+    Coquetel, Servico, Pacote, Funcionario, Cliente, Reserva, Fornecedor, Produto, Evento,
+    Porcao, Pedido, ItemPedido, ItemReceita,
+)
+from bar.pagination import ContagemAproximadaPaginator
+
+# As listas carregam as FKs exibidas (list_select_related) e os formulários usam
+# autocomplete no lugar de <select> com a tabela inteira. Os filtros laterais
+# são os que têm índice: datas (idx_*_data*), Evento.pago (idx_evento_pendente),
+# Funcionario.funcao (idx_funcionario_funcao) e Produto.precisa_repor
+# (idx_produto_repor).
+
+
+class TabelaGrandeAdmin(admin.ModelAdmin):
+    """Tabelas que crescem sem limite: sem COUNT(*) exato e sem a segunda contagem dos filtros."""
+    paginator = ContagemAproximadaPaginator
+    show_full_result_count = False
+
+
+class ItemReceitaInline(admin.TabularInline):
+    model = ItemReceita
+    autocomplete_fields = ['produto']
+    extra = 1
+
+
+@admin.register(Coquetel)
+class CoquetelAdmin(admin.ModelAdmin):
+    list_display = ['nome', 'recipiente', 'preco_custo', 'preco_venda', 'fornecedor']
+    list_select_related = ['fornecedor']
+    search_fields = ['nome']
+    autocomplete_fields = ['fornecedor']
+    inlines = [ItemReceitaInline]
+
+
+@admin.register(Servico)
+class ServicoAdmin(admin.ModelAdmin):
+    list_display = ['nome', 'funcao', 'valor_hora']
+    search_fields = ['nome']
+    autocomplete_fields = ['funcionarios']
+
+
+@admin.register(Pacote)
+class PacoteAdmin(admin.ModelAdmin):
+    list_display = ['nomePacote', 'coqueteis', 'produtos', 'servicos', 'valorPorPessoa', 'custo_insumos']
+    list_select_related = ['coqueteis', 'produtos', 'servicos']
+    search_fields = ['nomePacote']
+    autocomplete_fields = ['coqueteis', 'produtos', 'servicos']
+    raw_id_fields = ['eventos']
+
+
+@admin.register(Funcionario)
+class FuncionarioAdmin(admin.ModelAdmin):
+    list_display = ['nome', 'funcao', 'valorDiaria', 'supervisor']
+    list_select_related = ['supervisor']
+    list_filter = ['funcao']
+    search_fields = ['nome', 'cpf', 'email']
+    autocomplete_fields = ['supervisor']
+
+
+@admin.register(Cliente)
+class ClienteAdmin(TabelaGrandeAdmin):
+    list_display = ['nome', 'telefone', 'email', 'indicado_por']
+    list_select_related = ['indicado_por']
+    search_fields = ['nome', 'telefone', 'email']
+    autocomplete_fields = ['indicado_por']
+
+    def get_search_results(self, request, queryset, search_term):
+        # Busca indexada (bar/busca.py), também usada pelo autocomplete dos outros formulários
+        if not search_term:
+            return queryset, False
+        return buscar_clientes(search_term, queryset, limite=LIMITE_BUSCA), False
+
+
+@admin.register(Reserva)
+class ReservaAdmin(TabelaGrandeAdmin):
+    list_display = ['cliente', 'data', 'convidados', 'pacote', 'funcionario_responsavel']
+    list_select_related = ['cliente', 'pacote', 'funcionario_responsavel']
+    list_filter = ['data']
+    autocomplete_fields = ['cliente', 'pacote', 'funcionario_responsavel']
+
+
+@admin.register(Fornecedor)
+class FornecedorAdmin(admin.ModelAdmin):
+    list_display = ['nome', 'cnpj', 'email', 'telefone']
+    search_fields = ['nome', 'cnpj', 'email']
+
+
+class PrecisaReporFilter(admin.SimpleListFilter):
+    title = 'precisa repor'
+    parameter_name = 'precisa_repor'
+
+    def lookups(self, request, model_admin):
+        return [('sim', 'Sim'), ('nao', 'Não')]
+
+    def queryset(self, request, queryset):
+        if self.value() in ('sim', 'nao'):
+            return queryset.filter(precisa_repor=self.value() == 'sim')
+        return queryset
+
+
+@admin.register(Produto)
+class ProdutoAdmin(admin.ModelAdmin):
+    list_display = ['nome', 'fornecedor', 'preco', 'estoque', 'estoque_minimo', 'precisa_repor']
+    list_select_related = ['fornecedor']
+    list_filter = [PrecisaReporFilter]
+    search_fields = ['nome']
+    autocomplete_fields = ['fornecedor']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).com_precisa_repor()
+
+    @admin.display(boolean=True, ordering='precisa_repor', description='precisa repor')
+    def precisa_repor(self, produto):
+        return produto.precisa_repor
+
+
+@admin.register(Evento)
+class EventoAdmin(TabelaGrandeAdmin):
+    list_display = ['cliente', 'datahora', 'pago', 'forma_pagamento', 'local']
+    list_select_related = ['cliente']
+    list_filter = ['pago', 'datahora']
+    autocomplete_fields = ['cliente']
+
+
+@admin.register(Porcao)
+class PorcaoAdmin(admin.ModelAdmin):
+    list_display = ['nome', 'adicional', 'preco_custo', 'preco_venda']
+    search_fields = ['nome']
+
+
+class ItemPedidoInline(admin.TabularInline):
+    model = ItemPedido
+    autocomplete_fields = ['coquetel', 'porcao']
+    extra = 0
+
+
+@admin.register(Pedido)
+class PedidoAdmin(TabelaGrandeAdmin):
+    list_display = ['id', 'cliente', 'atendente', 'datahora', 'forma_pagamento', 'pago', 'total']
+    list_select_related = ['atendente']
+    list_filter = ['datahora']
+    autocomplete_fields = ['atendente']
+    readonly_fields = ['total'] # calculado na ingestão (bar/pedidos.py)
+    inlines = [ItemPedidoInline]
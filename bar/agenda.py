@@ -0,0 +1,160 @@
+"""
+Agenda de ocupação por local e dia (OcupacaoDiaria).
+
+Cada linha guarda, para um local num dia, quantos eventos, reservas e
+convidados há e quantos funcionários estão escalados (responsáveis distintos
+das reservas). A reserva vai para o local do Evento do mesmo cliente no
+mesmo dia (o mais recente, a mesma regra do faturamento); sem evento, fica
+no local ''.
+
+Cada escrita em Reserva ou Evento recalcula só os dias que ela toca (ver
+bar/signals.py), e escala.atribuir() faz o mesmo depois do UPDATE em lote.
+As consultas de disponibilidade leem só a agenda, pelo índice (local, data):
+o custo depende do intervalo pedido, não do histórico de eventos.
+"""
+from datetime import datetime, time, timedelta
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import CharField, Count, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from . import condicional
+from .models import Evento, OcupacaoDiaria, Reserva
+
+LOCAL_PADRAO = Evento._meta.get_field('local').default
+DIAS_PADRAO = 90
+LIMITE_DIAS = 366
+LIMITE_DATAS = 1000
+LIMITE_LOCAIS = 20
+CAMPOS = ('eventos', 'reservas', 'convidados', 'funcionarios')
+
+
+def _do_dia(dia):
+    # Dia no fuso do projeto, como faturamento.dia_do_evento
+    inicio = timezone.make_aware(datetime.combine(dia, time.min))
+    return Q(datahora__gte=inicio, datahora__lt=inicio + timedelta(days=1))
+
+
+def _eventos(dias=None):
+    eventos = Evento.objects.all()
+    if dias is not None:
+        eventos = eventos.filter(reduce(or_, map(_do_dia, dias)))  # faixas do índice de datahora
+    return (
+        eventos.order_by().annotate(dia=TruncDate('datahora'))
+        .values('dia', 'local').annotate(n_eventos=Count('id'))
+    )
+
+
+def _reservas(dias=None):
+    evento = Evento.objects.filter(cliente=OuterRef('cliente'), datahora__date=OuterRef('data')).order_by('-datahora')
+    reservas = Reserva.objects.all()
+    if dias is not None:
+        reservas = reservas.filter(data__in=dias)
+    return (
+        reservas
+        .annotate(local_evento=Coalesce(Subquery(evento.values('local')[:1]), Value(''), output_field=CharField()))
+        .order_by()
+        .values('data', 'local_evento')
+        .annotate(
+            n_reservas=Count('id'),
+            n_convidados=Sum('convidados'),
+            n_funcionarios=Count('funcionario_responsavel', distinct=True),
+        )
+    )
+
+
+def _ocupacoes(dias=None):
+    ocupacoes = {}
+
+    def linha(dia, local):
+        if (local, dia) not in ocupacoes:
+            ocupacoes[local, dia] = OcupacaoDiaria(data=dia, local=local)
+        return ocupacoes[local, dia]
+
+    for grupo in _eventos(dias).iterator():
+        linha(grupo['dia'], grupo['local']).eventos = grupo['n_eventos']
+    for grupo in _reservas(dias).iterator():
+        ocupacao = linha(grupo['data'], grupo['local_evento'])
+        ocupacao.reservas = grupo['n_reservas']
+        ocupacao.convidados = grupo['n_convidados'] or 0
+        ocupacao.funcionarios = grupo['n_funcionarios']
+    return ocupacoes
+
+
+def recalcular_dias(dias):
+    """Refaz a agenda apenas dos dias informados."""
+    dias = {dia for dia in dias if dia is not None}
+    if not dias:
+        return
+    with transaction.atomic():
+        OcupacaoDiaria.objects.filter(data__in=dias).delete()
+        OcupacaoDiaria.objects.bulk_create(_ocupacoes(dias).values())
+        condicional.marcar(OcupacaoDiaria)
+
+
+def reconstruir(batch_size=5000):
+    """Reconstrói a agenda inteira a partir de Reserva e Evento."""
+    with transaction.atomic():
+        OcupacaoDiaria.objects.all().delete()
+        OcupacaoDiaria.objects.bulk_create(_ocupacoes().values(), batch_size=batch_size)
+        condicional.marcar(OcupacaoDiaria)
+    return OcupacaoDiaria.objects.count()
+
+
+def verificar():
+    """Compara a agenda com um cálculo do zero; devolve a lista de divergências."""
+    esperado = {chave: tuple(getattr(o, c) for c in CAMPOS) for chave, o in _ocupacoes().items()}
+    atual = {
+        (local, dia): tuple(valores)
+        for local, dia, *valores in OcupacaoDiaria.objects.values_list('local', 'data', *CAMPOS).iterator()
+    }
+    divergencias = []
+    for chave in sorted(esperado.keys() | atual.keys()):
+        if esperado.get(chave) != atual.get(chave):
+            divergencias.append({
+                'chave': {'local': chave[0], 'data': chave[1]},
+                'esperado': dict(zip(CAMPOS, esperado[chave])) if chave in esperado else None,
+                'atual': dict(zip(CAMPOS, atual[chave])) if chave in atual else None,
+            })
+    return divergencias
+
+
+def _disponibilidade(ocupacoes, locais, datas):
+    # Dias sem linha na agenda estão livres
+    for dia in datas:
+        for local in locais:
+            ocupacao = ocupacoes.get((local, dia))
+            valores = {c: getattr(ocupacao, c) if ocupacao else 0 for c in CAMPOS}
+            yield {'data': dia, 'local': local, 'livre': not valores['eventos'], **valores}
+
+
+def disponibilidade(inicio, fim=None, locais=(LOCAL_PADRAO,)):
+    """Ocupação de cada local em cada dia de [inicio, fim] (90 dias por padrão); uma query."""
+    fim = fim or inicio + timedelta(days=DIAS_PADRAO - 1)
+    if fim < inicio:
+        raise ValueError({'fim': 'A data final deve ser igual ou posterior à inicial.'})
+    if (fim - inicio).days >= LIMITE_DIAS:
+        raise ValueError({'fim': f'Consulte no máximo {LIMITE_DIAS} dias por vez.'})
+    ocupacoes = {(o.local, o.data): o for o in OcupacaoDiaria.objects.filter(local__in=locais, data__range=(inicio, fim))}
+    datas = [inicio + timedelta(days=i) for i in range((fim - inicio).days + 1)]
+    return list(_disponibilidade(ocupacoes, locais, datas))
+
+
+def verificar_datas(datas, locais=(LOCAL_PADRAO,)):
+    """Ocupação de cada local nas datas candidatas (até LIMITE_DATAS, em qualquer ordem); uma query."""
+    datas = sorted(set(datas))
+    if len(datas) > LIMITE_DATAS:
+        raise ValueError({'datas': f'Envie no máximo {LIMITE_DATAS} datas por vez.'})
+    ocupacoes = {(o.local, o.data): o for o in OcupacaoDiaria.objects.filter(local__in=locais, data__in=datas)}
+    return list(_disponibilidade(ocupacoes, locais, datas))
+
+
+def ocupados(pares):
+    """Quais dos pares (local, data) já têm evento; uma query."""
+    locais, datas = {local for local, _ in pares}, {dia for _, dia in pares}
+    linhas = OcupacaoDiaria.objects.filter(local__in=locais, data__in=datas, eventos__gt=0).values_list('local', 'data')
+    return set(linhas) & set(pares)
+
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class BarConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'bar'
+
+    def ready(self):
+        from . import db, perfil, signals
+        db.conectar()
+        perfil.conectar()
+        signals.conectar()
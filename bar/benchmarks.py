@@ -0,0 +1,525 @@
+"""
+Cenários de benchmark executados por `manage.py benchmark_bar`.
+
+Cada cenário recebe o número de linhas sintéticas e de repetições e devolve
+um dicionário de medições; o comando roda tudo dentro de uma transação que é
+desfeita no final, então o banco configurado não é alterado.
+"""
+import statistics
+import time
+import tracemalloc
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connection, reset_queries, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import cache, condicional as condicional_, custos as custos_, folha as folha_, orcamentos as orcamentos_
+from . import pedidos as pedidos_, sincronizacao as sincronizacao_
+from . import views, views_async
+from . import busca, escala as escala_, exportacao as exportacao_, hierarquia as hierarquia_, importacao as importacao_
+from .busca import buscar_clientes
+from .models import Cliente, Coquetel, Funcionario, ItemPedido, ItemReceita, Pacote, Pedido, Porcao, Produto, Reserva
+from .sinteticos import popular, popular_clientes
+
+CENARIOS = {}
+
+
+def cenario(func):
+    CENARIOS[func.__name__] = func
+    return func
+
+
+def medir(func, repeticoes):
+    """Executa `func` `repeticoes` vezes e devolve as latências em ms."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        func()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return resumir(tempos)
+
+
+def percentil(ordenados, p):
+    indice = min(len(ordenados) - 1, round(p / 100 * (len(ordenados) - 1)))
+    return ordenados[indice]
+
+
+def resumir(tempos):
+    ordenados = sorted(tempos)
+    return {
+        'n': len(ordenados),
+        'media_ms': round(statistics.fmean(ordenados), 3),
+        'p50_ms': round(percentil(ordenados, 50), 3),
+        'p95_ms': round(percentil(ordenados, 95), 3),
+        'p99_ms': round(percentil(ordenados, 99), 3),
+    }
+
+
+def _get(cliente, url):
+    resposta = cliente.get(url)
+    assert resposta.status_code == 200, (url, resposta.status_code)
+
+
+@cenario
+def catalogo(linhas, repeticoes):
+    """Latência dos endpoints do catálogo com o cache ligado e desligado."""
+    popular(linhas)
+    cliente = Client()
+    urls = [reverse('coquetel-list'), reverse('pacote-list'), reverse('servico-list'), reverse('coquetel_list')]
+    resultado = {}
+    for ligado in (False, True):
+        with override_settings(BAR_CATALOGO_CACHE=ligado):
+            cache.invalidar(*cache.NAMESPACES)
+            for url in urls:
+                resultado[f"{url} cache={'on' if ligado else 'off'}"] = medir(lambda: _get(cliente, url), repeticoes)
+    return resultado
+
+
+@cenario
+def busca_clientes(linhas, repeticoes):
+    """Busca de clientes: `icontains` em nome/telefone/email (varredura) contra o índice FTS/trigramas."""
+    popular_clientes(linhas)
+    resultado = {}
+    for termo in ('Ana', 'sofia lima', 'Barb', 'cliente123', '(11) 90042'):
+        resultado[f'icontains "{termo}"'] = medir(
+            lambda: list(Cliente.objects.filter(pk__in=busca._ids_generico(termo, busca.LIMITE_PADRAO))), repeticoes)
+        resultado[f'indice "{termo}"'] = medir(lambda: list(buscar_clientes(termo)), repeticoes)
+    return resultado
+
+
+@cenario
+def exportacao(linhas, repeticoes):
+    """Tempo e pico de memória da exportação CSV de reservas (o pico não deve crescer com as linhas)."""
+    resultado = {}
+    for total in (max(1, linhas // 10), linhas):
+        popular(total)
+        nomes, tuplas = exportacao_.linhas('reservas')
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        for _ in exportacao_.stream('csv', nomes, tuplas):
+            pass
+        segundos = time.perf_counter() - inicio
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        resultado[f'reservas={total}'] = {'segundos': round(segundos, 3), 'pico_memoria_kib': round(pico / 1024, 1)}
+    return resultado
+
+
+@cenario
+def importacao(linhas, repeticoes):
+    """Linhas/segundo ao importar clientes: uma a uma (como o cliente_create) contra o importador em lotes."""
+    def gerar(prefixo):
+        return [{'nome': f'Importado {i}', 'telefone': f'{i:011d}', 'email': f'{prefixo}{i}@importacao.bar',
+                 'indicado_por_email': f'{prefixo}{i - 1}@importacao.bar' if i else ''} for i in range(linhas)]
+
+    inicio = time.perf_counter()
+    for linha in gerar('a'):
+        Cliente.objects.create(nome=linha['nome'], telefone=linha['telefone'], email=linha['email'],
+                               indicado_por=Cliente.objects.filter(email=linha['indicado_por_email']).first())
+    segundos = time.perf_counter() - inicio
+    relatorio = importacao_.importar('clientes', gerar('b'))
+    return {
+        'linha_a_linha': {'segundos': round(segundos, 3), 'linhas_por_segundo': round(linhas / segundos, 1)},
+        'em_lotes': {'segundos': relatorio['segundos'], 'linhas_por_segundo': relatorio['linhas_por_segundo']},
+    }
+
+
+@cenario
+def hierarquia(linhas, repeticoes):
+    """Rede de indicações (árvore ternária): nível a nível em Python, CTE recursiva e caminho materializado."""
+    raiz = Cliente.objects.create(nome='Raiz', telefone='0', email='raiz@hierarquia.bar')
+    nivel, criados = [raiz], 1
+    while criados < linhas:
+        nivel = Cliente.objects.bulk_create(
+            Cliente(nome=f'Indicado {criados + i}', telefone='0', email=f'{criados + i}@hierarquia.bar', indicado_por=pai)
+            for i, pai in enumerate(p for p in nivel for _ in range(3)) if criados + i < linhas
+        )
+        criados += len(nivel)
+    Reserva.objects.bulk_create(Reserva(cliente_id=pk, convidados=2) for pk in
+                                Cliente.objects.filter(email__endswith='@hierarquia.bar').values_list('pk', flat=True))
+    hierarquia_.reconstruir(Cliente)
+    raiz.refresh_from_db()
+
+    def nivel_a_nivel():
+        ids, total = [raiz.pk], 0
+        while ids:
+            ids = list(Cliente.objects.filter(indicado_por__in=ids).values_list('pk', flat=True))
+            total += len(ids)
+        return total
+
+    return {
+        'descendentes_nivel_a_nivel': medir(nivel_a_nivel, repeticoes),
+        'descendentes_cte': medir(lambda: hierarquia_.descendentes(Cliente, raiz.pk), repeticoes),
+        'descendentes_caminho': medir(lambda: list(Cliente.objects.descendentes_de(raiz).values_list('pk', flat=True)),
+                                      repeticoes),
+        'ranking_indicacoes': medir(lambda: list(
+            Cliente.objects.com_tamanho_rede().com_reservas_da_rede().filter(tamanho_rede__gt=0)
+            .order_by('-reservas_rede').values('pk', 'reservas_rede')[:10]), repeticoes),
+    }
+
+
+@cenario
+def escala(linhas, repeticoes):
+    """Escala automática de uma semana com `linhas` reservas sem responsável."""
+    segunda = date(2031, 1, 6)
+    funcoes = escala_.FUNCOES_PADRAO
+    Funcionario.objects.bulk_create(
+        Funcionario(nome=f'Escala {i}', funcao=funcoes[i % len(funcoes)], valorDiaria=Decimal(100 + i % 50))
+        for i in range(max(3, linhas // 5))
+    )
+    clientes = Cliente.objects.bulk_create(
+        Cliente(nome=f'Escala {i}', telefone='0', email=f'{i}@escala.bar') for i in range(linhas))
+    Reserva.objects.bulk_create(
+        Reserva(cliente=c, convidados=1 + i % 20, data=segunda + timedelta(days=i % 7)) for i, c in enumerate(clientes))
+
+    disponiveis = medir(lambda: list(escala_.disponiveis(segunda, segunda + timedelta(days=6), 'brt')[:20]),
+                        repeticoes)
+    relatorio = escala_.atribuir(segunda)
+    return {
+        'disponiveis_semana': disponiveis,
+        'atribuir_semana': {k: relatorio[k] for k in ('reservas_sem_responsavel', 'atribuidas', 'segundos')},
+        'disponiveis_apos_escala': medir(
+            lambda: list(escala_.disponiveis(segunda, segunda + timedelta(days=6), 'brt')[:20]), repeticoes),
+    }
+
+
+@cenario
+def polling(linhas, repeticoes):
+    """Tablet que consulta a API em loop, com uma escrita a cada 10 consultas: GET simples contra If-None-Match."""
+    popular(linhas)
+    urls = [reverse('reserva-list'), reverse('cliente-list'), reverse('produto-list')]
+    resultado = {}
+    for ligado in (False, True):
+        with override_settings(BAR_GET_CONDICIONAL=ligado):
+            cliente, etags, tempos, bytes_, respostas_304 = Client(), {}, [], 0, 0
+            cpu = time.process_time()
+            for i in range(repeticoes):
+                if i % 10 == 9:
+                    condicional_.renovar(Reserva)  # o que o on_commit de uma reserva nova faria
+                for url in urls:
+                    inicio = time.perf_counter()
+                    resposta = cliente.get(url, headers={'if-none-match': etags[url]} if url in etags else {})
+                    tempos.append((time.perf_counter() - inicio) * 1000)
+                    bytes_ += len(resposta.content)
+                    respostas_304 += resposta.status_code == 304
+                    if 'ETag' in resposta:
+                        etags[url] = resposta['ETag']
+            resultado[f"condicional={'on' if ligado else 'off'}"] = {
+                **resumir(tempos),
+                'cpu_s': round(time.process_time() - cpu, 3),
+                'kb_transferidos': round(bytes_ / 1024, 1),
+                'respostas_304': respostas_304,
+            }
+    return resultado
+
+
+@cenario
+def serializacao(linhas, repeticoes):
+    """Página de 500 linhas de Reserva e Evento: ModelSerializer contra a lista rápida (values_list)."""
+    popular(linhas)
+    cliente = Client()
+    resultado = {}
+    with override_settings(BAR_GET_CONDICIONAL=False):
+        for nome in ('reserva', 'evento'):
+            url = reverse(f'{nome}-list') + '?page_size=500'
+            for ligada in (False, True):
+                with override_settings(BAR_LISTA_RAPIDA=ligada):
+                    resultado[f"{url} rapida={'on' if ligada else 'off'}"] = medir(lambda: _get(cliente, url), repeticoes)
+    return resultado
+
+
+@cenario
+def perfil(linhas, repeticoes):
+    """Custo do PerfilMiddleware: fora da pilha, fora da amostra (0) e medindo todas as requisições (1)."""
+    popular(linhas)
+    sem_middleware = [m for m in settings.MIDDLEWARE if m != 'bar.perfil.PerfilMiddleware']
+    urls = [reverse('reserva-list'), reverse('cliente_detail', args=[Cliente.objects.values_list('pk', flat=True)[0]])]
+    variantes = {
+        'sem middleware': {'MIDDLEWARE': sem_middleware},
+        'amostra=0': {'BAR_PERFIL_AMOSTRA': 0},
+        'amostra=1': {'BAR_PERFIL_AMOSTRA': 1, 'BAR_PERFIL_SQL_LENTO_MS': None, 'BAR_PERFIL_REQUISICAO_LENTA_MS': None},
+    }
+    resultado = {}
+    with override_settings(BAR_GET_CONDICIONAL=False):
+        for nome, ajustes in variantes.items():
+            with override_settings(**ajustes):
+                cliente = Client()  # a pilha de middlewares é montada na primeira requisição
+                for url in urls:
+                    resultado[f'{url} {nome}'] = medir(lambda: _get(cliente, url), repeticoes)
+    return resultado
+
+
+@cenario
+def pedidos(linhas, repeticoes):
+    """Pedidos/segundo do PDV: um a um pelo ORM (pedido + itens) contra pedidos.ingerir() em lotes de vários tamanhos."""
+    popular(min(linhas, 50))
+    atendente = Funcionario.objects.values_list('pk', flat=True)[0]
+    coqueteis = list(Coquetel.objects.values_list('pk', 'preco_venda')[:20])
+    porcao = Porcao.objects.create(nome='Porção benchmark', preco_venda=Decimal('30.00'))
+
+    def gerar(prefixo):
+        return [{'codigo': f'{prefixo}-{i}', 'atendente': atendente, 'pago': True,
+                 'itens': [{'coquetel': coqueteis[i % len(coqueteis)][0], 'quantidade': 2}, {'porcao': porcao.pk}]}
+                for i in range(linhas)]
+
+    inicio = time.perf_counter()
+    for dados in gerar('a'):
+        coquetel, preco = coqueteis[int(dados['codigo'].split('-')[1]) % len(coqueteis)]
+        with transaction.atomic():
+            pedido = Pedido.objects.create(codigo=dados['codigo'], atendente_id=atendente, pago=True,
+                                           total=2 * preco + porcao.preco_venda)
+            ItemPedido.objects.create(pedido=pedido, coquetel_id=coquetel, quantidade=2, preco_unitario=preco)
+            ItemPedido.objects.create(pedido=pedido, porcao=porcao, preco_unitario=porcao.preco_venda)
+    segundos = time.perf_counter() - inicio
+    resultado = {'um_a_um': {'segundos': round(segundos, 3), 'pedidos_por_segundo': round(linhas / segundos, 1)}}
+    for lote in (10, 100, pedidos_.LOTE_PADRAO):
+        relatorio = pedidos_.ingerir(gerar(f'lote{lote}'), lote=lote)
+        resultado[f'lote={lote}'] = {k: relatorio[k] for k in ('segundos', 'pedidos_por_segundo')}
+    reenvio = pedidos_.ingerir(gerar(f'lote{pedidos_.LOTE_PADRAO}'))
+    resultado['reenvio'] = {k: reenvio[k] for k in ('duplicados', 'segundos')}
+    return resultado
+
+
+@cenario
+def custos(linhas, repeticoes):
+    """Mudança de preço de um produto (recálculo incremental) contra o recálculo completo, com catálogos crescentes."""
+    resultado = {}
+    for total in (max(10, linhas // 10), linhas):
+        popular(total)
+        coqueteis = list(Coquetel.objects.values_list('pk', flat=True))
+        produtos = list(Produto.objects.values_list('pk', flat=True))
+        ItemReceita.objects.all().delete()
+        # Cada coquetel usa 3 produtos; cada produto entra em ~3 receitas
+        ItemReceita.objects.bulk_create(
+            ItemReceita(coquetel_id=c, produto_id=produtos[(i * 7 + k) % len(produtos)], quantidade=1 + k)
+            for i, c in enumerate(coqueteis) for k in range(3)
+        )
+        custos_.reconstruir()
+        produto = Produto.objects.get(pk=produtos[len(produtos) // 2])
+
+        def mudar_preco():
+            produto.preco += Decimal('0.01')
+            produto.save()
+        resultado[f'coqueteis={len(coqueteis)} preco_de_um_produto'] = medir(mudar_preco, repeticoes)
+        resultado[f'coqueteis={len(coqueteis)} reconstruir'] = medir(custos_.reconstruir, max(1, repeticoes // 10))
+    return resultado
+
+
+@cenario
+def orcamentos(linhas, repeticoes):
+    """Orçamentos/segundo: um pacote lido do banco por orçamento contra orcamentos.orcar() com a tabela do lote."""
+    popular(min(linhas, 50))
+    pacotes = list(Pacote.objects.values_list('pk', flat=True))
+    hoje = date.today()
+    lote = [{'pacote': pacotes[i % len(pacotes)], 'convidados': 10 + i % 300, 'duracaoHora': 2 + i % 6,
+             'data': str(hoje + timedelta(days=i % 90))} for i in range(linhas)]
+
+    inicio = time.perf_counter()
+    for dados in lote:
+        orcamentos_.calcular(dados['pacote'], dados['convidados'], dados['duracaoHora'],
+                             orcamentos_.Tabela([dados['pacote']]))
+    segundos = time.perf_counter() - inicio
+    resultado = {'um_a_um': {'segundos': round(segundos, 3), 'orcamentos_por_segundo': round(linhas / segundos, 1)}}
+    relatorio = orcamentos_.orcar(lote)
+    resultado['lote'] = {k: relatorio[k] for k in ('segundos', 'orcamentos_por_segundo')}
+    cliente = Client()
+    resultado['api'] = medir(lambda: cliente.post(reverse('orcamentos_lote'), lote, content_type='application/json'),
+                             max(1, repeticoes // 10))
+    return resultado
+
+
+@cenario
+def folha(linhas, repeticoes):
+    """Folha do mês: cálculo completo, leitura de mês fechado e atualização incremental por reserva."""
+    popular(linhas)  # uma reserva por dia a partir de hoje, cada uma com um funcionário
+    mes = folha_.mes_de(date.today())
+    resultado = {'calcular': medir(lambda: folha_.calcular(mes), max(1, repeticoes // 10))}
+    reserva = Reserva.objects.filter(data__gte=mes, funcionario_responsavel__isnull=False).first()
+
+    def mudar_reserva():
+        reserva.convidados += 1
+        reserva.save()
+    resultado['reserva_no_mes_aberto'] = medir(mudar_reserva, repeticoes)
+    folha_.fechar(mes)
+    resultado['ler_mes_fechado'] = medir(lambda: folha_.relatorio(folha_.obter(mes)), repeticoes)
+    return resultado
+
+
+def _baixar_lista(cliente, url):
+    # Segue os links `next` da paginação; devolve os bytes recebidos
+    total = 0
+    while url:
+        resposta = cliente.get(url)
+        assert resposta.status_code == 200, (url, resposta.status_code)
+        total += len(resposta.content)
+        dados = resposta.json()
+        url = dados.get('next') if isinstance(dados, dict) else None
+    return total
+
+
+@cenario
+def sincronizacao(linhas, repeticoes):
+    """PDV que se atualiza: listas completas do catálogo contra o feed ?desde= com 10 alterações."""
+    popular(linhas)
+    urls = [reverse(f'{nome}-list') for nome in ('coquetel', 'produto', 'cliente', 'pacote', 'porcao')]
+    coqueteis = list(Coquetel.objects.all()[:10])
+    resultado = {}
+    with override_settings(BAR_GET_CONDICIONAL=False, BAR_CATALOGO_CACHE=False):
+        cliente = Client()
+        bytes_ = sum(_baixar_lista(cliente, url) for url in urls)
+        resultado['listas_completas'] = {**medir(lambda: [_baixar_lista(cliente, url) for url in urls],
+                                                 max(1, repeticoes // 10)), 'kb': round(bytes_ / 1024, 1)}
+        cursor = sincronizacao_.cursor_atual()
+        for coquetel in coqueteis:
+            coquetel.preco_venda += 1
+            coquetel.save()
+        url = reverse('sincronizar') + f'?desde={cursor}'
+        resultado['feed_10_alteracoes'] = {**medir(lambda: _get(cliente, url), repeticoes),
+                                           'kb': round(len(cliente.get(url).content) / 1024, 1)}
+    return resultado
+
+
+# Suíte de endpoints (manage.py benchmark_endpoints): roda cada view HTML e
+# endpoint da API sobre os dados já no banco (ex.: gerados por seed_bar) e
+# compara com uma linha de base salva em JSON.
+
+def _primeiro(queryset, campo='pk'):
+    return queryset.values_list(campo, flat=True).order_by(campo).first()
+
+
+def endpoints():
+    """{nome: url} de todas as leituras (GET), com pks reais do banco."""
+    from .urls import router
+
+    cliente = _primeiro(Cliente.objects.all())
+    coquetel = _primeiro(Coquetel.objects.all())
+    if cliente is None or coquetel is None:
+        raise ValueError('Banco sem dados: rode `manage.py seed_bar` antes.')
+    padrinho = _primeiro(Cliente.objects.filter(indicado_por__isnull=False), 'indicado_por')
+    indicado = Cliente.objects.filter(indicado_por__isnull=False).values_list('pk', flat=True).order_by('-pk').first()
+    supervisor = _primeiro(Funcionario.objects.filter(supervisor__isnull=False), 'supervisor')
+    subordinado = _primeiro(Funcionario.objects.filter(supervisor__isnull=False))
+    fim = date.today()
+    periodo = f'inicio={fim - timedelta(days=30)}&fim={fim}'
+
+    urls = {
+        'html coquetel_list': reverse('coquetel_list'),
+        'html coquetel_detail': reverse('coquetel_detail', args=[coquetel]),
+        'html coquetel_create': reverse('coquetel_create'),
+        'html coquetel_update': reverse('coquetel_update', args=[coquetel]),
+        'html coquetel_delete': reverse('coquetel_delete', args=[coquetel]),
+        'html cliente_list': reverse('cliente_list'),
+        'html cliente_list q=': reverse('cliente_list') + '?q=ana+silva',
+        'html cliente_detail': reverse('cliente_detail', args=[cliente]),
+        'html cliente_create': reverse('cliente_create'),
+        'html cliente_update': reverse('cliente_update', args=[cliente]),
+        'html cliente_delete': reverse('cliente_delete', args=[cliente]),
+        'html coquetel_list async': reverse('coquetel_list_async'),
+        'html coquetel_detail async': reverse('coquetel_detail_async', args=[coquetel]),
+        'html cliente_list async': reverse('cliente_list_async'),
+        'html cliente_detail async': reverse('cliente_detail_async', args=[cliente]),
+    }
+    if Coquetel.objects.count() > views.CoquetelListView.paginate_by:
+        urls['html coquetel_list page=2'] = reverse('coquetel_list') + '?page=2'
+    for _, viewset, basename in router.registry:
+        pk = _primeiro(viewset.queryset.model.objects.all())
+        urls[f'api {basename}-list'] = reverse(f'{basename}-list')
+        urls[f'api {basename}-list page_size=500'] = reverse(f'{basename}-list') + '?page_size=500'
+        if pk is not None:
+            urls[f'api {basename}-detail'] = reverse(f'{basename}-detail', args=[pk])
+        if basename in views_async.VIEWSETS:
+            urls[f'api {basename}-list async'] = reverse(f'{basename}-list-async')
+            if pk is not None:
+                urls[f'api {basename}-detail async'] = reverse(f'{basename}-detail-async', args=[pk])
+    urls.update({
+        'api cliente-list search=': reverse('cliente-list') + '?search=ana+silva',
+        'api evento-list pago=false': reverse('evento-list') + '?pago=false',
+        'api evento-list periodo': reverse('evento-list') + f'?{periodo}',
+        'api reserva-list periodo': reverse('reserva-list') + f'?{periodo}',
+        'api produto-list precisa_repor': reverse('produto-list') + '?precisa_repor=true',
+        'api funcionario-list funcao=': reverse('funcionario-list') + '?funcao=brt',
+        'api cliente-ranking-indicacoes': reverse('cliente-ranking-indicacoes'),
+        'api funcionario-disponiveis': reverse('funcionario-disponiveis') + f'?{periodo}',
+        'api catalogo_cache_stats': reverse('catalogo_cache_stats'),
+        'api faturamento_relatorio mes': reverse('faturamento_relatorio') + '?periodo=mes',
+        'api faturamento_relatorio dia por=pacote': reverse('faturamento_relatorio') + f'?por=pacote&{periodo}',
+        'api agenda_disponibilidade 90 dias': reverse('agenda_disponibilidade') + f'?{periodo.split("&")[0]}',
+        'api sincronizar desde=cursor': reverse('sincronizar') + f'?desde={sincronizacao_.cursor_atual()}',
+    })
+    for nome, pk in (('cliente', padrinho), ('funcionario', supervisor)):
+        if pk is not None:
+            urls[f'api {nome}-descendentes'] = reverse(f'{nome}-descendentes', args=[pk])
+    for nome, pk in (('cliente', indicado), ('funcionario', subordinado)):
+        if pk is not None:
+            urls[f'api {nome}-ancestrais'] = reverse(f'{nome}-ancestrais', args=[pk])
+    # Exportações: um mês das tabelas com data, o resto inteiro
+    for modelo in exportacao_.EXPORTAVEIS:
+        filtro = f'&{periodo}' if modelo in ('reservas', 'eventos') else ''
+        urls[f'exportar {modelo}'] = reverse('exportar', args=[modelo]) + f'?formato=ndjson{filtro}'
+    return urls
+
+
+def _requisitar(cliente, url):
+    resposta = cliente.get(url)
+    assert resposta.status_code == 200, (url, resposta.status_code)
+    if resposta.streaming:
+        return sum(len(pedaco) for pedaco in resposta.streaming_content)
+    return len(resposta.content)
+
+
+def medir_endpoint(cliente, url, repeticoes, tempo_maximo):
+    """Latências (até `repeticoes` ou `tempo_maximo` segundos), queries, pico de memória e bytes de uma URL."""
+    _requisitar(cliente, url)  # aquecimento: caches, templates, conexões
+    reset_queries()  # o log de queries tem tamanho fixo; cheio, a contagem daria 0
+    with CaptureQueriesContext(connection) as consultas:
+        tamanho = _requisitar(cliente, url)
+    queries = len(consultas)  # lido já: as próximas requisições limpam o log de queries
+    tracemalloc.start()
+    try:
+        _requisitar(cliente, url)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    tempos, limite = [], time.perf_counter() + tempo_maximo
+    while len(tempos) < repeticoes and (len(tempos) < 3 or time.perf_counter() < limite):
+        inicio = time.perf_counter()
+        _requisitar(cliente, url)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return {**resumir(tempos), 'queries': queries, 'pico_kb': round(pico / 1024, 1), 'bytes': tamanho}
+
+
+def medir_endpoints(repeticoes=20, tempo_maximo=10, apenas=None, progresso=None):
+    cliente = Client()
+    resultado = {}
+    for nome, url in endpoints().items():
+        if apenas and not any(trecho in nome for trecho in apenas):
+            continue
+        if progresso:
+            progresso(f'{nome}: {url}')
+        resultado[nome] = {'url': url, **medir_endpoint(cliente, url, repeticoes, tempo_maximo)}
+    return resultado
+
+
+# Métricas comparadas com a linha de base; a latência tolera `minimo_ms` de ruído absoluto
+METRICAS_COMPARADAS = ('p50_ms', 'p95_ms', 'queries', 'pico_kb')
+
+
+def comparar(base, atual, limite=0.2, minimo_ms=1.0):
+    """Regressões de `atual` sobre `base`: métricas que pioraram mais que `limite` (fração)."""
+    regressoes = []
+    for nome in sorted(base.keys() & atual.keys()):
+        for metrica in METRICAS_COMPARADAS:
+            antes, depois = base[nome].get(metrica), atual[nome].get(metrica)
+            if antes is None or depois is None:
+                continue
+            folga = minimo_ms if metrica.endswith('_ms') else 0
+            if depois > antes * (1 + limite) + folga:
+                regressoes.append({
+                    'endpoint': nome, 'metrica': metrica, 'antes': antes, 'depois': depois,
+                    'variacao': f'{(depois / antes - 1) * 100:+.0f}%' if antes else 'novo',
+                })
+    return regressoes
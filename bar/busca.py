@@ -0,0 +1,112 @@
+"""
+Busca de clientes por nome, telefone e email.
+
+SQLite usa a tabela FTS5 `bar_cliente_fts` (migração 0015), com prefixo em
+cada termo e ranking bm25 (nome pesa mais que telefone e email). Um telefone
+incompleto também casa pelos dígitos do meio ou do fim, com uma varredura.
+PostgreSQL usa `icontains` (UPPER(col) LIKE), atendido pelos índices de
+trigramas sobre UPPER(col) (migração 0025), e ordena por similaridade.
+Outros bancos caem no mesmo `icontains`, sem índice.
+
+O resultado é um queryset de Cliente limitado aos `limite` mais relevantes,
+já ordenado por relevância.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.functions import Greatest
+
+from .models import Cliente
+
+LIMITE_PADRAO = 50
+LIMITE_MAXIMO = 500
+
+# Pesos do bm25 por coluna: nome, telefone, email
+PESOS_FTS = (10.0, 2.0, 1.0)
+
+
+def telefone(texto):
+    """Os dígitos de `texto` se ele parece um telefone, senão None."""
+    if re.fullmatch(r'[\d\s().+-]*\d[\d\s().+-]*', texto or ''):
+        return re.sub(r'\D', '', texto)
+    return None
+
+
+def termos(texto):
+    """Quebra a busca em termos só com letras/dígitos (descarta a sintaxe do FTS5)."""
+    digitos = telefone(texto)
+    if digitos:
+        return [digitos]  # o índice guarda só os dígitos
+    return re.findall(r'\w+', texto or '')
+
+
+def _ids_sqlite(texto, limite):
+    consulta = ' '.join(f'"{termo}"*' for termo in termos(texto))
+    if not consulta:
+        return []
+    pesos = ', '.join(str(p) for p in PESOS_FTS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid FROM bar_cliente_fts WHERE bar_cliente_fts MATCH %s '
+            f'ORDER BY bm25(bar_cliente_fts, {pesos}) LIMIT %s',
+            [consulta, limite],
+        )
+        ids = [linha[0] for linha in cursor.fetchall()]
+        digitos = telefone(texto)
+        if digitos and len(ids) < limite:
+            # O FTS5 só casa o começo do telefone; dígitos do meio ou do fim varrem
+            # a coluna (já só com dígitos), depois dos que casaram pelo começo
+            cursor.execute(
+                'SELECT rowid FROM bar_cliente_fts WHERE telefone LIKE %s ORDER BY rowid LIMIT %s',
+                [f'%{digitos}%', limite],
+            )
+            ids += [pk for pk, in cursor.fetchall() if pk not in ids][:limite - len(ids)]
+        return ids
+
+
+def filtro_por_termos(partes):
+    """Cada termo em nome, telefone ou email; no PostgreSQL, o UPPER(col::text) LIKE dos índices de trigramas."""
+    filtro = Q()
+    for termo in partes:
+        filtro &= Q(nome__icontains=termo) | Q(telefone__icontains=termo) | Q(email__icontains=termo)
+    return filtro
+
+
+def _ids_postgres(texto, limite):
+    from django.contrib.postgres.search import TrigramWordSimilarity
+
+    partes = termos(texto)
+    if not partes:
+        return []
+    filtro = filtro_por_termos(partes)
+    busca = ' '.join(partes)
+    return list(
+        Cliente.objects.filter(filtro)
+        .annotate(relevancia=Greatest(
+            TrigramWordSimilarity(busca, 'nome'),
+            TrigramWordSimilarity(busca, 'email'),
+        ))
+        .order_by('-relevancia', 'nome', 'pk')
+        .values_list('pk', flat=True)[:limite]
+    )
+
+
+def _ids_generico(texto, limite):
+    filtro = filtro_por_termos(termos(texto))
+    if not filtro:
+        return []
+    return list(Cliente.objects.filter(filtro).order_by('nome', 'pk').values_list('pk', flat=True)[:limite])
+
+
+def buscar_clientes(texto, queryset=None, limite=LIMITE_PADRAO):
+    """Clientes que casam com `texto`, do mais para o menos relevante."""
+    limite = max(1, min(int(limite), LIMITE_MAXIMO))
+    buscar = {'sqlite': _ids_sqlite, 'postgresql': _ids_postgres}.get(connection.vendor, _ids_generico)
+    ids = buscar(texto, limite)
+    if queryset is None:
+        queryset = Cliente.objects.all()
+    if not ids:
+        return queryset.none()
+    posicao = Case(*[When(pk=pk, then=Value(i)) for i, pk in enumerate(ids)], output_field=IntegerField())
+    return queryset.filter(pk__in=ids).order_by(posicao)
@@ -0,0 +1,149 @@
+"""
+Cache de leitura (read-through) do catálogo: Coquetel, Pacote e Servico.
+
+Cada namespace ('coquetel', 'pacote', 'servico') tem um número de versão
+guardado no cache compartilhado 'versoes' e embutido em todas as chaves, então
+uma escrita em um worker invalida as entradas de todos. Os sinais em
+bar/signals.py incrementam a versão dos namespaces afetados por uma escrita,
+o que invalida de uma vez todas as entradas daquele namespace sem precisar
+enumerá-las; as entradas antigas expiram pelo TTL ou pelo MAX_ENTRIES.
+
+bulk_create() e QuerySet.update() não disparam sinais: quem os usar no
+catálogo deve chamar invalidar() explicitamente.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from rest_framework.response import Response
+
+CACHE_ALIAS = 'catalogo'
+VERSOES_ALIAS = 'versoes'  # o mesmo dos carimbos de bar/condicional.py
+NAMESPACES = ('coquetel', 'pacote', 'servico')
+
+_lock = threading.Lock()
+estatisticas = {'hits': 0, 'misses': 0}
+_AUSENTE = object()
+
+
+def ativo():
+    return getattr(settings, 'BAR_CATALOGO_CACHE', True)
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _versoes():
+    return caches[VERSOES_ALIAS]
+
+
+def _chave_versao(namespace):
+    return f'catalogo:versao:{namespace}'
+
+
+def _contar(tipo):
+    with _lock:
+        estatisticas[tipo] += 1
+
+
+def versao(namespace):
+    chave = _chave_versao(namespace)
+    atual = _versoes().get(chave)
+    if atual is None:
+        # Se a chave de versão foi descartada, recomeça de um valor novo
+        # (tempo em ns) para nunca reaproveitar entradas de uma versão antiga.
+        _versoes().add(chave, time.time_ns(), timeout=None)
+        atual = _versoes().get(chave)
+    return atual
+
+
+def invalidar(*namespaces):
+    # Uma versão nova (e não incr()): o backend em disco não incrementa de forma atômica
+    _versoes().set_many(dict.fromkeys(map(_chave_versao, namespaces), time.time_ns()), timeout=None)
+
+
+def obter(namespace, chave, calcular):
+    """Devolve o valor em cache ou calcula, guarda e devolve."""
+    if not ativo():
+        return calcular()
+    chave = f'{namespace}:{versao(namespace)}:{chave}'
+    valor = _cache().get(chave, _AUSENTE)
+    if valor is not _AUSENTE:
+        _contar('hits')
+        return valor
+    _contar('misses')
+    valor = calcular()
+    _cache().set(chave, valor)
+    return valor
+
+
+async def aversao(namespace):
+    chave = _chave_versao(namespace)
+    atual = await _versoes().aget(chave)
+    if atual is None:
+        await _versoes().aadd(chave, time.time_ns(), timeout=None)
+        atual = await _versoes().aget(chave)
+    return atual
+
+
+async def aobter(namespace, chave, calcular):
+    """Como obter(), para as views assíncronas: `calcular` é uma corrotina."""
+    if not ativo():
+        return await calcular()
+    chave = f'{namespace}:{await aversao(namespace)}:{chave}'
+    valor = await _cache().aget(chave, _AUSENTE)
+    if valor is not _AUSENTE:
+        _contar('hits')
+        return valor
+    _contar('misses')
+    valor = await calcular()
+    await _cache().aset(chave, valor)
+    return valor
+
+
+def resumo():
+    with _lock:
+        hits, misses = estatisticas['hits'], estatisticas['misses']
+    total = hits + misses
+    return {
+        'ativo': ativo(),
+        'hits': hits,
+        'misses': misses,
+        'taxa_acerto': round(hits / total, 4) if total else None,
+    }
+
+
+def zerar_estatisticas():
+    with _lock:
+        estatisticas.update(hits=0, misses=0)
+
+
+class CatalogoCacheMixin:
+    """Guarda o JSON serializado de list/retrieve de um ViewSet do catálogo."""
+    cache_namespace = None
+
+    def list(self, request, *args, **kwargs):
+        listar = super().list
+        dados = obter(self.cache_namespace, f'list:{request.get_full_path()}',
+                      lambda: listar(request, *args, **kwargs).data)
+        return Response(dados)
+
+    def retrieve(self, request, *args, **kwargs):
+        detalhar = super().retrieve
+        dados = obter(self.cache_namespace, f'retrieve:{request.get_full_path()}',
+                      lambda: detalhar(request, *args, **kwargs).data)
+        return Response(dados)
+
+
+class PaginaCacheMixin:
+    """Guarda o HTML renderizado do GET de uma view genérica do catálogo."""
+    cache_namespace = None
+
+    def get(self, request, *args, **kwargs):
+        pagina = super().get
+        conteudo = obter(self.cache_namespace, f'pagina:{request.get_full_path()}',
+                         lambda: pagina(request, *args, **kwargs).render().content)
+        return HttpResponse(conteudo)
@@ -0,0 +1,107 @@
+"""
+GET condicional na API: ETag / If-None-Match e Last-Modified / If-Modified-Since.
+
+Cada modelo tem um carimbo (time_ns da última escrita) no cache 'versoes'.
+Os sinais em bar/signals.py renovam o carimbo de qualquer escrita depois do
+commit, para uma leitura concorrente nunca sair com a ETag nova e os dados
+velhos. Gravações que não disparam sinais (bulk_create, update(), SQL
+próprio) chamam marcar() explicitamente.
+
+Os ViewSets declaram em `versionado_por` os modelos que aparecem nas suas
+respostas. A ETag é o hash desses carimbos com o caminho pedido e o formato,
+e o Last-Modified é o carimbo mais recente. Um 304 custa uma leitura no
+cache, sem a query principal e sem serialização.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+CACHE_ALIAS = 'versoes'
+METODOS = ('GET', 'HEAD')
+
+
+def ativo():
+    return getattr(settings, 'BAR_GET_CONDICIONAL', True)
+
+
+def _chave(modelo):
+    return f'carimbo:{modelo._meta.label_lower}'
+
+
+def renovar(*modelos):
+    caches[CACHE_ALIAS].set_many(dict.fromkeys(map(_chave, modelos), time.time_ns()), timeout=None)
+
+
+def marcar(*modelos):
+    """Renova o carimbo dos modelos quando a transação atual for confirmada."""
+    transaction.on_commit(lambda: renovar(*modelos))
+
+
+def carimbos(modelos):
+    chaves = [_chave(modelo) for modelo in modelos]
+    valores = caches[CACHE_ALIAS].get_many(chaves)
+    faltando = [chave for chave in chaves if chave not in valores]
+    if faltando:
+        # Carimbo descartado ou nunca gravado: começa agora (só invalida ETags antigas)
+        for chave in faltando:
+            caches[CACHE_ALIAS].add(chave, time.time_ns(), timeout=None)
+        valores.update(caches[CACHE_ALIAS].get_many(faltando))
+    return [valores[chave] for chave in chaves]
+
+
+def validadores(request, modelos, formato):
+    """(etag, last_modified) da resposta de `request` que lê `modelos`."""
+    valores = carimbos(modelos)
+    base = '|'.join([request.get_full_path(), formato, *map(str, valores)])
+    etag = quote_etag(hashlib.md5(base.encode(), usedforsecurity=False).hexdigest())
+    segundos = max(valores) // 10 ** 9
+    # If-Modified-Since tem resolução de 1 s: com uma escrita no segundo corrente,
+    # outra no mesmo segundo passaria despercebida, então fica só a ETag.
+    return etag, (segundos if segundos < int(time.time()) else None)
+
+
+def aplicar(resposta, validadores):
+    if validadores and resposta.status_code in (200, 304):
+        etag, last_modified = validadores
+        resposta['ETag'] = etag
+        if last_modified is not None:
+            resposta['Last-Modified'] = http_date(last_modified)
+    return resposta
+
+
+class NaoModificado(Exception):
+    def __init__(self, resposta):
+        super().__init__()
+        self.resposta = resposta
+
+
+class CondicionalMixin:
+    """GETs de um ViewSet com ETag/Last-Modified; um 304 sai antes de executar a ação."""
+    versionado_por = ()
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.validadores = None
+        # A API navegável (HTML) tem token CSRF e usuário na página: fica de fora
+        if not (ativo() and self.versionado_por and request.method in METODOS
+                and request.accepted_renderer.format == 'json'):
+            return
+        self.validadores = validadores(request, self.versionado_por, request.accepted_renderer.format)
+        etag, last_modified = self.validadores
+        resposta = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if resposta is not None:
+            raise NaoModificado(aplicar(resposta, self.validadores))
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NaoModificado):
+            return exc.resposta
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        return aplicar(response, getattr(self, 'validadores', None))
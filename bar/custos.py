@@ -0,0 +1,122 @@
+"""
+Custo dos coquetéis e pacotes derivado dos preços dos produtos.
+
+Um coquetel com receita (ItemReceita) custa a soma de `quantidade ×
+Produto.preco` dos seus itens; sem receita, o preco_custo continua o digitado.
+Pacote.custo_insumos é o preco_custo do coquetel mais o preço do produto do
+pacote.
+
+Quando o preço de produtos muda, atualizar_produtos() recalcula só os
+coquetéis cuja receita usa esses produtos e os pacotes que apontam para eles
+ou para os produtos, em dois UPDATEs com subqueries:
+
+    UPDATE bar_coquetel SET preco_custo = (SELECT SUM(...) FROM receita ...)
+     WHERE id IN (SELECT coquetel_id FROM bar_itemreceita WHERE produto_id IN (...))
+    UPDATE bar_pacote SET custo_insumos = (...) WHERE coqueteis_id IN (...) OR produtos_id IN (...)
+
+Os UPDATEs passam por sincronizacao.atualizar(), que carimba atualizado_em e
+anota as linhas no diário do feed dos PDVs (bar/sincronizacao.py).
+
+O número de queries não depende do catálogo, e as linhas tocadas são
+encontradas pelos índices de ItemReceita(produto), ItemReceita(coquetel,
+produto) e das FKs de Pacote. Os sinais de bar/signals.py chamam as funções
+abaixo em cada escrita; o comando `manage.py custos` reconstrói ou verifica
+tudo.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from . import cache, condicional, sincronizacao
+from .models import Coquetel, ItemReceita, Pacote, Produto
+
+CUSTO = DecimalField(max_digits=12, decimal_places=2)
+
+
+def custo_da_receita():
+    """Subquery com a soma de quantidade × preço da receita do coquetel."""
+    return Subquery(
+        ItemReceita.objects.filter(coquetel_id=OuterRef('pk')).order_by().values('coquetel_id')
+        .annotate(custo=Sum(F('quantidade') * F('produto__preco'), output_field=CUSTO)).values('custo')[:1],
+        output_field=CUSTO,
+    )
+
+
+def custo_do_pacote():
+    """Expressão de Pacote.custo_insumos a partir do coquetel e do produto do pacote."""
+    coquetel = Coquetel.objects.filter(pk=OuterRef('coqueteis_id')).order_by().values('preco_custo')[:1]
+    produto = Produto.objects.filter(pk=OuterRef('produtos_id')).order_by().values('preco')[:1]
+    return (Coalesce(Subquery(coquetel, output_field=CUSTO), Decimal(0))
+            + Coalesce(Subquery(produto, output_field=CUSTO), Decimal(0)))
+
+
+def custo_insumos(coquetel, produto):
+    """custo_insumos de um pacote com esse coquetel e esse produto; uma query."""
+    linha = Coquetel.objects.filter(pk=coquetel).values_list('preco_custo', Subquery(
+        Produto.objects.filter(pk=produto).order_by().values('preco')[:1], output_field=CUSTO)).first()
+    return sum((valor or 0 for valor in linha or ()), Decimal('0.00'))
+
+
+def _com_receita(coqueteis):
+    return ItemReceita.objects.filter(coquetel_id__in=coqueteis).values('coquetel_id')
+
+
+def _avisar(*modelos):
+    # update() não dispara sinais
+    condicional.marcar(*modelos)
+    cache.invalidar('coquetel', 'pacote')
+
+
+def atualizar_pacotes(coqueteis=(), produtos=()):
+    """Recalcula custo_insumos dos pacotes que usam os coquetéis ou produtos informados (ids ou subqueries)."""
+    return sincronizacao.atualizar(Pacote.objects.filter(Q(coqueteis_id__in=coqueteis) | Q(produtos_id__in=produtos)),
+                                   custo_insumos=custo_do_pacote())
+
+
+def atualizar_produtos(produtos):
+    """Preço de `produtos` mudou: recalcula os coquetéis das receitas que os usam e os pacotes afetados."""
+    afetados = ItemReceita.objects.filter(produto_id__in=produtos).values('coquetel_id')
+    with transaction.atomic():
+        coqueteis = sincronizacao.atualizar(Coquetel.objects.filter(pk__in=afetados), preco_custo=custo_da_receita())
+        pacotes = atualizar_pacotes(afetados, produtos)
+    _avisar(Coquetel, Pacote)
+    return {'coqueteis': coqueteis, 'pacotes': pacotes}
+
+
+def atualizar_coqueteis(coqueteis):
+    """Receita de `coqueteis` mudou: recalcula o preco_custo deles (se ainda têm receita) e os pacotes."""
+    with transaction.atomic():
+        alterados = sincronizacao.atualizar(Coquetel.objects.filter(pk__in=_com_receita(coqueteis)),
+                                            preco_custo=custo_da_receita())
+        pacotes = atualizar_pacotes(coqueteis)
+    _avisar(Coquetel, Pacote)
+    return {'coqueteis': alterados, 'pacotes': pacotes}
+
+
+def reconstruir():
+    """Recalcula o custo de todos os coquetéis com receita e de todos os pacotes."""
+    with transaction.atomic():
+        coqueteis = sincronizacao.atualizar(Coquetel.objects.filter(pk__in=ItemReceita.objects.values('coquetel_id')),
+                                            preco_custo=custo_da_receita())
+        pacotes = sincronizacao.atualizar(Pacote.objects.all(), custo_insumos=custo_do_pacote())
+    _avisar(Coquetel, Pacote)
+    return {'coqueteis': coqueteis, 'pacotes': pacotes}
+
+
+def verificar():
+    """Coquetéis e pacotes cujo custo gravado difere do calculado."""
+    # Comparado em Python, já arredondado para centavos: no SQLite os
+    # decimais são REAL e a soma pode diferir na última casa binária
+    consultas = {
+        'coquetel': Coquetel.objects.filter(pk__in=ItemReceita.objects.values('coquetel_id'))
+        .annotate(esperado=custo_da_receita()).values_list('pk', 'preco_custo', 'esperado'),
+        'pacote': Pacote.objects.annotate(esperado=custo_do_pacote()).values_list('pk', 'custo_insumos', 'esperado'),
+    }
+    return [
+        {'modelo': modelo, 'id': pk, 'atual': atual, 'esperado': esperado}
+        for modelo, consulta in consultas.items()
+        for pk, atual, esperado in consulta.order_by('pk').iterator()
+        if atual != esperado
+    ]
@@ -0,0 +1,21 @@
+"""Ajustes de conexão do banco (ver o perfil BAR_DB em project/settings.py)."""
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+# Collation de Cliente.caminho e Funcionario.caminho: as buscas por subárvore são
+# intervalos de texto e dependem da ordem byte a byte ('/' < '0'). No PostgreSQL
+# é a "C"; no SQLite a padrão (BINARY) já compara assim.
+COLACAO_CAMINHO = 'C' if settings.DATABASES['default']['ENGINE'].endswith('postgresql') else None
+
+
+def configurar_sqlite(sender, connection, **kwargs):
+    """Aplica BAR_SQLITE_PRAGMAS em cada conexão SQLite nova."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for nome, valor in getattr(settings, 'BAR_SQLITE_PRAGMAS', {}).items():
+            cursor.execute(f'PRAGMA {nome} = {valor}')
+
+
+def conectar():
+    connection_created.connect(configurar_sqlite, dispatch_uid='bar_configurar_sqlite')
@@ -0,0 +1,128 @@
+"""
+Escala de funcionários nas reservas.
+
+A restrição `uniq_reserva_funcionario_data` impede que um funcionário fique
+com duas reservas no mesmo dia, e o índice dela, (funcionario_responsavel,
+data), atende às consultas daqui:
+
+- `disponiveis(inicio, fim, funcao)`: quem não tem nenhuma reserva no
+  período (NOT EXISTS correlacionado, uma query);
+- `atribuir(inicio, fim)`: distribui as reservas sem responsável do
+  período. Lê as ocupações numa query, escolhe em memória e grava tudo com
+  um UPDATE por lote. A função com menos reservas por funcionário recebe a
+  próxima; dentro dela vai para o funcionário menos ocupado no período e,
+  no empate, para o de menor valorDiaria.
+"""
+import heapq
+import time
+from collections import Counter, defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from . import agenda, folha
+from .importacao import atualizar_referencias
+from .models import Funcionario, Reserva
+
+# Gerentes e chefes de pista não entram na escala automática, a não ser que sejam pedidos
+FUNCOES_PADRAO = ('brt', 'brb', 'gar')
+DIAS_PADRAO = 7
+
+
+def ocupados(inicio, fim):
+    return Reserva.objects.filter(funcionario_responsavel=OuterRef('pk'), data__range=(inicio, fim))
+
+
+def disponiveis(inicio, fim=None, funcao=None):
+    """Funcionários sem reserva em nenhum dia de [inicio, fim], do mais barato ao mais caro."""
+    queryset = Funcionario.objects.filter(~Exists(ocupados(inicio, fim or inicio)))
+    if funcao:
+        queryset = queryset.filter(funcao__in=[funcao] if isinstance(funcao, str) else funcao)
+    return queryset.order_by('valorDiaria', 'nome', 'pk')
+
+
+class _Funcao:
+    """Fila de prioridade (reservas no período, valorDiaria, id) dos funcionários de uma função."""
+
+    def __init__(self, funcionarios, carga):
+        self.tamanho = len(funcionarios)
+        self.atribuidas = 0
+        self.fila = [(carga[f.pk], f.valorDiaria, f.pk) for f in funcionarios]
+        heapq.heapify(self.fila)
+
+    def escolher(self, livre):
+        # Tira da fila até achar alguém livre no dia; os ocupados voltam depois
+        pulados, escolhido = [], None
+        while self.fila:
+            item = heapq.heappop(self.fila)
+            if livre(item[2]):
+                escolhido = item
+                break
+            pulados.append(item)
+        for item in pulados:
+            heapq.heappush(self.fila, item)
+        if escolhido:
+            carga, valor, pk = escolhido
+            heapq.heappush(self.fila, (carga + 1, valor, pk))
+            self.atribuidas += 1
+        return escolhido
+
+    def ocupacao(self):
+        return self.atribuidas / self.tamanho if self.tamanho else float('inf')
+
+
+def atribuir(inicio, fim=None, funcoes=FUNCOES_PADRAO, simular=False, lote=1000):
+    """Atribui responsáveis às reservas sem funcionário em [inicio, fim] e devolve o relatório."""
+    fim = fim or inicio + timedelta(days=DIAS_PADRAO - 1)
+    comeco = time.perf_counter()
+    with transaction.atomic():
+        funcionarios = list(Funcionario.objects.filter(funcao__in=funcoes).only('pk', 'funcao', 'valorDiaria'))
+        reservas = list(
+            Reserva.objects.select_for_update().filter(data__range=(inicio, fim), funcionario_responsavel__isnull=True)
+            .order_by('data', '-convidados', 'pk').values_list('pk', 'data')
+        )
+        ocupacoes = set(
+            Reserva.objects.filter(data__range=(inicio, fim), funcionario_responsavel__isnull=False)
+            .values_list('funcionario_responsavel', 'data')
+        )
+        carga = Counter(pk for pk, _ in ocupacoes)
+        por_funcao = defaultdict(list)
+        for funcionario in funcionarios:
+            por_funcao[funcionario.funcao].append(funcionario)
+        filas = {funcao: _Funcao(membros, carga) for funcao, membros in por_funcao.items()}
+        custo = {f.pk: f.valorDiaria for f in funcionarios}
+
+        atribuicoes, sem_funcionario, atribuidas_por_funcao = [], [], Counter()
+        for pk, data in reservas:
+            livre = lambda funcionario: (funcionario, data) not in ocupacoes
+            for funcao in sorted(filas, key=lambda f: (filas[f].ocupacao(), f)):
+                escolhido = filas[funcao].escolher(livre)
+                if escolhido:
+                    ocupacoes.add((escolhido[2], data))
+                    atribuicoes.append((pk, escolhido[2]))
+                    atribuidas_por_funcao[funcao] += 1
+                    break
+            else:
+                sem_funcionario.append(pk)
+
+        if not simular:
+            atualizar_referencias(Reserva, 'funcionario_responsavel', atribuicoes, lote)
+            # O UPDATE em lote não dispara sinais
+            agenda.recalcular_dias({data for _, data in reservas})
+            datas = dict(reservas)
+            folha.atualizar({(datas[pk], funcionario) for pk, funcionario in atribuicoes})
+
+    segundos = time.perf_counter() - comeco
+    return {
+        'inicio': inicio,
+        'fim': fim,
+        'reservas_sem_responsavel': len(reservas),
+        'atribuidas': len(atribuicoes),
+        'sem_funcionario_livre': len(sem_funcionario),
+        'por_funcao': dict(atribuidas_por_funcao),
+        'custo_diarias': sum((custo[f] for _, f in atribuicoes), Decimal('0.00')),
+        'simulacao': simular,
+        'segundos': round(segundos, 3),
+    }
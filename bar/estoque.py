@@ -0,0 +1,86 @@
+"""
+Baixa de estoque pelas vendas, a partir das receitas (ItemReceita).
+
+Cada dose vendida de um coquetel consome `quantidade` unidades de cada
+produto da receita. Um lote de vendas vira o consumo total por produto e a
+baixa sai em poucos UPDATEs com F() (um por quantidade distinta, não um por
+dose nem por produto), dentro da mesma transação que grava as vendas:
+
+    UPDATE bar_produto SET estoque = MAX(estoque - 3, 0) WHERE id IN (...)
+
+O F() faz a subtração no banco, então vendas simultâneas não se sobrescrevem.
+Antes do UPDATE as linhas são lidas com select_for_update() (no SQLite a
+transação IMMEDIATE já serializa as escritas), o que dá o estoque anterior
+exato para saber quais produtos cruzaram o estoque_minimo nesta baixa e
+quanto faltou quando o estoque não cobria a venda. Esses produtos vão para o
+logger 'bar.estoque' e para o relatório, sem uma segunda passada.
+"""
+import logging
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from . import condicional, sincronizacao
+from .models import ItemReceita, Produto
+
+logger = logging.getLogger('bar.estoque')
+
+
+def receitas(coqueteis):
+    """{coquetel_id: [(produto_id, quantidade)]} dos coquetéis informados; uma query."""
+    resultado = defaultdict(list)
+    linhas = ItemReceita.objects.filter(coquetel_id__in=set(coqueteis)).values_list('coquetel_id', 'produto_id',
+                                                                                    'quantidade')
+    for coquetel, produto, quantidade in linhas:
+        resultado[coquetel].append((produto, quantidade))
+    return resultado
+
+
+def consumo(vendas, receitas_=None):
+    """{produto_id: unidades} consumidas por `vendas` ({coquetel_id: doses} ou pares (coquetel_id, doses))."""
+    doses = Counter()
+    for coquetel, quantidade in (vendas.items() if isinstance(vendas, dict) else vendas):
+        doses[coquetel] += quantidade
+    if receitas_ is None:
+        receitas_ = receitas(doses)
+    total = Counter()
+    for coquetel, quantidade in doses.items():
+        for produto, por_dose in receitas_.get(coquetel, ()):
+            total[produto] += quantidade * por_dose
+    return {produto: unidades for produto, unidades in total.items() if unidades}
+
+
+def baixar(vendas, receitas_=None):
+    """Baixa o estoque consumido por `vendas`; devolve os produtos que precisam de reposição e as faltas."""
+    baixas = consumo(vendas, receitas_)
+    relatorio = {'produtos': len(baixas), 'unidades': sum(baixas.values()), 'repor': [], 'faltas': {}}
+    if not baixas:
+        return relatorio
+
+    por_quantidade = defaultdict(list)
+    for produto, unidades in baixas.items():
+        por_quantidade[unidades].append(produto)
+    with transaction.atomic():
+        antes = {pk: (estoque, minimo) for pk, estoque, minimo in Produto.objects.select_for_update()
+                 .filter(pk__in=baixas).order_by('pk').values_list('pk', 'estoque', 'estoque_minimo')}
+        agora = timezone.now()
+        for unidades, produtos in sorted(por_quantidade.items()):
+            Produto.objects.filter(pk__in=produtos).update(
+                estoque=Greatest(F('estoque') - Value(unidades), Value(0)), atualizado_em=agora)
+        sincronizacao.registrar(Produto, antes)  # update() não dispara sinais
+    condicional.marcar(Produto)
+
+    for produto, (estoque, minimo) in sorted(antes.items()):
+        unidades = baixas[produto]
+        if unidades > estoque:
+            relatorio['faltas'][produto] = unidades - estoque
+        if estoque >= minimo > estoque - unidades:
+            relatorio['repor'].append(produto)
+    if relatorio['repor']:
+        logger.warning('Produtos abaixo do estoque mínimo após vendas: %s', relatorio['repor'])
+    if relatorio['faltas']:
+        logger.warning('Vendas acima do estoque registrado (unidades faltando por produto): %s', relatorio['faltas'])
+    return relatorio
@@ -0,0 +1,235 @@
+"""
+Teste de estresse de escritas concorrentes em Reserva e Pedido.
+
+Cada thread abre a sua própria conexão e grava clientes e reservas em
+transações curtas, disputando também a mesma linha de uma reserva
+"quente". Com o perfil SQLite (WAL, busy_timeout, transações IMMEDIATE)
+nenhuma escrita deve falhar com "database is locked".
+
+martelar_pedidos() faz o mesmo com a ingestão em lote dos PDVs
+(bar/pedidos.py): várias threads enviando lotes ao mesmo tempo, com parte
+dos lotes reenviada para conferir que nada é gravado duas vezes.
+"""
+import threading
+import time
+import uuid
+from datetime import date, timedelta
+
+from django.db import OperationalError, close_old_connections, connection, transaction
+from django.db.models import F
+
+from . import pedidos as pedidos_
+from .models import Cliente, Coquetel, Funcionario, Pedido, Porcao, Reserva
+
+DOMINIO = 'estresse.bar'
+PREFIXO_PEDIDO = 'estresse-'  # `codigo` dos pedidos gravados aqui
+
+
+def martelar_reservas(threads=16, escritas=50):
+    lote = uuid.uuid4().hex[:8]
+    quente = Reserva.objects.create(
+        cliente=Cliente.objects.create(nome='Estresse', telefone='0', email=f'quente-{lote}@{DOMINIO}'),
+        convidados=1,
+    )
+    erros = []
+    barreira = threading.Barrier(threads)
+
+    def trabalhar(indice):
+        close_old_connections()
+        try:
+            barreira.wait()
+            for i in range(escritas):
+                try:
+                    with transaction.atomic():
+                        cliente = Cliente.objects.create(
+                            nome=f'Estresse {indice}-{i}', telefone='0', email=f'{lote}-{indice}-{i}@{DOMINIO}')
+                        Reserva.objects.create(cliente=cliente, convidados=2,
+                                               data=date.today() + timedelta(days=i % 30))
+                        Reserva.objects.filter(pk=quente.pk).update(convidados=F('convidados') + 1)
+                except OperationalError as erro:
+                    erros.append(str(erro))
+        finally:
+            connection.close()
+
+    inicio = time.perf_counter()
+    trabalhadores = [threading.Thread(target=trabalhar, args=(n,)) for n in range(threads)]
+    for t in trabalhadores:
+        t.start()
+    for t in trabalhadores:
+        t.join()
+    segundos = time.perf_counter() - inicio
+
+    total = threads * escritas
+    quente.refresh_from_db()
+    return {
+        'threads': threads,
+        'transacoes': total,
+        'erros': len(erros),
+        'exemplos_de_erro': sorted(set(erros))[:5],
+        'segundos': round(segundos, 3),
+        'transacoes_por_segundo': round((total - len(erros)) / segundos, 1),
+        'reserva_quente_consistente': quente.convidados == 1 + total - len(erros),
+    }
+
+
+def limpar():
+    """Remove os dados criados pelos testes de estresse."""
+    Reserva.objects.filter(cliente__email__endswith=f'@{DOMINIO}').delete()
+    Cliente.objects.filter(email__endswith=f'@{DOMINIO}').delete()
+
+
+def _lote_de_pedidos(prefixo, tamanho, atendente, coqueteis, porcao):
+    return [
+        {
+            'codigo': f'{prefixo}-{i}',
+            'atendente': atendente,
+            'forma_pagamento': ('Cre', 'Deb', 'Pix', 'Din')[i % 4],
+            'pago': i % 3 != 0,
+            'itens': [{'coquetel': coqueteis[i % len(coqueteis)], 'quantidade': 1 + i % 3}, {'porcao': porcao}]
+                     if coqueteis else [{'porcao': porcao, 'quantidade': 1 + i % 3}],
+        }
+        for i in range(tamanho)
+    ]
+
+
+def martelar_pedidos(threads=4, lotes=10, tamanho=500, via_api=False):
+    """
+    `threads` PDVs gravando `lotes` lotes de `tamanho` pedidos cada, por
+    pedidos.ingerir() ou pelo POST /bar/api/pedidos/lote/ (`via_api`). Cada
+    thread reenvia o primeiro lote no fim, como depois de um timeout.
+    """
+    from django.test import Client
+    from django.urls import reverse
+
+    rodada = uuid.uuid4().hex[:8]
+    atendente = Funcionario.objects.create(nome=f'{PREFIXO_PEDIDO}{rodada}', email=f'pdv-{rodada}@{DOMINIO}').pk
+    porcao = Porcao.objects.create(nome=f'{PREFIXO_PEDIDO}{rodada}', preco_venda=20).pk
+    coqueteis = list(Coquetel.objects.values_list('pk', flat=True)[:20])
+    erros, criados, duplicados = [], [], []
+    barreira = threading.Barrier(threads)
+
+    def enviar(http, lote):
+        if http is None:
+            return pedidos_.ingerir(lote)
+        resposta = http.post(reverse('pedido-lote'), lote, content_type='application/json')
+        if resposta.status_code != 200:
+            raise OperationalError(f'HTTP {resposta.status_code}')
+        return resposta.json()
+
+    def trabalhar(indice):
+        close_old_connections()
+        http = Client() if via_api else None
+        try:
+            barreira.wait()
+            enviados = [_lote_de_pedidos(f'{PREFIXO_PEDIDO}{rodada}-{indice}-{n}', tamanho, atendente, coqueteis, porcao)
+                        for n in range(lotes)]
+            for lote in enviados + enviados[:1]:
+                try:
+                    relatorio = enviar(http, lote)
+                    criados.append(relatorio['criados'])
+                    duplicados.append(relatorio['duplicados'])
+                except OperationalError as erro:
+                    erros.append(str(erro))
+        finally:
+            connection.close()
+
+    inicio = time.perf_counter()
+    trabalhadores = [threading.Thread(target=trabalhar, args=(n,)) for n in range(threads)]
+    for t in trabalhadores:
+        t.start()
+    for t in trabalhadores:
+        t.join()
+    segundos = time.perf_counter() - inicio
+
+    esperados = threads * lotes * tamanho
+    gravados = Pedido.objects.filter(codigo__startswith=f'{PREFIXO_PEDIDO}{rodada}-').count()
+    return {
+        'threads': threads,
+        'lotes_por_thread': lotes,
+        'pedidos_por_lote': tamanho,
+        'via_api': via_api,
+        'erros': len(erros),
+        'exemplos_de_erro': sorted(set(erros))[:5],
+        'criados': sum(criados),
+        'duplicados_ignorados': sum(duplicados),
+        'segundos': round(segundos, 3),
+        'pedidos_por_segundo': round(sum(criados) / segundos, 1),
+        'sem_duplicatas': gravados == sum(criados) == esperados - len(erros) * tamanho,
+    }
+
+
+def limpar_pedidos():
+    """Remove os pedidos, porções e atendentes criados por martelar_pedidos()."""
+    Pedido.objects.filter(codigo__startswith=PREFIXO_PEDIDO).delete()
+    Porcao.objects.filter(nome__startswith=PREFIXO_PEDIDO).delete()
+    Funcionario.objects.filter(nome__startswith=PREFIXO_PEDIDO, email__endswith=f'@{DOMINIO}').delete()
+
+
+def _percentil(ordenados, p):
+    if not ordenados:
+        return None
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+def carga_http(url, conexoes=32, segundos=10, aquecimento=1):
+    """
+    Teste de carga de leitura contra um servidor já rodando (gunicorn/WSGI ou
+    uvicorn/ASGI): cada thread mantém uma conexão keep-alive e repete GETs em
+    `url` por `segundos`. Devolve requisições/s e latências em ms.
+    """
+    import http.client
+    from urllib.parse import urlsplit
+
+    alvo = urlsplit(url)
+    caminho = alvo.path + (f'?{alvo.query}' if alvo.query else '')
+    latencias, erros = [], []
+    barreira = threading.Barrier(conexoes)
+    lock = threading.Lock()
+
+    def trabalhar():
+        http_ = http.client.HTTPConnection(alvo.hostname, alvo.port or 80, timeout=30)
+        medidas = []
+        barreira.wait()
+        inicio = time.perf_counter()
+        fim = inicio + aquecimento + segundos
+        try:
+            while (agora := time.perf_counter()) < fim:
+                try:
+                    http_.request('GET', caminho)
+                    resposta = http_.getresponse()
+                    resposta.read()
+                    if resposta.status != 200:
+                        erros.append(resposta.status)
+                    elif agora >= inicio + aquecimento:
+                        medidas.append(time.perf_counter() - agora)
+                except (OSError, http.client.HTTPException) as erro:
+                    erros.append(type(erro).__name__)
+                    http_.close()
+        finally:
+            http_.close()
+            with lock:
+                latencias.extend(medidas)
+
+    trabalhadores = [threading.Thread(target=trabalhar) for _ in range(conexoes)]
+    for t in trabalhadores:
+        t.start()
+    for t in trabalhadores:
+        t.join()
+
+    latencias.sort()
+    ms = lambda valor: round(valor * 1000, 2) if valor is not None else None
+    return {
+        'url': url,
+        'conexoes': conexoes,
+        'segundos': segundos,
+        'requisicoes': len(latencias),
+        'erros': len(erros),
+        'exemplos_de_erro': sorted({str(e) for e in erros})[:5],
+        'requisicoes_por_segundo': round(len(latencias) / segundos, 1),
+        'latencia_ms': {
+            'p50': ms(_percentil(latencias, 0.50)),
+            'p90': ms(_percentil(latencias, 0.90)),
+            'p99': ms(_percentil(latencias, 0.99)),
+            'max': ms(latencias[-1] if latencias else None),
+        },
+    }
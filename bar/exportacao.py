@@ -0,0 +1,175 @@
+"""
+Exportação em massa (CSV / NDJSON) dos modelos do bar.
+
+As linhas saem de `values_list(...).iterator(chunk_size=...)`: nada de
+instâncias de modelo nem lista completa em memória, e os nomes relacionados
+(`cliente__nome`, `fornecedor__nome`...) vêm por JOIN na mesma query.
+Usado pela view `exportar` (StreamingHttpResponse) e pelo comando
+`manage.py exportar_bar`.
+"""
+import csv
+import datetime
+import json
+from decimal import Decimal
+
+from django.db import models
+from django.utils import timezone
+
+from .models import Coquetel, Cliente, Servico, Pacote, Funcionario, Reserva, Fornecedor, Produto, Evento
+
+CHUNK_SIZE = 2000
+FORMATOS = ('csv', 'ndjson')
+
+
+class Exportavel:
+    """`queryset` é uma função (o queryset é montado a cada exportação)."""
+    def __init__(self, queryset, campos, campo_data=None):
+        self.queryset = queryset
+        self.campos = campos
+        self.campo_data = campo_data
+
+
+EXPORTAVEIS = {
+    'eventos': Exportavel(
+        lambda: Evento.objects.all(),
+        ['id', 'datahora', 'cliente_id', 'cliente__nome', 'pago', 'forma_pagamento', 'local', 'observacoes'],
+        campo_data='datahora',
+    ),
+    'reservas': Exportavel(
+        lambda: Reserva.objects.com_total_estimado(),
+        ['id', 'data', 'cliente_id', 'cliente__nome', 'pacote_id', 'pacote__nomePacote', 'convidados',
+         'funcionario_responsavel_id', 'funcionario_responsavel__nome', 'total_estimado'],
+        campo_data='data',
+    ),
+    'produtos': Exportavel(
+        lambda: Produto.objects.com_precisa_repor(),
+        ['id', 'nome', 'preco', 'estoque', 'estoque_minimo', 'precisa_repor', 'fornecedor_id', 'fornecedor__nome'],
+    ),
+    'coqueteis': Exportavel(
+        lambda: Coquetel.objects.com_indicadores(),
+        ['id', 'nome', 'ingredientes', 'recipiente', 'preco_custo', 'preco_venda', 'lucro_unitario', 'margem_lucro',
+         'fornecedor_id', 'fornecedor__nome'],
+    ),
+    'clientes': Exportavel(
+        lambda: Cliente.objects.all(),
+        ['id', 'nome', 'telefone', 'email', 'indicado_por_id', 'indicado_por__nome', 'data_cadastro'],
+        campo_data='data_cadastro',
+    ),
+    'servicos': Exportavel(
+        lambda: Servico.objects.all(),
+        ['id', 'nome', 'valor_hora', 'funcao', 'descricao'],
+    ),
+    'pacotes': Exportavel(
+        lambda: Pacote.objects.all(),
+        ['id', 'nomePacote', 'coqueteis_id', 'coqueteis__nome', 'produtos_id', 'produtos__nome', 'duracaoHora',
+         'servicos_id', 'servicos__nome', 'valorPorPessoa'],
+    ),
+    'funcionarios': Exportavel(
+        lambda: Funcionario.objects.all(),
+        ['id', 'nome', 'valorDiaria', 'funcao', 'cpf', 'email', 'supervisor_id', 'supervisor__nome'],
+    ),
+    'fornecedores': Exportavel(
+        lambda: Fornecedor.objects.all(),
+        ['id', 'nome', 'cnpj', 'email', 'telefone', 'endereco'],
+    ),
+}
+
+
+class ErroExportacao(ValueError):
+    pass
+
+
+def linhas(modelo, campos=None, inicio=None, fim=None, chunk_size=CHUNK_SIZE):
+    """Devolve (campos, iterador de tuplas) para o modelo pedido."""
+    if modelo not in EXPORTAVEIS:
+        raise ErroExportacao(f"Modelo desconhecido: {modelo}. Use um de: {', '.join(EXPORTAVEIS)}.")
+    exportavel = EXPORTAVEIS[modelo]
+    campos = campos or exportavel.campos
+    invalidos = [campo for campo in campos if campo not in exportavel.campos]
+    if invalidos:
+        raise ErroExportacao(f"Campo(s) inválido(s): {', '.join(invalidos)}. Disponíveis: {', '.join(exportavel.campos)}.")
+
+    queryset = exportavel.queryset()
+    if inicio or fim:
+        if not exportavel.campo_data:
+            raise ErroExportacao(f'{modelo} não aceita filtro de data.')
+        queryset = queryset.filter(**filtro_de_datas(queryset.model, exportavel.campo_data, inicio, fim))
+    formatadores = [_formatador(queryset, campo) for campo in campos]
+    tuplas = queryset.order_by('pk').values_list(*campos).iterator(chunk_size=chunk_size)
+    return campos, (tuple(f(v) for f, v in zip(formatadores, tupla)) for tupla in tuplas)
+
+
+def filtro_de_datas(modelo, campo, inicio=None, fim=None):
+    """Filtro [inicio, fim] (datas inclusivas) que usa o índice do campo, mesmo em DateTimeField."""
+    filtro = {}
+    if modelo._meta.get_field(campo).get_internal_type() == 'DateTimeField':
+        # Converte para o intervalo [inicio 00:00, fim + 1 dia 00:00) no fuso local
+        if inicio:
+            filtro[f'{campo}__gte'] = timezone.make_aware(datetime.datetime.combine(inicio, datetime.time.min))
+        if fim:
+            filtro[f'{campo}__lt'] = timezone.make_aware(
+                datetime.datetime.combine(fim + datetime.timedelta(days=1), datetime.time.min))
+    else:
+        if inicio:
+            filtro[f'{campo}__gte'] = inicio
+        if fim:
+            filtro[f'{campo}__lte'] = fim
+    return filtro
+
+
+def _formatador(queryset, campo):
+    """Converte o valor da coluna para texto/JSON; decimais com as casas do campo."""
+    if campo in queryset.query.annotations:
+        campo_modelo = queryset.query.annotations[campo].output_field
+    else:
+        modelo = queryset.model
+        for parte in campo.split('__')[:-1]:
+            modelo = modelo._meta.get_field(parte).related_model
+        campo_modelo = modelo._meta.get_field(campo.split('__')[-1])
+    if isinstance(campo_modelo, models.DecimalField):
+        casas = Decimal(1).scaleb(-campo_modelo.decimal_places)
+        return lambda v: None if v is None else str(Decimal(v).quantize(casas))
+    if isinstance(campo_modelo, (models.DateField, models.TimeField)):  # DateTimeField herda de DateField
+        return lambda v: None if v is None else v.isoformat()
+    return lambda v: v
+
+
+class _Eco:
+    """Pseudo-arquivo: o csv.writer devolve a linha em vez de guardá-la."""
+    def write(self, valor):
+        return valor
+
+
+def _em_blocos(pedacos, tamanho=500):
+    # Junta as linhas em blocos para não mandar um chunk HTTP por linha
+    bloco = []
+    for pedaco in pedacos:
+        bloco.append(pedaco)
+        if len(bloco) >= tamanho:
+            yield ''.join(bloco)
+            bloco = []
+    if bloco:
+        yield ''.join(bloco)
+
+
+def csv_stream(campos, tuplas):
+    escritor = csv.writer(_Eco())
+    yield escritor.writerow(campos)
+    yield from _em_blocos(escritor.writerow(tupla) for tupla in tuplas)
+
+
+def ndjson_stream(campos, tuplas):
+    yield from _em_blocos(
+        json.dumps(dict(zip(campos, tupla)), ensure_ascii=False) + '\n' for tupla in tuplas
+    )
+
+
+CONTENT_TYPES = {'csv': 'text/csv; charset=utf-8', 'ndjson': 'application/x-ndjson'}
+
+
+def stream(formato, campos, tuplas):
+    if formato == 'csv':
+        return csv_stream(campos, tuplas)
+    if formato == 'ndjson':
+        return ndjson_stream(campos, tuplas)
+    raise ErroExportacao(f"Formato desconhecido: {formato}. Use um de: {', '.join(FORMATOS)}.")
@@ -0,0 +1,136 @@
+"""
+Manutenção do resumo de faturamento (FaturamentoDiario).
+
+A receita de uma reserva é `convidados × pacote.valorPorPessoa`; a forma de
+pagamento e o status "pago" vêm do Evento do mesmo cliente no mesmo dia
+(o mais recente, se houver mais de um). Reservas sem evento entram com
+forma_pagamento ''.
+
+Cada escrita em Reserva, Evento ou Pacote recalcula apenas os dias afetados
+(ver bar/signals.py), com uma agregação indexada por `data`. Os relatórios
+leem só o resumo, então o custo depende do intervalo pedido, não do histórico.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import BooleanField, Case, CharField, Count, DecimalField, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from . import condicional
+from .models import Evento, FaturamentoDiario, Reserva
+
+CENTAVOS = Decimal('0.01')
+CHAVE = ('data', 'pacote_id', 'forma_pagamento')
+
+
+def _agregado(dias=None):
+    evento = Evento.objects.filter(cliente=OuterRef('cliente'), datahora__date=OuterRef('data')).order_by('-datahora')
+    reservas = Reserva.objects.com_total_estimado()
+    if dias is not None:
+        reservas = reservas.filter(data__in=dias)
+    return (
+        reservas
+        .annotate(
+            forma=Coalesce(Subquery(evento.values('forma_pagamento')[:1]), Value(''), output_field=CharField()),
+            evento_pago=Coalesce(Subquery(evento.values('pago')[:1]), Value(False), output_field=BooleanField()),
+        )
+        .order_by()
+        .values('data', 'pacote_id', 'forma')
+        .annotate(
+            n_reservas=Count('id'),
+            n_convidados=Sum('convidados'),
+            total=Sum('total_estimado'),
+            total_pago=Sum(Case(When(evento_pago=True, then='total_estimado'), default=Value(0),
+                                output_field=DecimalField(max_digits=14, decimal_places=2))),
+        )
+    )
+
+
+def _resumos(linhas):
+    for linha in linhas:
+        yield FaturamentoDiario(
+            data=linha['data'],
+            pacote_id=linha['pacote_id'],
+            forma_pagamento=linha['forma'],
+            reservas=linha['n_reservas'],
+            convidados=linha['n_convidados'] or 0,
+            receita=Decimal(linha['total'] or 0).quantize(CENTAVOS),
+            receita_paga=Decimal(linha['total_pago'] or 0).quantize(CENTAVOS),
+        )
+
+
+def recalcular_dias(dias):
+    """Refaz o resumo apenas dos dias informados."""
+    dias = {dia for dia in dias if dia is not None}
+    if not dias:
+        return
+    with transaction.atomic():
+        FaturamentoDiario.objects.filter(data__in=dias).delete()
+        FaturamentoDiario.objects.bulk_create(_resumos(_agregado(dias)))
+        condicional.marcar(FaturamentoDiario)
+
+
+def reconstruir(batch_size=5000):
+    """Reconstrói o resumo inteiro a partir de Reserva e Evento."""
+    with transaction.atomic():
+        FaturamentoDiario.objects.all().delete()
+        FaturamentoDiario.objects.bulk_create(_resumos(_agregado().iterator(chunk_size=batch_size)), batch_size=batch_size)
+        condicional.marcar(FaturamentoDiario)
+    return FaturamentoDiario.objects.count()
+
+
+def verificar():
+    """Compara o resumo com um cálculo do zero; devolve a lista de divergências."""
+    campos = ('reservas', 'convidados', 'receita', 'receita_paga')
+    esperado = {
+        tuple(getattr(r, c) for c in CHAVE): tuple(getattr(r, c) for c in campos)
+        for r in _resumos(_agregado().iterator())
+    }
+    atual = {
+        tuple(r[:3]): tuple(r[3:])
+        for r in FaturamentoDiario.objects.values_list(*CHAVE, *campos).iterator()
+    }
+    divergencias = []
+    for chave in sorted(esperado.keys() | atual.keys(), key=str):
+        if esperado.get(chave) != atual.get(chave):
+            divergencias.append({
+                'chave': dict(zip(CHAVE, chave)),
+                'esperado': dict(zip(campos, esperado[chave])) if chave in esperado else None,
+                'atual': dict(zip(campos, atual[chave])) if chave in atual else None,
+            })
+    return divergencias
+
+
+def dia_do_evento(datahora):
+    return timezone.localdate(datahora) if timezone.is_aware(datahora) else datahora.date()
+
+
+PERIODOS = {
+    'dia': lambda: F('data'),
+    'semana': lambda: TruncWeek('data'),
+    'mes': lambda: TruncMonth('data'),
+}
+AGRUPAMENTOS = {'pacote': 'pacote_id', 'forma_pagamento': 'forma_pagamento'}
+
+
+def relatorio(periodo='dia', inicio=None, fim=None, por=None):
+    """Totais por período (e opcionalmente por pacote ou forma de pagamento), lidos só do resumo."""
+    resumo = FaturamentoDiario.objects.all()
+    if inicio:
+        resumo = resumo.filter(data__gte=inicio)
+    if fim:
+        resumo = resumo.filter(data__lte=fim)
+    colunas = ['periodo'] + ([AGRUPAMENTOS[por]] if por else [])
+    return (
+        resumo
+        .annotate(periodo=PERIODOS[periodo]())
+        .values(*colunas)
+        .annotate(
+            reservas=Sum('reservas'),
+            convidados=Sum('convidados'),
+            receita=Sum('receita'),
+            receita_paga=Sum('receita_paga'),
+        )
+        .order_by(*colunas)
+    )
@@ -0,0 +1,176 @@
+"""
+Folha de pagamento por mês (FolhaMensal + FolhaFuncionario).
+
+A folha sai das reservas atribuídas (Reserva.funcionario_responsavel) no
+mês, numa agregação só, agrupada por funcionário:
+
+- dias: dias com reserva (a restrição uniq_reserva_funcionario_data garante
+  no máximo uma por dia) × valorDiaria;
+- horas: soma de Pacote.duracaoHora das reservas;
+- serviços: Servico.valor_hora × duracaoHora do serviço do pacote, quando o
+  funcionário está em Servico.funcionarios (habilitado para ele).
+
+O resultado fica guardado como foto do mês. Mês fechado (fechar()) é só
+lido: não muda com edições posteriores e reabrir() é explícito. Mês aberto é
+calculado na primeira leitura e depois mantido pelos sinais de bar/signals.py:
+cada escrita em Reserva ou Funcionario recalcula só as linhas dos
+funcionários e meses tocados; mudanças em Pacote e Servico, que podem atingir
+qualquer reserva, descartam as fotos abertas, refeitas na próxima leitura.
+"""
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, Exists, F, OuterRef, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import FolhaFuncionario, FolhaMensal, Reserva, Servico
+
+CENTAVOS = Decimal('0.01')
+VALOR = DecimalField(max_digits=12, decimal_places=2)
+CAMPOS = ('dias', 'horas', 'valor_diarias', 'valor_servicos', 'total')
+
+
+def mes_de(valor):
+    """Primeiro dia do mês de uma data ou de um texto AAAA-MM; ValueError se inválido."""
+    if isinstance(valor, date):
+        return valor.replace(day=1)
+    try:
+        ano, mes = (int(parte) for parte in str(valor).split('-'))
+        return date(ano, mes, 1)
+    except ValueError:
+        raise ValueError({'mes': 'Mês inválido; use AAAA-MM.'}) from None
+
+
+def _seguinte(mes):
+    return date(mes.year + mes.month // 12, mes.month % 12 + 1, 1)
+
+
+def _agregado(mes, funcionarios=None):
+    habilitado = Servico.funcionarios.through.objects.filter(
+        servico=OuterRef('pacote__servicos'), funcionario=OuterRef('funcionario_responsavel'))
+    reservas = Reserva.objects.filter(data__gte=mes, data__lt=_seguinte(mes), funcionario_responsavel__isnull=False)
+    if funcionarios is not None:
+        reservas = reservas.filter(funcionario_responsavel__in=funcionarios)  # índice (funcionario, data)
+    return (
+        reservas.order_by()
+        .values('funcionario_responsavel', 'funcionario_responsavel__nome', 'funcionario_responsavel__funcao',
+                'funcionario_responsavel__valorDiaria')
+        .annotate(
+            n_dias=Count('data', distinct=True),
+            n_horas=Coalesce(Sum('pacote__duracaoHora'), 0),
+            servicos=Sum(Case(
+                When(Exists(habilitado), then=F('pacote__servicos__valor_hora') * F('pacote__duracaoHora')),
+                default=Value(0), output_field=VALOR,
+            )),
+        )
+    )
+
+
+def _linhas(folha, funcionarios=None):
+    for grupo in _agregado(folha.mes, funcionarios).iterator():
+        diaria = grupo['funcionario_responsavel__valorDiaria']
+        valor_diarias = (diaria * grupo['n_dias']).quantize(CENTAVOS)
+        valor_servicos = Decimal(grupo['servicos'] or 0).quantize(CENTAVOS)
+        yield FolhaFuncionario(
+            folha=folha,
+            funcionario_id=grupo['funcionario_responsavel'],
+            nome=grupo['funcionario_responsavel__nome'],
+            funcao=grupo['funcionario_responsavel__funcao'],
+            valorDiaria=diaria,
+            dias=grupo['n_dias'],
+            horas=grupo['n_horas'],
+            valor_diarias=valor_diarias,
+            valor_servicos=valor_servicos,
+            total=valor_diarias + valor_servicos,
+        )
+
+
+def calcular(mes):
+    """Recalcula a folha inteira do mês, se ainda aberta; devolve a FolhaMensal."""
+    mes = mes_de(mes)
+    with transaction.atomic():
+        folha, _ = FolhaMensal.objects.select_for_update().get_or_create(mes=mes)
+        if folha.fechada:
+            return folha
+        folha.linhas.all().delete()
+        FolhaFuncionario.objects.bulk_create(_linhas(folha))
+        folha.calculada_em = timezone.now()
+        folha.save(update_fields=['calculada_em'])
+    return folha
+
+
+def obter(mes):
+    """Folha do mês: a foto guardada, ou calculada agora se o mês ainda não tem foto."""
+    return FolhaMensal.objects.filter(mes=mes_de(mes)).first() or calcular(mes)
+
+
+def atualizar(pares):
+    """Recalcula só as linhas dos pares (mês, funcionario_id) nas folhas abertas que já têm foto."""
+    por_mes = defaultdict(set)
+    for mes, funcionario in pares:
+        if mes is not None and funcionario is not None:
+            por_mes[mes_de(mes)].add(funcionario)
+    if not por_mes:
+        return
+    with transaction.atomic():
+        for folha in FolhaMensal.objects.select_for_update().filter(mes__in=por_mes, fechada=False):
+            funcionarios = por_mes[folha.mes]
+            folha.linhas.filter(funcionario__in=funcionarios).delete()
+            FolhaFuncionario.objects.bulk_create(_linhas(folha, funcionarios))
+
+
+def atualizar_funcionario(funcionario):
+    """Recalcula as linhas de um funcionário em todas as folhas abertas."""
+    meses = FolhaMensal.objects.filter(fechada=False).values_list('mes', flat=True)
+    atualizar((mes, funcionario) for mes in meses)
+
+
+def invalidar():
+    """Descarta as fotos dos meses abertos; cada uma é refeita na próxima leitura."""
+    FolhaMensal.objects.filter(fechada=False).delete()
+
+
+def fechar(mes):
+    """Recalcula (se aberta) e fecha a folha do mês."""
+    with transaction.atomic():
+        folha = calcular(mes)
+        if not folha.fechada:
+            folha.fechada = True
+            folha.save(update_fields=['fechada'])
+    return folha
+
+
+def reabrir(mes):
+    """Reabre a folha do mês e a recalcula com os dados atuais."""
+    FolhaMensal.objects.filter(mes=mes_de(mes)).update(fechada=False)
+    return calcular(mes)
+
+
+def relatorio(folha, por=None):
+    """Linhas da folha por funcionário ou somadas por função, lidas só da foto."""
+    linhas = folha.linhas.all()
+    if por == 'funcao':
+        return list(
+            linhas.order_by().values('funcao')
+            .annotate(funcionarios=Count('id'), **{campo: Sum(campo) for campo in CAMPOS})
+            .order_by('funcao')
+        )
+    return list(linhas.order_by('funcao', 'nome', 'pk'))
+
+
+def verificar(mes):
+    """Compara a foto do mês com um cálculo do zero; devolve as divergências."""
+    folha = FolhaMensal.objects.filter(mes=mes_de(mes)).first()
+    if folha is None:
+        return []
+    esperado = {linha.funcionario_id: tuple(getattr(linha, c) for c in CAMPOS) for linha in _linhas(folha)}
+    atual = {pk: tuple(valores) for pk, *valores in folha.linhas.values_list('funcionario_id', *CAMPOS)}
+    return [
+        {'funcionario': pk, 'esperado': dict(zip(CAMPOS, esperado[pk])) if pk in esperado else None,
+         'atual': dict(zip(CAMPOS, atual[pk])) if pk in atual else None}
+        for pk in sorted(esperado.keys() | atual.keys(), key=lambda pk: (pk is None, pk or 0))
+        if esperado.get(pk) != atual.get(pk)
+    ]
@@ -0,0 +1,15 @@
+from django import forms
+
+from .models import Coquetel, Cliente
+
+
+class CoquetelForm(forms.ModelForm):
+    class Meta:
+        model = Coquetel
+        fields = ['nome', 'ingredientes', 'recipiente', 'preco_custo', 'preco_venda', 'fornecedor']
+
+
+class ClienteForm(forms.ModelForm):
+    class Meta:
+        model = Cliente
+        fields = ['nome', 'telefone', 'email', 'indicado_por']
@@ -0,0 +1,207 @@
+"""
+Hierarquias por FK para o próprio modelo: Cliente.indicado_por (indicações)
+e Funcionario.supervisor (equipes).
+
+Duas representações:
+
+- CTE recursiva (`WITH RECURSIVE`, SQLite e PostgreSQL): descendentes,
+  ancestrais, profundidade e tamanho das subárvores em uma única query,
+  sempre a partir do FK (fonte da verdade);
+- caminho materializado (`caminho` = '/raiz/.../id/'), mantido a cada save
+  pelos sinais (bar/signals.py) e usado nas leituras quentes: descendentes
+  viram um intervalo no índice de `caminho` (HierarquiaQuerySet) e os
+  ancestrais saem do próprio texto, sem query.
+
+bulk_create/update() não disparam sinais: depois de gravações em massa chame
+`atualizar_caminhos(modelo, ids)` com os ids cujo pai mudou (importação) ou
+`reconstruir(modelo)` para a tabela toda (dados sintéticos); o comando
+`manage.py hierarquia verificar` compara os caminhos com a CTE.
+"""
+from django.db import connection, transaction
+from django.db.models import Value
+from django.db.models.functions import Concat, Substr
+
+from . import condicional
+from .models import Cliente, Funcionario, fim_da_subarvore
+
+# Limite de níveis percorridos pela CTE (protege contra ciclos gravados por fora dos sinais)
+PROFUNDIDADE_MAXIMA = 40
+
+HIERARQUIAS = {
+    'clientes': Cliente,
+    'funcionarios': Funcionario,
+}
+
+
+class ErroHierarquia(ValueError):
+    pass
+
+
+def _tabela(modelo):
+    ops = connection.ops
+    return ops.quote_name(modelo._meta.db_table), ops.quote_name(modelo._meta.get_field(modelo.campo_pai).column)
+
+
+def _consultar(sql, parametros):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, parametros)
+        colunas = [coluna[0] for coluna in cursor.description]
+        return [dict(zip(colunas, linha)) for linha in cursor.fetchall()]
+
+
+def descendentes(modelo, pk):
+    """Todos abaixo de `pk`, com a distância até ele (1 = indicado/subordinado direto)."""
+    tabela, pai = _tabela(modelo)
+    return _consultar(
+        f'WITH RECURSIVE arvore(id, profundidade) AS ('
+        f'  SELECT id, 1 FROM {tabela} WHERE {pai} = %s'
+        f'  UNION ALL'
+        f'  SELECT t.id, arvore.profundidade + 1 FROM {tabela} t JOIN arvore ON t.{pai} = arvore.id'
+        f'  WHERE arvore.profundidade < %s'
+        f') SELECT t.id, t.nome, t.{pai} AS pai_id, arvore.profundidade'
+        f' FROM arvore JOIN {tabela} t ON t.id = arvore.id ORDER BY arvore.profundidade, t.id',
+        [pk, PROFUNDIDADE_MAXIMA],
+    )
+
+
+def ancestrais(modelo, pk):
+    """Do pai de `pk` até a raiz, com a distância (1 = pai)."""
+    tabela, pai = _tabela(modelo)
+    return _consultar(
+        f'WITH RECURSIVE cadeia(id, distancia) AS ('
+        f'  SELECT {pai}, 1 FROM {tabela} WHERE id = %s AND {pai} IS NOT NULL'
+        f'  UNION ALL'
+        f'  SELECT t.{pai}, cadeia.distancia + 1 FROM {tabela} t JOIN cadeia ON t.id = cadeia.id'
+        f'  WHERE t.{pai} IS NOT NULL AND cadeia.distancia < %s'
+        f') SELECT t.id, t.nome, cadeia.distancia FROM cadeia JOIN {tabela} t ON t.id = cadeia.id'
+        f' ORDER BY cadeia.distancia',
+        [pk, PROFUNDIDADE_MAXIMA],
+    )
+
+
+def profundidade(modelo, pk):
+    """Número de ancestrais de `pk` (0 = raiz)."""
+    return len(ancestrais(modelo, pk))
+
+
+def tamanhos_das_subarvores(modelo, ids=None):
+    """{id: número de descendentes} para os `ids` pedidos (ou todos), numa query só."""
+    tabela, pai = _tabela(modelo)
+    filtro, parametros = '', []
+    if ids is not None:
+        ids = list(ids)
+        if not ids:
+            return {}
+        filtro = f'WHERE id IN ({", ".join(["%s"] * len(ids))})'
+        parametros = ids
+    linhas = _consultar(
+        f'WITH RECURSIVE rede(raiz, id, nivel) AS ('
+        f'  SELECT id, id, 0 FROM {tabela} {filtro}'
+        f'  UNION ALL'
+        f'  SELECT rede.raiz, t.id, rede.nivel + 1 FROM {tabela} t JOIN rede ON t.{pai} = rede.id'
+        f'  WHERE rede.nivel < %s'
+        f') SELECT raiz, COUNT(*) - 1 AS total FROM rede GROUP BY raiz',
+        parametros + [PROFUNDIDADE_MAXIMA],
+    )
+    return {linha['raiz']: linha['total'] for linha in linhas}
+
+
+def _cte_caminhos(tabela, pai):
+    # Caminho de cada linha alcançável a partir de uma raiz (FK nulo)
+    return (
+        f"WITH RECURSIVE arvore(id, caminho, nivel) AS ("
+        f"  SELECT id, '/' || CAST(id AS TEXT) || '/', 0 FROM {tabela} WHERE {pai} IS NULL"
+        f"  UNION ALL"
+        f"  SELECT t.id, arvore.caminho || CAST(t.id AS TEXT) || '/', arvore.nivel + 1"
+        f"  FROM {tabela} t JOIN arvore ON t.{pai} = arvore.id WHERE arvore.nivel < {PROFUNDIDADE_MAXIMA}"
+        f")"
+    )
+
+
+def reconstruir(modelo):
+    """Recalcula todos os caminhos pela CTE; linhas presas em ciclos ficam com caminho vazio."""
+    tabela, pai = _tabela(modelo)
+    with transaction.atomic(), connection.cursor() as cursor:
+        condicional.marcar(modelo)
+        cursor.execute(f"UPDATE {tabela} SET caminho = '' WHERE caminho <> ''")
+        cursor.execute(
+            f'{_cte_caminhos(tabela, pai)} '
+            f'UPDATE {tabela} SET caminho = arvore.caminho FROM arvore WHERE {tabela}.id = arvore.id'
+        )
+        return cursor.rowcount
+
+
+def atualizar_caminhos(modelo, ids, lote=1000):
+    """
+    Recalcula só os caminhos de `ids`, das linhas ainda sem caminho (as do
+    bulk_create) e dos descendentes delas, em vez da tabela inteira.
+
+    Primeiro esvazia o caminho de `ids` e das subárvores pelo FK (um UPDATE
+    por lote de ids); depois uma CTE parte das linhas sem caminho cujo pai
+    tem caminho (ou que são raízes) e desce pelo FK. Linhas presas em ciclos
+    ficam com caminho vazio, como em reconstruir().
+    """
+    tabela, pai = _tabela(modelo)
+    ids = list(ids)
+    with transaction.atomic(savepoint=False), connection.cursor() as cursor:
+        condicional.marcar(modelo)
+        for inicio in range(0, len(ids), lote):
+            parte = ids[inicio:inicio + lote]
+            cursor.execute(
+                f"WITH RECURSIVE sub(id, nivel) AS ("
+                f"  SELECT id, 0 FROM {tabela} WHERE id IN ({', '.join(['%s'] * len(parte))})"
+                f"  UNION ALL"
+                f"  SELECT t.id, sub.nivel + 1 FROM {tabela} t JOIN sub ON t.{pai} = sub.id"
+                f"  WHERE sub.nivel < {PROFUNDIDADE_MAXIMA}"
+                f") UPDATE {tabela} SET caminho = '' WHERE caminho <> '' AND id IN (SELECT id FROM sub)",
+                parte,
+            )
+        cursor.execute(
+            f"WITH RECURSIVE arvore(id, caminho, nivel) AS ("
+            # nivel a partir da raiz (um id por '/'), para o limite valer como em reconstruir()
+            f"  SELECT t.id, COALESCE(p.caminho, '/') || CAST(t.id AS TEXT) || '/',"
+            f"         COALESCE(LENGTH(p.caminho) - LENGTH(REPLACE(p.caminho, '/', '')) - 1, 0)"
+            f"  FROM {tabela} t LEFT JOIN {tabela} p ON p.id = t.{pai}"
+            f"  WHERE t.caminho = '' AND (t.{pai} IS NULL OR p.caminho <> '')"
+            f"  UNION ALL"
+            f"  SELECT t.id, arvore.caminho || CAST(t.id AS TEXT) || '/', arvore.nivel + 1"
+            f"  FROM {tabela} t JOIN arvore ON t.{pai} = arvore.id WHERE arvore.nivel < {PROFUNDIDADE_MAXIMA}"
+            f") UPDATE {tabela} SET caminho = arvore.caminho FROM arvore WHERE {tabela}.id = arvore.id"
+        )
+        return cursor.rowcount
+
+
+def verificar(modelo):
+    """Linhas cujo caminho gravado difere do calculado pela CTE."""
+    tabela, pai = _tabela(modelo)
+    return _consultar(
+        f'{_cte_caminhos(tabela, pai)} '
+        f'SELECT t.id, t.caminho AS atual, arvore.caminho AS esperado '
+        f"FROM {tabela} t LEFT JOIN arvore ON arvore.id = t.id WHERE t.caminho <> COALESCE(arvore.caminho, '') "
+        f'ORDER BY t.id',
+        [],
+    )
+
+
+# Manutenção incremental, chamada pelos sinais
+
+def caminho_do_pai(modelo, pai_id):
+    if pai_id is None:
+        return '/'
+    caminho = modelo.objects.filter(pk=pai_id).values_list('caminho', flat=True).first()
+    return caminho or '/'
+
+
+def validar_pai(instancia, caminho_pai):
+    if instancia.pk and (instancia.pk == getattr(instancia, f'{instancia.campo_pai}_id')
+                         or f'/{instancia.pk}/' in caminho_pai):
+        raise ErroHierarquia(f'{instancia} não pode ficar abaixo de si mesmo.')
+
+
+def mover_subarvore(modelo, antigo, novo):
+    """Troca o prefixo `antigo` por `novo` no caminho de todos os descendentes (um UPDATE)."""
+    if not antigo or antigo == novo:
+        return 0
+    return modelo.objects.subarvore(antigo).update(
+        caminho=Concat(Value(novo), Substr('caminho', len(antigo) + 1))
+    )
@@ -0,0 +1,355 @@
+"""
+Importação em massa de Cliente, Fornecedor, Produto e Funcionario.
+
+As linhas (dicts vindos de CSV ou JSON) são lidas em lotes, validadas com
+`clean_fields()` (sem queries) e gravadas com uma query por lote:
+
+- Fornecedor: upsert por `cnpj` (bulk_create com update_conflicts);
+- Funcionario: upsert por `cpf` ou, sem cpf, por `email` (update_conflicts);
+- Cliente: upsert por `email` (não é único no banco: lookup em memória);
+- Produto: upsert por (fornecedor, nome), também por lookup em memória.
+
+Como bulk_create não dispara sinais, o caminho materializado das hierarquias
+(bar/hierarquia.py) é reconstruído no final da importação, e os clientes e
+produtos gravados são anotados no diário do feed dos PDVs
+(bar/sincronizacao.py).
+
+Células vazias não apagam valores já gravados. FKs vêm por chave natural
+(`fornecedor_cnpj`, `indicado_por_email`, `supervisor_cpf`) e são resolvidas
+por tabelas de lookup em memória, carregadas com uma query por lote; as
+autorreferências são gravadas numa segunda passada, então a ordem das linhas
+no arquivo não importa. O resultado traz os erros por linha e a vazão em
+linhas/segundo. Usado pelo comando `manage.py import_bar_data` e pela view
+`importar`.
+"""
+import time
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import cache, condicional, custos, hierarquia, sincronizacao
+from .models import Cliente, Fornecedor, Funcionario, Produto
+
+LOTE_PADRAO = 1000
+
+
+class ErroImportacao(ValueError):
+    pass
+
+
+def _vazio(valor):
+    return valor is None or (isinstance(valor, str) and not valor.strip())
+
+
+def _texto(linha, coluna):
+    valor = linha.get(coluna)
+    return None if _vazio(valor) else str(valor).strip()
+
+
+def _por_colunas(objetos):
+    """Agrupa os objetos pelas colunas preenchidas (cada grupo vira um UPDATE)."""
+    grupos = {}
+    for objeto in objetos:
+        grupos.setdefault(objeto._colunas, []).append(objeto)
+    return grupos.items()
+
+
+def atualizar_referencias(modelo, campo, pares, lote=LOTE_PADRAO):
+    """Grava pares (id, id referenciado) numa FK; um UPDATE ... FROM (VALUES ...) por lote.
+
+    O bulk_update gera um CASE WHEN por linha, caro no Python e no banco; SQLite
+    (3.33+) e PostgreSQL aceitam o UPDATE com FROM de uma lista de valores.
+    """
+    condicional.marcar(modelo)
+    if connection.vendor not in ('sqlite', 'postgresql'):
+        modelo.objects.bulk_update([modelo(pk=pk, **{f'{campo}_id': ref}) for pk, ref in pares], [campo], batch_size=lote)
+        return
+    tabela = connection.ops.quote_name(modelo._meta.db_table)
+    coluna = connection.ops.quote_name(modelo._meta.get_field(campo).column)
+    with connection.cursor() as cursor:
+        for inicio in range(0, len(pares), lote):
+            parte = pares[inicio:inicio + lote]
+            cursor.execute(
+                f'WITH v(id, ref) AS (VALUES {", ".join(["(%s, %s)"] * len(parte))}) '
+                f'UPDATE {tabela} SET {coluna} = v.ref FROM v WHERE {tabela}.id = v.id',
+                [valor for par in parte for valor in par],
+            )
+
+
+class Importador:
+    modelo = None
+    campos = ()  # colunas gravadas no modelo
+    obrigatorios = ()
+    invalidar_cache = ()
+
+    def __init__(self, lote=LOTE_PADRAO):
+        self.lote = lote
+        self.erros = {}
+
+    def construir(self, linha):
+        faltando = [c for c in self.obrigatorios if _vazio(linha.get(c))]
+        if faltando:
+            raise ValidationError({c: ['Este campo é obrigatório.'] for c in faltando})
+        dados = {c: linha[c] for c in self.campos if not _vazio(linha.get(c))}
+        objeto = self.modelo(**dados)
+        # FKs são resolvidas depois, pelas tabelas de lookup
+        objeto.clean_fields(exclude=[f.name for f in self.modelo._meta.concrete_fields if f.is_relation])
+        objeto._colunas = frozenset(dados)
+        return objeto
+
+    def validar(self, numeradas):
+        validas = []
+        for numero, linha in numeradas:
+            try:
+                validas.append((numero, linha, self.construir(linha)))
+            except ValidationError as erro:
+                self.erro(numero, erro.message_dict if hasattr(erro, 'error_dict') else {'__all__': erro.messages})
+        return validas
+
+    def erro(self, numero, mensagens):
+        self.erros.setdefault(numero, {}).update(mensagens)
+
+    def gravar(self, validas):
+        raise NotImplementedError
+
+    def finalizar(self):
+        """Segunda passada (autorreferências), depois de todos os lotes."""
+
+    def importar(self, linhas):
+        inicio = time.perf_counter()
+        numeradas = enumerate(linhas, start=1)
+        total = 0
+        with transaction.atomic():
+            while lote := list(islice(numeradas, self.lote)):
+                total += len(lote)
+                validas = self.validar(lote)
+                if validas:
+                    self.gravar(validas)
+            self.finalizar()
+            condicional.marcar(self.modelo)
+        if self.invalidar_cache:
+            cache.invalidar(*self.invalidar_cache)  # bulk_create não dispara sinais
+        segundos = time.perf_counter() - inicio
+        return {
+            'modelo': self.modelo._meta.model_name,
+            'linhas': total,
+            'sem_erro': total - len(self.erros),
+            'com_erro': len(self.erros),
+            'erros': [{'linha': n, 'erros': self.erros[n]} for n in sorted(self.erros)],
+            'segundos': round(segundos, 3),
+            'linhas_por_segundo': round(total / segundos, 1) if segundos else None,
+        }
+
+    def upsert(self, objetos, chave):
+        """bulk_create com update_conflicts na chave única; a última linha repetida vence."""
+        unicos = {getattr(o, chave): o for o in objetos}.values()
+        for colunas, grupo in _por_colunas(unicos):
+            self.modelo.objects.bulk_create(
+                grupo, update_conflicts=True, unique_fields=[chave],
+                update_fields=sorted(colunas - {chave}) or [chave],
+            )
+
+    def atualizar_ou_criar(self, novos, existentes, chave):
+        """Para chaves que não são únicas no banco: bulk_update + bulk_create."""
+        # bulk_update não passa pelo auto_now: o carimbo do feed dos PDVs vai explícito
+        sincronizado = sincronizacao.sincronizado(self.modelo)
+        agora = timezone.now()
+        for colunas, grupo in _por_colunas(existentes):
+            if colunas - set(chave):
+                campos = sorted(colunas - set(chave))
+                if sincronizado:
+                    for objeto in grupo:
+                        objeto.atualizado_em = agora
+                    campos.append('atualizado_em')
+                self.modelo.objects.bulk_update(grupo, campos)
+        self.modelo.objects.bulk_create(novos)
+        if sincronizado:
+            sincronizacao.registrar(self.modelo, [objeto.pk for objeto in (*existentes, *novos)])
+
+
+class ImportadorFornecedor(Importador):
+    modelo = Fornecedor
+    campos = ('nome', 'cnpj', 'email', 'telefone', 'endereco')
+    obrigatorios = ('nome', 'cnpj', 'email', 'telefone')
+    invalidar_cache = ('coquetel',)
+
+    def gravar(self, validas):
+        # email também é único: recusa a linha se ele já pertence a outro cnpj
+        dono_do_email = dict(Fornecedor.objects.filter(
+            email__in=[o.email for _, _, o in validas]).values_list('email', 'cnpj'))
+        objetos = []
+        for numero, _, objeto in validas:
+            dono = dono_do_email.setdefault(objeto.email, objeto.cnpj)
+            if dono != objeto.cnpj:
+                self.erro(numero, {'email': [f'Email já usado pelo fornecedor {dono}.']})
+                continue
+            objetos.append(objeto)
+        self.upsert(objetos, 'cnpj')
+
+
+def _funcionarios(cpfs, emails):
+    return Funcionario.objects.filter(Q(cpf__in=cpfs) | Q(email__in=emails))
+
+
+class ImportadorFuncionario(Importador):
+    modelo = Funcionario
+    campos = ('nome', 'valorDiaria', 'funcao', 'cpf', 'email')
+    obrigatorios = ('nome',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.supervisores = []  # (numero, chave, valor da chave, cpf do supervisor)
+
+    def gravar(self, validas):
+        cpfs = [o.cpf for _, _, o in validas if o.cpf]
+        emails = [o.email for _, _, o in validas if o.email]
+        id_do_cpf, id_do_email = {}, {}
+        for pk, cpf, email in _funcionarios(cpfs, emails).values_list('id', 'cpf', 'email'):
+            id_do_cpf[cpf] = id_do_email[email] = pk
+        grupos = {'cpf': [], 'email': [], None: []}
+        for numero, linha, objeto in validas:
+            por_cpf = objeto.cpf and id_do_cpf.get(objeto.cpf)
+            por_email = objeto.email and id_do_email.get(objeto.email)
+            if por_cpf and por_email and por_cpf != por_email:
+                self.erro(numero, {'email': ['Email já usado por outro funcionário.']})
+                continue
+            dono = por_cpf or por_email or ('linha', numero)  # linhas novas também ocupam cpf/email
+            if objeto.cpf:
+                id_do_cpf[objeto.cpf] = dono
+            if objeto.email:
+                id_do_email[objeto.email] = dono
+            chave = 'cpf' if objeto.cpf and (por_cpf or not por_email) else ('email' if objeto.email else None)
+            grupos[chave].append(objeto)
+
+            supervisor = _texto(linha, 'supervisor_cpf')
+            if supervisor is None:
+                continue
+            if chave is None:
+                self.erro(numero, {'supervisor_cpf': ['Informe cpf ou email para vincular o supervisor.']})
+            elif supervisor == objeto.cpf:
+                self.erro(numero, {'supervisor_cpf': ['Um funcionário não pode supervisionar a si mesmo.']})
+            else:
+                self.supervisores.append((numero, chave, getattr(objeto, chave), supervisor))
+        for chave in ('cpf', 'email'):
+            if grupos[chave]:
+                self.upsert(grupos[chave], chave)
+        Funcionario.objects.bulk_create(grupos[None])
+
+    def finalizar(self):
+        cpfs = {s[3] for s in self.supervisores} | {s[2] for s in self.supervisores if s[1] == 'cpf'}
+        emails = {s[2] for s in self.supervisores if s[1] == 'email'}
+        ids = {'cpf': {}, 'email': {}}
+        for pk, cpf, email in _funcionarios(cpfs, emails).values_list('id', 'cpf', 'email'):
+            ids['cpf'][cpf] = ids['email'][email] = pk
+        atualizar = []
+        for numero, chave, valor, supervisor in self.supervisores:
+            if supervisor not in ids['cpf']:
+                self.erro(numero, {'supervisor_cpf': [f'Supervisor {supervisor} não encontrado.']})
+                continue
+            atualizar.append((ids[chave][valor], ids['cpf'][supervisor]))
+        atualizar_referencias(Funcionario, 'supervisor', atualizar, self.lote)
+        # Só as linhas novas (sem caminho) e as que mudaram de pai, com as subárvores
+        hierarquia.atualizar_caminhos(Funcionario, [pk for pk, _ in atualizar], self.lote)
+
+
+class ImportadorCliente(Importador):
+    modelo = Cliente
+    campos = ('nome', 'telefone', 'email')
+    obrigatorios = campos
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.id_do_email = {}
+        self.indicacoes = []  # (numero, email do cliente, email de quem indicou)
+
+    def gravar(self, validas):
+        # Emails repetidos no banco: fica o cliente mais antigo
+        self.id_do_email.update(Cliente.objects.filter(
+            email__in=[o.email for _, _, o in validas]).order_by('-pk').values_list('email', 'id'))
+        novos, existentes = {}, {}
+        for numero, linha, objeto in validas:
+            if objeto.email in self.id_do_email:
+                objeto.pk = self.id_do_email[objeto.email]
+                existentes[objeto.email] = objeto
+            else:
+                novos[objeto.email] = objeto
+            indicado_por = _texto(linha, 'indicado_por_email')
+            if indicado_por is not None:
+                self.indicacoes.append((numero, objeto.email, indicado_por))
+        self.atualizar_ou_criar(list(novos.values()), existentes.values(), ['email'])
+        self.id_do_email.update((o.email, o.pk) for o in novos.values())
+
+    def finalizar(self):
+        faltando = sorted({i for _, _, i in self.indicacoes} - self.id_do_email.keys())
+        for inicio in range(0, len(faltando), self.lote):
+            self.id_do_email.update(Cliente.objects.filter(
+                email__in=faltando[inicio:inicio + self.lote]).order_by('-pk').values_list('email', 'id'))
+        atualizar = []
+        for numero, email, indicado_por in self.indicacoes:
+            if indicado_por not in self.id_do_email:
+                self.erro(numero, {'indicado_por_email': [f'Cliente {indicado_por} não encontrado.']})
+            elif indicado_por == email:
+                self.erro(numero, {'indicado_por_email': ['Um cliente não pode indicar a si mesmo.']})
+            else:
+                atualizar.append((self.id_do_email[email], self.id_do_email[indicado_por]))
+        atualizar_referencias(Cliente, 'indicado_por', atualizar, self.lote)
+        # Só as linhas novas (sem caminho) e as que mudaram de pai, com as subárvores
+        hierarquia.atualizar_caminhos(Cliente, [pk for pk, _ in atualizar], self.lote)
+
+
+class ImportadorProduto(Importador):
+    modelo = Produto
+    campos = ('nome', 'preco', 'estoque', 'estoque_minimo')
+    obrigatorios = ('nome', 'preco', 'fornecedor_cnpj')
+    invalidar_cache = ('pacote',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.id_do_cnpj = {}
+
+    def gravar(self, validas):
+        cnpjs = {_texto(linha, 'fornecedor_cnpj') for _, linha, _ in validas} - self.id_do_cnpj.keys()
+        self.id_do_cnpj.update(Fornecedor.objects.filter(cnpj__in=cnpjs).values_list('cnpj', 'id'))
+        objetos = []
+        for numero, linha, objeto in validas:
+            cnpj = _texto(linha, 'fornecedor_cnpj')
+            if cnpj not in self.id_do_cnpj:
+                self.erro(numero, {'fornecedor_cnpj': [f'Fornecedor {cnpj} não encontrado.']})
+                continue
+            objeto.fornecedor_id = self.id_do_cnpj[cnpj]
+            objetos.append(objeto)
+
+        id_existente = {
+            (fornecedor, nome): pk for pk, fornecedor, nome in Produto.objects.filter(
+                fornecedor_id__in={o.fornecedor_id for o in objetos}, nome__in={o.nome for o in objetos},
+            ).values_list('id', 'fornecedor_id', 'nome')
+        }
+        novos, existentes = {}, {}
+        for objeto in objetos:
+            chave = (objeto.fornecedor_id, objeto.nome)
+            if chave in id_existente:
+                objeto.pk = id_existente[chave]
+                existentes[chave] = objeto
+            else:
+                novos[chave] = objeto
+        self.atualizar_ou_criar(list(novos.values()), existentes.values(), ['nome'])
+        # bulk_update não dispara sinais: custo das receitas e pacotes com esses produtos
+        custos.atualizar_produtos([objeto.pk for objeto in existentes.values()])
+
+
+IMPORTADORES = {
+    'fornecedores': ImportadorFornecedor,
+    'funcionarios': ImportadorFuncionario,
+    'clientes': ImportadorCliente,
+    'produtos': ImportadorProduto,
+}
+
+
+def importar(modelo, linhas, lote=LOTE_PADRAO):
+    """Importa as linhas (iterável de dicts) e devolve o relatório."""
+    if modelo not in IMPORTADORES:
+        raise ErroImportacao(f"Modelo desconhecido: {modelo}. Use um de: {', '.join(IMPORTADORES)}.")
+    return IMPORTADORES[modelo](lote=lote).importar(linhas)
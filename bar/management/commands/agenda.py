@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bar import agenda
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói ou verifica a agenda de ocupação por local e dia (OcupacaoDiaria).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('acao', choices=['reconstruir', 'verificar'])
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        if options['acao'] == 'reconstruir':
+            linhas = agenda.reconstruir()
+            self.stdout.write(self.style.SUCCESS(
+                f'Agenda reconstruída: {linhas} linha(s) em {time.perf_counter() - inicio:.2f}s.'))
+            return
+
+        divergencias = agenda.verificar()
+        for divergencia in divergencias[:50]:
+            self.stdout.write(f"{divergencia['chave']}: esperado {divergencia['esperado']}, atual {divergencia['atual']}")
+        if divergencias:
+            raise CommandError(f'{len(divergencias)} divergência(s) na agenda; rode "agenda reconstruir".')
+        self.stdout.write(self.style.SUCCESS(f'Agenda consistente ({time.perf_counter() - inicio:.2f}s).'))
@@ -0,0 +1,34 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from bar.benchmarks import CENARIOS
+
+
+class Command(BaseCommand):
+    help = 'Executa os cenários de benchmark do bar sobre dados sintéticos (descartados ao final).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('cenarios', nargs='*', help=f"Cenários a executar (padrão: todos). Opções: {', '.join(CENARIOS)}")
+        parser.add_argument('--linhas', type=int, default=1000, help='Linhas sintéticas por modelo.')
+        parser.add_argument('--repeticoes', type=int, default=50, help='Repetições de cada medição.')
+
+    def handle(self, *args, **options):
+        nomes = options['cenarios'] or list(CENARIOS)
+        desconhecidos = set(nomes) - set(CENARIOS)
+        if desconhecidos:
+            raise CommandError(f"Cenário(s) desconhecido(s): {', '.join(sorted(desconhecidos))}")
+
+        resultados = {}
+        setup_test_environment()
+        try:
+            with transaction.atomic():
+                for nome in nomes:
+                    self.stderr.write(f'Executando {nome}...')
+                    resultados[nome] = CENARIOS[nome](options['linhas'], options['repeticoes'])
+                transaction.set_rollback(True)
+        finally:
+            teardown_test_environment()
+        self.stdout.write(json.dumps(resultados, indent=2, ensure_ascii=False))
@@ -0,0 +1,53 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from bar.benchmarks import comparar, medir_endpoints
+
+
+class Command(BaseCommand):
+    help = ('Mede latência (p50/p95/p99), queries, pico de memória e bytes de todas as views e endpoints de leitura '
+            'sobre os dados do banco (ver seed_bar); salva a linha de base e aponta regressões em relação a ela.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticoes', type=int, default=20, help='Requisições medidas por endpoint.')
+        parser.add_argument('--tempo-maximo', type=float, default=10,
+                            help='Segundos por endpoint; endpoints lentos param antes das repetições (mínimo 3).')
+        parser.add_argument('--apenas', action='append', help='Mede só endpoints cujo nome contém o trecho (repetível).')
+        parser.add_argument('--salvar', help='Grava os resultados neste arquivo JSON (linha de base).')
+        parser.add_argument('--comparar', help='Linha de base (JSON) para apontar regressões.')
+        parser.add_argument('--limite', type=float, default=20, help='Piora tolerada, em %% (padrão: 20).')
+        parser.add_argument('--minimo-ms', type=float, default=1.0, help='Ruído absoluto tolerado nas latências.')
+
+    def handle(self, *args, **options):
+        base = None
+        if options['comparar']:
+            try:
+                with open(options['comparar'], encoding='utf-8') as arquivo:
+                    base = json.load(arquivo)
+            except (OSError, ValueError) as erro:
+                raise CommandError(f"Linha de base ilegível: {erro}")
+
+        setup_test_environment()  # para o test Client e o CaptureQueriesContext
+        try:
+            resultados = medir_endpoints(options['repeticoes'], options['tempo_maximo'], options['apenas'],
+                                         progresso=lambda texto: self.stderr.write(f'Medindo {texto}'))
+        except ValueError as erro:
+            raise CommandError(str(erro))
+        finally:
+            teardown_test_environment()
+
+        if options['salvar']:
+            with open(options['salvar'], 'w', encoding='utf-8') as arquivo:
+                json.dump(resultados, arquivo, indent=2, ensure_ascii=False)
+        self.stdout.write(json.dumps(resultados, indent=2, ensure_ascii=False))
+
+        if base is not None:
+            regressoes = comparar(base, resultados, options['limite'] / 100, options['minimo_ms'])
+            for r in regressoes:
+                self.stderr.write(self.style.ERROR(
+                    f"REGRESSÃO {r['endpoint']} {r['metrica']}: {r['antes']} -> {r['depois']} ({r['variacao']})"))
+            if regressoes:
+                raise CommandError(f'{len(regressoes)} regressão(ões) acima de {options["limite"]:g}%.')
+            self.stderr.write(self.style.SUCCESS('Sem regressões em relação à linha de base.'))
@@ -0,0 +1,23 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from bar import estresse
+
+
+class Command(BaseCommand):
+    help = ('Dispara GETs concorrentes contra um servidor rodando (ex.: gunicorn x uvicorn) '
+            'e reporta requisições/s e latências p50/p90/p99.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='+', help='Ex.: http://127.0.0.1:8000/bar/api/coqueteis/')
+        parser.add_argument('--conexoes', type=int, default=32, help='Conexões keep-alive simultâneas.')
+        parser.add_argument('--segundos', type=int, default=10)
+        parser.add_argument('--aquecimento', type=int, default=1, help='Segundos iniciais descartados.')
+
+    def handle(self, *args, **options):
+        resultados = [
+            estresse.carga_http(url, options['conexoes'], options['segundos'], options['aquecimento'])
+            for url in options['urls']
+        ]
+        self.stdout.write(json.dumps(resultados, indent=2, ensure_ascii=False))
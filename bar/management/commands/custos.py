@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bar import custos
+
+
+class Command(BaseCommand):
+    help = 'Recalcula ou verifica o custo dos coquetéis com receita e o custo de insumos dos pacotes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('acao', choices=['reconstruir', 'verificar'])
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        if options['acao'] == 'reconstruir':
+            linhas = custos.reconstruir()
+            self.stdout.write(self.style.SUCCESS(
+                f"Custos recalculados: {linhas['coqueteis']} coquetel(is) e {linhas['pacotes']} pacote(s) "
+                f'em {time.perf_counter() - inicio:.2f}s.'))
+            return
+
+        divergencias = custos.verificar()
+        for divergencia in divergencias[:50]:
+            self.stdout.write(f"{divergencia['modelo']} {divergencia['id']}: esperado {divergencia['esperado']}, "
+                              f"atual {divergencia['atual']}")
+        if divergencias:
+            raise CommandError(f'{len(divergencias)} divergência(s) de custo; rode "custos reconstruir".')
+        self.stdout.write(self.style.SUCCESS(f'Custos consistentes ({time.perf_counter() - inicio:.2f}s).'))
@@ -0,0 +1,45 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+from django.utils.dateparse import parse_date
+
+from bar import escala
+from bar.models import Funcionario
+
+
+class Command(BaseCommand):
+    help = 'Atribui funcionários às reservas sem responsável de uma semana (ou do período pedido).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--inicio', type=parse_date,
+                            help='Primeiro dia (AAAA-MM-DD). Padrão: a próxima segunda-feira.')
+        parser.add_argument('--dias', type=int, default=escala.DIAS_PADRAO)
+        parser.add_argument('--funcao', action='append', choices=[c for c, _ in Funcionario._meta.get_field('funcao').choices],
+                            help=f"Funções escaladas (repita a opção). Padrão: {', '.join(escala.FUNCOES_PADRAO)}.")
+        parser.add_argument('--simular', action='store_true', help='Calcula a escala sem gravar.')
+
+    def handle(self, *args, **options):
+        inicio = options['inicio']
+        if inicio is None:
+            hoje = date.today()
+            inicio = hoje + timedelta(days=7 - hoje.weekday())
+        if options['dias'] < 1:
+            raise CommandError('--dias deve ser pelo menos 1.')
+        fim = inicio + timedelta(days=options['dias'] - 1)
+        try:
+            relatorio = escala.atribuir(inicio, fim, funcoes=options['funcao'] or escala.FUNCOES_PADRAO,
+                                        simular=options['simular'])
+        except IntegrityError:
+            raise CommandError('Outra escala gravou ao mesmo tempo; rode o comando novamente.')
+
+        por_funcao = ', '.join(f'{funcao}: {total}' for funcao, total in sorted(relatorio['por_funcao'].items())) or '-'
+        self.stdout.write(
+            f"{inicio} a {fim}: {relatorio['atribuidas']} de {relatorio['reservas_sem_responsavel']} reserva(s) "
+            f"atribuída(s) em {relatorio['segundos']}s ({por_funcao}); custo R${relatorio['custo_diarias']}."
+        )
+        if relatorio['sem_funcionario_livre']:
+            self.stdout.write(self.style.WARNING(
+                f"{relatorio['sem_funcionario_livre']} reserva(s) sem funcionário livre."))
+        if relatorio['simulacao']:
+            self.stdout.write('Simulação: nada foi gravado.')
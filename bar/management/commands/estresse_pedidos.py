@@ -0,0 +1,28 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from bar import estresse
+
+
+class Command(BaseCommand):
+    help = 'Grava lotes de pedidos do PDV a partir de várias threads e reporta vazão e duplicatas (dados removidos ao final).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=4)
+        parser.add_argument('--lotes', type=int, default=10, help='Lotes por thread.')
+        parser.add_argument('--tamanho', type=int, default=500, help='Pedidos por lote.')
+        parser.add_argument('--via-api', action='store_true', help='Envia pelo POST /bar/api/pedidos/lote/ (test Client).')
+
+    def handle(self, *args, **options):
+        if options['via_api']:
+            setup_test_environment()  # para o test Client
+        try:
+            resultado = estresse.martelar_pedidos(options['threads'], options['lotes'], options['tamanho'],
+                                                  options['via_api'])
+        finally:
+            estresse.limpar_pedidos()
+            if options['via_api']:
+                teardown_test_environment()
+        self.stdout.write(json.dumps(resultado, indent=2, ensure_ascii=False))
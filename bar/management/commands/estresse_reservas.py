@@ -0,0 +1,20 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from bar import estresse
+
+
+class Command(BaseCommand):
+    help = 'Grava reservas a partir de várias threads e reporta erros de lock e vazão (dados removidos ao final).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--escritas', type=int, default=50, help='Transações por thread.')
+
+    def handle(self, *args, **options):
+        try:
+            resultado = estresse.martelar_reservas(options['threads'], options['escritas'])
+        finally:
+            estresse.limpar()
+        self.stdout.write(json.dumps(resultado, indent=2, ensure_ascii=False))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from bar import exportacao
+
+
+class Command(BaseCommand):
+    help = 'Exporta um modelo do bar em CSV ou NDJSON, em streaming (memória constante).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('modelo', choices=list(exportacao.EXPORTAVEIS))
+        parser.add_argument('--formato', choices=exportacao.FORMATOS, default='csv')
+        parser.add_argument('--campos', help='Lista separada por vírgulas (padrão: todos).')
+        parser.add_argument('--inicio', type=parse_date, help='Data inicial (AAAA-MM-DD), inclusive.')
+        parser.add_argument('--fim', type=parse_date, help='Data final (AAAA-MM-DD), inclusive.')
+        parser.add_argument('--saida', help='Arquivo de saída (padrão: stdout).')
+        parser.add_argument('--chunk-size', type=int, default=exportacao.CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        campos = [c for c in (options['campos'] or '').split(',') if c] or None
+        try:
+            nomes, linhas = exportacao.linhas(options['modelo'], campos, options['inicio'], options['fim'],
+                                              chunk_size=options['chunk_size'])
+        except exportacao.ErroExportacao as erro:
+            raise CommandError(str(erro))
+
+        blocos = exportacao.stream(options['formato'], nomes, linhas)
+        if not options['saida']:
+            for bloco in blocos:
+                self.stdout.write(bloco, ending='')
+            return
+        with open(options['saida'], 'w', encoding='utf-8', newline='') as saida:
+            for bloco in blocos:
+                saida.write(bloco)
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bar import faturamento
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói ou verifica o resumo de faturamento (FaturamentoDiario).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('acao', choices=['reconstruir', 'verificar'])
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        if options['acao'] == 'reconstruir':
+            linhas = faturamento.reconstruir()
+            self.stdout.write(self.style.SUCCESS(
+                f'Resumo reconstruído: {linhas} linha(s) em {time.perf_counter() - inicio:.2f}s.'))
+            return
+
+        divergencias = faturamento.verificar()
+        for divergencia in divergencias[:50]:
+            self.stdout.write(f"{divergencia['chave']}: esperado {divergencia['esperado']}, atual {divergencia['atual']}")
+        if divergencias:
+            raise CommandError(f'{len(divergencias)} divergência(s) no resumo; rode "faturamento reconstruir".')
+        self.stdout.write(self.style.SUCCESS(f'Resumo consistente ({time.perf_counter() - inicio:.2f}s).'))
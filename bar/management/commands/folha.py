@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from bar import folha
+
+
+class Command(BaseCommand):
+    help = 'Calcula, fecha, reabre ou verifica a folha de pagamento de um mês (FolhaMensal).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('acao', choices=['calcular', 'fechar', 'reabrir', 'verificar'])
+        parser.add_argument('--mes', help='AAAA-MM (padrão: mês atual).')
+
+    def handle(self, *args, **options):
+        try:
+            mes = folha.mes_de(options['mes'] or timezone.localdate())
+        except ValueError as erro:
+            raise CommandError(erro.args[0]['mes'])
+        inicio = time.perf_counter()
+        if options['acao'] == 'verificar':
+            divergencias = folha.verificar(mes)
+            for divergencia in divergencias[:50]:
+                self.stdout.write(f"Funcionário {divergencia['funcionario']}: esperado {divergencia['esperado']}, "
+                                  f"atual {divergencia['atual']}")
+            if divergencias:
+                raise CommandError(f'{len(divergencias)} divergência(s) na folha de {mes:%m/%Y}.')
+            self.stdout.write(self.style.SUCCESS(f'Folha de {mes:%m/%Y} consistente ({time.perf_counter() - inicio:.2f}s).'))
+            return
+
+        acao = {'calcular': folha.calcular, 'fechar': folha.fechar, 'reabrir': folha.reabrir}[options['acao']]
+        resultado = acao(mes)
+        self.stdout.write(self.style.SUCCESS(
+            f'{resultado}: {resultado.linhas.count()} funcionário(s) em {time.perf_counter() - inicio:.2f}s.'))
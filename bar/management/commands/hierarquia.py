@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bar import hierarquia
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói ou verifica o caminho materializado das hierarquias (indicações e supervisão).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('acao', choices=['reconstruir', 'verificar'])
+        parser.add_argument('modelos', nargs='*', choices=list(hierarquia.HIERARQUIAS),
+                            help='Padrão: todos.')
+
+    def handle(self, *args, **options):
+        total = 0
+        for nome in options['modelos'] or hierarquia.HIERARQUIAS:
+            modelo = hierarquia.HIERARQUIAS[nome]
+            inicio = time.perf_counter()
+            if options['acao'] == 'reconstruir':
+                linhas = hierarquia.reconstruir(modelo)
+                self.stdout.write(self.style.SUCCESS(
+                    f'{nome}: {linhas} caminho(s) reconstruído(s) em {time.perf_counter() - inicio:.2f}s.'))
+                continue
+            divergencias = hierarquia.verificar(modelo)
+            for divergencia in divergencias[:50]:
+                self.stdout.write(f"{nome} {divergencia['id']}: esperado {divergencia['esperado'] or '(ciclo)'}, "
+                                  f"atual {divergencia['atual'] or '(vazio)'}")
+            total += len(divergencias)
+            if not divergencias:
+                self.stdout.write(self.style.SUCCESS(f'{nome}: caminhos consistentes ({time.perf_counter() - inicio:.2f}s).'))
+        if total:
+            raise CommandError(f'{total} divergência(s); rode "hierarquia reconstruir".')
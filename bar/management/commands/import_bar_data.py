@@ -0,0 +1,51 @@
+import csv
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bar import importacao
+
+
+def _ler(arquivo, formato):
+    if formato == 'csv':
+        yield from csv.DictReader(arquivo)
+    elif formato == 'ndjson':
+        for linha in arquivo:
+            if linha.strip():
+                yield json.loads(linha)
+    else:
+        yield from json.load(arquivo)
+
+
+class Command(BaseCommand):
+    help = 'Importa clientes, fornecedores, produtos ou funcionários em lotes (CSV, NDJSON ou JSON).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('modelo', choices=list(importacao.IMPORTADORES))
+        parser.add_argument('arquivo')
+        parser.add_argument('--formato', choices=('csv', 'ndjson', 'json'),
+                            help='Padrão: deduzido pela extensão do arquivo (csv se não reconhecida).')
+        parser.add_argument('--lote', type=int, default=importacao.LOTE_PADRAO)
+        parser.add_argument('--relatorio', help='Grava o relatório completo (JSON) neste arquivo.')
+
+    def handle(self, *args, **options):
+        formato = options['formato'] or options['arquivo'].rsplit('.', 1)[-1].lower()
+        if formato not in ('csv', 'ndjson', 'json'):
+            formato = 'csv'
+        try:
+            with open(options['arquivo'], encoding='utf-8-sig', newline='') as arquivo:
+                relatorio = importacao.importar(options['modelo'], _ler(arquivo, formato), lote=options['lote'])
+        except (OSError, ValueError) as erro:
+            raise CommandError(str(erro))
+
+        for item in relatorio['erros']:
+            mensagens = '; '.join(f'{campo}: {" ".join(erros)}' for campo, erros in item['erros'].items())
+            self.stderr.write(f"linha {item['linha']}: {mensagens}")
+        self.stdout.write(
+            f"{relatorio['linhas']} linha(s) em {relatorio['segundos']}s "
+            f"({relatorio['linhas_por_segundo']} linhas/s): "
+            f"{relatorio['sem_erro']} sem erro, {relatorio['com_erro']} com erro."
+        )
+        if options['relatorio']:
+            with open(options['relatorio'], 'w', encoding='utf-8') as saida:
+                json.dump(relatorio, saida, ensure_ascii=False, indent=2)
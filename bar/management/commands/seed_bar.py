@@ -0,0 +1,30 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bar.sinteticos import escala_padrao, semear
+
+MODELOS = ('reservas', 'eventos', 'funcionarios', 'fornecedores', 'produtos', 'coqueteis', 'servicos', 'pacotes')
+
+
+class Command(BaseCommand):
+    help = ('Gera dados sintéticos consistentes (indicações, supervisão, reservas, Pacote×Evento) em massa, '
+            'via bulk_create. Ex.: seed_bar --clientes 1000000 --reservas 5000000')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clientes', type=int, default=10000, help='Clientes a criar (padrão: 10000).')
+        for nome in MODELOS:
+            parser.add_argument(f'--{nome}', type=int, default=None,
+                                help=f"Padrão proporcional aos clientes ({escala_padrao(10000)[nome]} para 10000).")
+        parser.add_argument('--semente', type=int, default=42, help='Semente do gerador aleatório.')
+        parser.add_argument('--lote', type=int, default=5000, help='Linhas por bulk_create.')
+
+    def handle(self, *args, **options):
+        escala = {nome: options[nome] for nome in ('clientes', *MODELOS)}
+        minimos = dict.fromkeys(escala, 1) | {'reservas': 0, 'eventos': 0}
+        invalidos = [nome for nome, valor in escala.items() if valor is not None and valor < minimos[nome]]
+        if invalidos or options['lote'] < 1:
+            raise CommandError(f"Valores inválidos: {', '.join(invalidos or ['lote'])}.")
+        relatorio = semear(**escala, semente=options['semente'], lote=options['lote'],
+                           progresso=lambda texto: self.stderr.write(f'Gerando {texto}...'))
+        self.stdout.write(json.dumps(relatorio, indent=2, ensure_ascii=False))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from bar import sincronizacao
+
+
+class Command(BaseCommand):
+    help = 'Mostra, poda ou reinicia o diário do feed de sincronização dos PDVs (Alteracao).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('acao', choices=['estado', 'podar', 'reiniciar'])
+        parser.add_argument('--dias', type=int, default=sincronizacao.DIAS_RETENCAO,
+                            help='podar: mantém as alterações dos últimos N dias.')
+
+    def handle(self, *args, **options):
+        if options['acao'] == 'podar':
+            apagadas = sincronizacao.podar(options['dias'])
+            self.stdout.write(self.style.SUCCESS(
+                f'{apagadas} alteração(ões) podada(s); PDVs com cursor anterior baixam o catálogo de novo.'))
+        elif options['acao'] == 'reiniciar':
+            cursor = sincronizacao.reiniciar()
+            self.stdout.write(self.style.SUCCESS(f'Marco de reinício {cursor}: todos os PDVs baixam o catálogo de novo.'))
+        estado = sincronizacao.estado()
+        self.stdout.write(f"Cursor {estado['cursor']}, {estado['linhas']} linha(s) no diário, "
+                          f"último reinício {estado['reinicio'] or '-'}, mais antiga {estado['mais_antiga'] or '-'}.")
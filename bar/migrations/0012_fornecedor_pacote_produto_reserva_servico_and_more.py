@@ -0,0 +1,240 @@
+# Generated by Django 5.2 on 2026-10-18 08:14
+
+import django.core.validators
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bar', '0011_alter_coquetel_options_alter_funcionario_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Fornecedor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=100)),
+                ('cnpj', models.CharField(max_length=18, unique=True)),
+                ('email', models.EmailField(max_length=254, unique=True)),
+                ('telefone', models.CharField(max_length=15)),
+                ('endereco', models.TextField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Fornecedor',
+                'verbose_name_plural': 'Fornecedores',
+                'ordering': ['nome'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Pacote',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nomePacote', models.CharField(max_length=100)),
+                ('duracaoHora', models.IntegerField(validators=[django.core.validators.MinValueValidator(1)])),
+                ('valorPorPessoa', models.DecimalField(decimal_places=2, default=0.0, max_digits=6)),
+            ],
+            options={
+                'verbose_name': 'Pacote',
+                'verbose_name_plural': 'Pacotes',
+                'ordering': ['nomePacote'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Produto',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=100)),
+                ('preco', models.DecimalField(decimal_places=2, max_digits=6, validators=[django.core.validators.MinValueValidator(0.01)])),
+                ('estoque', models.IntegerField(default=0, validators=[django.core.validators.MinValueValidator(0)])),
+                ('estoque_minimo', models.IntegerField(default=5, validators=[django.core.validators.MinValueValidator(0)])),
+            ],
+            options={
+                'verbose_name': 'Produto',
+                'verbose_name_plural': 'Produtos',
+                'ordering': ['nome'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Reserva',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.DateField(default=django.utils.timezone.now)),
+                ('convidados', models.IntegerField(validators=[django.core.validators.MinValueValidator(1)])),
+            ],
+            options={
+                'verbose_name': 'Reserva',
+                'verbose_name_plural': 'Reservas',
+                'ordering': ['-data'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Servico',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=100)),
+                ('valor_hora', models.DecimalField(decimal_places=2, default=0.0, max_digits=6)),
+                ('funcao', models.CharField(choices=[('brt', 'bartender'), ('gar', 'garçom'), ('chef', 'cheff_pista')], default='brt', max_length=10)),
+                ('descricao', models.TextField(blank=True, max_length=255, null=True)),
+            ],
+            options={
+                'verbose_name': 'Serviço',
+                'verbose_name_plural': 'Serviços',
+                'ordering': ['-valor_hora'],
+            },
+        ),
+        migrations.AlterModelOptions(
+            name='coquetel',
+            options={'ordering': ['nome'], 'verbose_name': 'Coquetel', 'verbose_name_plural': 'Coqueteis'},
+        ),
+        migrations.AlterModelOptions(
+            name='funcionario',
+            options={'ordering': ['-valorDiaria', 'nome'], 'verbose_name': 'Funcionário', 'verbose_name_plural': 'Funcionários'},
+        ),
+        migrations.RemoveField(
+            model_name='funcionario',
+            name='salario',
+        ),
+        migrations.AddField(
+            model_name='funcionario',
+            name='supervisor',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='bar.funcionario'),
+        ),
+        migrations.AddField(
+            model_name='funcionario',
+            name='valorDiaria',
+            field=models.DecimalField(decimal_places=2, default=0.0, max_digits=6),
+        ),
+        migrations.AlterField(
+            model_name='coquetel',
+            name='ingredientes',
+            field=models.TextField(blank=True, max_length=200, null=True),
+        ),
+        migrations.AlterField(
+            model_name='coquetel',
+            name='preco_custo',
+            field=models.DecimalField(decimal_places=2, default=0.0, max_digits=6),
+        ),
+        migrations.AlterField(
+            model_name='coquetel',
+            name='preco_venda',
+            field=models.DecimalField(decimal_places=2, default=0.0, max_digits=6),
+        ),
+        migrations.AlterField(
+            model_name='coquetel',
+            name='recipiente',
+            field=models.CharField(choices=[('ld', 'Long Drink'), ('otr', 'On The Rocks'), ('tac', 'Taça'), ('ilh', 'Ilhabela')], default='ld', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='funcionario',
+            name='cpf',
+            field=models.CharField(blank=True, default=None, max_length=11, null=True, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='funcionario',
+            name='funcao',
+            field=models.CharField(choices=[('brt', 'bartender'), ('brb', 'barback'), ('gar', 'garçom'), ('ger', 'gerente'), ('chef', 'cheff_pista')], default='brt', max_length=15),
+        ),
+        migrations.CreateModel(
+            name='Cliente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=100)),
+                ('telefone', models.CharField(max_length=15)),
+                ('email', models.EmailField(max_length=254)),
+                ('data_cadastro', models.DateTimeField(auto_now_add=True)),
+                ('indicado_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='bar.cliente')),
+            ],
+            options={
+                'verbose_name': 'Cliente',
+                'verbose_name_plural': 'Clientes',
+                'ordering': ['nome'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Evento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('datahora', models.DateTimeField(default=django.utils.timezone.now)),
+                ('pago', models.BooleanField(default=False)),
+                ('forma_pagamento', models.CharField(choices=[('Cre', 'Crédito'), ('Deb', 'Débito'), ('Pix', 'Pix'), ('Din', 'Dinheiro')], default='Din', max_length=3)),
+                ('local', models.CharField(default='Local Principal', max_length=100)),
+                ('observacoes', models.TextField(blank=True, null=True)),
+                ('cliente', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='bar.cliente')),
+            ],
+            options={
+                'verbose_name': 'Evento',
+                'verbose_name_plural': 'Eventos',
+                'ordering': ['-datahora'],
+            },
+        ),
+        migrations.AddField(
+            model_name='coquetel',
+            name='fornecedor',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='bar.fornecedor'),
+        ),
+        migrations.AddIndex(
+            model_name='coquetel',
+            index=models.Index(fields=['nome'], name='idx_coquetel_nome'),
+        ),
+        migrations.AddField(
+            model_name='pacote',
+            name='coqueteis',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='bar.coquetel'),
+        ),
+        migrations.AddField(
+            model_name='pacote',
+            name='eventos',
+            field=models.ManyToManyField(related_name='pacotes', to='bar.evento'),
+        ),
+        migrations.AddField(
+            model_name='produto',
+            name='fornecedor',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='bar.fornecedor'),
+        ),
+        migrations.AddField(
+            model_name='pacote',
+            name='produtos',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='bar.produto'),
+        ),
+        migrations.AddField(
+            model_name='reserva',
+            name='cliente',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='bar.cliente'),
+        ),
+        migrations.AddField(
+            model_name='reserva',
+            name='funcionario_responsavel',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='bar.funcionario'),
+        ),
+        migrations.AddField(
+            model_name='reserva',
+            name='pacote',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='bar.pacote'),
+        ),
+        migrations.AddField(
+            model_name='servico',
+            name='funcionarios',
+            field=models.ManyToManyField(related_name='servicos', to='bar.funcionario'),
+        ),
+        migrations.AddField(
+            model_name='pacote',
+            name='servicos',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='bar.servico'),
+        ),
+        migrations.AddIndex(
+            model_name='cliente',
+            index=models.Index(fields=['email'], name='idx_cliente_email'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='reserva',
+            unique_together={('cliente', 'data')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='pacote',
+            unique_together={('nomePacote', 'coqueteis')},
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-18 08:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bar', '0012_fornecedor_pacote_produto_reserva_servico_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cliente',
+            index=models.Index(fields=['nome', 'id'], name='idx_cliente_nome_id'),
+        ),
+        migrations.AddIndex(
+            model_name='evento',
+            index=models.Index(fields=['datahora', 'id'], name='idx_evento_datahora_id'),
+        ),
+        migrations.AddIndex(
+            model_name='reserva',
+            index=models.Index(fields=['data', 'id'], name='idx_reserva_data_id'),
+        ),
+    ]
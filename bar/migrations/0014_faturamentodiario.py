@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-18 08:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bar', '0013_indices_paginacao_cursor'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FaturamentoDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.DateField()),
+                ('forma_pagamento', models.CharField(blank=True, default='', max_length=3)),
+                ('reservas', models.IntegerField(default=0)),
+                ('convidados', models.IntegerField(default=0)),
+                ('receita', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('receita_paga', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('pacote', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='bar.pacote')),
+            ],
+            options={
+                'verbose_name': 'Faturamento diário',
+                'verbose_name_plural': 'Faturamento diário',
+                'ordering': ['-data'],
+                'unique_together': {('data', 'pacote', 'forma_pagamento')},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-18 08:23
+
+from django.db import migrations
+
+# Índice de busca de Cliente (nome, telefone, email), usado por bar/busca.py.
+# O SQL fica em _fts.py, compartilhado com as migrações que recriam bar_cliente.
+from ._fts import POSTGRES_CRIAR, POSTGRES_REMOVER, SQLITE_CRIAR, SQLITE_REMOVER
+
+
+def _executar(comandos):
+    def executar(apps, schema_editor):
+        for sql in comandos.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+    return executar
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bar', '0014_faturamentodiario'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _executar({'sqlite': SQLITE_CRIAR, 'postgresql': POSTGRES_CRIAR}),
+            _executar({'sqlite': SQLITE_REMOVER, 'postgresql': POSTGRES_REMOVER}),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2 on 2026-10-18 08:38
+
+from django.db import migrations, models
+
+from bar.db import COLACAO_CAMINHO
+
+# No SQLite o AddField recria a tabela bar_cliente, o que apaga os triggers
+# do índice de busca (0015): ele é recriado aqui (e também ao desfazer).
+from ._fts import recriar_indice_de_busca
+
+# Caminho materializado '/raiz/.../id/' de Cliente.indicado_por e
+# Funcionario.supervisor (bar/hierarquia.py), preenchido por uma CTE recursiva.
+# No PostgreSQL a coluna usa a collation "C" (bar/db.py): as buscas por
+# subárvore são intervalos de texto e dependem da ordem byte a byte ('/' < '0').
+TABELAS = [('bar_cliente', 'indicado_por_id'), ('bar_funcionario', 'supervisor_id')]
+
+
+def preencher_caminhos(apps, schema_editor):
+    for tabela, pai in TABELAS:
+        schema_editor.execute(
+            f"WITH RECURSIVE arvore(id, caminho, nivel) AS ("
+            f"  SELECT id, '/' || CAST(id AS TEXT) || '/', 0 FROM {tabela} WHERE {pai} IS NULL"
+            f"  UNION ALL"
+            f"  SELECT t.id, arvore.caminho || CAST(t.id AS TEXT) || '/', arvore.nivel + 1"
+            f"  FROM {tabela} t JOIN arvore ON t.{pai} = arvore.id WHERE arvore.nivel < 40"
+            f") UPDATE {tabela} SET caminho = arvore.caminho FROM arvore WHERE {tabela}.id = arvore.id"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bar', '0015_cliente_busca_textual'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, recriar_indice_de_busca),
+        migrations.AddField(
+            model_name='cliente',
+            name='caminho',
+            field=models.CharField(db_collation=COLACAO_CAMINHO, db_index=True, default='', editable=False,
+                                   max_length=500),
+        ),
+        migrations.AddField(
+            model_name='funcionario',
+            name='caminho',
+            field=models.CharField(db_collation=COLACAO_CAMINHO, db_index=True, default='', editable=False,
+                                   max_length=500),
+        ),
+        migrations.RunPython(recriar_indice_de_busca, migrations.RunPython.noop),
+        migrations.RunPython(preencher_caminhos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2 on 2026-10-18 08:42
+
+import sys
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def liberar_funcionarios_em_conflito(apps, schema_editor):
+    # Antes da restrição: em cada (funcionário, dia) repetido fica só a reserva mais antiga;
+    # as outras voltam para a fila da escala (manage.py escalar_funcionarios). As reservas
+    # alteradas saem na saída do migrate, para conferir a escala delas.
+    Reserva = apps.get_model('bar', 'Reserva')
+    repetidos = (Reserva.objects.filter(funcionario_responsavel__isnull=False)
+                 .values('funcionario_responsavel', 'data').annotate(n=Count('id'), primeira=Min('id')).filter(n__gt=1))
+    for grupo in repetidos:
+        liberadas = Reserva.objects.filter(
+            funcionario_responsavel=grupo['funcionario_responsavel'], data=grupo['data'],
+        ).exclude(pk=grupo['primeira'])
+        ids = list(liberadas.values_list('pk', flat=True))
+        liberadas.update(funcionario_responsavel=None)
+        sys.stdout.write(
+            f"\n  Funcionário {grupo['funcionario_responsavel']} em {grupo['data']}: fica na reserva "
+            f"{grupo['primeira']}; sem responsável agora: {', '.join(map(str, ids))}"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bar', '0016_hierarquia_caminho'),
+    ]
+
+    operations = [
+        migrations.RunPython(liberar_funcionarios_em_conflito, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='reserva',
+            constraint=models.UniqueConstraint(fields=('funcionario_responsavel', 'data'), name='uniq_reserva_funcionario_data'),
+        ),
+    ]
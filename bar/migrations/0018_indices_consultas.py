@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-18 09:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bar', '0017_reserva_funcionario_data'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='evento',
+            index=models.Index(condition=models.Q(('pago', False)), fields=['datahora', 'id'], name='idx_evento_pendente'),
+        ),
+        migrations.AddIndex(
+            model_name='evento',
+            index=models.Index(fields=['cliente', 'datahora'], name='idx_evento_cliente_datahora'),
+        ),
+        migrations.AddIndex(
+            model_name='funcionario',
+            index=models.Index(fields=['funcao', 'valorDiaria'], name='idx_funcionario_funcao'),
+        ),
+        migrations.AddIndex(
+            model_name='produto',
+            index=models.Index(condition=models.Q(('estoque__lt', models.F('estoque_minimo'))), fields=['nome'], name='idx_produto_repor'),
+        ),
+    ]
@@ -0,0 +1,116 @@
+# Generated by Django 5.2 on 2026-10-18 09:16
+
+import django.core.validators
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def itens_dos_pedidos_antigos(apps, schema_editor):
+    # Até aqui um pedido tinha exatamente um coquetel e uma porção: viram dois itens
+    Pedido = apps.get_model('bar', 'Pedido')
+    ItemPedido = apps.get_model('bar', 'ItemPedido')
+    itens = []
+    for pedido in Pedido.objects.select_related('coqueteis', 'porcoes').iterator():
+        itens.append(ItemPedido(pedido=pedido, coquetel=pedido.coqueteis, preco_unitario=pedido.coqueteis.preco_venda))
+        itens.append(ItemPedido(pedido=pedido, porcao=pedido.porcoes, preco_unitario=pedido.porcoes.preco_venda))
+        pedido.total = pedido.coqueteis.preco_venda + pedido.porcoes.preco_venda
+        pedido.save(update_fields=['total'])
+    ItemPedido.objects.bulk_create(itens, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bar', '0018_indices_consultas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemPedido',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantidade', models.PositiveSmallIntegerField(default=1, validators=[django.core.validators.MinValueValidator(1)])),
+                ('preco_unitario', models.DecimalField(decimal_places=2, max_digits=6)),
+            ],
+            options={
+                'verbose_name': 'Item do pedido',
+                'verbose_name_plural': 'Itens do pedido',
+            },
+        ),
+        migrations.AddField(
+            model_name='itempedido',
+            name='coquetel',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, to='bar.coquetel'),
+        ),
+        migrations.AddField(
+            model_name='itempedido',
+            name='pedido',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='itens', to='bar.pedido'),
+        ),
+        migrations.AddField(
+            model_name='itempedido',
+            name='porcao',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, to='bar.porcao'),
+        ),
+        migrations.AddConstraint(
+            model_name='itempedido',
+            constraint=models.CheckConstraint(condition=models.Q(models.Q(('coquetel__isnull', False), ('porcao__isnull', True)), models.Q(('coquetel__isnull', True), ('porcao__isnull', False)), _connector='OR'), name='item_pedido_coquetel_ou_porcao'),
+        ),
+        migrations.AddField(
+            model_name='pedido',
+            name='total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.RunPython(itens_dos_pedidos_antigos, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='pedido',
+            name='coqueteis',
+        ),
+        migrations.RemoveField(
+            model_name='pedido',
+            name='porcoes',
+        ),
+        migrations.AlterModelOptions(
+            name='pedido',
+            options={'ordering': ['-datahora'], 'verbose_name': 'Pedido', 'verbose_name_plural': 'Pedidos'},
+        ),
+        migrations.AlterModelOptions(
+            name='porcao',
+            options={'ordering': ['nome'], 'verbose_name': 'Porção', 'verbose_name_plural': 'Porções'},
+        ),
+        migrations.AddField(
+            model_name='pedido',
+            name='codigo',
+            field=models.CharField(blank=True, max_length=36, null=True, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='pedido',
+            name='atendente',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='bar.funcionario'),
+        ),
+        migrations.AlterField(
+            model_name='pedido',
+            name='cliente',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='pedido',
+            name='datahora',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name='pedido',
+            name='forma_pagamento',
+            field=models.CharField(choices=[('Cre', 'Crédito'), ('Deb', 'Débito'), ('Pix', 'Pix'), ('Din', 'Dinheiro')], default='Din', max_length=3),
+        ),
+        migrations.AlterField(
+            model_name='pedido',
+            name='pago',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='pedido',
+            index=models.Index(fields=['datahora', 'id'], name='idx_pedido_datahora_id'),
+        ),
+    ]
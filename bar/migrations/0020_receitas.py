@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-18 09:21
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bar', '0019_pedido_itens'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemReceita',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantidade', models.PositiveIntegerField(default=1, validators=[django.core.validators.MinValueValidator(1)])),
+                ('coquetel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='receita', to='bar.coquetel')),
+                ('produto', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='receitas', to='bar.produto')),
+            ],
+            options={
+                'verbose_name': 'Item da receita',
+                'verbose_name_plural': 'Itens da receita',
+                'ordering': ['coquetel_id', 'id'],
+                'constraints': [models.UniqueConstraint(fields=('coquetel', 'produto'), name='item_receita_unico')],
+            },
+        ),
+    ]
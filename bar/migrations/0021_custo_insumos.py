@@ -0,0 +1,35 @@
+# Generated by Django 5.2 on 2026-10-18 09:23
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def calcular_custo_insumos(apps, schema_editor):
+    # Ainda não há receitas: o custo vem do preco_custo digitado no coquetel
+    Pacote = apps.get_model('bar', 'Pacote')
+    Coquetel = apps.get_model('bar', 'Coquetel')
+    Produto = apps.get_model('bar', 'Produto')
+    custo = models.DecimalField(max_digits=12, decimal_places=2)
+    Pacote.objects.update(custo_insumos=(
+        Coalesce(Subquery(Coquetel.objects.filter(pk=OuterRef('coqueteis_id')).values('preco_custo')[:1],
+                          output_field=custo), 0, output_field=custo)
+        + Coalesce(Subquery(Produto.objects.filter(pk=OuterRef('produtos_id')).values('preco')[:1],
+                            output_field=custo), 0, output_field=custo)
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bar', '0020_receitas'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pacote',
+            name='custo_insumos',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=8),
+        ),
+        migrations.RunPython(calcular_custo_insumos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-18 09:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bar', '0021_custo_insumos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OcupacaoDiaria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.DateField()),
+                ('local', models.CharField(blank=True, default='', max_length=100)),
+                ('eventos', models.IntegerField(default=0)),
+                ('reservas', models.IntegerField(default=0)),
+                ('convidados', models.IntegerField(default=0)),
+                ('funcionarios', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Ocupação diária',
+                'verbose_name_plural': 'Ocupação diária',
+                'ordering': ['data', 'local'],
+                'indexes': [models.Index(fields=['data'], name='idx_ocupacao_data')],
+                'constraints': [models.UniqueConstraint(fields=('local', 'data'), name='uniq_ocupacao_local_data')],
+            },
+        ),
+    ]
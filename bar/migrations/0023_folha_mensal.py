@@ -0,0 +1,51 @@
+# Generated by Django 5.2 on 2026-10-18 09:36
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bar', '0022_ocupacao_diaria'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FolhaMensal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.DateField(unique=True)),
+                ('fechada', models.BooleanField(default=False)),
+                ('calculada_em', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Folha mensal',
+                'verbose_name_plural': 'Folhas mensais',
+                'ordering': ['-mes'],
+            },
+        ),
+        migrations.CreateModel(
+            name='FolhaFuncionario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=100)),
+                ('funcao', models.CharField(max_length=15)),
+                ('valorDiaria', models.DecimalField(decimal_places=2, default=0, max_digits=6)),
+                ('dias', models.IntegerField(default=0)),
+                ('horas', models.IntegerField(default=0)),
+                ('valor_diarias', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('valor_servicos', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('funcionario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='bar.funcionario')),
+                ('folha', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='linhas', to='bar.folhamensal')),
+            ],
+            options={
+                'verbose_name': 'Folha do funcionário',
+                'verbose_name_plural': 'Folhas dos funcionários',
+                'ordering': ['folha', 'funcao', 'nome'],
+                'constraints': [models.UniqueConstraint(fields=('folha', 'funcionario'), name='uniq_folha_funcionario')],
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2 on 2026-10-18 11:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+# No SQLite o AddField recria a tabela bar_cliente e apaga os triggers do
+# índice de busca (0015): ele é recriado depois (e também ao desfazer).
+from ._fts import recriar_indice_de_busca
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bar', '0023_folha_mensal'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Alteracao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(blank=True, max_length=30)),
+                ('objeto_id', models.BigIntegerField(blank=True, null=True)),
+                ('apagado', models.BooleanField(default=False)),
+                ('momento', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Alteração',
+                'verbose_name_plural': 'Alterações',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.RunPython(migrations.RunPython.noop, recriar_indice_de_busca),
+        migrations.AddField(
+            model_name='cliente',
+            name='atualizado_em',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(recriar_indice_de_busca, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='coquetel',
+            name='atualizado_em',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='pacote',
+            name='atualizado_em',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='porcao',
+            name='atualizado_em',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='produto',
+            name='atualizado_em',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-18 14:10
+
+from django.db import migrations
+
+# Os índices de trigramas da 0015 eram sobre as colunas cruas, que o
+# `__icontains` do Django não usa. Bancos que já os têm recebem os novos, sobre
+# UPPER(col::text) (_fts.py); no SQLite nada muda.
+from ._fts import POSTGRES_CRIAR, POSTGRES_REMOVER
+
+
+def recriar_indices_de_trigramas(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for sql in POSTGRES_REMOVER + POSTGRES_CRIAR:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bar', '0024_sincronizacao'),
+    ]
+
+    operations = [
+        migrations.RunPython(recriar_indices_de_trigramas, migrations.RunPython.noop),
+    ]
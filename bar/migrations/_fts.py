@@ -0,0 +1,71 @@
+"""
+SQL do índice de busca de Cliente (nome, telefone, email), usado por bar/busca.py.
+
+Criado pela migração 0015. No SQLite as migrações que recriam a tabela
+bar_cliente (AddField) apagam os triggers e chamam recriar_indice_de_busca().
+O "_" no nome deixa este módulo fora do carregador de migrações.
+"""
+
+# SQLite: tabela FTS5 própria, mantida por triggers (inclusive em bulk_create).
+# O telefone é indexado só com dígitos.
+SQLITE_TELEFONE = "replace(replace(replace(replace(replace({col}, ' ', ''), '-', ''), '(', ''), ')', ''), '+', '')"
+
+SQLITE_CRIAR = [
+    """
+    CREATE VIRTUAL TABLE bar_cliente_fts USING fts5(
+        nome, telefone, email, tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER bar_cliente_fts_insert AFTER INSERT ON bar_cliente BEGIN
+        INSERT INTO bar_cliente_fts (rowid, nome, telefone, email)
+        VALUES (new.id, new.nome, {SQLITE_TELEFONE.format(col='new.telefone')}, new.email);
+    END
+    """,
+    """
+    CREATE TRIGGER bar_cliente_fts_delete AFTER DELETE ON bar_cliente BEGIN
+        DELETE FROM bar_cliente_fts WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER bar_cliente_fts_update AFTER UPDATE OF nome, telefone, email ON bar_cliente BEGIN
+        DELETE FROM bar_cliente_fts WHERE rowid = old.id;
+        INSERT INTO bar_cliente_fts (rowid, nome, telefone, email)
+        VALUES (new.id, new.nome, {SQLITE_TELEFONE.format(col='new.telefone')}, new.email);
+    END
+    """,
+    f"""
+    INSERT INTO bar_cliente_fts (rowid, nome, telefone, email)
+    SELECT id, nome, {SQLITE_TELEFONE.format(col='telefone')}, email FROM bar_cliente
+    """,
+]
+
+SQLITE_REMOVER = [
+    "DROP TRIGGER IF EXISTS bar_cliente_fts_insert",
+    "DROP TRIGGER IF EXISTS bar_cliente_fts_delete",
+    "DROP TRIGGER IF EXISTS bar_cliente_fts_update",
+    "DROP TABLE IF EXISTS bar_cliente_fts",
+]
+
+# PostgreSQL: índices GIN de trigramas sobre a mesma expressão que o Django gera
+# para `__icontains` (UPPER(col::text) LIKE UPPER('%termo%')); sobre a coluna
+# crua o planejador não os usaria.
+POSTGRES_CRIAR = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS idx_cliente_nome_trgm ON bar_cliente USING gin ((UPPER(nome::text)) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS idx_cliente_telefone_trgm ON bar_cliente "
+    "USING gin ((UPPER(telefone::text)) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS idx_cliente_email_trgm ON bar_cliente USING gin ((UPPER(email::text)) gin_trgm_ops)",
+]
+
+POSTGRES_REMOVER = [
+    "DROP INDEX IF EXISTS idx_cliente_nome_trgm",
+    "DROP INDEX IF EXISTS idx_cliente_telefone_trgm",
+    "DROP INDEX IF EXISTS idx_cliente_email_trgm",
+]
+
+
+def recriar_indice_de_busca(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for sql in SQLITE_REMOVER + SQLITE_CRIAR:
+            schema_editor.execute(sql)
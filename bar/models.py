@@ -1,8 +1,59 @@
 from django.db import models
+from django.db.models import Case, ExpressionWrapper, F, Func, IntegerField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Cast, Coalesce, Concat, Length, Replace, Round, Substr
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
 from django.utils import timezone 
 
-class Coquetel(models.Model):
+from .db import COLACAO_CAMINHO
+
+
+class anotavel:
+    """
+    Como @property, mas cede lugar ao valor anotado pelo banco com o mesmo nome.
+
+    Os QuerySets abaixo anotam a versão SQL de cada propriedade calculada;
+    quando a linha vem anotada o valor do banco é usado, senão calcula em Python.
+    """
+    def __init__(self, func):
+        self.func = func
+        self.__doc__ = func.__doc__
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return self.func(instance)
+
+
+class Sincronizado:
+    """Modelos do feed dos PDVs (bar/sincronizacao.py): save(update_fields=...) também grava atualizado_em."""
+
+    def save(self, *args, update_fields=None, **kwargs):
+        if update_fields:
+            update_fields = {*update_fields, 'atualizado_em'}  # o auto_now só vale para os campos salvos
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+
+class CoquetelQuerySet(models.QuerySet):
+    def com_indicadores(self):
+        # Mesmas regras de Coquetel.lucro_unitario e Coquetel.margem_lucro,
+        # arredondadas no banco para as casas decimais expostas pela API.
+        lucro = F('preco_venda') - F('preco_custo')
+        return self.annotate(
+            lucro_unitario=Round(lucro, 2, output_field=models.DecimalField(max_digits=7, decimal_places=2)),
+            margem_lucro=Case(
+                # O Cast para float evita a divisão inteira do SQLite quando os preços não têm
+                # centavos; o de volta para decimal, porque o PostgreSQL só tem round(numeric, int)
+                When(preco_custo__gt=0, then=Round(Cast(
+                    lucro / Cast('preco_custo', models.FloatField()),
+                    models.DecimalField(max_digits=20, decimal_places=4),
+                ), 4)),
+                default=Value(0),
+                output_field=models.DecimalField(max_digits=9, decimal_places=4),
+            ),
+        )
+
+class Coquetel(Sincronizado, models.Model):
     nome = models.CharField(max_length=100)
     ingredientes = models.TextField(max_length=200, null=True, blank=True) # Adicionado blank=True
     recipiente = models.CharField(
@@ -18,6 +69,7 @@ class Coquetel(models.Model):
     preco_custo = models.DecimalField(decimal_places=2, max_digits=6, default=0.0) # Aumentado max_digits
     preco_venda = models.DecimalField(decimal_places=2, max_digits=6, default=0.0) # Aumentado max_digits
     fornecedor = models.ForeignKey('Fornecedor', on_delete=models.SET_NULL, null=True, blank=True)
+    atualizado_em = models.DateTimeField(auto_now=True, db_index=True) # feed de sincronização dos PDVs (bar/sincronizacao.py)
     
     class Meta:
         verbose_name = "Coquetel"
@@ -27,14 +79,16 @@ class Coquetel(models.Model):
             models.Index(fields=['nome'], name='idx_coquetel_nome'),
         ]
     
+    objects = CoquetelQuerySet.as_manager()
+    
     def __str__(self):
         return self.nome
     
-    @property
+    @anotavel
     def lucro_unitario(self):
         return self.preco_venda - self.preco_custo
     
-    @property
+    @anotavel
     def margem_lucro(self):
         if self.preco_custo and self.preco_custo > 0: # Adicionada verificação para evitar divisão por zero
             return (self.preco_venda - self.preco_custo) / self.preco_custo
@@ -72,14 +126,16 @@ class Servico(models.Model):
        
         return self.funcao == 'ger' 
 
-class Pacote(models.Model):
+class Pacote(Sincronizado, models.Model):
     nomePacote = models.CharField(max_length=100)
     coqueteis = models.ForeignKey('Coquetel', on_delete=models.PROTECT)
     produtos = models.ForeignKey('Produto', on_delete=models.PROTECT)
     duracaoHora = models.IntegerField(validators=[MinValueValidator(1)]) # Adicionado validador
     servicos = models.ForeignKey('Servico', on_delete=models.PROTECT)
     valorPorPessoa = models.DecimalField(decimal_places=2, max_digits=6, default=0.0) # Aumentado max_digits
+    custo_insumos = models.DecimalField(decimal_places=2, max_digits=8, default=0, editable=False) # custo do coquetel + produto (bar/custos.py)
     eventos = models.ManyToManyField('Evento', related_name='pacotes')
+    atualizado_em = models.DateTimeField(auto_now=True, db_index=True) # bar/sincronizacao.py
     
     class Meta:
         verbose_name = "Pacote"
@@ -99,7 +155,83 @@ class Pacote(models.Model):
         
         return self.valorPorPessoa * 10 
 
-class Funcionario(models.Model):
+def fim_da_subarvore(caminho):
+    """
+    Limite superior (exclusivo) dos caminhos abaixo de `caminho`.
+
+    '/1/5/' -> '/1/50': como '0' vem logo depois de '/', todo caminho que começa
+    com '/1/5/' fica entre os dois, e a busca vira um intervalo no índice.
+    Aceita string ou expressão (OuterRef) para subqueries correlacionadas.
+    """
+    if isinstance(caminho, str):
+        return caminho[:-1] + '0'
+    return Concat(Substr(caminho, 1, Length(caminho) - 1), Value('0'), output_field=models.CharField())
+
+
+def _contar(queryset):
+    # COUNT(*) como subquery escalar (sem GROUP BY)
+    return Coalesce(Subquery(queryset.order_by().annotate(
+        total=Func(F('pk'), function='COUNT', output_field=IntegerField())).values('total')[:1]), 0)
+
+
+class HierarquiaQuerySet(models.QuerySet):
+    """Leituras de hierarquia pelo caminho materializado (mantido por bar/signals.py)."""
+
+    def subarvore(self, caminho):
+        # Descendentes de quem tem esse caminho (sem ele mesmo)
+        return self.filter(caminho__gt=caminho, caminho__lt=fim_da_subarvore(caminho))
+
+    def descendentes_de(self, objeto):
+        return self.subarvore(objeto.caminho) if objeto.caminho else self.none()
+
+    def ancestrais_de(self, objeto):
+        return self.filter(pk__in=objeto.ids_ancestrais)
+
+    def com_tamanho_rede(self):
+        return self.annotate(tamanho_rede=_contar(
+            self.model.objects.filter(caminho__gt=OuterRef('caminho'), caminho__lt=fim_da_subarvore(OuterRef('caminho')))
+        ))
+
+    def com_profundidade(self):
+        # Mesma regra de Hierarquico.profundidade: barras do caminho menos as duas da própria linha
+        barras = Length('caminho') - Length(Replace('caminho', Value('/'), Value('')))
+        return self.annotate(profundidade=Case(
+            When(caminho='', then=Value(0)), default=barras - 2, output_field=IntegerField(),
+        ))
+
+
+MENSAGEM_CICLO = 'Não pode ficar abaixo de si mesmo na hierarquia.'
+
+
+class Hierarquico:
+    """Propriedades comuns de Cliente e Funcionario, lidas do caminho materializado."""
+
+    @property
+    def ids_ancestrais(self):
+        # '/1/5/9/' -> [1, 5] (da raiz para o pai)
+        return [int(parte) for parte in self.caminho.strip('/').split('/')[:-1]] if self.caminho else []
+
+    @anotavel
+    def profundidade(self):
+        return len(self.ids_ancestrais)
+
+    def forma_ciclo(self, pai_id):
+        """Se `pai_id` como pai deixaria o objeto abaixo de si mesmo (é ele ou um descendente dele)."""
+        if not self.pk or pai_id is None:
+            return False
+        caminho_pai = type(self).objects.filter(pk=pai_id).values_list('caminho', flat=True).first() or ''
+        return pai_id == self.pk or f'/{self.pk}/' in caminho_pai
+
+    def clean(self):
+        # Formulários (ClienteForm, admin); a API valida no serializer e o pre_save é a última barreira
+        super().clean()
+        if self.forma_ciclo(getattr(self, f'{self.campo_pai}_id')):
+            raise ValidationError({self.campo_pai: MENSAGEM_CICLO})
+
+class FuncionarioQuerySet(HierarquiaQuerySet):
+    pass
+
+class Funcionario(Hierarquico, models.Model):
     nome = models.CharField(max_length=100)
     valorDiaria = models.DecimalField(decimal_places=2, max_digits=6, default=0.0) # Aumentado max_digits
     funcao = models.CharField(
@@ -115,11 +247,20 @@ class Funcionario(models.Model):
     cpf = models.CharField(max_length=11, null=True, blank=True, default=None, unique=True) # Adicionado blank=True
     email = models.EmailField(blank=True, null=True, default=None, unique=True)
     supervisor = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True)
+    caminho = models.CharField(max_length=500, default='', editable=False, db_index=True, # /raiz/.../id/ (bar/hierarquia.py)
+                               db_collation=COLACAO_CAMINHO)
     
     class Meta:
         verbose_name = "Funcionário"
         verbose_name_plural = "Funcionários"
         ordering = ['-valorDiaria', 'nome']
+        indexes = [
+            # ?funcao= e a escala (funcao IN (...) ORDER BY valorDiaria)
+            models.Index(fields=['funcao', 'valorDiaria'], name='idx_funcionario_funcao'),
+        ]
+    
+    objects = FuncionarioQuerySet.as_manager()
+    campo_pai = 'supervisor'
     
     def __str__(self):
         return self.nome
@@ -134,13 +275,23 @@ class Funcionario(models.Model):
             return self.email
         return f"{self.nome.replace(' ', '.').lower()}@bar.com"
 
-class Cliente(models.Model):
+class ClienteQuerySet(HierarquiaQuerySet):
+    def com_reservas_da_rede(self):
+        # Reservas feitas pelos indicados (diretos e indiretos) de cada cliente
+        return self.annotate(reservas_rede=_contar(Reserva.objects.filter(
+            cliente__caminho__gt=OuterRef('caminho'), cliente__caminho__lt=fim_da_subarvore(OuterRef('caminho')),
+        )))
+
+class Cliente(Sincronizado, Hierarquico, models.Model):
     nome = models.CharField(max_length=100)
     telefone = models.CharField(max_length=15)
     email = models.EmailField()
     indicado_por = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True)
     # NOVO CAMPO ADICIONADO AQUI PARA COMPLEMENTAR 5 CAMPOS
     data_cadastro = models.DateTimeField(auto_now_add=True) # data e hora de criação automática
+    caminho = models.CharField(max_length=500, default='', editable=False, db_index=True, # /raiz/.../id/ (bar/hierarquia.py)
+                               db_collation=COLACAO_CAMINHO)
+    atualizado_em = models.DateTimeField(auto_now=True, db_index=True) # bar/sincronizacao.py
     
     class Meta:
         verbose_name = "Cliente"
@@ -148,8 +299,12 @@ class Cliente(models.Model):
         ordering = ['nome']
         indexes = [
             models.Index(fields=['email'], name='idx_cliente_email'),
+            models.Index(fields=['nome', 'id'], name='idx_cliente_nome_id'), # Paginação por cursor
         ]
     
+    objects = ClienteQuerySet.as_manager()
+    campo_pai = 'indicado_por'
+    
     def __str__(self):
         return self.nome
     
@@ -161,6 +316,17 @@ class Cliente(models.Model):
     def contato_resumido(self):
         return f"{self.nome} ({self.telefone})"
 
+class ReservaQuerySet(models.QuerySet):
+    def com_total_estimado(self):
+        # Mesma regra de Reserva.total_estimado (0 quando não há pacote)
+        return self.annotate(
+            total_estimado=Coalesce(
+                F('pacote__valorPorPessoa') * F('convidados'),
+                Value(0),
+                output_field=models.DecimalField(max_digits=12, decimal_places=2),
+            ),
+        )
+
 class Reserva(models.Model):
     cliente = models.ForeignKey(Cliente, on_delete=models.CASCADE)
     pacote = models.ForeignKey(Pacote, on_delete=models.SET_NULL, null=True, blank=True) # Adicionado blank=True
@@ -173,11 +339,20 @@ class Reserva(models.Model):
         verbose_name_plural = "Reservas"
         ordering = ['-data']
         unique_together = ['cliente', 'data']
+        indexes = [
+            models.Index(fields=['data', 'id'], name='idx_reserva_data_id'), # Paginação por cursor
+        ]
+        constraints = [
+            # Um funcionário atende uma reserva por dia; o índice também serve à escala (bar/escala.py)
+            models.UniqueConstraint(fields=['funcionario_responsavel', 'data'], name='uniq_reserva_funcionario_data'),
+        ]
+    
+    objects = ReservaQuerySet.as_manager()
     
     def __str__(self):
         return f"Reserva de {self.cliente.nome} em {self.data}"
     
-    @property
+    @anotavel
     def total_estimado(self):
         return self.pacote.valorPorPessoa * self.convidados if self.pacote else 0
     
@@ -208,17 +383,31 @@ class Fornecedor(models.Model):
     def identificador(self):
         return f"{self.nome[:3].upper()}-{self.cnpj[-4:]}"
 
-class Produto(models.Model):
+class ProdutoQuerySet(models.QuerySet):
+    def com_precisa_repor(self):
+        # Mesma regra de Produto.precisa_repor
+        return self.annotate(
+            precisa_repor=ExpressionWrapper(Q(estoque__lt=F('estoque_minimo')), output_field=models.BooleanField()),
+        )
+
+class Produto(Sincronizado, models.Model):
     nome = models.CharField(max_length=100)
     preco = models.DecimalField(decimal_places=2, max_digits=6, validators=[MinValueValidator(0.01)]) # Adicionado validador
     fornecedor = models.ForeignKey(Fornecedor, on_delete=models.CASCADE)
     estoque = models.IntegerField(default=0, validators=[MinValueValidator(0)]) # Adicionado validador
     estoque_minimo = models.IntegerField(default=5, validators=[MinValueValidator(0)]) # Adicionado validador
+    atualizado_em = models.DateTimeField(auto_now=True, db_index=True) # bar/sincronizacao.py
     
     class Meta:
         verbose_name = "Produto"
         verbose_name_plural = "Produtos"
         ordering = ['nome']
+        indexes = [
+            # ?precisa_repor=true: só os produtos abaixo do mínimo, já na ordem de nome
+            models.Index(fields=['nome'], condition=Q(estoque__lt=F('estoque_minimo')), name='idx_produto_repor'),
+        ]
+    
+    objects = ProdutoQuerySet.as_manager()
     
     def __str__(self):
         return self.nome
@@ -227,10 +416,17 @@ class Produto(models.Model):
     def preco_formatado(self):
         return f"R${self.preco:.2f}"
     
-    @property
+    @anotavel
     def precisa_repor(self):
         return self.estoque < self.estoque_minimo
 
+class EventoQuerySet(models.QuerySet):
+    def com_status_pagamento(self):
+        # Mesma regra de Evento.status_pagamento
+        return self.annotate(status_pagamento=Case(
+            When(pago=True, then=Value('Pago')), default=Value('Pendente'), output_field=models.CharField(),
+        ))
+
 class Evento(models.Model):
     cliente = models.ForeignKey(Cliente, on_delete=models.PROTECT)
     datahora = models.DateTimeField(default=timezone.now) # Adicionado default
@@ -252,15 +448,239 @@ class Evento(models.Model):
         verbose_name = "Evento"
         verbose_name_plural = "Eventos"
         ordering = ['-datahora']
+        indexes = [
+            models.Index(fields=['datahora', 'id'], name='idx_evento_datahora_id'), # Paginação por cursor
+            # ?pago=false: eventos pendentes (a minoria) por data, sem ler os pagos
+            models.Index(fields=['datahora', 'id'], condition=Q(pago=False), name='idx_evento_pendente'),
+            # Eventos de um cliente por data (resumo de faturamento, bar/faturamento.py)
+            models.Index(fields=['cliente', 'datahora'], name='idx_evento_cliente_datahora'),
+        ]
+    
+    objects = EventoQuerySet.as_manager()
     
     def __str__(self):
         return f"Evento {self.cliente.nome} em {self.datahora.strftime('%d/%m/%Y %H:%M')}"
     
-    @property
+    @anotavel
     def status_pagamento(self):
         return "Pago" if self.pago else "Pendente"
     
     @property
     def horario_brasilia(self):
         
-        return self.datahora.astimezone(timezone.get_current_timezone()).strftime('%d/%m/%Y %H:%M')
\ No newline at end of file
+        return self.datahora.astimezone(timezone.get_current_timezone()).strftime('%d/%m/%Y %H:%M')
+
+
+class FaturamentoDiario(models.Model):
+    """
+    Resumo de receita e ocupação por dia × pacote × forma de pagamento.
+
+    Mantido de forma incremental pelos sinais de Reserva, Evento e Pacote
+    (ver bar/faturamento.py); nunca deve ser editado à mão.
+    """
+    data = models.DateField()
+    pacote = models.ForeignKey(Pacote, on_delete=models.CASCADE, null=True, blank=True)
+    forma_pagamento = models.CharField(max_length=3, blank=True, default='') # '' = reserva sem evento
+    reservas = models.IntegerField(default=0)
+    convidados = models.IntegerField(default=0)
+    receita = models.DecimalField(decimal_places=2, max_digits=14, default=0)
+    receita_paga = models.DecimalField(decimal_places=2, max_digits=14, default=0)
+    
+    class Meta:
+        verbose_name = "Faturamento diário"
+        verbose_name_plural = "Faturamento diário"
+        ordering = ['-data']
+        unique_together = ['data', 'pacote', 'forma_pagamento']
+    
+    def __str__(self):
+        return f"Faturamento de {self.data}"
+
+
+class OcupacaoDiaria(models.Model):
+    """
+    Ocupação de cada local por dia: eventos, reservas, convidados e funcionários escalados.
+
+    Mantida de forma incremental pelos sinais de Reserva e Evento (ver
+    bar/agenda.py); nunca deve ser editada à mão.
+    """
+    data = models.DateField()
+    local = models.CharField(max_length=100, blank=True, default='') # '' = reservas sem evento no dia
+    eventos = models.IntegerField(default=0)
+    reservas = models.IntegerField(default=0)
+    convidados = models.IntegerField(default=0)
+    funcionarios = models.IntegerField(default=0)
+    
+    class Meta:
+        verbose_name = "Ocupação diária"
+        verbose_name_plural = "Ocupação diária"
+        ordering = ['data', 'local']
+        constraints = [
+            # Agenda de um local num intervalo de datas: uma leitura por faixa do índice
+            models.UniqueConstraint(fields=['local', 'data'], name='uniq_ocupacao_local_data'),
+        ]
+        indexes = [
+            models.Index(fields=['data'], name='idx_ocupacao_data'), # Todos os locais num intervalo
+        ]
+    
+    def __str__(self):
+        return f"Ocupação de {self.local or 'sem local'} em {self.data}"
+
+
+
+# Folha de pagamento por mês (bar/folha.py): foto calculada das reservas
+# atribuídas; um mês fechado não muda mais.
+
+class FolhaMensal(models.Model):
+    mes = models.DateField(unique=True) # primeiro dia do mês
+    fechada = models.BooleanField(default=False)
+    calculada_em = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        verbose_name = "Folha mensal"
+        verbose_name_plural = "Folhas mensais"
+        ordering = ['-mes']
+    
+    def __str__(self):
+        return f"Folha de {self.mes:%m/%Y}{' (fechada)' if self.fechada else ''}"
+
+class FolhaFuncionario(models.Model):
+    folha = models.ForeignKey(FolhaMensal, on_delete=models.CASCADE, related_name='linhas')
+    funcionario = models.ForeignKey(Funcionario, on_delete=models.SET_NULL, null=True, blank=True)
+    nome = models.CharField(max_length=100) # como estava no cálculo, para meses fechados
+    funcao = models.CharField(max_length=15)
+    valorDiaria = models.DecimalField(decimal_places=2, max_digits=6, default=0)
+    dias = models.IntegerField(default=0)
+    horas = models.IntegerField(default=0)
+    valor_diarias = models.DecimalField(decimal_places=2, max_digits=12, default=0)
+    valor_servicos = models.DecimalField(decimal_places=2, max_digits=12, default=0)
+    total = models.DecimalField(decimal_places=2, max_digits=12, default=0)
+    
+    class Meta:
+        verbose_name = "Folha do funcionário"
+        verbose_name_plural = "Folhas dos funcionários"
+        ordering = ['folha', 'funcao', 'nome']
+        constraints = [
+            models.UniqueConstraint(fields=['folha', 'funcionario'], name='uniq_folha_funcionario'),
+        ]
+    
+    def __str__(self):
+        return f"{self.nome} em {self.folha.mes:%m/%Y}"
+
+# Pedidos do bar (PDV): um pedido tem vários itens, cada um de um coquetel ou
+# de uma porção. A gravação em massa fica em bar/pedidos.py.
+
+class Porcao(Sincronizado, models.Model):
+    nome = models.CharField(max_length=100)
+    ingredientes = models.TextField(max_length=300, null=True)
+    adicional = models.CharField(
+        choices=(
+            ('', '---'),
+            ('Cal', 'Calabresa'),
+            ('Mus', 'Mussarela'),
+            ('Bac', 'Bacon'),
+            ('Che', 'Cheddar'),
+            ('Cat', 'Catupiry')
+        ), blank=True, default=''
+    )
+    preco_custo = models.DecimalField(decimal_places=2, max_digits=4, default=0.0)
+    preco_venda = models.DecimalField(decimal_places=2, max_digits=4, default=0.0)
+    atualizado_em = models.DateTimeField(auto_now=True, db_index=True) # bar/sincronizacao.py
+
+    class Meta:
+        verbose_name = "Porção"
+        verbose_name_plural = "Porções"
+        ordering = ['nome']
+
+    def __str__(self):
+        return self.nome
+
+class Pedido(models.Model):
+    codigo = models.CharField(max_length=36, unique=True, null=True, blank=True) # gerado pelo PDV; reenvios não duplicam
+    cliente = models.CharField(max_length=100, blank=True, default='') # nome ou mesa
+    atendente = models.ForeignKey(Funcionario, on_delete=models.PROTECT)
+    datahora = models.DateTimeField(default=timezone.now) # horário do PDV (pedidos enviados depois de ficar offline)
+    pago = models.BooleanField(default=False)
+    forma_pagamento = models.CharField(
+        max_length=3,
+        choices=(
+            ('Cre', 'Crédito'),
+            ('Deb', 'Débito'),
+            ('Pix', 'Pix'),
+            ('Din', 'Dinheiro')
+        ),
+        default='Din'
+    )
+    total = models.DecimalField(decimal_places=2, max_digits=10, default=0) # soma dos itens, gravada na criação
+
+    class Meta:
+        verbose_name = "Pedido"
+        verbose_name_plural = "Pedidos"
+        ordering = ['-datahora']
+        indexes = [
+            models.Index(fields=['datahora', 'id'], name='idx_pedido_datahora_id'), # Paginação por cursor
+        ]
+
+    def __str__(self):
+        return f"Pedido {self.pk} ({self.cliente or 'balcão'})"
+
+class ItemPedido(models.Model):
+    pedido = models.ForeignKey(Pedido, on_delete=models.CASCADE, related_name='itens')
+    coquetel = models.ForeignKey(Coquetel, on_delete=models.PROTECT, null=True, blank=True)
+    porcao = models.ForeignKey(Porcao, on_delete=models.PROTECT, null=True, blank=True)
+    quantidade = models.PositiveSmallIntegerField(default=1, validators=[MinValueValidator(1)])
+    preco_unitario = models.DecimalField(decimal_places=2, max_digits=6) # preço de venda no momento do pedido
+
+    class Meta:
+        verbose_name = "Item do pedido"
+        verbose_name_plural = "Itens do pedido"
+        constraints = [
+            # Cada item é um coquetel ou uma porção, nunca os dois
+            models.CheckConstraint(
+                condition=Q(coquetel__isnull=False, porcao__isnull=True) | Q(coquetel__isnull=True, porcao__isnull=False),
+                name='item_pedido_coquetel_ou_porcao',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.quantidade}x {self.coquetel or self.porcao}"
+
+    @property
+    def subtotal(self):
+        return self.quantidade * self.preco_unitario
+
+class ItemReceita(models.Model):
+    # Receita estruturada do coquetel: cada dose vendida baixa `quantidade` unidades do produto (bar/estoque.py)
+    coquetel = models.ForeignKey(Coquetel, on_delete=models.CASCADE, related_name='receita')
+    produto = models.ForeignKey(Produto, on_delete=models.PROTECT, related_name='receitas')
+    quantidade = models.PositiveIntegerField(default=1, validators=[MinValueValidator(1)]) # na unidade do estoque
+
+    class Meta:
+        verbose_name = "Item da receita"
+        verbose_name_plural = "Itens da receita"
+        ordering = ['coquetel_id', 'id'] # na ordem em que os itens foram cadastrados
+        constraints = [
+            models.UniqueConstraint(fields=['coquetel', 'produto'], name='item_receita_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.coquetel}: {self.quantidade}x {self.produto}"
+
+
+# Diário do feed de sincronização dos PDVs (bar/sincronizacao.py): só cresce
+# (até a poda); o id é o cursor dos clientes.
+
+class Alteracao(models.Model):
+    modelo = models.CharField(max_length=30, blank=True) # model_name; '' = marco de reinício
+    objeto_id = models.BigIntegerField(null=True, blank=True)
+    apagado = models.BooleanField(default=False) # tombstone
+    momento = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Alteração"
+        verbose_name_plural = "Alterações"
+        ordering = ['id']
+
+    def __str__(self):
+        if not self.modelo:
+            return f"Reinício #{self.pk}"
+        return f"#{self.pk} {self.modelo} {self.objeto_id}{' (apagado)' if self.apagado else ''}"
@@ -0,0 +1,154 @@
+"""
+Orçamentos de pacotes em lote, para simulações da equipe de vendas.
+
+Cada pedido de orçamento é (pacote, convidados, duracaoHora, data). Os
+pacotes citados no lote inteiro são lidos numa query só, com o custo do
+serviço junto (Tabela); o resto é aritmética em Python sobre essa foto, sem
+queries por orçamento. As regras:
+
+- preço: valorPorPessoa × convidados, com as horas além da duração do
+  pacote cobradas na mesma proporção (menos horas não dão desconto);
+- insumos: Pacote.custo_insumos (coquetel + produto, mantido por
+  bar/custos.py) por convidado;
+- equipe: um profissional do serviço a cada CONVIDADOS_POR_PROFISSIONAL
+  convidados, a Servico.valor_hora × horas;
+- margem: preço - (insumos + equipe); `preco_sugerido` é o menor preço que
+  dá a margem alvo (30% por padrão), nunca abaixo do preço da tabela.
+
+Com data, o orçamento diz se o local está livre no dia, pela agenda
+(bar/agenda.py), numa query para todas as datas do lote.
+"""
+import time
+from datetime import date
+from decimal import Decimal
+
+from django.utils.dateparse import parse_date
+
+from . import agenda
+from .models import Pacote
+
+LIMITE_ORCAMENTOS = 10000  # por chamada
+CONVIDADOS_MAXIMO = 10000
+HORAS_MAXIMO = 24
+CONVIDADOS_POR_PROFISSIONAL = 25
+MARGEM_ALVO = Decimal('30')  # %
+CENTAVOS = Decimal('0.01')
+CEM = Decimal(100)
+
+
+class ErroOrcamento(ValueError):
+    pass
+
+
+def _inteiro(valor):
+    # bool é int em Python, mas true/false não é um número
+    return valor if isinstance(valor, int) and not isinstance(valor, bool) else None
+
+
+class Tabela:
+    """Foto dos custos dos pacotes: {pk: (valorPorPessoa, duracaoHora, custo_insumos, valor_hora)}; uma query."""
+
+    def __init__(self, pacotes=None):
+        consulta = Pacote.objects.order_by()
+        if pacotes is not None:
+            consulta = consulta.filter(pk__in=pacotes)
+        self.pacotes = {
+            pk: (valor, max(duracao, 1), insumos or Decimal(0), valor_hora or Decimal(0))
+            for pk, valor, duracao, insumos, valor_hora in consulta.values_list(
+                'pk', 'valorPorPessoa', 'duracaoHora', 'custo_insumos', 'servicos__valor_hora')
+        }
+
+    @classmethod
+    def do_lote(cls, orcamentos):
+        return cls({_inteiro(dados.get('pacote')) for dados in orcamentos if isinstance(dados, dict)} - {None})
+
+
+def validar(dados, tabela):
+    """(pacote, convidados, horas, data, local) de um pedido de orçamento; ValueError({campo: mensagem}) se inválido."""
+    if not isinstance(dados, dict):
+        raise ValueError({'__all__': 'Cada orçamento deve ser um objeto.'})
+    erros = {}
+    pacote = _inteiro(dados.get('pacote'))
+    if pacote not in tabela.pacotes:
+        erros['pacote'] = 'Informe o id de um pacote existente.'
+    convidados = _inteiro(dados.get('convidados'))
+    if convidados is None or not 1 <= convidados <= CONVIDADOS_MAXIMO:
+        erros['convidados'] = f'Inteiro de 1 a {CONVIDADOS_MAXIMO}.'
+    horas = dados.get('duracaoHora')
+    if horas is not None and (_inteiro(horas) is None or not 1 <= horas <= HORAS_MAXIMO):
+        erros['duracaoHora'] = f'Inteiro de 1 a {HORAS_MAXIMO}.'
+    dia = dados.get('data')
+    if dia is not None and not isinstance(dia, date):
+        try:
+            dia = parse_date(dia) if isinstance(dia, str) else None
+        except ValueError:
+            dia = None
+        if dia is None:
+            erros['data'] = 'Data inválida; use AAAA-MM-DD.'
+    local = dados.get('local', agenda.LOCAL_PADRAO)
+    if not isinstance(local, str) or len(local) > 100:
+        erros['local'] = 'Texto de até 100 caracteres.'
+    if erros:
+        raise ValueError(erros)
+    return pacote, convidados, horas, dia, local
+
+
+def calcular(pacote, convidados, horas, tabela, margem_alvo=MARGEM_ALVO):
+    """Preço, custos e margem de um orçamento, só com a tabela em memória."""
+    valor, duracao, insumos, valor_hora = tabela.pacotes[pacote]
+    horas = horas or duracao
+    equipe = -(-convidados // CONVIDADOS_POR_PROFISSIONAL)
+    preco = (valor * convidados * max(horas, duracao) / duracao).quantize(CENTAVOS)
+    custo_insumos = (insumos * convidados).quantize(CENTAVOS)
+    custo_equipe = (valor_hora * horas * equipe).quantize(CENTAVOS)
+    custo = custo_insumos + custo_equipe
+    margem = preco - custo
+    minimo = (custo * CEM / (CEM - margem_alvo)).quantize(CENTAVOS)
+    return {
+        'pacote': pacote,
+        'convidados': convidados,
+        'duracaoHora': horas,
+        'equipe': equipe,
+        'preco': preco,
+        'custo_insumos': custo_insumos,
+        'custo_equipe': custo_equipe,
+        'custo': custo,
+        'margem': margem,
+        'margem_percentual': (margem * CEM / preco).quantize(CENTAVOS) if preco else None,
+        'preco_sugerido': max(preco, minimo),
+    }
+
+
+def orcar(orcamentos, margem_alvo=MARGEM_ALVO, tabela=None):
+    """Orça uma lista de pedidos (dicts); devolve o relatório com um orçamento (ou None) por pedido."""
+    orcamentos = list(orcamentos)
+    if len(orcamentos) > LIMITE_ORCAMENTOS:
+        raise ErroOrcamento(f'No máximo {LIMITE_ORCAMENTOS} orçamentos por chamada.')
+    if not margem_alvo.is_finite() or not Decimal(0) <= margem_alvo < CEM:
+        raise ErroOrcamento('A margem alvo deve estar entre 0 e 100 (exclusive).')
+    inicio = time.perf_counter()
+    tabela = tabela or Tabela.do_lote(orcamentos)
+    erros, validos = {}, []
+    for numero, dados in enumerate(orcamentos):
+        try:
+            validos.append((numero, *validar(dados, tabela)))
+        except ValueError as erro:
+            erros[numero] = erro.args[0]
+
+    datas = {(local, dia) for *_, dia, local in validos if dia}
+    ocupados = agenda.ocupados(datas) if datas else set()
+    resultado = [None] * len(orcamentos)
+    for numero, pacote, convidados, horas, dia, local in validos:
+        orcamento = calcular(pacote, convidados, horas, tabela, margem_alvo)
+        if dia:
+            orcamento.update(data=dia, local=local, livre=(local, dia) not in ocupados)
+        resultado[numero] = orcamento
+
+    segundos = time.perf_counter() - inicio
+    return {
+        'orcamentos': resultado,
+        'com_erro': len(erros),
+        'erros': [{'orcamento': n, 'erros': erros[n]} for n in sorted(erros)],
+        'segundos': round(segundos, 3),
+        'orcamentos_por_segundo': round(len(validos) / segundos, 1) if segundos else None,
+    }
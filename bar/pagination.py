@@ -0,0 +1,257 @@
+import base64
+import datetime
+import decimal
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import DecimalField, F, Q, QuerySet
+from django.db.models.functions import Round
+from django.db.models.lookups import Exact, GreaterThan, LessThan
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def _valor_cursor(valor):
+    # Ao contrário do DjangoJSONEncoder, preserva os microssegundos: o cursor
+    # precisa reproduzir exatamente a posição da última linha.
+    if isinstance(valor, (datetime.date, datetime.time)):
+        return valor.isoformat()
+    if isinstance(valor, decimal.Decimal):
+        return str(valor)
+    raise TypeError(f'Valor não suportado no cursor: {valor!r}')
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginação por cursor (keyset) para as tabelas grandes.
+
+    A ordenação é a do queryset (ou o Meta.ordering do modelo) com o `pk`
+    como desempate, e cada página filtra "depois da última linha vista" em
+    vez de usar OFFSET/COUNT. Assim a página 5.000 custa o mesmo que a
+    primeira e inserções entre uma página e outra não duplicam nem pulam linhas.
+    """
+    page_size = 50
+    max_page_size = 500
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Cursor inválido.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.montar_pagina(list(self.consulta_da_pagina(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Versão assíncrona (bar/views_async.py): a página vem pelo aiterator()."""
+        consulta = self.consulta_da_pagina(queryset, request)
+        return self.montar_pagina([linha async for linha in consulta.aiterator()])
+
+    def paginar_linhas(self, queryset, request, colunas):
+        """Como paginate_queryset, mas a página vem em tuplas de values_list(*colunas) (bar/serializacao.py)."""
+        consulta = self.consulta_da_pagina(queryset, request)
+        # As colunas da ordenação vão no fim de cada tupla, para montar o cursor
+        # (como F(), para não se fundirem com uma coluna de mesmo nome)
+        ordem = [F(campo.lstrip('-')) for campo in self.ordering]
+        return self.montar_pagina(list(consulta.values_list(*colunas, *ordem)))
+
+    def consulta_da_pagina(self, queryset, request):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+
+        self.chaves = self.chaves_de_comparacao(queryset)
+        self.posicao, self.anterior = self.decode_cursor(request)
+        if self.posicao is not None:
+            self.posicao = self.tipar(queryset, self.posicao)
+        ordering = self.inverter(self.ordering) if self.anterior else self.ordering
+        queryset = queryset.order_by(*(self.ordenar(campo) for campo in ordering))
+        if self.posicao is not None:
+            queryset = queryset.filter(self.apos(ordering, self.posicao, self.chaves))
+        return queryset[:self.page_size + 1]
+
+    def montar_pagina(self, resultados):
+        tem_mais = len(resultados) > self.page_size
+        self.page = resultados[:self.page_size]
+        if self.anterior:
+            self.page.reverse()
+
+        # Na navegação para trás, o "mais" fica antes da página atual.
+        self.has_next = (self.posicao is not None) if self.anterior else tem_mais
+        self.has_previous = tem_mais if self.anterior else (self.posicao is not None)
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            tamanho = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(tamanho, self.max_page_size))
+
+    def get_ordering(self, queryset):
+        ordering = [str(campo) for campo in (queryset.query.order_by or queryset.model._meta.ordering)]
+        if not any(campo.lstrip('-') in ('pk', 'id') for campo in ordering):
+            # Desempate no mesmo sentido do último campo para usar o índice (campo, id).
+            ordering.append('-pk' if ordering and ordering[-1].startswith('-') else 'pk')
+        return ordering
+
+    @staticmethod
+    def inverter(ordering):
+        return [campo[1:] if campo.startswith('-') else f'-{campo}' for campo in ordering]
+
+    def tipar(self, queryset, posicao):
+        """Valores do cursor (texto no JSON) de volta aos tipos dos campos ou anotações da ordenação."""
+        query = queryset.query.clone()  # resolve_ref() pode acrescentar joins
+        try:
+            return [
+                valor if valor is None else query.resolve_ref(campo.lstrip('-')).output_field.to_python(valor)
+                for campo, valor in zip(self.ordering, posicao)
+            ]
+        except ValidationError:
+            raise NotFound(self.invalid_cursor_message)
+
+    def chaves_de_comparacao(self, queryset):
+        """
+        Anotações decimais da ordenação -> a expressão arredondada usada para ordenar e comparar.
+
+        No SQLite um produto como valorPorPessoa * convidados é REAL (80.10 * 5 =
+        400.49999999999994), mas a linha chega ao Python, e ao cursor, já
+        quantizada (400.50). Ordenando e comparando pelo valor arredondado às casas
+        do output_field, os dois lados do cursor veem o mesmo número e o
+        desempate pelo pk fica certo.
+        """
+        chaves = {}
+        for campo in self.ordering:
+            nome = campo.lstrip('-')
+            anotacao = queryset.query.annotations.get(nome)
+            if anotacao is not None and isinstance(anotacao.output_field, DecimalField):
+                chaves[nome] = Round(F(nome), anotacao.output_field.decimal_places, output_field=anotacao.output_field)
+        return chaves
+
+    def ordenar(self, campo):
+        expressao = self.chaves.get(campo.lstrip('-'))
+        if expressao is None:
+            return campo
+        return expressao.desc() if campo.startswith('-') else expressao.asc()
+
+    @staticmethod
+    def apos(ordering, posicao, chaves=None):
+        """(a > x) OR (a = x AND b > y) OR ..., respeitando o sentido de cada campo."""
+        condicao = Q()
+        iguais = []
+        for campo, valor in zip(ordering, posicao):
+            expressao = (chaves or {}).get(campo.lstrip('-')) or F(campo.lstrip('-'))
+            lookup = LessThan if campo.startswith('-') else GreaterThan
+            condicao |= Q(*iguais, lookup(expressao, valor))
+            iguais.append(Exact(expressao, valor))
+        return condicao
+
+    def posicao_de(self, instancia):
+        if isinstance(instancia, tuple):  # linha de paginar_linhas()
+            return list(instancia[-len(self.ordering):])
+        posicao = []
+        for campo in self.ordering:
+            valor = instancia
+            for parte in campo.lstrip('-').split('__'):
+                valor = getattr(valor, parte)
+            posicao.append(valor)
+        return posicao
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        try:
+            dados = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            posicao, anterior = dados['p'], bool(dados.get('r'))
+        except (TypeError, ValueError, KeyError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(posicao, list) or len(posicao) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return posicao, anterior
+
+    def encode_cursor(self, posicao, anterior):
+        dados = {'p': posicao}
+        if anterior:
+            dados['r'] = 1
+        cursor = base64.urlsafe_b64encode(json.dumps(dados, default=_valor_cursor).encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.posicao_de(self.page[-1]), anterior=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.posicao_de(self.page[0]), anterior=True)
+
+    def get_html_context(self):
+        return {
+            'previous_url': self.get_previous_link(),
+            'next_url': self.get_next_link(),
+        }
+
+
+def estimar_linhas(modelo, using='default'):
+    """Total aproximado de linhas da tabela sem COUNT(*); None se o banco não oferece uma estimativa."""
+    conexao = connections[using]
+    tabela = modelo._meta.db_table
+    with conexao.cursor() as cursor:
+        if conexao.vendor == 'postgresql':
+            # Atualizado pelo autovacuum/ANALYZE; -1 se a tabela nunca foi analisada
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [tabela])
+        elif conexao.vendor == 'sqlite':
+            # Maior rowid: uma descida na árvore; superestima depois de exclusões
+            cursor.execute(f'SELECT MAX(rowid) FROM {conexao.ops.quote_name(tabela)}')
+        else:
+            return None
+        linha = cursor.fetchone()
+    return linha[0] if linha and linha[0] is not None and linha[0] >= 0 else None
+
+
+class ContagemAproximadaPaginator(Paginator):
+    """
+    Paginator do Django (admin, ListView) que não faz COUNT(*) da tabela inteira.
+
+    Sem filtros, acima de `limite_exato` linhas, o total é a estimativa do
+    banco (estimar_linhas). Com filtros, a contagem para em `limite_exato`
+    (COUNT sobre um LIMIT), então o custo não cresce com a tabela; a
+    navegação vai até a página que esse limite alcança.
+    """
+    limite_exato = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return super().count
+        if not queryset.query.where:
+            estimativa = estimar_linhas(queryset.model, queryset.db)
+            if estimativa is not None and estimativa > self.limite_exato:
+                return estimativa
+        return queryset.order_by()[:self.limite_exato].count()
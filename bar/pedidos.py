@@ -0,0 +1,232 @@
+"""
+Ingestão em massa de pedidos do PDV (Pedido + ItemPedido).
+
+Os PDVs mandam lotes de centenas de pedidos por chamada (POST
+/bar/api/pedidos/lote/ ou `ingerir()` direto). Cada pedido é validado em
+Python, sem queries: os ids de atendentes, coquetéis e porções citados no
+lote inteiro são carregados antes, com uma query por modelo, junto com os
+preços de venda. O preço unitário de cada item é o do cardápio no momento da
+ingestão, não um valor enviado pelo PDV.
+
+A gravação vai em transações de até `lote` pedidos, cada uma com poucas
+queries: os `codigo` já gravados, um bulk_create dos pedidos (os ids voltam
+pelo RETURNING, no SQLite 3.35+ e no PostgreSQL), um bulk_create dos itens e
+a baixa do estoque dos coquetéis vendidos pelas receitas (bar/estoque.py).
+Com o SQLite em WAL o custo dominante é o commit, então poucos commits
+grandes sustentam milhares de pedidos por segundo (ver `manage.py
+estresse_pedidos`).
+
+`codigo` é gerado pelo PDV (um UUID, por exemplo): reenviar um lote depois
+de um timeout não duplica os pedidos, e a resposta traz os mesmos ids.
+"""
+import time
+from datetime import datetime
+from decimal import Decimal
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import condicional, estoque
+from .models import Coquetel, Funcionario, ItemPedido, Pedido, Porcao
+
+LOTE_PADRAO = 500
+LIMITE_PEDIDOS = 5000  # por chamada
+LIMITE_ITENS = 100  # por pedido
+
+FORMAS_PAGAMENTO = {valor for valor, _ in Pedido._meta.get_field('forma_pagamento').choices}
+QUANTIDADE_MAXIMA = 32767
+TOTAL_MAXIMO = Decimal(10) ** (Pedido._meta.get_field('total').max_digits - 2)
+
+
+class ErroPedido(ValueError):
+    pass
+
+
+def _inteiro(valor):
+    # bool é int em Python, mas true/false não é um id
+    return valor if isinstance(valor, int) and not isinstance(valor, bool) else None
+
+
+class Catalogo:
+    """Ids válidos e preços de venda de tudo o que um lote cita; uma query por modelo."""
+
+    def __init__(self, pedidos):
+        atendentes, coqueteis, porcoes = set(), set(), set()
+        for dados in pedidos:
+            if not isinstance(dados, dict):
+                continue
+            atendentes.add(_inteiro(dados.get('atendente')))
+            itens = dados.get('itens')
+            for item in itens if isinstance(itens, list) else ():
+                if isinstance(item, dict):
+                    coqueteis.add(_inteiro(item.get('coquetel')))
+                    porcoes.add(_inteiro(item.get('porcao')))
+        self.atendentes = set(Funcionario.objects.filter(pk__in=atendentes - {None}).values_list('pk', flat=True))
+        self.coqueteis = dict(Coquetel.objects.filter(pk__in=coqueteis - {None}).values_list('pk', 'preco_venda'))
+        self.porcoes = dict(Porcao.objects.filter(pk__in=porcoes - {None}).values_list('pk', 'preco_venda'))
+        self.receitas = estoque.receitas(self.coqueteis)
+
+
+def _datahora(valor):
+    if valor is None:
+        return timezone.now()
+    if isinstance(valor, datetime):
+        momento = valor
+    elif isinstance(valor, str):
+        try:
+            momento = parse_datetime(valor)
+        except ValueError:
+            momento = None
+    else:
+        momento = None
+    if momento is None:
+        raise ValueError('Data/hora inválida; use ISO 8601 (AAAA-MM-DDTHH:MM[:SS][±HH:MM]).')
+    return timezone.make_aware(momento) if timezone.is_naive(momento) else momento
+
+
+def _item(dados, catalogo):
+    if not isinstance(dados, dict):
+        raise ValueError('Cada item deve ser um objeto.')
+    coquetel, porcao = _inteiro(dados.get('coquetel')), _inteiro(dados.get('porcao'))
+    if (dados.get('coquetel') is None) == (dados.get('porcao') is None):
+        raise ValueError('Informe `coquetel` ou `porcao` (um dos dois).')
+    quantidade = dados.get('quantidade', 1)
+    if _inteiro(quantidade) is None or not 1 <= quantidade <= QUANTIDADE_MAXIMA:
+        raise ValueError('`quantidade` deve ser um inteiro positivo.')
+    if dados.get('coquetel') is not None:
+        if coquetel not in catalogo.coqueteis:
+            raise ValueError(f"Coquetel {dados['coquetel']!r} não existe.")
+        return ItemPedido(coquetel_id=coquetel, quantidade=quantidade, preco_unitario=catalogo.coqueteis[coquetel])
+    if porcao not in catalogo.porcoes:
+        raise ValueError(f"Porção {dados['porcao']!r} não existe.")
+    return ItemPedido(porcao_id=porcao, quantidade=quantidade, preco_unitario=catalogo.porcoes[porcao])
+
+
+def construir(dados, catalogo):
+    """(Pedido, [ItemPedido]) de um pedido do PDV; ValueError({campo: mensagem}) se inválido."""
+    if not isinstance(dados, dict):
+        raise ValueError({'__all__': 'Cada pedido deve ser um objeto.'})
+    erros = {}
+    codigo = dados.get('codigo')
+    if codigo is not None and (not isinstance(codigo, str) or not 0 < len(codigo) <= 36):
+        erros['codigo'] = 'Texto de 1 a 36 caracteres.'
+    cliente = dados.get('cliente') or ''
+    if not isinstance(cliente, str) or len(cliente) > 100:
+        erros['cliente'] = 'Texto de até 100 caracteres.'
+    atendente = _inteiro(dados.get('atendente'))
+    if atendente not in catalogo.atendentes:
+        erros['atendente'] = 'Informe o id de um funcionário existente.'
+    pago = dados.get('pago', False)
+    if not isinstance(pago, bool):
+        erros['pago'] = 'Use true ou false.'
+    forma_pagamento = dados.get('forma_pagamento', 'Din')
+    if forma_pagamento not in FORMAS_PAGAMENTO:
+        erros['forma_pagamento'] = f"Use um de: {', '.join(sorted(FORMAS_PAGAMENTO))}."
+    try:
+        datahora = _datahora(dados.get('datahora'))
+    except ValueError as erro:
+        erros['datahora'] = str(erro)
+
+    itens = dados.get('itens')
+    if not isinstance(itens, list) or not 0 < len(itens) <= LIMITE_ITENS:
+        erros['itens'] = f'Informe de 1 a {LIMITE_ITENS} itens.'
+        itens = []
+    construidos = []
+    for numero, item in enumerate(itens):
+        try:
+            construidos.append(_item(item, catalogo))
+        except ValueError as erro:
+            erros[f'itens[{numero}]'] = str(erro)
+    total = sum((item.quantidade * item.preco_unitario for item in construidos), Decimal('0.00'))
+    if total >= TOTAL_MAXIMO:
+        erros['itens'] = 'Total do pedido acima do limite.'
+    if erros:
+        raise ValueError(erros)
+
+    pedido = Pedido(codigo=codigo, cliente=cliente, atendente_id=atendente, datahora=datahora, pago=pago,
+                    forma_pagamento=forma_pagamento, total=total)
+    return pedido, construidos
+
+
+def _gravar(validos, catalogo):
+    """Grava [(numero, pedido, itens)] numa transação; devolve {numero: id}, os números já gravados antes e a baixa."""
+    codigos = [pedido.codigo for _, pedido, _ in validos if pedido.codigo]
+    existentes = dict(Pedido.objects.filter(codigo__in=codigos).values_list('codigo', 'pk')) if codigos else {}
+    ids, duplicados, novos, vistos = {}, [], [], {}
+    for numero, pedido, itens in validos:
+        if pedido.codigo in existentes:
+            ids[numero] = existentes[pedido.codigo]
+            duplicados.append(numero)
+        elif pedido.codigo and pedido.codigo in vistos:
+            # Repetido dentro do próprio lote: vale o primeiro
+            duplicados.append(numero)
+            vistos[pedido.codigo].append(numero)
+        else:
+            novos.append((numero, pedido, itens))
+            if pedido.codigo:
+                vistos[pedido.codigo] = [numero]
+    Pedido.objects.bulk_create([pedido for _, pedido, _ in novos])
+    todos = []
+    for numero, pedido, itens in novos:
+        ids[numero] = pedido.pk
+        for numero_repetido in vistos.get(pedido.codigo, ())[1:]:
+            ids[numero_repetido] = pedido.pk
+        for item in itens:
+            item.pedido_id = pedido.pk
+        todos.extend(itens)
+    ItemPedido.objects.bulk_create(todos)
+    vendas = [(item.coquetel_id, item.quantidade) for item in todos if item.coquetel_id]
+    return ids, duplicados, estoque.baixar(vendas, catalogo.receitas)
+
+
+def ingerir(pedidos, lote=LOTE_PADRAO):
+    """Valida e grava os pedidos (lista de dicts) em transações de até `lote`; devolve o relatório."""
+    pedidos = list(pedidos)
+    if len(pedidos) > LIMITE_PEDIDOS:
+        raise ErroPedido(f'No máximo {LIMITE_PEDIDOS} pedidos por chamada.')
+    inicio = time.perf_counter()
+    catalogo = Catalogo(pedidos)
+    erros, validos = {}, []
+    for numero, dados in enumerate(pedidos):
+        try:
+            validos.append((numero, *construir(dados, catalogo)))
+        except ValueError as erro:
+            erros[numero] = erro.args[0]
+
+    ids, duplicados, repor = {}, [], set()
+    partes = iter(validos)
+    while parte := list(islice(partes, lote)):
+        for tentativa in range(2):
+            try:
+                with transaction.atomic():
+                    gravados, repetidos, baixa = _gravar(parte, catalogo)
+                break
+            except IntegrityError:
+                # Outro envio gravou um dos `codigo` entre a leitura e o INSERT: relê e tenta de novo
+                if tentativa:
+                    raise
+                for _, pedido, itens in parte:
+                    pedido.pk = None
+                    for item in itens:
+                        item.pk = None
+        ids.update(gravados)
+        duplicados.extend(repetidos)
+        repor.update(baixa['repor'])
+    if len(ids) > len(duplicados):
+        condicional.marcar(Pedido)  # bulk_create não dispara sinais
+
+    segundos = time.perf_counter() - inicio
+    criados = len(ids) - len(duplicados)
+    return {
+        'pedidos': len(pedidos),
+        'criados': criados,
+        'duplicados': len(duplicados),
+        'com_erro': len(erros),
+        'ids': [ids.get(numero) for numero in range(len(pedidos))],
+        'erros': [{'pedido': n, 'erros': erros[n]} for n in sorted(erros)],
+        'produtos_para_repor': sorted(repor),
+        'segundos': round(segundos, 3),
+        'pedidos_por_segundo': round(criados / segundos, 1) if segundos else None,
+    }
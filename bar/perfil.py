@@ -0,0 +1,215 @@
+"""
+Perfil por requisição: tempo de SQL, da view e dos templates.
+
+O PerfilMiddleware (primeiro da pilha em project/settings.py) mede uma
+fração BAR_PERFIL_AMOSTRA das requisições e devolve as medições no
+cabeçalho Server-Timing, que o DevTools do navegador mostra na aba Network:
+
+    Server-Timing: total;dur=41.2, view;dur=38.0, db;dur=12.5;desc="7 queries",
+                   tpl;dur=20.1, render;dur=0.4
+
+- db: soma das queries (um execute_wrapper em cada conexão, ver conectar())
+- view: da chamada da view até ela devolver a resposta
+- tpl: templates renderizados (backend DjangoTemplates deste módulo)
+- render: response.render() de TemplateResponse/Response do DRF (JSON)
+
+As fatias se sobrepõem (db e tpl acontecem dentro de view/render). Requisições
+acima de BAR_PERFIL_REQUISICAO_LENTA_MS e queries acima de
+BAR_PERFIL_SQL_LENTO_MS vão para o logger 'bar.perfil', com a view ou a
+linha do projeto que disparou a query.
+
+Fora da amostra, o custo é um random() por requisição e uma leitura de
+ContextVar por query. A ContextVar (e não o `with connection.execute_wrapper()`
+só no thread da requisição) é o que alcança as queries das views assíncronas,
+executadas pelo sync_to_async em outro thread.
+"""
+import logging
+import os
+import random
+import sys
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.template import TemplateDoesNotExist
+from django.template.backends import django as backend_django
+
+logger = logging.getLogger('bar.perfil')
+
+_atual = ContextVar('bar_perfil', default=None)
+
+
+def amostra():
+    return getattr(settings, 'BAR_PERFIL_AMOSTRA', 0)
+
+
+def _limite(nome):
+    valor = getattr(settings, nome, None)
+    return None if valor is None else valor / 1000
+
+
+def _ms(segundos):
+    return round(segundos * 1000, 1)
+
+
+def origem():
+    """Primeira linha do projeto (fora de site-packages e deste módulo) na pilha atual."""
+    raiz = str(settings.BASE_DIR)
+    frame = sys._getframe(1)
+    while frame is not None:
+        arquivo = frame.f_code.co_filename
+        if arquivo.startswith(raiz) and arquivo != __file__ and 'site-packages' not in arquivo:
+            return f'{os.path.relpath(arquivo, raiz)}:{frame.f_lineno} {frame.f_code.co_name}'
+        frame = frame.f_back
+    return '?'
+
+
+class Perfil:
+    """Medições de uma requisição; compartilhado entre threads pela ContextVar."""
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.fim = None
+        self.queries = 0
+        self.db = 0.0
+        self.templates = 0.0
+        self.view_inicio = None
+        self.render_inicio = None
+        self.render = None
+        self.sql_lento = _limite('BAR_PERFIL_SQL_LENTO_MS')
+
+    def registrar_sql(self, sql, segundos, alias):
+        self.queries += 1
+        self.db += segundos
+        if self.sql_lento is not None and segundos >= self.sql_lento:
+            logger.warning('SQL lento (%s ms, %s) em %s: %s', _ms(segundos), alias, origem(), sql)
+
+    def metricas(self):
+        fim = self.fim or time.perf_counter()
+        metricas = [('total', fim - self.inicio, None)]
+        if self.view_inicio is not None:
+            metricas.append(('view', (self.render_inicio or fim) - self.view_inicio, None))
+        metricas.append(('db', self.db, f'{self.queries} queries'))
+        if self.templates:
+            metricas.append(('tpl', self.templates, None))
+        if self.render is not None:
+            metricas.append(('render', self.render, None))
+        return metricas
+
+    def server_timing(self):
+        return ', '.join(
+            f'{nome};dur={_ms(segundos)}' + (f';desc="{descricao}"' if descricao else '')
+            for nome, segundos, descricao in self.metricas()
+        )
+
+    def concluir(self, request, resposta):
+        self.fim = time.perf_counter()
+        resposta['Server-Timing'] = self.server_timing()
+        lenta = _limite('BAR_PERFIL_REQUISICAO_LENTA_MS')
+        if lenta is not None and self.fim - self.inicio >= lenta:
+            rota = getattr(request, 'resolver_match', None)
+            logger.warning('Requisição lenta: %s %s %s (%s) %s', request.method, request.get_full_path(),
+                           resposta.status_code, rota.view_name if rota else '?', resposta['Server-Timing'])
+        return resposta
+
+
+class PerfilMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.assincrono = iscoroutinefunction(get_response)
+        if self.assincrono:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.assincrono:
+            return self.__acall__(request)
+        if random.random() >= amostra():
+            return self.get_response(request)
+        perfil = Perfil()
+        token = _atual.set(perfil)
+        try:
+            resposta = self.get_response(request)
+        finally:
+            _atual.reset(token)
+        return perfil.concluir(request, resposta)
+
+    async def __acall__(self, request):
+        if random.random() >= amostra():
+            return await self.get_response(request)
+        perfil = Perfil()
+        token = _atual.set(perfil)
+        try:
+            resposta = await self.get_response(request)
+        finally:
+            _atual.reset(token)
+        return perfil.concluir(request, resposta)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        perfil = _atual.get()
+        if perfil is not None:
+            perfil.view_inicio = time.perf_counter()
+
+    def process_template_response(self, request, resposta):
+        # Chamado logo antes do response.render(); o callback marca o fim
+        perfil = _atual.get()
+        if perfil is not None:
+            perfil.render_inicio = time.perf_counter()
+
+            def fim_do_render(resposta):
+                perfil.render = time.perf_counter() - perfil.render_inicio
+            resposta.add_post_render_callback(fim_do_render)
+        return resposta
+
+
+# SQL: execute_wrapper permanente em cada conexão, ativo só nas requisições da amostra
+
+def medir_sql(execute, sql, params, many, context):
+    perfil = _atual.get()
+    if perfil is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        perfil.registrar_sql(sql, time.perf_counter() - inicio, context['connection'].alias)
+
+
+def instalar(sender, connection, **kwargs):
+    if medir_sql not in connection.execute_wrappers:
+        # No início da lista: o execute_wrapper() do Django remove o último ao sair
+        connection.execute_wrappers.insert(0, medir_sql)
+
+
+def conectar():
+    connection_created.connect(instalar, dispatch_uid='bar_perfil_sql')
+
+
+# Templates: backend DjangoTemplates que cronometra cada render de nível mais
+# alto (os {% include %} acontecem dentro dele e não contam duas vezes)
+
+class Template(backend_django.Template):
+    def render(self, context=None, request=None):
+        perfil = _atual.get()
+        if perfil is None:
+            return super().render(context, request)
+        inicio = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            perfil.templates += time.perf_counter() - inicio
+
+
+class DjangoTemplates(backend_django.DjangoTemplates):
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return Template(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            backend_django.reraise(exc, self)
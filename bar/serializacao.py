@@ -0,0 +1,149 @@
+"""
+Serialização rápida das listagens da API.
+
+Numa página de 500 reservas ou eventos, o tempo vai quase todo em instanciar
+modelos e no `to_representation` campo a campo do ModelSerializer, não no
+SQL. Com `lista_rapida = True`, o `list` do ViewSet lê as linhas com
+`values_list()` (os campos "*_nome" viram JOINs no SQL) e converte cada
+coluna com uma função montada uma vez a partir dos próprios campos do
+serializer. O JSON sai idêntico ao do serializer: mesmos campos, na mesma
+ordem, com os mesmos formatos.
+
+Só entram campos que leem uma coluna, um campo de FK ("fornecedor.nome") ou
+uma anotação do queryset. Para propriedades calculadas o queryset anota a
+versão SQL (ver `anotavel` em bar/models.py). M2M e campos aninhados não são
+suportados; ViewSets com eles ficam no caminho normal.
+"""
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from rest_framework import fields, relations
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+
+def ativo():
+    return getattr(settings, 'BAR_LISTA_RAPIDA', True)
+
+
+def _decimal(campo):
+    # Valores que já chegam do banco com as casas do campo são só formatados;
+    # o resto passa pelo to_representation do DRF (arredondamento, limites).
+    if (campo.decimal_places is None or campo.normalize_output or campo.localize
+            or not getattr(campo, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)):
+        return campo.to_representation
+    casas, limite = -campo.decimal_places, campo.max_digits or float('inf')
+
+    def converter(valor):
+        if isinstance(valor, Decimal):
+            _, digitos, expoente = valor.as_tuple()
+            if expoente == casas and len(digitos) <= limite:
+                return format(valor, 'f')
+        return campo.to_representation(valor)
+    return converter
+
+
+def _data(campo):
+    if getattr(campo, 'format', api_settings.DATE_FORMAT) != fields.ISO_8601:
+        return campo.to_representation
+    return lambda valor: valor.isoformat() if valor else None
+
+
+def _data_hora(campo):
+    fuso = getattr(campo, 'timezone', campo.default_timezone())
+    if getattr(campo, 'format', api_settings.DATETIME_FORMAT) != fields.ISO_8601 or fuso is None:
+        return campo.to_representation
+
+    def converter(valor):
+        if not valor:
+            return None
+        texto = valor.astimezone(fuso).isoformat()
+        return texto[:-6] + 'Z' if texto.endswith('+00:00') else texto
+    return converter
+
+
+def _escolha(campo):
+    valores = campo.choice_strings_to_values
+    return lambda valor: valor if valor == '' else valores.get(str(valor), valor)
+
+
+def _conversor(campo):
+    """Função valor -> JSON equivalente ao campo.to_representation; None = valor já serve."""
+    if isinstance(campo, relations.PrimaryKeyRelatedField) and campo.pk_field is None:
+        return None  # values_list já devolve o id
+    if isinstance(campo, fields.ChoiceField):
+        return _escolha(campo)
+    if isinstance(campo, fields.CharField):
+        return str
+    if isinstance(campo, fields.BooleanField):
+        return bool
+    if isinstance(campo, fields.IntegerField):
+        return int
+    if isinstance(campo, fields.FloatField):
+        return float
+    if isinstance(campo, fields.DecimalField):
+        return _decimal(campo)
+    if isinstance(campo, fields.DateTimeField):
+        return _data_hora(campo)
+    if isinstance(campo, fields.DateField):
+        return _data(campo)
+    raise ImproperlyConfigured(f'Campo {campo.field_name!r} ({type(campo).__name__}) não suportado na lista rápida.')
+
+
+def _coluna(campo, queryset):
+    if campo.source == '*':
+        raise ImproperlyConfigured(f'Campo {campo.field_name!r} não lê uma coluna.')
+    coluna = '__'.join(campo.source_attrs)
+    if coluna in queryset.query.annotations:
+        return coluna
+    try:
+        modelo = queryset.model
+        for parte in campo.source_attrs:
+            alvo = modelo._meta.get_field(parte)
+            modelo = alvo.related_model
+    except FieldDoesNotExist:
+        raise ImproperlyConfigured(f'Campo {campo.field_name!r}: {coluna!r} não é coluna nem anotação do queryset.')
+    if alvo.many_to_many or alvo.one_to_many:
+        raise ImproperlyConfigured(f'Campo {campo.field_name!r}: relações múltiplas não são suportadas.')
+    return coluna
+
+
+class Plano:
+    """Colunas do values_list() e conversões equivalentes a um serializer."""
+
+    def __init__(self, serializer, queryset):
+        legiveis = [campo for campo in serializer.fields.values() if not campo.write_only]
+        self.nomes = [campo.field_name for campo in legiveis]
+        self.colunas = [_coluna(campo, queryset) for campo in legiveis]
+        self.conversores = [_conversor(campo) for campo in legiveis]
+
+    def serializar(self, linhas):
+        # zip() ignora as colunas extras do fim (cursor da paginação)
+        nomes, conversores = self.nomes, self.conversores
+        return [
+            {nome: valor if valor is None or converter is None else converter(valor)
+             for nome, converter, valor in zip(nomes, conversores, linha)}
+            for linha in linhas
+        ]
+
+
+class ListaRapidaMixin:
+    """`list` via values_list() quando `lista_rapida` está ligada no ViewSet."""
+    lista_rapida = False
+
+    def list(self, request, *args, **kwargs):
+        paginador = self.paginator
+        if not (self.lista_rapida and ativo()) or (paginador is not None and not hasattr(paginador, 'paginar_linhas')):
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        plano = Plano(self.get_serializer(), queryset)
+        pagina = self.paginar_linhas(queryset, plano.colunas)
+        if pagina is not None:
+            return paginador.get_paginated_response(plano.serializar(pagina))
+        return Response(plano.serializar(queryset.values_list(*plano.colunas)))
+
+    def paginar_linhas(self, queryset, colunas):
+        if self.paginator is None:
+            return None
+        return self.paginator.paginar_linhas(queryset, self.request, colunas)
@@ -0,0 +1,226 @@
+from rest_framework import serializers
+
+from .models import (
+    Coquetel, Cliente, Servico, Pacote, Funcionario, Reserva, Fornecedor, Produto, Evento, FaturamentoDiario,
+    Porcao, Pedido, ItemPedido, ItemReceita, FolhaFuncionario, MENSAGEM_CICLO,
+)
+from .agenda import LIMITE_DATAS, LIMITE_LOCAIS
+
+
+def _validar_pai(serializer, pai):
+    # Mesma regra do pre_save (bar/hierarquia.py), antes do save: 400 em vez de erro no sinal
+    if serializer.instance is not None and serializer.instance.forma_ciclo(pai.pk if pai else None):
+        raise serializers.ValidationError(MENSAGEM_CICLO)
+    return pai
+
+
+# Os campos "*_nome" leem atributos de FKs; as views da API carregam essas
+# relações com select_related/prefetch_related para evitar N+1.
+
+class CoquetelSerializer(serializers.ModelSerializer):
+    fornecedor_nome = serializers.CharField(source='fornecedor.nome', read_only=True, default=None)
+    lucro_unitario = serializers.DecimalField(max_digits=7, decimal_places=2, read_only=True)
+    margem_lucro = serializers.DecimalField(max_digits=9, decimal_places=4, read_only=True)
+
+    class Meta:
+        model = Coquetel
+        fields = '__all__'
+
+
+class ClienteSerializer(serializers.ModelSerializer):
+    indicado_por_nome = serializers.CharField(source='indicado_por.nome', read_only=True, default=None)
+    profundidade = serializers.IntegerField(read_only=True) # nível na árvore de indicações (0 = raiz)
+
+    class Meta:
+        model = Cliente
+        fields = '__all__'
+
+    def validate_indicado_por(self, valor):
+        return _validar_pai(self, valor)
+
+
+class ServicoSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Servico
+        fields = '__all__'
+
+
+class PacoteSerializer(serializers.ModelSerializer):
+    coquetel_nome = serializers.CharField(source='coqueteis.nome', read_only=True)
+    produto_nome = serializers.CharField(source='produtos.nome', read_only=True)
+    servico_nome = serializers.CharField(source='servicos.nome', read_only=True)
+
+    class Meta:
+        model = Pacote
+        fields = '__all__'
+
+
+class FuncionarioSerializer(serializers.ModelSerializer):
+    supervisor_nome = serializers.CharField(source='supervisor.nome', read_only=True, default=None)
+    profundidade = serializers.IntegerField(read_only=True) # nível na hierarquia de supervisão (0 = raiz)
+
+    class Meta:
+        model = Funcionario
+        fields = '__all__'
+
+    def validate_supervisor(self, valor):
+        return _validar_pai(self, valor)
+
+
+class ReservaSerializer(serializers.ModelSerializer):
+    cliente_nome = serializers.CharField(source='cliente.nome', read_only=True)
+    pacote_nome = serializers.CharField(source='pacote.nomePacote', read_only=True, default=None)
+    funcionario_nome = serializers.CharField(source='funcionario_responsavel.nome', read_only=True, default=None)
+    total_estimado = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = Reserva
+        fields = '__all__'
+
+
+class FornecedorSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Fornecedor
+        fields = '__all__'
+
+
+class ProdutoSerializer(serializers.ModelSerializer):
+    fornecedor_nome = serializers.CharField(source='fornecedor.nome', read_only=True)
+    precisa_repor = serializers.BooleanField(read_only=True)
+
+    class Meta:
+        model = Produto
+        fields = '__all__'
+
+
+class ItemReceitaSerializer(serializers.ModelSerializer):
+    coquetel_nome = serializers.CharField(source='coquetel.nome', read_only=True)
+    produto_nome = serializers.CharField(source='produto.nome', read_only=True)
+
+    class Meta:
+        model = ItemReceita
+        fields = '__all__'
+
+
+class EventoSerializer(serializers.ModelSerializer):
+    cliente_nome = serializers.CharField(source='cliente.nome', read_only=True)
+    status_pagamento = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = Evento
+        fields = '__all__'
+
+
+class PorcaoSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Porcao
+        fields = '__all__'
+
+
+class ItemPedidoSerializer(serializers.ModelSerializer):
+    coquetel_nome = serializers.CharField(source='coquetel.nome', read_only=True, default=None)
+    porcao_nome = serializers.CharField(source='porcao.nome', read_only=True, default=None)
+    subtotal = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = ItemPedido
+        exclude = ['pedido']
+
+
+# Somente leitura: os pedidos entram pelo POST /bar/api/pedidos/lote/ (bar/pedidos.py)
+class PedidoSerializer(serializers.ModelSerializer):
+    atendente_nome = serializers.CharField(source='atendente.nome', read_only=True)
+    itens = ItemPedidoSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Pedido
+        fields = '__all__'
+
+
+class FaturamentoDiarioSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = FaturamentoDiario
+        fields = '__all__'
+
+
+class RelatorioFaturamentoSerializer(serializers.Serializer):
+    periodo = serializers.DateField()
+    pacote_id = serializers.IntegerField(required=False, allow_null=True)
+    forma_pagamento = serializers.CharField(required=False)
+    reservas = serializers.IntegerField()
+    convidados = serializers.IntegerField()
+    receita = serializers.DecimalField(max_digits=16, decimal_places=2)
+    receita_paga = serializers.DecimalField(max_digits=16, decimal_places=2)
+
+
+class RankingIndicacoesSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    nome = serializers.CharField()
+    email = serializers.EmailField()
+    tamanho_rede = serializers.IntegerField() # indicados diretos e indiretos
+    reservas_rede = serializers.IntegerField() # reservas feitas por essa rede
+
+
+# Agenda de ocupação (bar/agenda.py)
+class OcupacaoSerializer(serializers.Serializer):
+    data = serializers.DateField()
+    local = serializers.CharField()
+    livre = serializers.BooleanField()
+    eventos = serializers.IntegerField()
+    reservas = serializers.IntegerField()
+    convidados = serializers.IntegerField()
+    funcionarios = serializers.IntegerField()
+
+
+class VerificarDatasSerializer(serializers.Serializer):
+    datas = serializers.ListField(child=serializers.DateField(), allow_empty=False, max_length=LIMITE_DATAS)
+    locais = serializers.ListField(child=serializers.CharField(allow_blank=True), required=False,
+                                   max_length=LIMITE_LOCAIS)
+
+
+# Folha de pagamento (bar/folha.py)
+class FolhaFuncionarioSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = FolhaFuncionario
+        exclude = ['folha']
+
+
+class FolhaFuncaoSerializer(serializers.Serializer):
+    funcao = serializers.CharField()
+    funcionarios = serializers.IntegerField()
+    dias = serializers.IntegerField()
+    horas = serializers.IntegerField()
+    valor_diarias = serializers.DecimalField(max_digits=14, decimal_places=2)
+    valor_servicos = serializers.DecimalField(max_digits=14, decimal_places=2)
+    total = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+
+# Feed de sincronização dos PDVs (bar/sincronizacao.py): só colunas da própria
+# linha, sem "*_nome", caminho, profundidade nem Pacote.eventos, que mudam com
+# escritas em outras linhas.
+class CoquetelSyncSerializer(CoquetelSerializer):
+    fornecedor_nome = None
+
+
+class ProdutoSyncSerializer(ProdutoSerializer):
+    fornecedor_nome = None
+
+
+class ClienteSyncSerializer(ClienteSerializer):
+    indicado_por_nome = None
+    profundidade = None
+
+    class Meta(ClienteSerializer.Meta):
+        fields = None
+        exclude = ['caminho']
+
+
+class PacoteSyncSerializer(PacoteSerializer):
+    coquetel_nome = None
+    produto_nome = None
+    servico_nome = None
+
+    class Meta(PacoteSerializer.Meta):
+        fields = None
+        exclude = ['eventos']
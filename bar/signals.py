@@ -0,0 +1,302 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+
+from . import agenda, cache, condicional, custos, faturamento, folha, hierarquia, sincronizacao
+from .models import (
+    Cliente, Coquetel, Evento, Fornecedor, Funcionario, ItemPedido, ItemReceita, Pacote, Pedido, Porcao, Produto, Reserva, Servico,
+)
+
+# Modelo alterado -> namespaces do cache do catálogo que exibem seus dados
+CATALOGO = {
+    Coquetel: ('coquetel', 'pacote'),
+    Fornecedor: ('coquetel',),  # fornecedor_nome do coquetel
+    Produto: ('pacote',),  # produto_nome do pacote
+    Servico: ('servico', 'pacote'),
+    Pacote: ('pacote',),
+}
+
+CATALOGO_M2M = {
+    Servico.funcionarios.through: ('servico',),
+    Pacote.eventos.through: ('pacote',),
+}
+
+
+def invalidar_catalogo(sender, **kwargs):
+    cache.invalidar(*CATALOGO[sender])
+
+
+def invalidar_catalogo_m2m(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        cache.invalidar(*CATALOGO_M2M[sender])
+
+
+def invalidar_pacotes_do_evento(sender, **kwargs):
+    # Apagar um Evento remove as linhas de Pacote.eventos sem disparar m2m_changed.
+    cache.invalidar('pacote')
+
+
+def invalidar_servicos_do_funcionario(sender, **kwargs):
+    # O mesmo com Funcionario e Servico.funcionarios (a lista de serviços guarda os ids)
+    cache.invalidar('servico')
+
+
+# Carimbos do GET condicional (bar/condicional.py): renovados depois do commit
+
+VERSIONADOS = (Coquetel, Cliente, Servico, Pacote, Funcionario, Reserva, Fornecedor, Produto, Evento, Porcao, Pedido,
+               ItemReceita)
+
+VERSIONADOS_M2M = {
+    Servico.funcionarios.through: Servico,
+    Pacote.eventos.through: Pacote,
+}
+
+# Linhas que aparecem aninhadas na resposta de outro modelo
+VERSIONADOS_FILHOS = {ItemPedido: Pedido}
+
+
+def marcar_modelo(sender, **kwargs):
+    condicional.marcar(sender)
+
+
+def marcar_modelo_pai(sender, **kwargs):
+    condicional.marcar(VERSIONADOS_FILHOS[sender])
+
+
+def marcar_modelo_m2m(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        condicional.marcar(VERSIONADOS_M2M[sender])
+
+
+# Resumo de faturamento: cada escrita recalcula só os dias que ela toca.
+
+def guardar_dia_da_reserva(sender, instance, **kwargs):
+    # Dia e responsável anteriores: faturamento, agenda e folha de pagamento
+    anterior = Reserva.objects.filter(pk=instance.pk).values_list('data', 'funcionario_responsavel_id').first() \
+        if instance.pk else None
+    instance._dias_faturamento = {anterior[0] if anterior else None}
+    instance._folha_anterior = anterior
+
+
+def guardar_dia_do_evento(sender, instance, **kwargs):
+    anterior = Evento.objects.filter(pk=instance.pk).values_list('datahora', flat=True).first() if instance.pk else None
+    instance._dias_faturamento = {faturamento.dia_do_evento(anterior)} if anterior else set()
+
+
+def guardar_dias_do_pacote(sender, instance, **kwargs):
+    # Só o preço por pessoa e a remoção do pacote mudam a receita.
+    if instance.pk and (kwargs['signal'] is pre_delete or not Pacote.objects.filter(
+            pk=instance.pk, valorPorPessoa=instance.valorPorPessoa).exists()):
+        instance._dias_faturamento = set(Reserva.objects.filter(pacote=instance).values_list('data', flat=True).distinct())
+    else:
+        instance._dias_faturamento = set()
+
+
+def _dias_tocados(sender, instance):
+    dias = set(getattr(instance, '_dias_faturamento', ()))
+    if sender is Reserva:
+        dias.add(instance.data)
+    elif sender is Evento:
+        dias.add(faturamento.dia_do_evento(instance.datahora))
+    return dias
+
+
+def atualizar_faturamento(sender, instance, **kwargs):
+    faturamento.recalcular_dias(_dias_tocados(sender, instance))
+
+
+# Agenda de ocupação (bar/agenda.py): os mesmos dias do faturamento, só de Reserva e Evento
+
+def atualizar_agenda(sender, instance, **kwargs):
+    agenda.recalcular_dias(_dias_tocados(sender, instance))
+
+
+# Folha de pagamento (bar/folha.py): só as linhas dos funcionários e meses tocados, nas folhas abertas
+
+def atualizar_folha_da_reserva(sender, instance, **kwargs):
+    folha.atualizar({getattr(instance, '_folha_anterior', None) or (None, None),
+                     (instance.data, instance.funcionario_responsavel_id)})
+
+
+def atualizar_folha_do_funcionario(sender, instance, created, raw=False, **kwargs):
+    if not raw and not created:
+        folha.atualizar_funcionario(instance.pk)
+
+
+def invalidar_folha(sender, action=None, **kwargs):
+    # Pacote e Servico podem mudar o valor de qualquer reserva; o M2M, quem é habilitado no serviço
+    if action in (None, 'post_add', 'post_remove', 'post_clear'):
+        folha.invalidar()
+
+
+# Custos derivados das receitas (bar/custos.py): cada escrita recalcula só o que depende dela
+
+def guardar_preco_do_produto(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or not instance.pk or (update_fields is not None and 'preco' not in update_fields):
+        instance._preco_anterior = instance.preco
+        return
+    instance._preco_anterior = Produto.objects.filter(pk=instance.pk).values_list('preco', flat=True).first()
+
+
+def atualizar_custos_do_produto(sender, instance, created, raw=False, **kwargs):
+    if not raw and not created and instance._preco_anterior != instance.preco:
+        custos.atualizar_produtos([instance.pk])
+
+
+def calcular_custo_do_coquetel(sender, instance, raw=False, **kwargs):
+    # Com receita, o preco_custo digitado dá lugar ao calculado
+    instance._custo_anterior = None
+    if raw or not instance.pk:
+        return
+    atual = Coquetel.objects.filter(pk=instance.pk).annotate(calculado=custos.custo_da_receita()).values_list(
+        'preco_custo', 'calculado').first()
+    if atual:
+        instance._custo_anterior = atual[0]
+        if atual[1] is not None:
+            instance.preco_custo = atual[1]
+
+
+def atualizar_custos_do_coquetel(sender, instance, created, raw=False, **kwargs):
+    if not raw and not created and instance._custo_anterior != instance.preco_custo:
+        custos.atualizar_pacotes([instance.pk])
+        condicional.marcar(Pacote)
+
+
+def calcular_custo_do_pacote(sender, instance, raw=False, **kwargs):
+    if not raw:
+        instance.custo_insumos = custos.custo_insumos(instance.coqueteis_id, instance.produtos_id)
+
+
+def guardar_coquetel_da_receita(sender, instance, **kwargs):
+    anterior = ItemReceita.objects.filter(pk=instance.pk).values_list('coquetel_id', flat=True).first() \
+        if instance.pk else None
+    instance._coqueteis_receita = {anterior, instance.coquetel_id} - {None}
+
+
+def atualizar_custos_da_receita(sender, instance, **kwargs):
+    custos.atualizar_coqueteis(getattr(instance, '_coqueteis_receita', None) or [instance.coquetel_id])
+
+
+# Caminho materializado de Cliente.indicado_por e Funcionario.supervisor
+
+def preparar_caminho(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    pai_id = getattr(instance, f'{sender.campo_pai}_id')
+    atual = sender.objects.filter(pk=instance.pk).values_list(f'{sender.campo_pai}_id', 'caminho').first() \
+        if instance.pk else None
+    if atual and atual[0] == pai_id and atual[1]:
+        instance.caminho = atual[1]  # o da memória pode estar velho se um ancestral mudou de lugar
+        instance._caminho_anterior = None
+        return
+    caminho_pai = hierarquia.caminho_do_pai(sender, pai_id)
+    hierarquia.validar_pai(instance, caminho_pai)
+    instance._caminho_anterior = atual[1] if atual else ''
+    if instance.pk:
+        instance.caminho = f'{caminho_pai}{instance.pk}/'
+    else:
+        instance._caminho_pai = caminho_pai  # o id só existe depois do INSERT
+
+
+def gravar_caminho(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if created:
+        instance.caminho = f'{instance.__dict__.pop("_caminho_pai", "/")}{instance.pk}/'
+        sender.objects.filter(pk=instance.pk).update(caminho=instance.caminho)
+    elif getattr(instance, '_caminho_anterior', None) is not None:
+        if update_fields is not None and 'caminho' not in update_fields:
+            sender.objects.filter(pk=instance.pk).update(caminho=instance.caminho)
+        hierarquia.mover_subarvore(sender, instance._caminho_anterior, instance.caminho)
+
+
+def guardar_caminho(sender, instance, **kwargs):
+    instance._caminho_anterior = sender.objects.filter(pk=instance.pk).values_list('caminho', flat=True).first()
+
+
+def soltar_subarvore(sender, instance, **kwargs):
+    # O SET_NULL já tornou os filhos raízes; os descendentes perdem o prefixo do apagado
+    if instance._caminho_anterior:
+        hierarquia.mover_subarvore(sender, instance._caminho_anterior, '/')
+
+
+# Feed de sincronização dos PDVs (bar/sincronizacao.py): cada save() e delete() entra no diário
+
+SINCRONIZADOS = tuple(consulta.model for consulta in sincronizacao.CONSULTAS.values())
+
+# Modelo apagado -> (modelo sincronizado, FK com SET_NULL para ele)
+SINCRONIZADOS_SET_NULL = {
+    Cliente: (Cliente, 'indicado_por'),
+    Fornecedor: (Coquetel, 'fornecedor'),
+}
+
+
+def anotar_alteracao(sender, instance, raw=False, **kwargs):
+    if not raw:
+        sincronizacao.registrar(sender, [instance.pk], apagado=kwargs['signal'] is post_delete)
+
+
+def anotar_set_null(sender, instance, **kwargs):
+    # O SET_NULL do delete() é um UPDATE sem sinais nas linhas que apontavam para o apagado
+    modelo, campo = SINCRONIZADOS_SET_NULL[sender]
+    sincronizacao.atualizar(modelo.objects.filter(**{campo: instance}))
+
+
+def conectar():
+    for modelo in CATALOGO:
+        post_save.connect(invalidar_catalogo, sender=modelo, dispatch_uid=f'catalogo_save_{modelo.__name__}')
+        post_delete.connect(invalidar_catalogo, sender=modelo, dispatch_uid=f'catalogo_delete_{modelo.__name__}')
+    for through in CATALOGO_M2M:
+        m2m_changed.connect(invalidar_catalogo_m2m, sender=through, dispatch_uid=f'catalogo_m2m_{through.__name__}')
+    post_delete.connect(invalidar_pacotes_do_evento, sender=Evento, dispatch_uid='catalogo_delete_evento')
+    post_delete.connect(invalidar_servicos_do_funcionario, sender=Funcionario, dispatch_uid='catalogo_delete_funcionario')
+
+    for modelo in VERSIONADOS:
+        post_save.connect(marcar_modelo, sender=modelo, dispatch_uid=f'versao_save_{modelo.__name__}')
+        post_delete.connect(marcar_modelo, sender=modelo, dispatch_uid=f'versao_delete_{modelo.__name__}')
+    for modelo in VERSIONADOS_FILHOS:
+        post_save.connect(marcar_modelo_pai, sender=modelo, dispatch_uid=f'versao_save_{modelo.__name__}')
+        post_delete.connect(marcar_modelo_pai, sender=modelo, dispatch_uid=f'versao_delete_{modelo.__name__}')
+    for through in VERSIONADOS_M2M:
+        m2m_changed.connect(marcar_modelo_m2m, sender=through, dispatch_uid=f'versao_m2m_{through.__name__}')
+
+    pre_save.connect(guardar_dia_da_reserva, sender=Reserva, dispatch_uid='faturamento_pre_save_reserva')
+    pre_save.connect(guardar_dia_do_evento, sender=Evento, dispatch_uid='faturamento_pre_save_evento')
+    pre_delete.connect(guardar_dia_do_evento, sender=Evento, dispatch_uid='faturamento_pre_delete_evento')
+    pre_save.connect(guardar_dias_do_pacote, sender=Pacote, dispatch_uid='faturamento_pre_save_pacote')
+    pre_delete.connect(guardar_dias_do_pacote, sender=Pacote, dispatch_uid='faturamento_pre_delete_pacote')
+    for modelo in (Reserva, Evento, Pacote):
+        post_save.connect(atualizar_faturamento, sender=modelo, dispatch_uid=f'faturamento_save_{modelo.__name__}')
+        post_delete.connect(atualizar_faturamento, sender=modelo, dispatch_uid=f'faturamento_delete_{modelo.__name__}')
+    for modelo in (Reserva, Evento):
+        post_save.connect(atualizar_agenda, sender=modelo, dispatch_uid=f'agenda_save_{modelo.__name__}')
+        post_delete.connect(atualizar_agenda, sender=modelo, dispatch_uid=f'agenda_delete_{modelo.__name__}')
+
+    post_save.connect(atualizar_folha_da_reserva, sender=Reserva, dispatch_uid='folha_save_reserva')
+    post_delete.connect(atualizar_folha_da_reserva, sender=Reserva, dispatch_uid='folha_delete_reserva')
+    post_save.connect(atualizar_folha_do_funcionario, sender=Funcionario, dispatch_uid='folha_save_funcionario')
+    for modelo in (Funcionario, Pacote, Servico):
+        post_delete.connect(invalidar_folha, sender=modelo, dispatch_uid=f'folha_delete_{modelo.__name__}')
+    for modelo in (Pacote, Servico):
+        post_save.connect(invalidar_folha, sender=modelo, dispatch_uid=f'folha_save_{modelo.__name__}')
+    m2m_changed.connect(invalidar_folha, sender=Servico.funcionarios.through, dispatch_uid='folha_m2m_servico')
+
+    pre_save.connect(guardar_preco_do_produto, sender=Produto, dispatch_uid='custos_pre_save_produto')
+    post_save.connect(atualizar_custos_do_produto, sender=Produto, dispatch_uid='custos_save_produto')
+    pre_save.connect(calcular_custo_do_coquetel, sender=Coquetel, dispatch_uid='custos_pre_save_coquetel')
+    post_save.connect(atualizar_custos_do_coquetel, sender=Coquetel, dispatch_uid='custos_save_coquetel')
+    pre_save.connect(calcular_custo_do_pacote, sender=Pacote, dispatch_uid='custos_pre_save_pacote')
+    pre_save.connect(guardar_coquetel_da_receita, sender=ItemReceita, dispatch_uid='custos_pre_save_receita')
+    post_save.connect(atualizar_custos_da_receita, sender=ItemReceita, dispatch_uid='custos_save_receita')
+    post_delete.connect(atualizar_custos_da_receita, sender=ItemReceita, dispatch_uid='custos_delete_receita')
+
+    for modelo in (Cliente, Funcionario):
+        nome = modelo.__name__
+        pre_save.connect(preparar_caminho, sender=modelo, dispatch_uid=f'hierarquia_pre_save_{nome}')
+        post_save.connect(gravar_caminho, sender=modelo, dispatch_uid=f'hierarquia_save_{nome}')
+        pre_delete.connect(guardar_caminho, sender=modelo, dispatch_uid=f'hierarquia_pre_delete_{nome}')
+        post_delete.connect(soltar_subarvore, sender=modelo, dispatch_uid=f'hierarquia_delete_{nome}')
+
+    for modelo in SINCRONIZADOS:
+        post_save.connect(anotar_alteracao, sender=modelo, dispatch_uid=f'sincronizacao_save_{modelo.__name__}')
+        post_delete.connect(anotar_alteracao, sender=modelo, dispatch_uid=f'sincronizacao_delete_{modelo.__name__}')
+    for modelo in SINCRONIZADOS_SET_NULL:
+        pre_delete.connect(anotar_set_null, sender=modelo, dispatch_uid=f'sincronizacao_pre_delete_{modelo.__name__}')
@@ -0,0 +1,192 @@
+"""
+Feed incremental dos PDVs (tablets que funcionam offline): só o que mudou desde um cursor.
+
+Cada escrita em Coquetel, Produto, Cliente, Pacote e Porcao deixa uma linha no
+diário (Alteracao): modelo, id e se a linha foi apagada. O id do diário é o
+cursor do cliente. GET /bar/api/sync/?desde=<cursor> devolve, numa resposta
+para todos os modelos, as linhas alteradas depois dele, no estado atual, e
+os ids apagados (tombstones). Uma linha alterada várias vezes sai uma vez só,
+então o tráfego acompanha o número de alterações, não o tamanho do catálogo.
+
+save() e delete() são anotados pelos sinais de bar/signals.py. As gravações
+em massa (custos, baixa de estoque, importação) chamam registrar() ou
+atualizar(), o UPDATE que também carimba atualizado_em (o auto_now só vale no
+save()). Um QuerySet entra no diário com um INSERT ... SELECT.
+
+O payload tem só colunas da própria linha. Nomes de FKs e a posição na árvore
+de indicações mudam com escritas em outras linhas e ficam de fora; o PDV os
+resolve pelos ids.
+
+Sem cursor, ou com um cursor anterior a um marco de reinício (reiniciar(),
+usado pela carga sintética e pela poda do diário), a resposta pede `reset`:
+o cliente baixa as listas completas da API e continua do cursor devolvido. O
+cursor é lido antes das listas, então o que mudar durante o download vem de
+novo na próxima sincronização (as linhas são idempotentes).
+
+O cursor devolvido é o maior id do diário, lido antes das alterações, e
+isso só é seguro se os ids ficam visíveis na ordem em que são gerados. No
+SQLite as escritas já são serializadas. No PostgreSQL a sequência entrega os
+ids na ordem da alocação, mas eles aparecem na ordem dos commits: um leitor
+poderia ver o 101 com o 100 ainda em aberto e perdê-lo. Por isso toda escrita
+no diário pega antes um lock de transação (pg_advisory_xact_lock), mantido até
+o commit: quem anota depois recebe ids maiores e só confirma depois.
+"""
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import F, Max, QuerySet
+from django.utils import timezone
+
+from .models import Alteracao, Cliente, Coquetel, Pacote, Porcao, Produto
+
+# Chave no payload (a mesma rota da API) -> linhas enviadas aos PDVs
+CONSULTAS = {
+    'coqueteis': Coquetel.objects.com_indicadores(),
+    'produtos': Produto.objects.com_precisa_repor(),
+    'clientes': Cliente.objects.all(),
+    'pacotes': Pacote.objects.all(),
+    'porcoes': Porcao.objects.all(),
+}
+CHAVES = {consulta.model._meta.model_name: chave for chave, consulta in CONSULTAS.items()}
+REINICIO = ''  # Alteracao.modelo do marco de reinício
+LIMITE_PADRAO = 1000  # linhas do diário por chamada
+LIMITE_MAXIMO = 5000
+DIAS_RETENCAO = 30
+LOCK_DIARIO = 0x62617273  # chave do pg_advisory_xact_lock das escritas no diário
+
+
+def sincronizado(modelo):
+    return modelo._meta.model_name in CHAVES
+
+
+def _travar_diario():
+    # Serializa as escritas no diário até o commit (PostgreSQL; o SQLite já serializa)
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [LOCK_DIARIO])
+
+
+def _registrar_consulta(nome, consulta, apagado):
+    # INSERT ... SELECT: as linhas de um QuerySet entram sem passar pelo Python
+    sql, params = consulta.order_by().values(objeto_id=F('pk')).query.sql_with_params()
+    momento = Alteracao._meta.get_field('momento').get_db_prep_value(timezone.now(), connection)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {connection.ops.quote_name(Alteracao._meta.db_table)} (modelo, objeto_id, apagado, momento) '
+            f'SELECT %s, linhas.objeto_id, %s, %s FROM ({sql}) linhas',
+            [nome, apagado, momento, *params],
+        )
+        return cursor.rowcount
+
+
+def registrar(modelo, ids, apagado=False):
+    """Anota no diário os ids de `modelo` (iterável ou QuerySet); um INSERT, devolve quantos."""
+    nome = modelo._meta.model_name
+    with transaction.atomic(savepoint=False):  # o lock vale até o fim da transação
+        _travar_diario()
+        if isinstance(ids, QuerySet):
+            return _registrar_consulta(nome, ids, apagado)
+        return len(Alteracao.objects.bulk_create(
+            [Alteracao(modelo=nome, objeto_id=pk, apagado=apagado) for pk in ids], batch_size=LIMITE_MAXIMO))
+
+
+def atualizar(consulta, **valores):
+    """consulta.update(**valores) com atualizado_em carimbado e as linhas anotadas no diário."""
+    with transaction.atomic(savepoint=False):
+        alteradas = consulta.update(atualizado_em=timezone.now(), **valores)
+        if alteradas:
+            registrar(consulta.model, consulta)
+    return alteradas
+
+
+def reiniciar():
+    """Marco de reinício: clientes com cursor anterior a ele baixam tudo de novo."""
+    with transaction.atomic(savepoint=False):
+        _travar_diario()
+        return Alteracao.objects.create(modelo=REINICIO).pk
+
+
+def cursor_atual():
+    return Alteracao.objects.aggregate(cursor=Max('pk'))['cursor'] or 0
+
+
+def _validar(desde, chaves, limite):
+    erros = {}
+    if desde is not None and desde < 0:
+        erros['desde'] = 'Informe um cursor devolvido pela sincronização.'
+    desconhecidas = [chave for chave in chaves if chave not in CONSULTAS]
+    if desconhecidas:
+        erros['modelo'] = f"Desconhecido: {', '.join(desconhecidas)}. Use um de: {', '.join(CONSULTAS)}."
+    if not 1 <= limite <= LIMITE_MAXIMO:
+        erros['limite'] = f'Inteiro de 1 a {LIMITE_MAXIMO}.'
+    if erros:
+        raise ValueError(erros)
+
+
+def alteracoes(desde, chaves=None, limite=LIMITE_PADRAO):
+    """
+    O que mudou nos modelos `chaves` depois do cursor `desde`.
+
+    Devolve {'cursor', 'reset', 'mais', 'alterados': {chave: [objetos]},
+    'apagados': {chave: [ids]}}; com `mais`, o cliente pede de novo a partir
+    do cursor. São uma leitura do diário e uma query por modelo alterado.
+    """
+    chaves = list(chaves or CONSULTAS)
+    _validar(desde, chaves, limite)
+    cursor = cursor_atual()
+    resultado = {'cursor': cursor, 'reset': False, 'mais': False, 'alterados': {}, 'apagados': {}}
+    if desde is None or desde > cursor:
+        resultado['reset'] = True  # primeira carga, ou cursor de outro banco
+        return resultado
+
+    nomes = [REINICIO, *(CONSULTAS[chave].model._meta.model_name for chave in chaves)]
+    linhas = list(
+        Alteracao.objects.filter(pk__gt=desde, pk__lte=cursor, modelo__in=nomes).order_by('pk')
+        .values_list('pk', 'modelo', 'objeto_id', 'apagado')[:limite + 1]
+    )
+    if any(modelo == REINICIO for _, modelo, _, _ in linhas):
+        resultado['reset'] = True
+        return resultado
+    if len(linhas) > limite:
+        linhas = linhas[:limite]
+        resultado.update(cursor=linhas[-1][0], mais=True)
+
+    ultima = {}  # (modelo, id) -> apagado na última anotação
+    for _, modelo, pk, apagado in linhas:
+        ultima[modelo, pk] = apagado
+    vivos, apagados = {}, {}
+    for (modelo, pk), apagado in ultima.items():
+        (apagados if apagado else vivos).setdefault(CHAVES[modelo], set()).add(pk)
+    for chave in chaves:
+        ids, tombstones = vivos.get(chave, set()), apagados.get(chave, set())
+        objetos = list(CONSULTAS[chave].filter(pk__in=ids).order_by('pk')) if ids else []
+        # Apagada depois da leitura do cursor: o tombstone já vai agora
+        tombstones |= ids - {objeto.pk for objeto in objetos}
+        if objetos:
+            resultado['alterados'][chave] = objetos
+        if tombstones:
+            resultado['apagados'][chave] = sorted(tombstones)
+    return resultado
+
+
+def podar(dias=DIAS_RETENCAO):
+    """Apaga o diário mais velho que `dias`; a última linha apagada vira marco de reinício."""
+    # Varre do fim do diário para trás só até a primeira linha velha
+    corte = Alteracao.objects.filter(momento__lt=timezone.now() - timedelta(days=dias)).order_by('-pk') \
+        .values_list('pk', flat=True).first()
+    if corte is None:
+        return 0
+    with transaction.atomic():
+        apagadas, _ = Alteracao.objects.filter(pk__lt=corte).delete()
+        Alteracao.objects.filter(pk=corte).update(modelo=REINICIO, objeto_id=None, apagado=False)
+    return apagadas
+
+
+def estado():
+    """Cursor atual, último marco de reinício e tamanho do diário."""
+    return {
+        'cursor': cursor_atual(),
+        'reinicio': Alteracao.objects.filter(modelo=REINICIO).aggregate(pk=Max('pk'))['pk'],
+        'linhas': Alteracao.objects.count(),
+        'mais_antiga': Alteracao.objects.order_by('pk').values_list('momento', flat=True).first(),
+    }
@@ -0,0 +1,317 @@
+"""Geração de dados sintéticos para testes e benchmarks."""
+import random
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from itertools import islice
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import agenda, cache, condicional, custos, faturamento, folha, hierarquia, sincronizacao
+from .importacao import atualizar_referencias
+from .models import Coquetel, Cliente, Servico, Pacote, Funcionario, Reserva, Fornecedor, Produto, Evento, ItemReceita
+
+
+def popular(total):
+    """Completa cada modelo do bar até `total` linhas, com todas as FKs/M2Ms preenchidas."""
+    inicio = Cliente.objects.count()
+    novos = range(inicio, total)
+    if not novos:
+        return
+
+    fornecedores = Fornecedor.objects.bulk_create(
+        Fornecedor(nome=f'Fornecedor {i}', cnpj=f'{i:014d}', email=f'fornecedor{i}@bar.com', telefone='1199999999')
+        for i in novos
+    )
+    produtos = Produto.objects.bulk_create(
+        Produto(nome=f'Produto {i}', preco=Decimal('10.00'), fornecedor=f, estoque=i % 10)
+        for i, f in zip(novos, fornecedores)
+    )
+    coqueteis = Coquetel.objects.bulk_create(
+        Coquetel(nome=f'Coquetel {i}', preco_custo=Decimal('8.00'), preco_venda=Decimal('20.00'), fornecedor=f)
+        for i, f in zip(novos, fornecedores)
+    )
+    supervisor = Funcionario.objects.filter(funcao='ger').first()
+    if supervisor is None:
+        supervisor = Funcionario.objects.create(nome='Gerente', funcao='ger', valorDiaria=Decimal('300.00'))
+    funcionarios = Funcionario.objects.bulk_create(
+        Funcionario(nome=f'Funcionario {i}', cpf=f'{i:011d}', valorDiaria=Decimal('150.00'), supervisor=supervisor)
+        for i in novos
+    )
+    servicos = Servico.objects.bulk_create(
+        Servico(nome=f'Servico {i}', valor_hora=Decimal('25.00')) for i in novos
+    )
+    Servico.funcionarios.through.objects.bulk_create(
+        Servico.funcionarios.through(servico=s, funcionario=f) for s, f in zip(servicos, funcionarios)
+    )
+    padrinho = Cliente.objects.first()
+    clientes = Cliente.objects.bulk_create(
+        Cliente(nome=f'Cliente {i}', telefone='1188888888', email=f'cliente{i}@bar.com', indicado_por=padrinho)
+        for i in novos
+    )
+    eventos = Evento.objects.bulk_create(Evento(cliente=c) for c in clientes)
+    pacotes = Pacote.objects.bulk_create(
+        Pacote(nomePacote=f'Pacote {i}', coqueteis=c, produtos=p, servicos=s, duracaoHora=4, valorPorPessoa=Decimal('90.00'))
+        for i, c, p, s in zip(novos, coqueteis, produtos, servicos)
+    )
+    Pacote.eventos.through.objects.bulk_create(
+        Pacote.eventos.through(pacote=p, evento=e) for p, e in zip(pacotes, eventos)
+    )
+    hoje = date.today()
+    Reserva.objects.bulk_create(
+        Reserva(cliente=c, pacote=p, funcionario_responsavel=f, convidados=10, data=hoje + timedelta(days=i))
+        for i, c, p, f in zip(novos, clientes, pacotes, funcionarios)
+    )
+    # bulk_create não passa pelos sinais que mantêm o caminho materializado
+    hierarquia.reconstruir(Cliente)
+    hierarquia.reconstruir(Funcionario)
+    custos.reconstruir()
+    sincronizacao.reiniciar()  # os PDVs baixam o catálogo de novo
+    condicional.marcar(Coquetel, Servico, Pacote, Reserva, Fornecedor, Produto, Evento)
+
+
+PRIMEIROS_NOMES = ['Ana', 'Bruno', 'Carla', 'Diego', 'Eduarda', 'Felipe', 'Gabriela', 'Henrique', 'Isabela', 'João',
+                   'Larissa', 'Marcos', 'Natália', 'Otávio', 'Paula', 'Rafael', 'Sofia', 'Thiago', 'Vitória', 'William']
+SOBRENOMES = ['Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves', 'Pereira', 'Lima', 'Gomes',
+              'Costa', 'Ribeiro', 'Martins', 'Carvalho', 'Almeida', 'Lopes', 'Soares', 'Fernandes', 'Vieira', 'Barbosa']
+
+
+def nome_sintetico(i):
+    return (f'{PRIMEIROS_NOMES[i % 20]} {SOBRENOMES[(i // 20) % 20]} '
+            f'{SOBRENOMES[(i // 400) % 20]}')
+
+
+def popular_clientes(total, lote=10000):
+    """Completa Cliente até `total` linhas com nomes, telefones e emails variados."""
+    inicio = Cliente.objects.count()
+    for comeco in range(inicio, total, lote):
+        Cliente.objects.bulk_create(
+            Cliente(nome=nome_sintetico(i), telefone=f'(11) 9{i % 10000:04d}-{i // 10000 % 10000:04d}',
+                    email=f'cliente{i}@exemplo.com')
+            for i in range(comeco, min(comeco + lote, total))
+        )
+    hierarquia.reconstruir(Cliente)
+
+
+# Massa de dados realista para benchmarks (manage.py seed_bar)
+
+DOMINIO_SEMENTE = 'seed.bar'
+
+FUNCOES_EQUIPE = (('brt', 40), ('gar', 35), ('brb', 25))
+DIARIAS = {'ger': (250, 400), 'chef': (180, 260), 'brt': (120, 200), 'gar': (90, 150), 'brb': (80, 120)}
+FORMAS_PAGAMENTO = (('Pix', 45), ('Cre', 30), ('Deb', 15), ('Din', 10))
+LOCAIS = ('Local Principal', 'Terraço', 'Salão de Festas', 'Área Externa', 'Cliente')
+PROFUNDIDADE_SEMENTE = 30  # abaixo do limite das CTEs (hierarquia.PROFUNDIDADE_MAXIMA)
+
+
+def escala_padrao(clientes):
+    """Quantidade de cada modelo proporcional ao número de clientes."""
+    return {
+        'clientes': clientes,
+        'reservas': clientes * 5,
+        'eventos': clientes // 2,
+        'funcionarios': max(20, clientes // 200),
+        'fornecedores': max(10, clientes // 1000),
+        'produtos': max(50, clientes // 200),
+        'coqueteis': 200,
+        'servicos': 30,
+        'pacotes': 50,
+    }
+
+
+def _sortear(rng, pesos):
+    valores, pesos = zip(*pesos)
+    return rng.choices(valores, pesos)[0]
+
+
+def _centavos(rng, minimo, maximo):
+    return Decimal(rng.randrange(minimo * 100, maximo * 100)) / 100
+
+
+def _inserir(modelo, objetos, lote, guardar=True):
+    """bulk_create em lotes; devolve os ids (SQLite 3.35+ e PostgreSQL preenchem o pk)."""
+    ids = []
+    objetos = iter(objetos)
+    while parte := list(islice(objetos, lote)):
+        modelo.objects.bulk_create(parte, batch_size=lote)
+        if guardar:
+            ids.extend(objeto.pk for objeto in parte)
+    return ids
+
+
+def semear(clientes=10000, reservas=None, eventos=None, funcionarios=None, fornecedores=None, produtos=None,
+           coqueteis=None, servicos=None, pacotes=None, semente=42, lote=5000, progresso=None):
+    """
+    Gera dados com FKs consistentes: rede de indicações, árvore de supervisão
+    (gerentes > chefes de pista > equipe), Servico×Funcionario, Pacote×Evento e
+    reservas sem violar (cliente, data) nem (funcionario_responsavel, data).
+    As reservas e eventos são dos clientes criados nesta execução. Devolve
+    linhas e tempo por modelo.
+    """
+    escala = escala_padrao(clientes)
+    escala.update({nome: valor for nome, valor in (
+        ('reservas', reservas), ('eventos', eventos), ('funcionarios', funcionarios), ('fornecedores', fornecedores),
+        ('produtos', produtos), ('coqueteis', coqueteis), ('servicos', servicos), ('pacotes', pacotes),
+    ) if valor is not None})
+    rng = random.Random(semente)
+    hoje = date.today()
+    base = Cliente.objects.filter(email__endswith=f'@{DOMINIO_SEMENTE}').count()  # numeração única entre execuções
+    relatorio = {}
+
+    def etapa(nome, func):
+        if progresso:
+            progresso(f'{nome}: {escala.get(nome, "")}')
+        inicio = time.perf_counter()
+        func()
+        segundos = time.perf_counter() - inicio
+        relatorio[nome] = {'linhas': escala.get(nome), 'segundos': round(segundos, 2)}
+
+    ids = {}
+
+    def gerar_fornecedores():
+        ids['fornecedores'] = _inserir(Fornecedor, (
+            Fornecedor(nome=f'Distribuidora {base + i}', cnpj=f'8{base + i:013d}', telefone='(11) 3000-0000',
+                       email=f'fornecedor{base + i}@{DOMINIO_SEMENTE}')
+            for i in range(escala['fornecedores'])), lote)
+
+    def gerar_produtos():
+        precos = [_centavos(rng, 1, 80) for _ in range(escala['produtos'])]
+        ids['produtos'] = _inserir(Produto, (
+            Produto(nome=f'Insumo {i}', preco=preco, fornecedor_id=rng.choice(ids['fornecedores']),
+                    estoque=rng.randrange(0, 200), estoque_minimo=rng.randrange(5, 20))
+            for i, preco in enumerate(precos)), lote)
+        ids['precos'] = dict(zip(ids['produtos'], precos))
+
+    def gerar_coqueteis():
+        recipientes = [valor for valor, _ in Coquetel._meta.get_field('recipiente').choices]
+        receitas = []
+
+        def coquetel(i):
+            # 80% com receita de 2 a 4 insumos: o custo é o que custos.reconstruir() calcularia
+            receita = []
+            if rng.random() < 0.8:
+                receita = [(p, 1 if rng.random() < 0.8 else 2)
+                           for p in rng.sample(ids['produtos'], min(len(ids['produtos']), rng.randint(2, 4)))]
+            receitas.append(receita)
+            custo = sum((ids['precos'][p] * q for p, q in receita), Decimal('0.00')) or _centavos(rng, 3, 25)
+            return Coquetel(nome=f'Drink {i}', recipiente=rng.choice(recipientes), preco_custo=custo,
+                            preco_venda=(custo * Decimal(rng.uniform(1.5, 3.5))).quantize(Decimal('0.01')),
+                            fornecedor_id=rng.choice(ids['fornecedores']) if rng.random() < 0.9 else None)
+        ids['coqueteis'] = _inserir(Coquetel, (coquetel(i) for i in range(escala['coqueteis'])), lote)
+        _inserir(ItemReceita, (ItemReceita(coquetel_id=c, produto_id=p, quantidade=q)
+                               for c, receita in zip(ids['coqueteis'], receitas) for p, q in receita),
+                 lote, guardar=False)
+
+    def gerar_funcionarios():
+        total = escala['funcionarios']
+        numeros = iter(range(base, base + total))
+
+        def funcionario(funcao, supervisor):
+            n = next(numeros)
+            return Funcionario(nome=f'{nome_sintetico(n)} ({funcao})', funcao=funcao, supervisor_id=supervisor,
+                               valorDiaria=_centavos(rng, *DIARIAS[funcao]), cpf=f'8{n:010d}',
+                               email=f'funcionario{n}@{DOMINIO_SEMENTE}')
+        gerentes = _inserir(Funcionario, [funcionario('ger', None) for _ in range(max(1, total // 50))], lote)
+        chefes = _inserir(Funcionario, [funcionario('chef', rng.choice(gerentes))
+                                        for _ in range(max(1, total // 12))], lote)
+        equipe = _inserir(Funcionario, (funcionario(_sortear(rng, FUNCOES_EQUIPE), rng.choice(chefes))
+                                        for _ in range(total - len(gerentes) - len(chefes))), lote)
+        ids['funcionarios'] = gerentes + chefes + equipe
+
+    def gerar_servicos():
+        ids['servicos'] = _inserir(Servico, (
+            Servico(nome=f'Serviço {i}', valor_hora=_centavos(rng, 20, 90),
+                    funcao=rng.choice(('brt', 'gar', 'chef'))) for i in range(escala['servicos'])), lote)
+        Through = Servico.funcionarios.through
+        _inserir(Through, (Through(servico_id=s, funcionario_id=f) for s in ids['servicos']
+                           for f in rng.sample(ids['funcionarios'], min(len(ids['funcionarios']), rng.randint(2, 6)))),
+                 lote, guardar=False)
+
+    def gerar_pacotes():
+        ids['pacotes'] = _inserir(Pacote, (
+            Pacote(nomePacote=f'Pacote {i}', coqueteis_id=rng.choice(ids['coqueteis']),
+                   produtos_id=rng.choice(ids['produtos']), servicos_id=rng.choice(ids['servicos']),
+                   duracaoHora=rng.randint(2, 8), valorPorPessoa=_centavos(rng, 40, 250))
+            for i in range(escala['pacotes'])), lote)
+
+    def gerar_clientes():
+        total = escala['clientes']
+        ids['clientes'] = _inserir(Cliente, (
+            Cliente(nome=nome_sintetico(n), telefone=f'(11) 9{n % 10000:04d}-{n // 10000 % 10000:04d}',
+                    email=f'cliente{n}@{DOMINIO_SEMENTE}')
+            for n in range(base, base + total)), lote)
+        # Um terço chega por indicação de um cliente anterior; cadeias limitadas em profundidade
+        profundidade, pares = [0] * total, []
+        for i in range(1, total):
+            if rng.random() < 0.35:
+                pai = rng.randrange(i)
+                if profundidade[pai] < PROFUNDIDADE_SEMENTE:
+                    profundidade[i] = profundidade[pai] + 1
+                    pares.append((ids['clientes'][i], ids['clientes'][pai]))
+        atualizar_referencias(Cliente, 'indicado_por', pares, lote)
+
+    def gerar_eventos():
+        fuso = timezone.get_current_timezone()
+
+        def evento():
+            momento = datetime.combine(hoje + timedelta(days=rng.randint(-730, 180)),
+                                       datetime.min.time(), fuso) + timedelta(minutes=rng.randrange(17 * 60, 26 * 60))
+            passado = momento.date() < hoje
+            return Evento(cliente_id=rng.choice(ids['clientes']), datahora=momento,
+                          pago=rng.random() < (0.85 if passado else 0.2),
+                          forma_pagamento=_sortear(rng, FORMAS_PAGAMENTO), local=rng.choice(LOCAIS),
+                          observacoes='Aniversário' if rng.random() < 0.1 else None)
+        ids['eventos'] = _inserir(Evento, (evento() for _ in range(escala['eventos'])), lote)
+        Through = Pacote.eventos.through
+        _inserir(Through, (Through(evento_id=e, pacote_id=p) for e in ids['eventos'] if rng.random() < 0.8
+                           for p in rng.sample(ids['pacotes'], 2 if rng.random() < 0.15 else 1)), lote, guardar=False)
+
+    def gerar_reservas():
+        # Reserva k: cliente c = k % C (ordem embaralhada), rodada j = k // C, dia j*S + c % S.
+        # Cada cliente tem um dia por rodada e, num mesmo dia, os clientes têm c // S
+        # distintos, então o funcionário c // S nunca repete no dia.
+        clientes = ids['clientes'][:]
+        rng.shuffle(clientes)
+        equipe = [pk for pk in ids['funcionarios']]
+        total, quantos = escala['reservas'], len(clientes)
+        rodadas = -(-total // quantos) if quantos else 0
+        espaco = max(1, 900 // max(rodadas, 1))  # ~2,5 anos de datas no total
+        inicio = hoje - timedelta(days=730)
+
+        def reserva(k):
+            c, j = k % quantos, k // quantos
+            posto = c // espaco
+            return Reserva(cliente_id=clientes[c], data=inicio + timedelta(days=j * espaco + c % espaco),
+                           convidados=min(300, int(rng.paretovariate(1.5) * 10)),
+                           pacote_id=rng.choice(ids['pacotes']) if rng.random() < 0.8 else None,
+                           funcionario_responsavel_id=equipe[posto] if posto < len(equipe) and rng.random() < 0.6
+                           else None)
+        _inserir(Reserva, (reserva(k) for k in range(total)), lote, guardar=False)
+
+    comeco = time.perf_counter()
+    with transaction.atomic():
+        etapa('fornecedores', gerar_fornecedores)
+        etapa('produtos', gerar_produtos)
+        etapa('coqueteis', gerar_coqueteis)
+        etapa('funcionarios', gerar_funcionarios)
+        etapa('servicos', gerar_servicos)
+        etapa('pacotes', gerar_pacotes)
+        etapa('clientes', gerar_clientes)
+        etapa('eventos', gerar_eventos)
+        etapa('reservas', gerar_reservas)
+        # bulk_create não dispara sinais: caminhos, resumo de faturamento, agenda, caches e carimbos
+        etapa('hierarquias', lambda: (hierarquia.reconstruir(Cliente), hierarquia.reconstruir(Funcionario)))
+        etapa('faturamento', faturamento.reconstruir)
+        etapa('agenda', agenda.reconstruir)
+        folha.invalidar()  # meses abertos refeitos na próxima leitura
+        etapa('custos', custos.reconstruir)
+        sincronizacao.reiniciar()  # os PDVs baixam o catálogo de novo
+        cache.invalidar(*cache.NAMESPACES)
+        condicional.marcar(Coquetel, Cliente, Servico, Pacote, Funcionario, Reserva, Fornecedor, Produto, Evento,
+                           ItemReceita)
+    segundos = time.perf_counter() - comeco
+    linhas = sum(etapa['linhas'] or 0 for etapa in relatorio.values())
+    relatorio['total'] = {'linhas': linhas, 'segundos': round(segundos, 2),
+                          'linhas_por_segundo': round(linhas / segundos) if segundos else None}
+    return relatorio
@@ -1,3 +1,1657 @@
-from django.test import TestCase
+import base64
+import csv
+import io
+import json
+import os
+import re
+import tempfile
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal, ROUND_HALF_UP
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from . import (
+    agenda, benchmarks, busca, cache, condicional, custos, escala, estoque, estresse, faturamento, hierarquia,
+    importacao, folha, orcamentos, pedidos,
+    serializacao, sincronizacao,
+)
+from .busca import buscar_clientes
+from .models import (
+    Coquetel, Cliente, Servico, Pacote, Funcionario, Reserva, Fornecedor, Produto, Evento, FaturamentoDiario,
+    Porcao, Pedido, ItemPedido, ItemReceita, OcupacaoDiaria, FolhaMensal, Alteracao,
+)
+from .pagination import ContagemAproximadaPaginator, KeysetPagination
+from .serializers import ReservaSerializer
+from .sinteticos import popular
+from .views import EventoViewSet, ProdutoViewSet, ReservaViewSet
+
+
+@override_settings(BAR_CATALOGO_CACHE=False)
+class QueryCountTests(TestCase):
+    """O número de queries de cada endpoint não pode crescer com o número de linhas."""
+
+    TAMANHOS = (10, 1000, 10000)
+
+    # basename da API -> (modelo, queries da lista, queries do detalhe)
+    API = {
+        'coquetel': (Coquetel, 1, 1),
+        'cliente': (Cliente, 1, 1),
+        'servico': (Servico, 2, 2),
+        'pacote': (Pacote, 2, 2),
+        'funcionario': (Funcionario, 1, 1),
+        'reserva': (Reserva, 1, 1),
+        'fornecedor': (Fornecedor, 1, 1),
+        'produto': (Produto, 1, 1),
+        'evento': (Evento, 1, 1),
+    }
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def assertQueriesConstantes(self, url, esperado):
+        with self.subTest(url=url, linhas=Cliente.objects.count()):
+            with self.assertNumQueries(esperado):
+                resposta = self.client.get(url)
+            self.assertEqual(resposta.status_code, 200)
+
+    def test_queries_constantes(self):
+        for tamanho in self.TAMANHOS:
+            popular(tamanho)
+            for basename, (modelo, lista, detalhe) in self.API.items():
+                pk = modelo.objects.order_by('-pk').values_list('pk', flat=True)[0]
+                self.assertQueriesConstantes(reverse(f'{basename}-list'), lista)
+                self.assertQueriesConstantes(reverse(f'{basename}-detail', args=[pk]), detalhe)
+
+            coquetel = Coquetel.objects.order_by('-pk').first()
+            cliente = Cliente.objects.order_by('-pk').first()
+            self.assertQueriesConstantes(reverse('coquetel_list'), 2)  # COUNT + página
+            self.assertQueriesConstantes(reverse('coquetel_detail', args=[coquetel.pk]), 1)
+            self.assertQueriesConstantes(reverse('cliente_list'), 1)
+            self.assertQueriesConstantes(reverse('cliente_detail', args=[cliente.pk]), 1)
+
+
+class KeysetPaginationTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.clientes = Cliente.objects.bulk_create(
+            # Nomes repetidos forçam o desempate pelo id.
+            Cliente(nome=f'Cliente {i % 7}', telefone='1188888888', email=f'cliente{i}@bar.com')
+            for i in range(60)
+        )
+        hoje = date.today()
+        Reserva.objects.bulk_create(
+            Reserva(cliente=c, convidados=2, data=hoje - timedelta(days=i % 5))
+            for i, c in enumerate(self.clientes)
+        )
+
+    def percorrer(self, url):
+        ids, paginas = [], 0
+        while url:
+            resposta = self.client.get(url)
+            self.assertEqual(resposta.status_code, 200)
+            self.assertNotIn('count', resposta.data)
+            ids += [linha['id'] for linha in resposta.data['results']]
+            url, paginas = resposta.data['next'], paginas + 1
+        return ids, paginas
+
+    def test_percorre_todas_as_linhas_na_ordem_do_modelo(self):
+        ids, paginas = self.percorrer(reverse('reserva-list') + '?page_size=7')
+        esperado = list(Reserva.objects.order_by('-data', '-pk').values_list('pk', flat=True))
+        self.assertEqual(ids, esperado)
+        self.assertEqual(paginas, 9)
+
+        ids, _ = self.percorrer(reverse('cliente-list') + '?page_size=8')
+        self.assertEqual(ids, list(Cliente.objects.order_by('nome', 'pk').values_list('pk', flat=True)))
+
+    def test_insercoes_entre_paginas_nao_duplicam_linhas(self):
+        primeira = self.client.get(reverse('cliente-list') + '?page_size=10').data
+        Cliente.objects.create(nome='Aaa Novo', telefone='1', email='novo@bar.com')
+        segunda = self.client.get(primeira['next']).data
+        vistos = [c['id'] for c in primeira['results'] + segunda['results']]
+        self.assertEqual(len(vistos), len(set(vistos)))
+        self.assertEqual(vistos, list(Cliente.objects.exclude(nome='Aaa Novo').order_by('nome', 'pk').values_list('pk', flat=True)[:20]))
+
+    def test_volta_para_a_pagina_anterior(self):
+        primeira = self.client.get(reverse('evento-list'))
+        self.assertIsNone(primeira.data['previous'])
+        Evento.objects.bulk_create(Evento(cliente=c) for c in self.clientes)
+        primeira = self.client.get(reverse('evento-list') + '?page_size=10').data
+        segunda = self.client.get(primeira['next']).data
+        de_volta = self.client.get(segunda['previous']).data
+        self.assertEqual(de_volta['results'], primeira['results'])
+
+    def test_ordenacao_por_decimal_anotado_com_empates(self):
+        fornecedor = Fornecedor.objects.create(nome='F', cnpj='1', email='f@bar.com', telefone='1')
+        coquetel, produto = Coquetel.objects.create(nome='C'), Produto.objects.create(nome='P', preco=1, fornecedor=fornecedor)
+        servico = Servico.objects.create(nome='S')
+        pacotes = [Pacote.objects.create(nomePacote=str(valor), coqueteis=coquetel, produtos=produto, servicos=servico,
+                                         duracaoHora=1, valorPorPessoa=Decimal(valor))
+                   for valor in ('33.33', '80.10', '12.70', '0.10')]
+        reservas = list(Reserva.objects.order_by('pk'))
+        for i, reserva in enumerate(reservas):
+            # Produtos com centavos (não exatos em REAL) e muitos valores repetidos
+            reserva.pacote, reserva.convidados = (pacotes[i % 4] if i % 9 else None), 3 + i % 4
+        Reserva.objects.bulk_update(reservas, ['pacote', 'convidados'])
+
+        for ordem in ('-total_estimado', 'total_estimado'):
+            ids, _ = self.percorrer(reverse('reserva-list') + f'?ordering={ordem}&page_size=7')
+            self.assertEqual(sorted(ids), sorted(r.pk for r in reservas), ordem)
+            esperado = sorted(reservas, key=lambda r: (r.total_estimado, r.pk), reverse=ordem.startswith('-'))
+            self.assertEqual(ids, [r.pk for r in esperado], ordem)
+
+        url = reverse('reserva-list') + '?ordering=-total_estimado&page_size=7'
+        primeira = self.client.get(url).data
+        terceira = self.client.get(self.client.get(primeira['next']).data['next']).data
+        segunda = self.client.get(terceira['previous']).data
+        self.assertEqual(self.client.get(segunda['previous']).data['results'], primeira['results'])
+    def test_cursor_invalido(self):
+        resposta = self.client.get(reverse('reserva-list') + '?cursor=nao-e-um-cursor')
+        self.assertEqual(resposta.status_code, 404)
+
+    def test_cursor_volta_aos_tipos_da_ordenacao(self):
+        cursor = lambda *p: base64.urlsafe_b64encode(json.dumps({'p': list(p)}).encode()).decode()
+        paginador = KeysetPagination()
+        consulta = Reserva.objects.com_total_estimado().order_by('-total_estimado', 'cliente__nome', 'data')
+        requisicao = Request(APIRequestFactory().get('/', {'cursor': cursor('25642.4000000000', 'Cliente 3', '2026-10-18', '7')}))
+        paginador.consulta_da_pagina(consulta, requisicao)
+        self.assertEqual(paginador.posicao, [Decimal('25642.40'), 'Cliente 3', date(2026, 10, 18), 7])
+        self.assertIsInstance(paginador.posicao[0], Decimal)
+
+        resposta = self.client.get(reverse('reserva-list') + f"?cursor={cursor('ontem', 1)}")
+        self.assertEqual(resposta.status_code, 404)
+
+
+class CamposCalculadosTests(TestCase):
+    """As anotações SQL e as propriedades Python devem dar o mesmo resultado."""
+
+    def setUp(self):
+        self.client = APIClient()
+        caches['catalogo'].clear()
+        fornecedor = Fornecedor.objects.create(nome='Distribuidora', cnpj='1', email='d@bar.com', telefone='1')
+        precos = [('0.00', '12.00'), ('8.00', '20.00'), ('3.00', '10.00'), ('7.50', '7.50'), ('9.99', '4.99'), ('0.16', '0.17')]
+        for i, (custo, venda) in enumerate(precos):
+            Coquetel.objects.create(nome=f'Coquetel {i}', preco_custo=Decimal(custo), preco_venda=Decimal(venda))
+        for i, (estoque, minimo) in enumerate([(0, 5), (5, 5), (9, 5), (2, 0), (1, 3)]):
+            Produto.objects.create(nome=f'Produto {i}', preco=Decimal('1.00'), fornecedor=fornecedor,
+                                   estoque=estoque, estoque_minimo=minimo)
+        coquetel = Coquetel.objects.first()
+        produto = Produto.objects.first()
+        servico = Servico.objects.create(nome='Bar', valor_hora=Decimal('30.00'))
+        pacote = Pacote.objects.create(nomePacote='Festa', coqueteis=coquetel, produtos=produto, servicos=servico,
+                                       duracaoHora=4, valorPorPessoa=Decimal('87.35'))
+        for i, convidados in enumerate([1, 13, 250]):
+            cliente = Cliente.objects.create(nome=f'Cliente {i}', telefone='1', email=f'c{i}@bar.com')
+            Reserva.objects.create(cliente=cliente, pacote=pacote if i else None, convidados=convidados)
+
+    def test_sql_igual_python(self):
+        for coquetel in Coquetel.objects.com_indicadores():
+            python = Coquetel.objects.get(pk=coquetel.pk)
+            self.assertEqual(coquetel.lucro_unitario, python.lucro_unitario)
+            self.assertEqual(coquetel.margem_lucro, Decimal(python.margem_lucro).quantize(Decimal('0.0001'), ROUND_HALF_UP))
+        for reserva in Reserva.objects.com_total_estimado():
+            self.assertEqual(reserva.total_estimado, Reserva.objects.get(pk=reserva.pk).total_estimado)
+        for produto in Produto.objects.com_precisa_repor():
+            self.assertIs(produto.precisa_repor, Produto.objects.get(pk=produto.pk).precisa_repor)
+
+    def test_ordenacao_e_filtro_pela_api(self):
+        resposta = self.client.get(reverse('coquetel-list') + '?ordering=-margem_lucro')
+        python = sorted(Coquetel.objects.all(), key=lambda c: c.margem_lucro, reverse=True)
+        self.assertEqual([c['id'] for c in resposta.data], [c.pk for c in python])
+
+        resposta = self.client.get(reverse('reserva-list') + '?ordering=-total_estimado')
+        python = sorted(Reserva.objects.all(), key=lambda r: r.total_estimado, reverse=True)
+        self.assertEqual([r['id'] for r in resposta.data['results']], [r.pk for r in python])
+
+        resposta = self.client.get(reverse('produto-list') + '?precisa_repor=true')
+        self.assertEqual({p['id'] for p in resposta.data}, {p.pk for p in Produto.objects.all() if p.precisa_repor})
+        self.assertTrue(all(p['precisa_repor'] for p in resposta.data))
+
+
+class CatalogoCacheTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        caches['catalogo'].clear()
+        cache.zerar_estatisticas()
+        self.fornecedor = Fornecedor.objects.create(nome='Distribuidora', cnpj='1', email='d@bar.com', telefone='1')
+        self.coquetel = Coquetel.objects.create(nome='Caipirinha', preco_venda=Decimal('20.00'), fornecedor=self.fornecedor)
+        produto = Produto.objects.create(nome='Limão', preco=Decimal('1.00'), fornecedor=self.fornecedor)
+        self.servico = Servico.objects.create(nome='Bar', valor_hora=Decimal('30.00'))
+        self.pacote = Pacote.objects.create(nomePacote='Festa', coqueteis=self.coquetel, produtos=produto,
+                                            servicos=self.servico, duracaoHora=4, valorPorPessoa=Decimal('80.00'))
+
+    def test_segunda_leitura_nao_consulta_o_banco(self):
+        url = reverse('coquetel-list')
+        primeira = self.client.get(url)
+        with self.assertNumQueries(0):
+            segunda = self.client.get(url)
+        self.assertEqual(primeira.json(), segunda.json())
+        self.assertEqual(self.client.get(reverse('catalogo_cache_stats')).data['hits'], 1)
+
+    def test_escritas_invalidam_os_namespaces_afetados(self):
+        pacotes, servicos = reverse('pacote-list'), reverse('servico-list')
+        self.client.get(pacotes), self.client.get(servicos)
+
+        self.coquetel.nome = 'Caipiroska'
+        self.coquetel.save()
+        self.assertEqual(self.client.get(pacotes).data[0]['coquetel_nome'], 'Caipiroska')
+        with self.assertNumQueries(0):
+            self.client.get(servicos)  # Servico não depende de Coquetel
+
+        funcionario = Funcionario.objects.create(nome='Ana')
+        self.servico.funcionarios.add(funcionario)
+        self.assertEqual(self.client.get(servicos).data[0]['funcionarios'], [funcionario.pk])
+        funcionario.delete()
+        self.assertEqual(self.client.get(servicos).data[0]['funcionarios'], [])
+
+        self.fornecedor.nome = 'Outra'
+        self.fornecedor.save()
+        self.assertEqual(self.client.get(reverse('coquetel-list')).data[0]['fornecedor_nome'], 'Outra')
+
+        evento = Evento.objects.create(cliente=Cliente.objects.create(nome='Bia', telefone='1', email='b@bar.com'))
+        self.pacote.eventos.add(evento)
+        self.assertEqual(self.client.get(pacotes).data[0]['eventos'], [evento.pk])
+        evento.delete()
+        self.assertEqual(self.client.get(pacotes).data[0]['eventos'], [])
+
+    def test_versoes_ficam_no_cache_compartilhado(self):
+        url = reverse('servico-list')
+        self.client.get(url)
+        # Outro worker: conexão própria com o mesmo backend de 'versoes'
+        outro_worker = caches.create_connection('versoes')
+        antes = outro_worker.get('catalogo:versao:servico')
+        Servico.objects.create(nome='Chopeira')
+        self.assertNotEqual(outro_worker.get('catalogo:versao:servico'), antes)
+        self.assertEqual(len(self.client.get(url).data), 2)
+
+    @override_settings(BAR_CATALOGO_CACHE=False)
+    def test_cache_desligado(self):
+        url = reverse('coquetel-list')
+        self.client.get(url)
+        with self.assertNumQueries(1):
+            self.client.get(url)
+
+
+class FaturamentoTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        fornecedor = Fornecedor.objects.create(nome='Distribuidora', cnpj='1', email='d@bar.com', telefone='1')
+        coquetel = Coquetel.objects.create(nome='Caipirinha')
+        produto = Produto.objects.create(nome='Limão', preco=Decimal('1.00'), fornecedor=fornecedor)
+        servico = Servico.objects.create(nome='Bar')
+        self.basico = Pacote.objects.create(nomePacote='Básico', coqueteis=coquetel, produtos=produto, servicos=servico,
+                                            duracaoHora=4, valorPorPessoa=Decimal('50.00'))
+        self.premium = Pacote.objects.create(nomePacote='Premium', coqueteis=coquetel, produtos=produto, servicos=servico,
+                                             duracaoHora=6, valorPorPessoa=Decimal('120.00'))
+        self.ana, self.bia, self.caio = (
+            Cliente.objects.create(nome=nome, telefone='1', email=f'{nome}@bar.com') for nome in ('Ana', 'Bia', 'Caio')
+        )
+        self.dia = date(2025, 3, 14)
+
+    def assertConsistente(self):
+        self.assertEqual(faturamento.verificar(), [])
+
+    def test_resumo_incremental_igual_a_reconstrucao(self):
+        r1 = Reserva.objects.create(cliente=self.ana, pacote=self.basico, data=self.dia, convidados=10)
+        Reserva.objects.create(cliente=self.bia, pacote=self.premium, data=self.dia, convidados=20)
+        Reserva.objects.create(cliente=self.caio, pacote=None, data=self.dia + timedelta(days=1), convidados=5)
+        self.assertConsistente()
+        self.assertEqual(FaturamentoDiario.objects.get(data=self.dia, pacote=self.basico).receita, Decimal('500.00'))
+
+        evento = Evento.objects.create(cliente=self.ana, datahora=timezone.make_aware(datetime(2025, 3, 14, 21)),
+                                       pago=True, forma_pagamento='Pix')
+        self.assertConsistente()
+        linha = FaturamentoDiario.objects.get(data=self.dia, pacote=self.basico)
+        self.assertEqual((linha.forma_pagamento, linha.receita_paga), ('Pix', Decimal('500.00')))
+
+        r1.data = self.dia + timedelta(days=1)
+        r1.save()
+        evento.pago = False
+        evento.save()
+        self.assertConsistente()
+
+        self.premium.valorPorPessoa = Decimal('130.00')
+        self.premium.save()
+        self.assertConsistente()
+        self.assertEqual(FaturamentoDiario.objects.get(data=self.dia, pacote=self.premium).receita, Decimal('2600.00'))
+
+        evento.delete()
+        r1.delete()
+        self.assertConsistente()
+        Reserva.objects.filter(pacote=self.premium).delete()
+        self.premium.delete()
+        self.assertConsistente()
+
+        atual = list(FaturamentoDiario.objects.values_list('data', 'pacote', 'forma_pagamento', 'receita').order_by('data'))
+        self.assertEqual(faturamento.reconstruir(), len(atual))
+        self.assertEqual(list(FaturamentoDiario.objects.values_list('data', 'pacote', 'forma_pagamento', 'receita').order_by('data')), atual)
+
+    def test_verificar_aponta_divergencias(self):
+        Reserva.objects.create(cliente=self.ana, pacote=self.basico, data=self.dia, convidados=10)
+        FaturamentoDiario.objects.update(receita=Decimal('1.00'))
+        self.assertEqual(len(faturamento.verificar()), 1)
+        faturamento.reconstruir()
+        self.assertConsistente()
+
+    def test_relatorio_por_mes(self):
+        Reserva.objects.create(cliente=self.ana, pacote=self.basico, data=date(2025, 3, 1), convidados=10)
+        Reserva.objects.create(cliente=self.bia, pacote=self.premium, data=date(2025, 3, 31), convidados=1)
+        Reserva.objects.create(cliente=self.ana, pacote=self.premium, data=date(2025, 4, 2), convidados=2)
+        resposta = self.client.get(reverse('faturamento_relatorio') + '?periodo=mes&inicio=2025-03-01')
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(
+            [(linha['periodo'], linha['reservas'], linha['receita']) for linha in resposta.json()],
+            [('2025-03-01', 2, '620.00'), ('2025-04-01', 1, '240.00')],
+        )
+        resposta = self.client.get(reverse('faturamento_relatorio') + '?periodo=mes&por=pacote&fim=2025-03-31')
+        self.assertEqual([(l['pacote_id'], l['convidados']) for l in resposta.json()],
+                         [(self.basico.pk, 10), (self.premium.pk, 1)])
+        self.assertEqual(self.client.get(reverse('faturamento_relatorio') + '?periodo=ano').status_code, 400)
+
+
+class AgendaTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.ana, self.bia = (
+            Cliente.objects.create(nome=nome, telefone='1', email=f'{nome}@bar.com') for nome in ('Ana', 'Bia')
+        )
+        self.gerente = Funcionario.objects.create(nome='Gerente', funcao='brt', valorDiaria=Decimal('100.00'))
+        self.dia = date(2025, 3, 14)
+
+    def noite(self, dia):
+        return timezone.make_aware(datetime.combine(dia, datetime.min.time()) + timedelta(hours=21))
+
+    def ocupacao(self, local, dia):
+        return OcupacaoDiaria.objects.filter(local=local, data=dia).values_list(*agenda.CAMPOS).first()
+
+    def test_agenda_incremental_igual_a_reconstrucao(self):
+        reserva = Reserva.objects.create(cliente=self.ana, data=self.dia, convidados=30,
+                                         funcionario_responsavel=self.gerente)
+        self.assertEqual(self.ocupacao('', self.dia), (0, 1, 30, 1))  # ainda sem evento
+
+        evento = Evento.objects.create(cliente=self.ana, datahora=self.noite(self.dia), local='Terraço')
+        Reserva.objects.create(cliente=self.bia, data=self.dia, convidados=5)
+        self.assertEqual(self.ocupacao('Terraço', self.dia), (1, 1, 30, 1))
+        self.assertEqual(self.ocupacao('', self.dia), (0, 1, 5, 0))
+
+        evento.local = 'Salão'
+        evento.datahora = self.noite(self.dia + timedelta(days=1))
+        evento.save()
+        self.assertIsNone(self.ocupacao('Terraço', self.dia))
+        self.assertEqual(self.ocupacao('Salão', self.dia + timedelta(days=1)), (1, 0, 0, 0))
+        reserva.data = self.dia + timedelta(days=1)
+        reserva.save()
+        self.assertEqual(self.ocupacao('Salão', self.dia + timedelta(days=1)), (1, 1, 30, 1))
+        self.assertEqual(agenda.verificar(), [])
+
+        reserva.delete()
+        evento.delete()
+        self.assertEqual(agenda.verificar(), [])
+        OcupacaoDiaria.objects.update(convidados=0)
+        self.assertEqual(len(agenda.verificar()), 1)
+        self.assertEqual(agenda.reconstruir(), 1)
+        self.assertEqual(agenda.verificar(), [])
+
+    def test_escala_atualiza_funcionarios(self):
+        Reserva.objects.create(cliente=self.ana, data=self.dia, convidados=10)
+        escala.atribuir(self.dia, self.dia)
+        self.assertEqual(self.ocupacao('', self.dia), (0, 1, 10, 1))
+
+    def test_disponibilidade(self):
+        Evento.objects.create(cliente=self.ana, datahora=self.noite(self.dia), local='Terraço')
+        url = reverse('agenda_disponibilidade') + f'?inicio={self.dia - timedelta(days=1)}&local=Terraço&local=Salão'
+        with self.assertNumQueries(1):
+            linhas = self.client.get(url).json()
+        self.assertEqual(len(linhas), 2 * agenda.DIAS_PADRAO)
+        ocupados = [(l['data'], l['local']) for l in linhas if not l['livre']]
+        self.assertEqual(ocupados, [(str(self.dia), 'Terraço')])
+        self.assertEqual(self.client.get(reverse('agenda_disponibilidade') + '?inicio=2025-01-01&fim=2026-06-01').status_code, 400)
+        self.assertEqual(self.client.get(reverse('agenda_disponibilidade') + '?inicio=ontem').status_code, 400)
+
+    def test_verificar_datas_em_lote(self):
+        Evento.objects.create(cliente=self.ana, datahora=self.noite(self.dia))
+        datas = [str(self.dia + timedelta(days=i)) for i in range(-250, 250)]
+        with self.assertNumQueries(1):
+            resposta = self.client.post(reverse('agenda_verificar'), {'datas': datas}, format='json')
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(len(resposta.json()), 500)
+        self.assertEqual([l['data'] for l in resposta.json() if not l['livre']], [str(self.dia)])
+        self.assertEqual(resposta.json()[0]['local'], agenda.LOCAL_PADRAO)
+        demais = {'datas': [str(self.dia)] * (agenda.LIMITE_DATAS + 1)}
+        self.assertEqual(self.client.post(reverse('agenda_verificar'), demais, format='json').status_code, 400)
+        self.assertEqual(self.client.post(reverse('agenda_verificar'), {'datas': ['x']}, format='json').status_code, 400)
+
+
+class BuscaClientesTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.ana = Cliente.objects.create(nome='Ana Beatriz Souza', telefone='(11) 98765-4321', email='ana@bar.com')
+        self.joao = Cliente.objects.create(nome='João Anastácio', telefone='(21) 91234-5678', email='joao@bar.com')
+        self.bia = Cliente.objects.create(nome='Beatriz Lima', telefone='(31) 99999-0000', email='bia.anatomia@bar.com')
+
+    def nomes(self, texto):
+        return [c.nome for c in buscar_clientes(texto)]
+
+    def test_busca_por_prefixo_telefone_e_email(self):
+        self.assertEqual(self.nomes('beatriz souza'), ['Ana Beatriz Souza'])
+        self.assertEqual(self.nomes('joao'), ['João Anastácio'])  # sem acento
+        self.assertEqual(self.nomes('11987654321'), ['Ana Beatriz Souza'])
+        self.assertEqual(self.nomes('bia.anatomia'), ['Beatriz Lima'])
+        self.assertEqual(self.nomes('"*) OR'), [])  # sintaxe do FTS5 é ignorada
+
+    @skipUnless(connection.vendor == 'postgresql', 'Plano no formato do EXPLAIN do PostgreSQL.')
+    def test_postgres_usa_os_indices_de_trigramas(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')  # tabela pequena: força o plano das grandes
+        plano = Cliente.objects.filter(busca.filtro_por_termos(['beatriz'])).explain()
+        for indice in ('idx_cliente_nome_trgm', 'idx_cliente_telefone_trgm', 'idx_cliente_email_trgm'):
+            self.assertIn(f'Bitmap Index Scan on {indice}', plano)
+        self.assertNotIn('Seq Scan on bar_cliente', plano)
+
+    def test_telefone_pelos_digitos_do_meio_ou_do_fim(self):
+        self.assertEqual(self.nomes('4321'), ['Ana Beatriz Souza'])
+        self.assertEqual(self.nomes('765-43'), ['Ana Beatriz Souza'])  # atravessa o hífen
+        self.assertEqual(self.nomes('9'), ['Ana Beatriz Souza', 'João Anastácio', 'Beatriz Lima'])
+        Cliente.objects.create(nome='Caio', telefone='4321', email='caio@bar.com')
+        self.assertEqual(self.nomes('4321'), ['Caio', 'Ana Beatriz Souza'])  # o prefixo vem antes
+
+    def test_ranking_prioriza_o_nome(self):
+        # "ana" casa com o nome de Ana e João e só com o email de Beatriz
+        self.assertEqual(self.nomes('ana')[-1], 'Beatriz Lima')
+        self.assertEqual(set(self.nomes('ana')[:2]), {'Ana Beatriz Souza', 'João Anastácio'})
+
+    def test_indice_acompanha_as_escritas(self):
+        self.joao.nome = 'João Pedro'
+        self.joao.save()
+        self.assertEqual(self.nomes('pedro'), ['João Pedro'])
+        self.assertNotIn('João Pedro', self.nomes('anastacio'))
+        Cliente.objects.bulk_create([Cliente(nome='Pedro Alves', telefone='1', email='p@bar.com')])
+        self.assertEqual(set(self.nomes('pedro')), {'João Pedro', 'Pedro Alves'})
+        self.joao.delete()
+        self.assertEqual(self.nomes('pedro'), ['Pedro Alves'])
+
+    def test_busca_pela_api_e_pela_pagina(self):
+        resposta = self.client.get(reverse('cliente-list') + '?search=beatriz&limite=1')
+        self.assertEqual(len(resposta.data), 1)
+        self.assertIn(resposta.data[0]['nome'], ('Ana Beatriz Souza', 'Beatriz Lima'))
+        resposta = self.client.get(reverse('cliente_list') + '?q=lima')
+        self.assertEqual(list(resposta.context['clientes']), [self.bia])
+
+
+class EscritasConcorrentesTests(TransactionTestCase):
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('O SQLite em memória não aceita escritas concorrentes; rode com um banco em arquivo.')
+
+    def test_sem_database_is_locked(self):
+        resultado = estresse.martelar_reservas(threads=8, escritas=10)
+        self.assertEqual(resultado['erros'], 0, resultado['exemplos_de_erro'])
+        self.assertTrue(resultado['reserva_quente_consistente'])
+        self.assertEqual(Reserva.objects.filter(cliente__email__endswith=f'@{estresse.DOMINIO}').count(), 81)
+
+    def test_baixa_de_estoque_concorrente(self):
+        import threading
+        fornecedor = Fornecedor.objects.create(nome='F', cnpj='1', email='f@f.com', telefone='1')
+        limao = Produto.objects.create(nome='Limão', preco=1, estoque=10000, fornecedor=fornecedor)
+        coquetel = Coquetel.objects.create(nome='Caipirinha')
+        ItemReceita.objects.create(coquetel=coquetel, produto=limao, quantidade=2)
+
+        def vender():
+            try:
+                for _ in range(20):
+                    estoque.baixar({coquetel.pk: 3})
+            finally:
+                connection.close()
+        threads = [threading.Thread(target=vender) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        limao.refresh_from_db()
+        self.assertEqual(limao.estoque, 10000 - 8 * 20 * 3 * 2)  # nenhuma baixa perdida
+
+
+class ExportacaoTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        popular(30)
+
+    def baixar(self, url):
+        resposta = self.client.get(url)
+        self.assertEqual(resposta.status_code, 200)
+        return b''.join(resposta.streaming_content).decode()
+
+    def test_csv_com_campos_e_intervalo_de_datas(self):
+        inicio, fim = date.today() + timedelta(days=5), date.today() + timedelta(days=9)
+        with self.assertNumQueries(1):
+            conteudo = self.baixar(reverse('exportar', args=['reservas'])
+                                   + f'?campos=id,data,cliente__nome,total_estimado&inicio={inicio}&fim={fim}')
+        linhas = list(csv.reader(io.StringIO(conteudo)))
+        self.assertEqual(linhas[0], ['id', 'data', 'cliente__nome', 'total_estimado'])
+        esperado = Reserva.objects.filter(data__range=(inicio, fim)).order_by('pk')
+        self.assertEqual([l[0] for l in linhas[1:]], [str(r.pk) for r in esperado])
+        self.assertEqual(linhas[1][2:], [esperado[0].cliente.nome, str(esperado[0].total_estimado.quantize(Decimal('0.01')))])
+
+    def test_ndjson_de_eventos_por_data_local(self):
+        evento = Evento.objects.first()
+        evento.datahora = timezone.make_aware(datetime(2025, 3, 14, 23, 30))
+        evento.save()
+        conteudo = self.baixar(reverse('exportar', args=['eventos']) + '?formato=ndjson&inicio=2025-03-14&fim=2025-03-14')
+        linhas = [json.loads(l) for l in conteudo.splitlines()]
+        self.assertEqual([l['id'] for l in linhas], [evento.pk])
+        self.assertEqual(linhas[0]['cliente__nome'], evento.cliente.nome)
+
+    def test_comando_e_erros(self):
+        saida = io.StringIO()
+        call_command('exportar_bar', 'produtos', '--campos', 'nome,precisa_repor,fornecedor__nome', stdout=saida)
+        self.assertEqual(len(saida.getvalue().splitlines()), Produto.objects.count() + 1)
+        self.assertEqual(self.client.get(reverse('exportar', args=['reservas']) + '?campos=senha').status_code, 400)
+        self.assertEqual(self.client.get(reverse('exportar', args=['produtos']) + '?inicio=2025-01-01').status_code, 400)
+        self.assertEqual(self.client.get(reverse('exportar', args=['nada'])).status_code, 400)
+
+
+class ImportacaoTests(TestCase):
+
+    def setUp(self):
+        self.api = APIClient()
+
+    def test_fornecedores_upsert_por_cnpj_e_email_de_outro_cnpj(self):
+        Fornecedor.objects.create(nome='Antigo', cnpj='111', email='a@f.com', telefone='1', endereco='Rua A')
+        linhas = [
+            {'nome': 'Renomeado', 'cnpj': '111', 'email': 'a@f.com', 'telefone': '2', 'endereco': ''},
+            {'nome': 'Novo', 'cnpj': '222', 'email': 'b@f.com', 'telefone': '3'},
+            {'nome': 'Intruso', 'cnpj': '333', 'email': 'a@f.com', 'telefone': '4'},
+            {'nome': 'Sem email', 'cnpj': '444', 'email': 'invalido', 'telefone': '5'},
+        ]
+        resposta = self.api.post(reverse('importar', args=['fornecedores']), linhas, format='json')
+        self.assertEqual(resposta.status_code, 200)
+        relatorio = resposta.json()
+        self.assertEqual((relatorio['linhas'], relatorio['com_erro']), (4, 2))
+        self.assertEqual([e['linha'] for e in relatorio['erros']], [3, 4])
+        self.assertIn('email', relatorio['erros'][0]['erros'])
+        antigo = Fornecedor.objects.get(cnpj='111')
+        self.assertEqual((antigo.nome, antigo.telefone, antigo.endereco), ('Renomeado', '2', 'Rua A'))  # vazio não apaga
+        self.assertEqual(Fornecedor.objects.count(), 2)
+
+        resposta = self.api.post(reverse('importar', args=['fornecedores']), [linhas[0], 1, [2]], format='json')
+        self.assertEqual(resposta.status_code, 400)
+        self.assertTrue(resposta.json()['detail'].endswith('Linhas inválidas: 2, 3.'))
+
+    def test_clientes_em_lotes_com_indicacao_por_lookup(self):
+        Cliente.objects.create(nome='Já existe', telefone='1', email='velho@c.com')
+        linhas = [{'nome': f'Cliente {i}', 'telefone': str(i), 'email': f'c{i}@c.com',
+                   'indicado_por_email': f'c{i + 1}@c.com' if i < 49 else 'velho@c.com'} for i in range(50)]
+        linhas += [
+            {'nome': 'Atualizado', 'telefone': '9', 'email': 'velho@c.com'},
+            {'nome': 'Órfão', 'telefone': '8', 'email': 'orfao@c.com', 'indicado_por_email': 'ninguem@c.com'},
+            {'nome': '', 'telefone': '7', 'email': 'x@c.com'},
+        ]
+        # Por lote: lookup + gravação + diário do feed dos PDVs; depois a segunda
+        # passada das indicações e os caminhos das linhas tocadas (por lote, nada por linha)
+        with self.assertNumQueries(33):
+            relatorio = importacao.importar('clientes', linhas, lote=10)
+        self.assertEqual(relatorio['com_erro'], 2)
+        self.assertEqual([e['linha'] for e in relatorio['erros']], [52, 53])
+        self.assertEqual(Cliente.objects.get(email='c0@c.com').indicado_por.email, 'c1@c.com')
+        self.assertEqual(Cliente.objects.get(email='c49@c.com').indicado_por.nome, 'Atualizado')
+        self.assertEqual(Cliente.objects.count(), 52)
+        self.assertEqual(buscar_clientes('Cliente 42').first().email, 'c42@c.com')  # índice FTS via trigger
+        self.assertEqual(hierarquia.verificar(Cliente), [])
+
+        # A cadeia inteira desce para baixo de um cliente novo; o resto da tabela não é reescrito
+        fora = Cliente.objects.create(nome='Fora', telefone='1', email='fora@c.com')
+        Cliente.objects.filter(pk=fora.pk).update(caminho='/0/')  # só uma reconstrução total o corrigiria
+        importacao.importar('clientes', [
+            {'nome': 'Topo', 'telefone': '1', 'email': 'topo@c.com'},
+            {'nome': 'Atualizado', 'telefone': '9', 'email': 'velho@c.com', 'indicado_por_email': 'topo@c.com'},
+        ])
+        topo = Cliente.objects.get(email='topo@c.com')
+        self.assertTrue(Cliente.objects.get(email='c45@c.com').caminho.startswith(topo.caminho))
+        self.assertEqual([linha['id'] for linha in hierarquia.verificar(Cliente)], [fora.pk])
+
+    def test_produtos_resolvem_fornecedor_e_funcionarios_supervisor(self):
+        fornecedor = Fornecedor.objects.create(nome='F', cnpj='999', email='f@f.com', telefone='1')
+        Produto.objects.create(nome='Limão', preco=2, estoque=10, fornecedor=fornecedor)
+        conteudo = 'nome,preco,estoque,fornecedor_cnpj\nLimão,3.00,,999\nGelo,0,1,999\nAçúcar,3,1,000\nTônica,4,2,999\n'
+        resposta = self.api.generic('POST', reverse('importar', args=['produtos']), conteudo, content_type='text/csv')
+        relatorio = resposta.json()
+        self.assertEqual([e['linha'] for e in relatorio['erros']], [2, 3])
+        self.assertIn('preco', relatorio['erros'][0]['erros'])
+        limao = Produto.objects.get(nome='Limão')
+        self.assertEqual((limao.preco, limao.estoque), (Decimal('3.00'), 10))
+        self.assertEqual(Produto.objects.count(), 2)
+
+        Funcionario.objects.create(nome='Caio antigo', email='caio@b.com', valorDiaria=80)
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False, encoding='utf-8') as arquivo:
+            json.dump([
+                {'nome': 'Ana', 'cpf': '1', 'email': 'ana@b.com', 'supervisor_cpf': '2', 'valorDiaria': '150'},
+                {'nome': 'Bia', 'cpf': '2', 'funcao': 'ger'},
+                {'nome': 'Caio', 'email': 'caio@b.com', 'supervisor_cpf': '9'},
+            ], arquivo)
+        self.addCleanup(os.remove, arquivo.name)
+        saida, erros = io.StringIO(), io.StringIO()
+        call_command('import_bar_data', 'funcionarios', arquivo.name, stdout=saida, stderr=erros)
+        self.assertIn('3 linha(s)', saida.getvalue())
+        self.assertIn('linha 3: supervisor_cpf', erros.getvalue())
+        self.assertEqual(Funcionario.objects.get(cpf='1').supervisor.nome, 'Bia')
+        caio = Funcionario.objects.get(email='caio@b.com')
+        self.assertEqual((caio.nome, caio.valorDiaria), ('Caio', Decimal('80.00')))  # vazio não apaga
+
+
+class HierarquiaTests(TestCase):
+
+    def setUp(self):
+        self.api = APIClient()
+        novo = lambda nome, pai=None: Cliente.objects.create(nome=nome, telefone='1', email=f'{nome}@h.com', indicado_por=pai)
+        self.a = novo('a')
+        self.b = novo('b', self.a)
+        self.c = novo('c', self.b)
+        self.d = novo('d', self.b)
+        self.e = novo('e', self.a)
+
+    def caminhos(self):
+        return dict(Cliente.objects.values_list('nome', 'caminho'))
+
+    def test_cte_e_caminho_materializado_concordam(self):
+        a, b, c = self.a, self.b, self.c
+        self.assertEqual(self.caminhos()['c'], f'/{a.pk}/{b.pk}/{c.pk}/')
+        with self.assertNumQueries(1):
+            cte = hierarquia.descendentes(Cliente, a.pk)
+        self.assertEqual([(l['nome'], l['profundidade']) for l in cte], [('b', 1), ('e', 1), ('c', 2), ('d', 2)])
+        self.assertEqual({l['id'] for l in cte}, set(Cliente.objects.descendentes_de(a).values_list('pk', flat=True)))
+        self.assertEqual([l['nome'] for l in hierarquia.ancestrais(Cliente, c.pk)], ['b', 'a'])
+        self.assertEqual(c.ids_ancestrais, [a.pk, b.pk])
+        self.assertEqual(hierarquia.profundidade(Cliente, c.pk), c.profundidade)
+        self.assertEqual(hierarquia.tamanhos_das_subarvores(Cliente, [a.pk, b.pk, c.pk]), {a.pk: 4, b.pk: 2, c.pk: 0})
+        self.assertEqual(hierarquia.verificar(Cliente), [])
+
+    def test_mover_apagar_e_ciclo_mantem_os_caminhos(self):
+        b = Cliente.objects.get(pk=self.b.pk)
+        b.indicado_por = self.e
+        b.save()
+        self.assertEqual(self.caminhos()['d'], f'/{self.a.pk}/{self.e.pk}/{self.b.pk}/{self.d.pk}/')
+        self.c.nome = 'c2'  # instância com caminho velho em memória
+        self.c.save()
+        self.assertEqual(hierarquia.verificar(Cliente), [])
+
+        self.a.indicado_por = self.d
+        with self.assertRaises(hierarquia.ErroHierarquia):
+            self.a.save()
+
+        self.e.delete()
+        self.assertEqual(self.caminhos()['d'], f'/{self.b.pk}/{self.d.pk}/')
+        self.assertEqual(hierarquia.verificar(Cliente), [])
+
+        Cliente.objects.filter(pk=self.d.pk).update(indicado_por=None)  # sem sinais
+        self.assertEqual(len(hierarquia.verificar(Cliente)), 1)
+
+        with self.assertRaises(CommandError):
+            call_command('hierarquia', 'verificar', 'clientes', stdout=io.StringIO())
+        hierarquia.reconstruir(Cliente)
+        self.assertEqual(hierarquia.verificar(Cliente), [])
+
+    @skipUnless(connection.vendor == 'postgresql', 'No SQLite a collation padrão já é byte a byte.')
+    def test_caminho_usa_a_collation_c(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT table_name, collation_name FROM information_schema.columns "
+                           "WHERE column_name = 'caminho' ORDER BY table_name")
+            self.assertEqual(cursor.fetchall(), [('bar_cliente', 'C'), ('bar_funcionario', 'C')])
+
+    def test_ciclo_vira_400_na_api_e_erro_no_formulario(self):
+        resposta = self.api.patch(reverse('cliente-detail', args=[self.a.pk]), {'indicado_por': self.d.pk}, format='json')
+        self.assertEqual(resposta.status_code, 400)
+        self.assertIn('indicado_por', resposta.json())
+        chefe = Funcionario.objects.create(nome='Chefe')
+        resposta = self.api.patch(reverse('funcionario-detail', args=[chefe.pk]), {'supervisor': chefe.pk}, format='json')
+        self.assertEqual(resposta.status_code, 400)
+        self.assertIn('supervisor', resposta.json())
+
+        dados = {'nome': 'b', 'telefone': '1', 'email': 'b@h.com', 'indicado_por': self.c.pk}
+        resposta = self.client.post(reverse('cliente_update', args=[self.b.pk]), dados)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertIn('indicado_por', resposta.context['form'].errors)
+        self.assertEqual(hierarquia.verificar(Cliente), [])
+
+        dados['indicado_por'] = self.e.pk  # mover continua valendo
+        self.assertEqual(self.client.post(reverse('cliente_update', args=[self.b.pk]), dados).status_code, 302)
+        self.assertEqual(self.caminhos()['c'], f'/{self.a.pk}/{self.e.pk}/{self.b.pk}/{self.c.pk}/')
+
+    def test_endpoints_e_ranking_de_indicacoes(self):
+        for cliente, dias in ((self.c, 2), (self.d, 1), (self.e, 1)):
+            for i in range(dias):
+                Reserva.objects.create(cliente=cliente, convidados=2, data=date.today() + timedelta(days=i))
+        with self.assertNumQueries(1):
+            resposta = self.api.get(reverse('cliente-ranking-indicacoes'))
+        ranking = [(l['nome'], l['tamanho_rede'], l['reservas_rede']) for l in resposta.json()]
+        self.assertEqual(ranking, [('a', 4, 4), ('b', 2, 3)])
+        por_indicados = self.api.get(reverse('cliente-ranking-indicacoes') + '?por=indicados&limite=1').json()
+        self.assertEqual([l['nome'] for l in por_indicados], ['a'])
+        self.assertEqual(self.api.get(reverse('cliente-ranking-indicacoes') + '?por=x').status_code, 400)
+
+        resposta = self.api.get(reverse('cliente-descendentes', args=[self.b.pk]))
+        self.assertEqual([(l['nome'], l['profundidade']) for l in resposta.json()['results']], [('c', 2), ('d', 2)])
+        resposta = self.api.get(reverse('cliente-ancestrais', args=[self.c.pk]))
+        self.assertEqual([l['nome'] for l in resposta.json()], ['a', 'b'])
+
+        chefe = Funcionario.objects.create(nome='Chefe', funcao='ger')
+        Funcionario.objects.create(nome='Bartender', supervisor=chefe)
+        resposta = self.api.get(reverse('funcionario-descendentes', args=[chefe.pk]))
+        self.assertEqual([l['nome'] for l in resposta.json()], ['Bartender'])
+
+
+class EscalaTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.segunda = date(2030, 1, 7)
+        cls.ana = Funcionario.objects.create(nome='Ana', funcao='brt', valorDiaria=200)
+        cls.bia = Funcionario.objects.create(nome='Bia', funcao='brt', valorDiaria=150)
+        cls.caio = Funcionario.objects.create(nome='Caio', funcao='gar', valorDiaria=100)
+        Funcionario.objects.create(nome='Gerente', funcao='ger', valorDiaria=50)
+        clientes = Cliente.objects.bulk_create(
+            Cliente(nome=f'Cliente {i}', telefone='1', email=f'e{i}@escala.com') for i in range(12))
+        # 4 reservas por dia na segunda, terça e quarta; a Ana já atende uma na segunda
+        Reserva.objects.bulk_create(
+            Reserva(cliente=c, convidados=10, data=cls.segunda + timedelta(days=i % 3),
+                    funcionario_responsavel=cls.ana if i == 0 else None)
+            for i, c in enumerate(clientes)
+        )
+
+    def test_disponiveis_por_periodo_e_funcao(self):
+        with self.assertNumQueries(1):
+            livres = list(escala.disponiveis(self.segunda, self.segunda + timedelta(days=1), 'brt'))
+        self.assertEqual(livres, [self.bia])
+        resposta = APIClient().get(reverse('funcionario-disponiveis') + f'?inicio={self.segunda + timedelta(days=1)}')
+        self.assertEqual([f['nome'] for f in resposta.json()], ['Gerente', 'Caio', 'Bia', 'Ana'])
+        self.assertEqual(APIClient().get(reverse('funcionario-disponiveis')).status_code, 400)
+
+    def test_atribuicao_sem_conflitos_e_com_carga_equilibrada(self):
+        # savepoint, 3 leituras, 1 UPDATE; agenda dos dias: savepoint, DELETE, 2 agregações, INSERT, release;
+        # folhas abertas (nenhuma): savepoint, SELECT, release; release
+        with self.assertNumQueries(15):
+            relatorio = escala.atribuir(self.segunda)
+        # Por dia só há 3 funcionários escaláveis: sobra uma reserva na segunda (Ana já ocupada) e uma por dia depois
+        self.assertEqual((relatorio['reservas_sem_responsavel'], relatorio['atribuidas']), (11, 8))
+        self.assertEqual(relatorio['sem_funcionario_livre'], 3)
+        self.assertEqual(relatorio['custo_diarias'], Decimal('1150.00'))
+        escalados = Reserva.objects.filter(funcionario_responsavel__isnull=False)
+        self.assertEqual(escalados.count(), 9)
+        self.assertFalse(escalados.filter(funcionario_responsavel__funcao='ger').exists())
+        carga = {f.nome: f.reserva_set.count() for f in (self.ana, self.bia, self.caio)}
+        self.assertEqual(carga, {'Ana': 3, 'Bia': 3, 'Caio': 3})  # um por dia cada, sem repetir
+        self.assertEqual(escala.atribuir(self.segunda)['atribuidas'], 0)
+
+    def test_simulacao_comando_e_restricao(self):
+        saida = io.StringIO()
+        call_command('escalar_funcionarios', '--inicio', str(self.segunda), '--dias', '1', '--simular', stdout=saida)
+        self.assertIn('2 de 3 reserva(s)', saida.getvalue())
+        self.assertEqual(Reserva.objects.filter(funcionario_responsavel__isnull=False).count(), 1)
+        outra = Reserva.objects.filter(data=self.segunda, funcionario_responsavel__isnull=True).first()
+        resposta = APIClient().patch(reverse('reserva-detail', args=[outra.pk]),
+                                     {'funcionario_responsavel': self.ana.pk}, format='json')
+        self.assertEqual(resposta.status_code, 400)
+
+
+class ViewsAssincronasTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        caches['catalogo'].clear()
+        fornecedor = Fornecedor.objects.create(nome='Distribuidora', cnpj='1', email='d@bar.com', telefone='1')
+        self.coqueteis = Coquetel.objects.bulk_create(
+            Coquetel(nome=f'Coquetel {i:02}', preco_venda=Decimal('20.00'), fornecedor=fornecedor) for i in range(25)
+        )
+        self.clientes = Cliente.objects.bulk_create(
+            Cliente(nome=f'Cliente {i % 4}', telefone='1', email=f'c{i}@bar.com') for i in range(30)
+        )
+        Reserva.objects.bulk_create(Reserva(cliente=c, convidados=2) for c in self.clientes)
+
+    def comparar_api(self, url):
+        sincrona = self.client.get(url)
+        assincrona = self.client.get(url.replace('/bar/api/', '/bar/async/api/'))
+        self.assertEqual(assincrona.status_code, sincrona.status_code)
+        self.assertEqual(assincrona.content.decode().replace('/bar/async/api/', '/bar/api/'), sincrona.content.decode())
+        return sincrona.json()
+
+    def test_api_igual_a_sincrona(self):
+        for basename in ('coquetel', 'reserva', 'funcionario'):
+            self.comparar_api(reverse(f'{basename}-list'))
+        # Percorre o cursor da paginação por keyset pelas duas rotas
+        url = reverse('cliente-list') + '?page_size=7'
+        paginas = 0
+        while url:
+            url, paginas = self.comparar_api(url)['next'], paginas + 1
+        self.assertEqual(paginas, 5)
+        self.comparar_api(reverse('cliente-list') + '?search=Cliente 1')
+        self.comparar_api(reverse('cliente-detail', args=[self.clientes[0].pk]))
+        self.comparar_api(reverse('coquetel-detail', args=[self.coqueteis[0].pk]))
+        self.comparar_api(reverse('coquetel-detail', args=[0]))
+        self.assertEqual(self.client.get(reverse('reserva-detail-async', args=[0])).status_code, 404)
+
+    def test_paginas_html_iguais_e_cache_compartilhado(self):
+        for nome, args in (('coquetel_list', []), ('coquetel_detail', [self.coqueteis[3].pk]),
+                           ('cliente_list', []), ('cliente_detail', [self.clientes[3].pk])):
+            sincrona = self.client.get(reverse(nome, args=args))
+            assincrona = self.client.get(reverse(f'{nome}_async', args=args))
+            self.assertEqual(assincrona.content, sincrona.content, nome)
+        segunda_pagina = self.client.get(reverse('coquetel_list') + '?page=2').content
+        with self.assertNumQueries(0):  # a view síncrona já deixou o HTML em cache
+            self.assertEqual(self.client.get(reverse('coquetel_list_async') + '?page=2').content, segunda_pagina)
+        self.assertEqual(self.client.get(reverse('coquetel_list_async') + '?page=9').status_code, 404)
+        self.assertEqual(self.client.get(reverse('cliente_detail_async', args=[0])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('cliente_list_async') + '?q=Cliente').status_code, 200)
+
+
+class GetCondicionalTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        caches['versoes'].clear()
+        self.cliente = Cliente.objects.create(nome='Ana', telefone='1', email='ana@bar.com')
+        Funcionario.objects.create(nome='Gil', funcao='brt')
+        Reserva.objects.bulk_create(
+            Reserva(cliente=self.cliente, convidados=i, data=date.today() + timedelta(days=i)) for i in range(5))
+        self.url = reverse('reserva-list')
+
+    def condicional(self, url, **cabecalhos):
+        return self.client.get(url, headers=cabecalhos)
+
+    def test_304_sem_consultar_o_banco(self):
+        primeira = self.client.get(self.url)
+        etag = primeira['ETag']
+        with self.assertNumQueries(0):
+            resposta = self.condicional(self.url, if_none_match=etag)
+        self.assertEqual((resposta.status_code, resposta.content, resposta['ETag']), (304, b'', etag))
+        # A ETag depende do caminho pedido e do formato
+        self.assertNotEqual(self.client.get(self.url + '?page_size=2')['ETag'], etag)
+        self.assertNotIn('ETag', self.client.get(self.url, HTTP_ACCEPT='text/html'))
+        # A rota assíncrona também responde 304
+        url_async = reverse('reserva-list-async')
+        etag_async = self.client.get(url_async)['ETag']
+        self.assertEqual(self.condicional(url_async, if_none_match=etag_async).status_code, 304)
+
+    def test_escritas_mudam_a_etag_dos_recursos_que_leem_o_modelo(self):
+        etag = self.client.get(self.url)['ETag']
+        etag_coqueteis = self.client.get(reverse('coquetel-list'))['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(reverse('cliente-detail', args=[self.cliente.pk]), {'nome': 'Bia'}, format='json')
+        resposta = self.condicional(self.url, if_none_match=etag)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.json()['results'][0]['cliente_nome'], 'Bia')
+        self.assertEqual(self.condicional(reverse('coquetel-list'), if_none_match=etag_coqueteis).status_code, 304)
+
+        # Gravações em massa marcam o modelo explicitamente; rollback não marca
+        etag = resposta['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    Cliente.objects.create(nome='Caio', telefone='1', email='caio@bar.com')
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(self.condicional(self.url, if_none_match=etag).status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(escala.atribuir(date.today())['atribuidas'], 5)  # UPDATE em massa, sem sinais
+        self.assertEqual(self.condicional(self.url, if_none_match=etag).status_code, 200)
+
+    def test_last_modified(self):
+        caches['versoes'].set_many({f'carimbo:bar.{m}': 1_700_000_000 * 10 ** 9 for m in
+                                    ('reserva', 'cliente', 'pacote', 'funcionario')}, timeout=None)
+        resposta = self.client.get(self.url)
+        self.assertEqual(resposta['Last-Modified'], 'Tue, 14 Nov 2023 22:13:20 GMT')
+        self.assertEqual(self.condicional(self.url, if_modified_since=resposta['Last-Modified']).status_code, 304)
+        # Escrita no segundo corrente: sem Last-Modified, só a ETag
+        condicional.renovar(Reserva)
+        resposta = self.condicional(self.url, if_modified_since='Tue, 14 Nov 2023 22:13:20 GMT')
+        self.assertEqual(resposta.status_code, 200)
+        self.assertNotIn('Last-Modified', resposta)
+
+
+@override_settings(BAR_CATALOGO_CACHE=False, BAR_GET_CONDICIONAL=False)
+class ListaRapidaTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        popular(30)
+        fornecedor = Fornecedor.objects.first()
+        # Casos de borda: FKs nulas, margem nula, valores sem centavos, eventos pagos em horários variados
+        Coquetel.objects.create(nome='Sem fornecedor', preco_custo=0, preco_venda=Decimal('12.5'))
+        Coquetel.objects.create(nome='Taça', recipiente='tac', preco_custo=Decimal('3.33'), preco_venda=7, fornecedor=fornecedor)
+        Produto.objects.create(nome='Sem estoque', preco=Decimal('0.10'), fornecedor=fornecedor, estoque=0)
+        cliente = Cliente.objects.create(nome='Neto', telefone='1', email='neto@bar.com',
+                                         indicado_por=Cliente.objects.exclude(indicado_por=None).first())
+        Reserva.objects.create(cliente=cliente, convidados=3, data=date(2030, 1, 1))
+        for i, momento in enumerate(['2024-01-01T03:00:00.123456+00:00', '2024-07-01T23:59:59-03:00']):
+            Evento.objects.create(cliente=cliente, datahora=datetime.fromisoformat(momento),
+                                  pago=bool(i), forma_pagamento=['Pix', 'Cre'][i], observacoes='ok' if i else None)
+        Funcionario.objects.create(nome='Copeira', funcao='cop', valorDiaria=90,
+                                   supervisor=Funcionario.objects.exclude(supervisor=None).first())
+
+    def ler(self, url, rapida):
+        serializar = mock.patch.object(serializacao.Plano, 'serializar', autospec=True,
+                                       side_effect=serializacao.Plano.serializar)
+        with override_settings(BAR_LISTA_RAPIDA=rapida), serializar as espiao:
+            paginas = []
+            while url:
+                resposta = APIClient().get(url)
+                self.assertEqual(resposta.status_code, 200, url)
+                paginas.append(resposta.content)
+                url = resposta.json().get('next') if isinstance(resposta.json(), dict) else None
+        self.assertEqual(espiao.call_count, len(paginas) if rapida else 0)
+        return paginas
+
+    def test_json_identico_ao_do_serializer(self):
+        urls = [reverse(f'{nome}-list') for nome in ('reserva', 'evento', 'cliente', 'funcionario', 'coquetel',
+                                                     'produto', 'fornecedor', 'faturamentodiario')]
+        urls += [reverse('reserva-list') + '?page_size=7&ordering=-total_estimado',
+                 reverse('coquetel-list') + '?ordering=margem_lucro', reverse('cliente-list') + '?search=cliente']
+        for url in urls:
+            with self.subTest(url=url):
+                rapida = self.ler(url, True)
+                self.assertEqual(rapida, self.ler(url, False))
+                self.assertTrue(json.loads(rapida[0]))
+
+    def test_uma_query_por_pagina(self):
+        with self.assertNumQueries(1):
+            resposta = APIClient().get(reverse('reserva-list') + '?page_size=500')
+        self.assertEqual(len(resposta.json()['results']), 31)
+        self.assertEqual(resposta.json()['results'][0]['pacote_nome'], None)
+
+    def test_campo_sem_coluna_e_recusado(self):
+        class Serializer(ReservaSerializer):
+            dia_semana = serializers.CharField(read_only=True)
+        with self.assertRaisesMessage(ImproperlyConfigured, 'dia_semana'):
+            serializacao.Plano(Serializer(), Reserva.objects.com_total_estimado())
+
+
+class SeedBarTests(TestCase):
+
+    def test_dados_consistentes_e_reprodutiveis(self):
+        saida = io.StringIO()
+        call_command('seed_bar', clientes=300, reservas=1200, funcionarios=40, lote=97, stdout=saida, stderr=io.StringIO())
+        relatorio = json.loads(saida.getvalue())
+        self.assertEqual(relatorio['reservas']['linhas'], Reserva.objects.count())
+        self.assertEqual(Cliente.objects.count(), 300)
+        self.assertEqual(Funcionario.objects.count(), 40)
+        self.assertTrue(Cliente.objects.exclude(indicado_por=None).exists())
+        self.assertFalse(Funcionario.objects.filter(funcao='ger').exclude(supervisor=None).exists())
+        self.assertFalse(Funcionario.objects.exclude(funcao='ger').filter(supervisor=None).exists())
+        self.assertTrue(Reserva.objects.exclude(funcionario_responsavel=None).exists())
+        self.assertTrue(Pacote.eventos.through.objects.exists())
+        # Caminhos e resumo de faturamento reconstruídos depois do bulk_create
+        self.assertEqual(hierarquia.verificar(Cliente), [])
+        self.assertEqual(hierarquia.verificar(Funcionario), [])
+        self.assertEqual(faturamento.verificar(), [])
+
+        # Uma segunda rodada numera e-mails/CPFs/CNPJs depois da primeira
+        call_command('seed_bar', clientes=50, reservas=0, eventos=0, stdout=io.StringIO(), stderr=io.StringIO())
+        self.assertEqual(Cliente.objects.count(), 350)
+
+    def test_valores_invalidos(self):
+        with self.assertRaisesMessage(CommandError, 'clientes'):
+            call_command('seed_bar', clientes=0, stdout=io.StringIO(), stderr=io.StringIO())
+
+
+class BenchmarkEndpointsTests(TestCase):
+
+    def test_compara_com_linha_de_base(self):
+        base = {'api x': {'p50_ms': 10, 'p95_ms': 20, 'queries': 1, 'pico_kb': 100},
+                'api rapido': {'p50_ms': 0.2, 'p95_ms': 0.3, 'queries': 0, 'pico_kb': 10}}
+        atual = {'api x': {'p50_ms': 14, 'p95_ms': 21, 'queries': 2, 'pico_kb': 100},
+                 'api rapido': {'p50_ms': 0.9, 'p95_ms': 0.3, 'queries': 0, 'pico_kb': 10},
+                 'api novo': {'p50_ms': 99, 'p95_ms': 99, 'queries': 9, 'pico_kb': 999}}
+        regressoes = benchmarks.comparar(base, atual, limite=0.2, minimo_ms=1.0)
+        # 'api rapido' piorou só no ruído absoluto; endpoints novos não têm com o que comparar
+        self.assertEqual([(r['endpoint'], r['metrica']) for r in regressoes], [('api x', 'p50_ms'), ('api x', 'queries')])
+        self.assertEqual(regressoes[0]['variacao'], '+40%')
+
+    def test_todos_os_endpoints_respondem(self):
+        popular(5)
+        urls = benchmarks.endpoints()
+        self.assertIn('api reserva-list', urls)
+        self.assertIn('html cliente_list async', urls)
+        self.assertIn('exportar reservas', urls)
+        resultado = benchmarks.medir_endpoints(repeticoes=1, tempo_maximo=0)
+        self.assertEqual(resultado.keys(), urls.keys())
+        self.assertEqual(resultado['api reserva-list']['queries'], 1)
+
+
+class PerfilTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        popular(3)
+
+    def metricas(self, resposta):
+        metricas = {}
+        for parte in resposta['Server-Timing'].split(', '):
+            nome, *atributos = parte.split(';')
+            metricas[nome] = dict(atributo.split('=', 1) for atributo in atributos)
+        return metricas
+
+    @override_settings(BAR_PERFIL_AMOSTRA=1)
+    def test_server_timing(self):
+        resposta = self.client.get(reverse('cliente_detail', args=[Cliente.objects.first().pk]))
+        metricas = self.metricas(resposta)
+        self.assertEqual(metricas['db']['desc'], '"1 queries"')
+        self.assertGreater(float(metricas['tpl']['dur']), 0)
+        self.assertGreaterEqual(float(metricas['total']['dur']), float(metricas['view']['dur']))
+
+        # DRF: render do JSON separado da view; views assíncronas (queries em outro thread) também contam
+        self.assertIn('render', self.metricas(self.client.get(reverse('reserva-list'))))
+        self.assertEqual(self.metricas(self.client.get(reverse('reserva-list-async')))['db']['desc'], '"1 queries"')
+
+    @override_settings(BAR_PERFIL_AMOSTRA=0)
+    def test_fora_da_amostra(self):
+        self.assertNotIn('Server-Timing', self.client.get(reverse('reserva-list')))
+
+    @override_settings(BAR_PERFIL_AMOSTRA=1, BAR_PERFIL_SQL_LENTO_MS=0, BAR_PERFIL_REQUISICAO_LENTA_MS=0)
+    def test_log_de_lentidao(self):
+        with self.assertLogs('bar.perfil', 'WARNING') as logs:
+            self.client.get(reverse('reserva-list'))
+        sql, requisicao = logs.output
+        self.assertIn('em bar/pagination.py:', sql)  # linha do projeto que executou a query
+        self.assertIn('FROM "bar_reserva"', sql)
+        self.assertIn('GET /bar/api/reservas/ 200 (reserva-list)', requisicao)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Planos de execução no formato do EXPLAIN QUERY PLAN do SQLite.')
+class PedidosTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.atendente = Funcionario.objects.create(nome='Caixa', funcao='gar')
+        cls.coquetel = Coquetel.objects.create(nome='Caipirinha', preco_custo=5, preco_venda=Decimal('18.50'))
+        cls.porcao = Porcao.objects.create(nome='Fritas', preco_venda=Decimal('22.00'))
+
+    def pedido(self, codigo, **extra):
+        return {'codigo': codigo, 'atendente': self.atendente.pk, 'forma_pagamento': 'Pix', 'pago': True,
+                'datahora': '2025-03-01T21:30:00-03:00',
+                'itens': [{'coquetel': self.coquetel.pk, 'quantidade': 2}, {'porcao': self.porcao.pk}], **extra}
+
+    def test_lote_grava_com_queries_constantes(self):
+        lote = [self.pedido(f'pdv-{i}') for i in range(60)]
+        # Catálogo e receitas (4) + por transação de 25: savepoint, codigos, pedidos, itens, release
+        with self.assertNumQueries(4 + 3 * 5):
+            relatorio = pedidos.ingerir(lote, lote=25)
+        self.assertEqual((relatorio['criados'], relatorio['duplicados'], relatorio['com_erro']), (60, 0, 0))
+        self.assertEqual(Pedido.objects.count(), 60)
+        self.assertEqual(ItemPedido.objects.count(), 120)
+        pedido = Pedido.objects.get(codigo='pdv-7')
+        self.assertEqual(relatorio['ids'][7], pedido.pk)
+        self.assertEqual(pedido.total, Decimal('59.00'))  # 2 x 18.50 + 22.00, preços do cardápio
+        self.assertEqual(pedido.datahora, datetime(2025, 3, 2, 0, 30, tzinfo=dt_timezone.utc))
+
+    def test_reenvio_nao_duplica(self):
+        primeiro = pedidos.ingerir([self.pedido('a'), self.pedido('b')])
+        segundo = pedidos.ingerir([self.pedido('b'), self.pedido('c'), self.pedido('c')])
+        self.assertEqual((segundo['criados'], segundo['duplicados']), (1, 2))
+        self.assertEqual(segundo['ids'][0], primeiro['ids'][1])
+        self.assertEqual(segundo['ids'][1], segundo['ids'][2])
+        self.assertEqual(Pedido.objects.count(), 3)
+
+    def test_erros_por_pedido_nao_barram_o_lote(self):
+        lote = [
+            self.pedido('ok'),
+            self.pedido('sem-itens', itens=[]),
+            self.pedido('ruim', atendente=999, pago='sim', forma_pagamento='Vale', datahora='ontem',
+                        itens=[{'coquetel': self.coquetel.pk, 'porcao': self.porcao.pk}, {'porcao': 999},
+                               {'coquetel': self.coquetel.pk, 'quantidade': 0}]),
+            'texto',
+        ]
+        relatorio = pedidos.ingerir(lote)
+        self.assertEqual((relatorio['criados'], relatorio['com_erro']), (1, 3))
+        self.assertEqual([e['pedido'] for e in relatorio['erros']], [1, 2, 3])
+        self.assertEqual(set(relatorio['erros'][1]['erros']),
+                         {'atendente', 'pago', 'forma_pagamento', 'datahora', 'itens[0]', 'itens[1]', 'itens[2]'})
+        self.assertEqual(relatorio['ids'][1:], [None, None, None])
+        with self.assertRaises(pedidos.ErroPedido):
+            pedidos.ingerir([{}] * (pedidos.LIMITE_PEDIDOS + 1))
+
+    def test_api_lote_e_leitura(self):
+        api = APIClient()
+        url = reverse('pedido-lote')
+        self.assertEqual(api.post(url, {'codigo': 'x'}, format='json').status_code, 400)
+        with self.captureOnCommitCallbacks(execute=True):
+            resposta = api.post(f'{url}?lote=1', [self.pedido('api-1'), self.pedido('api-2')], format='json')
+        self.assertEqual(resposta.status_code, 200, resposta.content)
+        self.assertEqual(resposta.json()['criados'], 2)
+        with self.assertNumQueries(2):  # pedidos + itens com coquetel/porção
+            dados = api.get(reverse('pedido-list')).json()
+        self.assertEqual([p['codigo'] for p in dados['results']], ['api-2', 'api-1'])
+        item = dados['results'][0]['itens'][0]
+        self.assertEqual((item['coquetel_nome'], item['subtotal'], dados['results'][0]['atendente_nome']),
+                         ('Caipirinha', '37.00', 'Caixa'))
+        self.assertEqual(api.get(reverse('porcao-list')).json()[0]['nome'], 'Fritas')
+
+
+class EstoqueTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        fornecedor = Fornecedor.objects.create(nome='F', cnpj='1', email='f@f.com', telefone='1')
+        cls.limao = Produto.objects.create(nome='Limão', preco=1, estoque=30, estoque_minimo=10, fornecedor=fornecedor)
+        cls.cachaca = Produto.objects.create(nome='Cachaça', preco=1, estoque=4, estoque_minimo=2, fornecedor=fornecedor)
+        cls.gelo = Produto.objects.create(nome='Gelo', preco=1, estoque=3, estoque_minimo=5, fornecedor=fornecedor)
+        cls.caipirinha = Coquetel.objects.create(nome='Caipirinha', preco_venda=20)
+        cls.batida = Coquetel.objects.create(nome='Batida', preco_venda=18)
+        ItemReceita.objects.bulk_create([
+            ItemReceita(coquetel=cls.caipirinha, produto=cls.limao, quantidade=2),
+            ItemReceita(coquetel=cls.caipirinha, produto=cls.cachaca, quantidade=1),
+            ItemReceita(coquetel=cls.caipirinha, produto=cls.gelo, quantidade=1),
+            ItemReceita(coquetel=cls.batida, produto=cls.limao, quantidade=1),
+        ])
+
+    def estoques(self):
+        return dict(Produto.objects.values_list('nome', 'estoque'))
+
+    def test_baixa_agregada_por_produto(self):
+        vendas = [(self.caipirinha.pk, 2), (self.batida.pk, 3), (self.caipirinha.pk, 1), (self.batida.pk, 1)]
+        self.assertEqual(estoque.consumo(vendas), {self.limao.pk: 10, self.cachaca.pk: 3, self.gelo.pk: 3})
+        # Receitas, leitura com lock, um UPDATE por quantidade distinta (10 e 3), o diário e o savepoint
+        with self.assertNumQueries(1 + 1 + 2 + 1 + 2), self.assertLogs('bar.estoque', 'WARNING'):
+            relatorio = estoque.baixar(vendas)
+        self.assertEqual(self.estoques(), {'Limão': 20, 'Cachaça': 1, 'Gelo': 0})
+        # Cachaça cruzou o mínimo agora; o gelo já estava abaixo (não é um aviso novo)
+        self.assertEqual(relatorio['repor'], [self.cachaca.pk])
+        self.assertEqual(relatorio['faltas'], {})
+
+    def test_venda_acima_do_estoque_zera_e_informa_a_falta(self):
+        with self.assertLogs('bar.estoque', 'WARNING'):
+            relatorio = estoque.baixar({self.caipirinha.pk: 6})
+        self.assertEqual(self.estoques(), {'Limão': 18, 'Cachaça': 0, 'Gelo': 0})
+        self.assertEqual(relatorio['faltas'], {self.cachaca.pk: 2, self.gelo.pk: 3})
+        self.assertEqual(list(Produto.objects.com_precisa_repor().filter(precisa_repor=True).order_by('nome')
+                              .values_list('nome', flat=True)), ['Cachaça', 'Gelo'])
+        self.assertEqual(estoque.baixar({Coquetel.objects.create(nome='Sem receita').pk: 5})['produtos'], 0)
+
+    def test_pedidos_baixam_o_estoque(self):
+        atendente = Funcionario.objects.create(nome='Caixa')
+        itens = [{'coquetel': self.caipirinha.pk, 'quantidade': 3}, {'coquetel': self.batida.pk}]
+        lote = [{'codigo': f'p{i}', 'atendente': atendente.pk, 'itens': itens} for i in range(2)]
+        with self.assertLogs('bar.estoque', 'WARNING'):
+            relatorio = pedidos.ingerir(lote + lote[:1])  # o repetido não baixa de novo
+        self.assertEqual(self.estoques(), {'Limão': 16, 'Cachaça': 0, 'Gelo': 0})
+        self.assertEqual(relatorio['produtos_para_repor'], [self.cachaca.pk])
+        api = APIClient()
+        resposta = api.get(reverse('itemreceita-list'), {'coquetel': self.caipirinha.pk})
+        self.assertEqual([i['produto_nome'] for i in resposta.json()], ['Limão', 'Cachaça', 'Gelo'])
+
+
+class CustosTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.fornecedor = Fornecedor.objects.create(nome='F', cnpj='1', email='f@f.com', telefone='1')
+        cls.limao = Produto.objects.create(nome='Limão', preco=Decimal('0.50'), fornecedor=cls.fornecedor)
+        cls.cachaca = Produto.objects.create(nome='Cachaça', preco=Decimal('4.00'), fornecedor=cls.fornecedor)
+        cls.vodka = Produto.objects.create(nome='Vodka', preco=Decimal('6.00'), fornecedor=cls.fornecedor)
+        cls.caipirinha = Coquetel.objects.create(nome='Caipirinha', preco_custo=1, preco_venda=20)
+        cls.caipiroska = Coquetel.objects.create(nome='Caipiroska', preco_custo=1, preco_venda=22)
+        cls.manual = Coquetel.objects.create(nome='Sem receita', preco_custo=Decimal('7.00'), preco_venda=15)
+        for coquetel, produto, quantidade in ((cls.caipirinha, cls.limao, 2), (cls.caipirinha, cls.cachaca, 1),
+                                              (cls.caipiroska, cls.limao, 2), (cls.caipiroska, cls.vodka, 1)):
+            ItemReceita.objects.create(coquetel=coquetel, produto=produto, quantidade=quantidade)
+        servico = Servico.objects.create(nome='Bar', valor_hora=50)
+        cls.pacote = Pacote.objects.create(nomePacote='Festa', coqueteis=cls.caipirinha, produtos=cls.vodka,
+                                           servicos=servico, duracaoHora=4, valorPorPessoa=90)
+        cls.pacote_manual = Pacote.objects.create(nomePacote='Simples', coqueteis=cls.manual, produtos=cls.limao,
+                                                  servicos=servico, duracaoHora=4, valorPorPessoa=50)
+
+    def custos(self):
+        return (dict(Coquetel.objects.values_list('nome', 'preco_custo')),
+                dict(Pacote.objects.values_list('nomePacote', 'custo_insumos')))
+
+    def test_receita_define_o_custo(self):
+        self.assertEqual(self.custos(), (
+            {'Caipirinha': Decimal('5.00'), 'Caipiroska': Decimal('7.00'), 'Sem receita': Decimal('7.00')},
+            {'Festa': Decimal('11.00'), 'Simples': Decimal('7.50')},
+        ))
+        # O preco_custo digitado no formulário dá lugar ao da receita
+        self.caipirinha.preco_custo = 99
+        self.caipirinha.save()
+        self.assertEqual(self.caipirinha.preco_custo, Decimal('5.00'))
+        self.assertEqual(custos.verificar(), [])
+
+    def test_preco_do_produto_atualiza_so_os_afetados(self):
+        self.limao.preco = Decimal('1.00')
+        # preço anterior + save + diário + savepoint com os custos dos coquetéis e dos pacotes,
+        # cada UPDATE com um INSERT ... SELECT no diário (nada por linha)
+        with self.assertNumQueries(9):
+            self.limao.save()
+        self.assertEqual(self.custos(), (
+            {'Caipirinha': Decimal('6.00'), 'Caipiroska': Decimal('8.00'), 'Sem receita': Decimal('7.00')},
+            {'Festa': Decimal('12.00'), 'Simples': Decimal('8.00')},
+        ))
+        self.vodka.estoque = 3
+        with self.assertNumQueries(2):
+            self.vodka.save(update_fields=['estoque'])  # sem o preço, nem a leitura do anterior (+ diário)
+        self.assertEqual(custos.atualizar_produtos([self.cachaca.pk]), {'coqueteis': 1, 'pacotes': 1})
+
+    def test_coquetel_sem_receita_e_edicao_da_receita(self):
+        self.manual.preco_custo = Decimal('9.00')
+        self.manual.save()
+        self.assertEqual(Pacote.objects.get(pk=self.pacote_manual.pk).custo_insumos, Decimal('9.50'))
+        item = ItemReceita.objects.create(coquetel=self.manual, produto=self.vodka, quantidade=2)
+        self.assertEqual(Coquetel.objects.get(pk=self.manual.pk).preco_custo, Decimal('12.00'))
+        item.coquetel = self.caipirinha
+        item.save()  # o item mudou de coquetel: os dois são recalculados
+        custo_caipirinha, custo_manual = Coquetel.objects.filter(pk__in=[self.manual.pk, self.caipirinha.pk]) \
+            .order_by('nome').values_list('preco_custo', flat=True)
+        self.assertEqual((custo_caipirinha, custo_manual), (Decimal('17.00'), Decimal('12.00')))  # sem receita: fica
+        self.assertEqual(custos.verificar(), [])
+
+    def test_importacao_e_comando(self):
+        importacao.importar('produtos', [{'nome': 'Cachaça', 'preco': '5.00', 'fornecedor_cnpj': '1'}])
+        self.assertEqual(Coquetel.objects.get(pk=self.caipirinha.pk).preco_custo, Decimal('6.00'))
+        Coquetel.objects.filter(pk=self.caipiroska.pk).update(preco_custo=1)
+        with self.assertRaisesMessage(CommandError, '1 divergência'):
+            call_command('custos', 'verificar', stdout=io.StringIO())
+        call_command('custos', 'reconstruir', stdout=io.StringIO())
+        self.assertEqual(custos.verificar(), [])
+
+
+class OrcamentosTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        fornecedor = Fornecedor.objects.create(nome='F', cnpj='1', email='f@f.com', telefone='1')
+        produto = Produto.objects.create(nome='Gelo', preco=Decimal('2.00'), fornecedor=fornecedor)
+        coquetel = Coquetel.objects.create(nome='Mojito', preco_custo=Decimal('8.00'), preco_venda=20)
+        servico = Servico.objects.create(nome='Bar', valor_hora=25)
+        # custo_insumos = 8 + 2 por convidado
+        cls.pacote = Pacote.objects.create(nomePacote='Festa', coqueteis=coquetel, produtos=produto, servicos=servico,
+                                           duracaoHora=4, valorPorPessoa=50)
+        cls.barato = Pacote.objects.create(nomePacote='Barato', coqueteis=coquetel, produtos=produto,
+                                           servicos=servico, duracaoHora=4, valorPorPessoa=15)
+        cls.cliente = Cliente.objects.create(nome='Ana', telefone='1', email='ana@bar.com')
+
+    def test_calculo(self):
+        tabela = orcamentos.Tabela()
+        orcamento = orcamentos.calcular(self.pacote.pk, 60, 6, tabela)
+        # 2 horas extras cobradas na proporção; 3 profissionais (60 / 25) por 6 horas
+        self.assertEqual(
+            {c: orcamento[c] for c in ('preco', 'custo_insumos', 'equipe', 'custo_equipe', 'margem', 'margem_percentual',
+                                       'preco_sugerido')},
+            {'preco': Decimal('4500.00'), 'custo_insumos': Decimal('600.00'), 'equipe': 3,
+             'custo_equipe': Decimal('450.00'), 'margem': Decimal('3450.00'), 'margem_percentual': Decimal('76.67'),
+             'preco_sugerido': Decimal('4500.00')},
+        )
+        # Menos horas que o pacote: mesmo preço, equipe mais barata
+        orcamento = orcamentos.calcular(self.pacote.pk, 60, 2, tabela)
+        self.assertEqual((orcamento['preco'], orcamento['custo_equipe']), (Decimal('3000.00'), Decimal('150.00')))
+        # Abaixo da margem alvo: o sugerido cobre custo / (1 - 30%)
+        orcamento = orcamentos.calcular(self.barato.pk, 10, None, tabela)
+        self.assertEqual((orcamento['duracaoHora'], orcamento['preco'], orcamento['custo']),
+                         (4, Decimal('150.00'), Decimal('200.00')))
+        self.assertEqual(orcamento['preco_sugerido'], Decimal('285.71'))
+
+    def test_lote_com_duas_queries(self):
+        dia = date(2030, 6, 7)
+        Evento.objects.create(cliente=self.cliente, datahora=timezone.make_aware(datetime(2030, 6, 7, 21)))
+        lote = [{'pacote': (self.pacote.pk, self.barato.pk)[i % 2], 'convidados': 10 + i, 'duracaoHora': 1 + i % 8,
+                 'data': str(dia + timedelta(days=i % 30))} for i in range(500)]
+        lote += [{'pacote': 0, 'convidados': 10}, {'pacote': self.pacote.pk, 'convidados': True, 'data': 'ontem'}, 7]
+        with self.assertNumQueries(2):  # tabela dos pacotes + agenda das datas
+            relatorio = orcamentos.orcar(lote)
+        self.assertEqual(relatorio['com_erro'], 3)
+        self.assertEqual(relatorio['erros'][1], {'orcamento': 501, 'erros': {
+            'convidados': f'Inteiro de 1 a {orcamentos.CONVIDADOS_MAXIMO}.', 'data': 'Data inválida; use AAAA-MM-DD.'}})
+        self.assertEqual(relatorio['orcamentos'][500:], [None] * 3)
+        ocupados = {o['data'] for o in relatorio['orcamentos'][:500] if not o['livre']}
+        self.assertEqual(ocupados, {dia})
+        with self.assertNumQueries(1):
+            orcamentos.orcar([{'pacote': self.pacote.pk, 'convidados': 10}])
+
+    def test_api(self):
+        client = APIClient()
+        url = reverse('orcamentos_lote')
+        resposta = client.post(url + '?margem=90', [{'pacote': self.pacote.pk, 'convidados': 25}], format='json')
+        self.assertEqual(resposta.status_code, 200)
+        orcamento = resposta.json()['orcamentos'][0]
+        self.assertEqual((orcamento['preco'], orcamento['custo'], orcamento['preco_sugerido']),
+                         ('1250.00', '350.00', '3500.00'))
+        self.assertNotIn('livre', orcamento)
+        self.assertEqual(client.post(url, {'pacote': self.pacote.pk}, format='json').status_code, 400)
+        self.assertEqual(client.post(url + '?margem=100', [], format='json').status_code, 400)
+        self.assertEqual(client.post(url + '?margem=abc', [], format='json').status_code, 400)
+        self.assertEqual(client.post(url + '?margem=nan', [], format='json').status_code, 400)
+
+
+class FolhaTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        fornecedor = Fornecedor.objects.create(nome='F', cnpj='1', email='f@f.com', telefone='1')
+        produto = Produto.objects.create(nome='Gelo', preco=Decimal('2.00'), fornecedor=fornecedor)
+        coquetel = Coquetel.objects.create(nome='Mojito', preco_custo=Decimal('8.00'), preco_venda=20)
+        cls.ana = Funcionario.objects.create(nome='Ana', funcao='brt', valorDiaria=100)
+        cls.beto = Funcionario.objects.create(nome='Beto', funcao='gar', valorDiaria=80)
+        cls.bar = Servico.objects.create(nome='Bar', valor_hora=20)
+        cls.bar.funcionarios.add(cls.ana)  # só Ana é habilitada no serviço do pacote
+        cls.pacote = Pacote.objects.create(nomePacote='Festa', coqueteis=coquetel, produtos=produto, servicos=cls.bar,
+                                           duracaoHora=4, valorPorPessoa=50)
+        cls.clientes = [Cliente.objects.create(nome=f'C{i}', telefone='1', email=f'c{i}@bar.com') for i in range(4)]
+        cls.junho = date(2030, 6, 1)
+        Reserva.objects.create(cliente=cls.clientes[0], data=date(2030, 6, 5), convidados=10, pacote=cls.pacote,
+                               funcionario_responsavel=cls.ana)
+        Reserva.objects.create(cliente=cls.clientes[1], data=date(2030, 6, 6), convidados=10, pacote=cls.pacote,
+                               funcionario_responsavel=cls.ana)
+        Reserva.objects.create(cliente=cls.clientes[2], data=date(2030, 6, 6), convidados=10, pacote=cls.pacote,
+                               funcionario_responsavel=cls.beto)
+        Reserva.objects.create(cliente=cls.clientes[0], data=date(2030, 7, 1), convidados=10,
+                               funcionario_responsavel=cls.beto)
+
+    def linhas(self, mes='2030-06'):
+        return {linha.nome: (linha.dias, linha.horas, linha.valor_diarias, linha.valor_servicos, linha.total)
+                for linha in folha.relatorio(folha.obter(mes))}
+
+    def test_calculo(self):
+        self.assertEqual(self.linhas(), {
+            'Ana': (2, 8, Decimal('200.00'), Decimal('160.00'), Decimal('360.00')),
+            'Beto': (1, 4, Decimal('80.00'), Decimal('0.00'), Decimal('80.00')),  # não habilitado no serviço
+        })
+        por_funcao = folha.relatorio(folha.obter(self.junho), por='funcao')
+        self.assertEqual([(l['funcao'], l['funcionarios'], l['total']) for l in por_funcao],
+                         [('brt', 1, Decimal('360.00')), ('gar', 1, Decimal('80.00'))])
+        self.assertEqual(self.linhas('2030-07'), {'Beto': (1, 0, Decimal('80.00'), Decimal('0.00'), Decimal('80.00'))})
+
+    def test_mes_aberto_incremental(self):
+        self.linhas()
+        Reserva.objects.create(cliente=self.clientes[3], data=date(2030, 6, 9), convidados=5,
+                               funcionario_responsavel=self.beto)
+        self.beto.valorDiaria = 90
+        self.beto.save()
+        self.assertEqual(self.linhas()['Beto'][:3], (2, 4, Decimal('180.00')))
+        reserva = Reserva.objects.create(cliente=self.clientes[3], data=date(2030, 6, 20), convidados=5)
+        escala.atribuir(reserva.data, reserva.data, funcoes=('brt',))
+        self.assertEqual(self.linhas()['Ana'][0], 3)
+        self.assertEqual(folha.verificar(self.junho), [])
+
+        # Pacote e Servico descartam a foto aberta, refeita na leitura
+        self.bar.valor_hora = 30
+        self.bar.save()
+        self.assertFalse(FolhaMensal.objects.filter(mes=self.junho).exists())
+        self.assertEqual(self.linhas()['Ana'][3], Decimal('240.00'))
+
+    def test_mes_fechado_e_foto(self):
+        folha.fechar('2030-06')
+        with self.assertNumQueries(2):  # cabeçalho + linhas, sem agregar reservas
+            self.linhas()
+        Reserva.objects.create(cliente=self.clientes[3], data=date(2030, 6, 9), convidados=5,
+                               funcionario_responsavel=self.beto)
+        self.beto.valorDiaria = 90
+        self.beto.save()
+        self.assertEqual(self.linhas()['Beto'][:3], (1, 4, Decimal('80.00')))
+        self.assertEqual(len(folha.verificar(self.junho)), 1)
+        folha.reabrir(self.junho)
+        self.assertEqual(self.linhas()['Beto'][:3], (2, 4, Decimal('180.00')))
+
+    def test_api(self):
+        client = APIClient()
+        resposta = client.get(reverse('folha_mensal') + '?mes=2030-06&por=funcao')
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual((resposta.json()['total'], resposta.json()['fechada']), ('440.00', False))
+        self.assertEqual([l['funcao'] for l in resposta.json()['linhas']], ['brt', 'gar'])
+        resposta = client.post(reverse('folha_fechamento', args=['fechar']) + '?mes=2030-06')
+        self.assertEqual((resposta.status_code, resposta.json()['fechada']), (200, True))
+        self.assertEqual(resposta.json()['linhas'][0]['nome'], 'Ana')
+        self.assertEqual(client.get(reverse('folha_mensal') + '?mes=junho').status_code, 400)
+        self.assertEqual(client.get(reverse('folha_mensal') + '?por=cargo').status_code, 400)
+        self.assertEqual(client.post(reverse('folha_fechamento', args=['apagar']) + '?mes=2030-06').status_code, 404)
+
+
+
+class SincronizacaoTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.fornecedor = Fornecedor.objects.create(nome='F', cnpj='1', email='f@f.com', telefone='1')
+        cls.limao = Produto.objects.create(nome='Limão', preco=Decimal('2.00'), fornecedor=cls.fornecedor, estoque=50)
+        cls.caipirinha = Coquetel.objects.create(nome='Caipirinha', preco_venda=20, fornecedor=cls.fornecedor)
+        ItemReceita.objects.create(coquetel=cls.caipirinha, produto=cls.limao, quantidade=2)
+        servico = Servico.objects.create(nome='Bar', valor_hora=20)
+        cls.pacote = Pacote.objects.create(nomePacote='Festa', coqueteis=cls.caipirinha, produtos=cls.limao,
+                                           servicos=servico, duracaoHora=4, valorPorPessoa=50)
+        cls.porcao = Porcao.objects.create(nome='Fritas', preco_venda=15)
+        cls.ana = Cliente.objects.create(nome='Ana', telefone='1', email='ana@bar.com')
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def feed(self, desde, **params):
+        resposta = self.client.get(reverse('sincronizar'), {'desde': desde, **params})
+        self.assertEqual(resposta.status_code, 200)
+        return resposta.json()
+
+    def test_so_o_que_mudou_desde_o_cursor(self):
+        cursor = sincronizacao.cursor_atual()
+        self.caipirinha.preco_venda = 22
+        self.caipirinha.save()
+        self.caipirinha.preco_venda = 25
+        self.caipirinha.save()
+        porcao = self.porcao.pk
+        self.porcao.delete()
+        bia = Cliente.objects.create(nome='Bia', telefone='2', email='bia@bar.com', indicado_por=self.ana)
+        # Cursor, diário e uma query por modelo com linhas vivas (as porções só têm tombstone)
+        with self.assertNumQueries(4):
+            feed = self.feed(cursor)
+        self.assertEqual((feed['reset'], feed['mais']), (False, False))
+        self.assertEqual(sorted(feed['alterados']), ['clientes', 'coqueteis'])
+        [coquetel] = feed['alterados']['coqueteis']  # duas alterações, uma linha no estado atual
+        self.assertEqual((coquetel['id'], coquetel['preco_venda'], coquetel['fornecedor']),
+                         (self.caipirinha.pk, '25.00', self.fornecedor.pk))
+        self.assertNotIn('fornecedor_nome', coquetel)
+        [cliente] = feed['alterados']['clientes']
+        self.assertEqual((cliente['id'], cliente['indicado_por']), (bia.pk, self.ana.pk))
+        self.assertFalse({'caminho', 'profundidade', 'indicado_por_nome'} & cliente.keys())
+        self.assertEqual(feed['apagados'], {'porcoes': [porcao]})
+
+        seguinte = self.feed(feed['cursor'])
+        self.assertEqual((seguinte['cursor'], seguinte['alterados'], seguinte['apagados']), (feed['cursor'], {}, {}))
+
+    def test_gravacoes_sem_sinais_entram_no_diario(self):
+        antes = Coquetel.objects.get(pk=self.caipirinha.pk).atualizado_em
+        cursor = sincronizacao.cursor_atual()
+        self.limao.preco = Decimal('3.00')
+        self.limao.save()  # custos: UPDATE do coquetel e do pacote
+        estoque.baixar({self.caipirinha.pk: 5})
+        feed = self.feed(cursor)
+        self.assertEqual(feed['alterados']['coqueteis'][0]['preco_custo'], '6.00')
+        self.assertEqual(feed['alterados']['pacotes'][0]['custo_insumos'], '9.00')
+        self.assertNotIn('eventos', feed['alterados']['pacotes'][0])
+        self.assertEqual(feed['alterados']['produtos'][0]['estoque'], 40)
+        self.assertGreater(Coquetel.objects.get(pk=self.caipirinha.pk).atualizado_em, antes)
+
+        # SET_NULL do delete() e save(update_fields=...) também carimbam
+        cursor = feed['cursor']
+        outro = Fornecedor.objects.create(nome='G', cnpj='2', email='g@f.com', telefone='2')
+        Coquetel.objects.filter(pk=self.caipirinha.pk).update(fornecedor=outro)
+        outro.delete()
+        self.porcao.preco_venda = 18
+        self.porcao.save(update_fields=['preco_venda'])
+        feed = self.feed(cursor)
+        self.assertIsNone(feed['alterados']['coqueteis'][0]['fornecedor'])
+        self.assertGreater(Porcao.objects.get(pk=self.porcao.pk).atualizado_em, antes)
+
+        cursor = feed['cursor']
+        importacao.importar('produtos', [{'nome': 'Limão', 'preco': '3.50', 'fornecedor_cnpj': '1'},
+                                         {'nome': 'Gelo', 'preco': '1.00', 'fornecedor_cnpj': '1'}])
+        feed = self.feed(cursor, modelo='produtos')
+        self.assertEqual([p['nome'] for p in feed['alterados']['produtos']], ['Limão', 'Gelo'])
+
+    def test_reset_paginas_e_poda(self):
+        self.assertEqual(self.feed('')['reset'], True)  # primeira carga: listas completas
+        cursor = sincronizacao.cursor_atual()
+        self.assertEqual(self.feed(cursor + 10)['reset'], True)  # cursor de outro banco
+        for preco in (21, 22, 23):
+            self.caipirinha.preco_venda = preco
+            self.caipirinha.save()
+            self.ana.telefone = str(preco)
+            self.ana.save()
+        pagina = self.feed(cursor, limite=4)
+        self.assertEqual((pagina['mais'], pagina['cursor']), (True, cursor + 4))
+        resto = self.feed(pagina['cursor'], limite=4)
+        self.assertEqual((resto['mais'], resto['cursor']), (False, cursor + 6))
+        self.assertEqual(resto['alterados']['clientes'][0]['telefone'], '23')
+
+        marco = sincronizacao.reiniciar()
+        self.assertEqual(self.feed(cursor)['reset'], True)
+        self.assertEqual(self.feed(marco)['reset'], False)
+
+        Alteracao.objects.filter(pk__lte=marco).update(momento=timezone.now() - timedelta(days=40))
+        self.porcao.save()
+        self.assertEqual(sincronizacao.podar(30), marco - 1)
+        self.assertEqual(Alteracao.objects.count(), 2)  # o marco e a porção
+        self.assertEqual(self.feed(cursor)['reset'], True)
+        self.assertEqual(self.feed(marco)['alterados']['porcoes'][0]['id'], self.porcao.pk)
+
+    def test_api_valida_os_parametros(self):
+        url = reverse('sincronizar')
+        self.assertEqual(self.client.get(url, {'desde': 'ontem'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'desde': -1}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'desde': 0, 'modelo': 'reservas'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'desde': 0, 'limite': 0}).status_code, 400)
+        feed = self.feed(0, modelo=['porcoes', 'clientes'])
+        self.assertEqual(sorted(feed['alterados']), ['clientes', 'porcoes'])
+        call_command('sincronizacao', 'estado', stdout=io.StringIO())
+
+    @skipUnless(connection.vendor == 'postgresql', 'No SQLite as escritas já são serializadas.')
+    def test_escrita_no_diario_segura_o_lock_ate_o_commit(self):
+        # Os ids do diário só ficam visíveis na ordem em que foram gerados
+        consulta = "SELECT count(*) FROM pg_locks WHERE locktype = 'advisory' AND objid = %s AND pid = pg_backend_pid()"
+        with transaction.atomic(), connection.cursor() as cursor:
+            self.porcao.save()
+            cursor.execute(consulta, [sincronizacao.LOCK_DIARIO])
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+
+class IndicesTests(TestCase):
+    inicio = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+    fim = datetime(2025, 2, 1, tzinfo=dt_timezone.utc)
+
+    def assertUsaIndice(self, queryset, tabela, indice):
+        plano = queryset.explain()
+        self.assertRegex(plano, rf'(SCAN|SEARCH) {tabela} USING (COVERING )?INDEX {indice}\b', plano)
+        self.assertNotRegex(plano, rf'(?m)SCAN {tabela}$', plano)  # varredura completa da tabela
+
+    def test_eventos(self):
+        pagina = EventoViewSet.queryset.order_by('-datahora', '-pk')
+        self.assertUsaIndice(pagina.filter(pago=False)[:51], 'bar_evento', 'idx_evento_pendente')
+        self.assertUsaIndice(pagina.filter(pago=False, datahora__gte=self.inicio, datahora__lt=self.fim)[:51],
+                             'bar_evento', 'idx_evento_pendente')
+        self.assertUsaIndice(pagina.filter(datahora__gte=self.inicio, datahora__lt=self.fim)[:51],
+                             'bar_evento', 'idx_evento_datahora_id')
+        # Evento do cliente no dia, consultado para cada grupo do resumo de faturamento
+        self.assertUsaIndice(faturamento._agregado(), 'U0', 'idx_evento_cliente_datahora')
+
+    def test_reservas_por_data(self):
+        pagina = ReservaViewSet.queryset.filter(data__range=(date(2025, 1, 1), date(2025, 1, 31)))
+        self.assertUsaIndice(pagina.order_by('-data', '-pk')[:51], 'bar_reserva', 'idx_reserva_data_id')
+
+    def test_produtos_para_repor(self):
+        self.assertUsaIndice(ProdutoViewSet.queryset.filter(precisa_repor=True), 'bar_produto', 'idx_produto_repor')
+
+    def test_agenda(self):
+        intervalo = (date(2025, 1, 1), date(2025, 3, 31))
+        # No SQLite a UniqueConstraint criada com a tabela vira o índice automático da UNIQUE (local, data)
+        self.assertUsaIndice(OcupacaoDiaria.objects.filter(local__in=['Terraço'], data__range=intervalo),
+                             'bar_ocupacaodiaria', 'sqlite_autoindex_bar_ocupacaodiaria_1')
+        self.assertUsaIndice(OcupacaoDiaria.objects.filter(data__range=intervalo), 'bar_ocupacaodiaria',
+                             'idx_ocupacao_data')
+
+    def test_funcionarios_por_funcao(self):
+        self.assertUsaIndice(Funcionario.objects.filter(funcao__in=['brt', 'gar']), 'bar_funcionario',
+                             'idx_funcionario_funcao')
+        self.assertUsaIndice(escala.disponiveis(date(2025, 1, 1), date(2025, 1, 7), 'brt'), 'bar_funcionario',
+                             'idx_funcionario_funcao')
+
+    def test_filtros_da_api(self):
+        popular(3)
+        evento = Evento.objects.first()
+        Evento.objects.filter(pk=evento.pk).update(pago=True, datahora=self.inicio + timedelta(days=3))
+        client = APIClient()
+        ids = lambda url: [linha['id'] for linha in client.get(url).json()['results']]
+        self.assertEqual(ids(reverse('evento-list') + '?pago=true'), [evento.pk])
+        self.assertNotIn(evento.pk, ids(reverse('evento-list') + '?pago=false'))
+        self.assertEqual(ids(reverse('evento-list') + '?inicio=2025-01-02&fim=2025-01-10'), [evento.pk])
+        reserva = Reserva.objects.first()
+        self.assertEqual(ids(reverse('reserva-list') + f'?inicio={reserva.data}&fim={reserva.data}'), [reserva.pk])
+        self.assertEqual(client.get(reverse('reserva-list') + '?inicio=ontem').status_code, 400)
+        funcoes = {f['funcao'] for f in client.get(reverse('funcionario-list') + '?funcao=ger').json()}
+        self.assertEqual(funcoes, {'ger'})
+
+
+class AdminTests(TestCase):
+    """Listas e formulários do admin com custo independente do tamanho das tabelas."""
+
+    def setUp(self):
+        usuario = User.objects.create_superuser('admin', 'admin@example.com', 'senha')
+        self.client.force_login(usuario)
+
+    def queries(self, url):
+        with CaptureQueriesContext(connection) as contexto:
+            resposta = self.client.get(url)
+        self.assertEqual(resposta.status_code, 200)
+        return len(contexto)
+
+    def test_listas_sem_n_mais_1(self):
+        urls = [reverse(f'admin:bar_{modelo}_changelist') for modelo in (
+            'reserva', 'evento', 'cliente', 'coquetel', 'pacote', 'funcionario', 'produto', 'pedido')]
+        popular(5)
+        antes = {url: self.queries(url) for url in urls}
+        popular(40)
+        depois = {url: self.queries(url) for url in urls}
+        self.assertEqual(depois, antes)
+
+    def test_formulario_sem_select_de_clientes(self):
+        popular(20)
+        reserva = Reserva.objects.first()
+        resposta = self.client.get(reverse('admin:bar_reserva_change', args=[reserva.pk]))
+        self.assertEqual(resposta.status_code, 200)
+        # Só o cliente selecionado vira <option>; o resto vem do autocomplete
+        select = re.search(r'<select name="cliente".*?</select>', resposta.content.decode(), re.S).group()
+        self.assertEqual(re.findall(r'<option value="(\d+)"', select), [str(reserva.cliente_id)])
+        self.assertIn('admin-autocomplete', select)
+
+    def test_contagem_aproximada(self):
+        popular(20)
+        total = Cliente.objects.count()
+        maior_id = Cliente.objects.order_by('-pk').values_list('pk', flat=True)[0]
+        with mock.patch.object(ContagemAproximadaPaginator, 'limite_exato', 5):
+            # Sem filtro, acima do limite: estimativa, sem COUNT
+            paginator = ContagemAproximadaPaginator(Cliente.objects.order_by('pk'), 10)
+            with self.assertNumQueries(1):
+                self.assertEqual(paginator.count, maior_id)
+            # Com filtro: contagem limitada
+            paginator = ContagemAproximadaPaginator(Cliente.objects.filter(pk__gt=0).order_by('pk'), 10)
+            self.assertEqual(paginator.count, 5)
+        self.assertEqual(ContagemAproximadaPaginator(Cliente.objects.order_by('pk'), 10).count, total)
+
+    def test_filtro_precisa_repor(self):
+        popular(5)
+        Produto.objects.update(estoque=10, estoque_minimo=1)
+        produto = Produto.objects.first()
+        Produto.objects.filter(pk=produto.pk).update(estoque=0)
+        resposta = self.client.get(reverse('admin:bar_produto_changelist') + '?precisa_repor=sim')
+        self.assertEqual(list(resposta.context['cl'].result_list), [produto])
+        resposta = self.client.get(reverse('admin:bar_produto_changelist') + '?precisa_repor=nao')
+        self.assertNotIn(produto, resposta.context['cl'].result_list)
@@ -0,0 +1,64 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+
+from . import views, views_async
+
+# Rotas da API (Django REST Framework)
+router = DefaultRouter()
+router.register(r'coqueteis', views.CoquetelViewSet)
+router.register(r'clientes', views.ClienteViewSet)
+router.register(r'servicos', views.ServicoViewSet)
+router.register(r'pacotes', views.PacoteViewSet)
+router.register(r'funcionarios', views.FuncionarioViewSet)
+router.register(r'reservas', views.ReservaViewSet)
+router.register(r'fornecedores', views.FornecedorViewSet)
+router.register(r'produtos', views.ProdutoViewSet)
+router.register(r'eventos', views.EventoViewSet)
+router.register(r'faturamento-diario', views.FaturamentoDiarioViewSet)
+router.register(r'porcoes', views.PorcaoViewSet)
+router.register(r'pedidos', views.PedidoViewSet)
+router.register(r'receitas', views.ItemReceitaViewSet)
+
+urlpatterns = [
+    # Coquetel (views baseadas em classe)
+    path('coqueteis/', views.CoquetelListView.as_view(), name='coquetel_list'),
+    path('coqueteis/novo/', views.CoquetelCreateView.as_view(), name='coquetel_create'),
+    path('coqueteis/<int:pk>/', views.CoquetelDetailView.as_view(), name='coquetel_detail'),
+    path('coqueteis/<int:pk>/editar/', views.CoquetelUpdateView.as_view(), name='coquetel_update'),
+    path('coqueteis/<int:pk>/deletar/', views.CoquetelDeleteView.as_view(), name='coquetel_delete'),
+
+    # Cliente (views baseadas em função)
+    path('clientes/', views.cliente_list, name='cliente_list'),
+    path('clientes/novo/', views.cliente_create, name='cliente_create'),
+    path('clientes/<int:pk>/', views.cliente_detail, name='cliente_detail'),
+    path('clientes/<int:pk>/editar/', views.cliente_update, name='cliente_update'),
+    path('clientes/<int:pk>/deletar/', views.cliente_delete, name='cliente_delete'),
+
+    # API
+    path('api/cache/catalogo/', views.catalogo_cache_stats, name='catalogo_cache_stats'),
+    path('api/faturamento/', views.faturamento_relatorio, name='faturamento_relatorio'),
+    path('api/agenda/', views.agenda_disponibilidade, name='agenda_disponibilidade'),
+    path('api/agenda/verificar/', views.agenda_verificar, name='agenda_verificar'),
+    path('api/orcamentos/', views.orcamentos_lote, name='orcamentos_lote'),
+    path('api/folha/', views.folha_mensal, name='folha_mensal'),
+    path('api/folha/<str:acao>/', views.folha_fechamento, name='folha_fechamento'),
+    path('api/sync/', views.sincronizar, name='sincronizar'),
+    path('api/exportar/<str:modelo>/', views.exportar, name='exportar'),
+    path('api/importar/<str:modelo>/', views.importar, name='importar'),
+    path('api/', include(router.urls)),
+
+    # Leituras assíncronas (modo ASGI, ver project/asgi.py): mesmas respostas das rotas acima
+    path('async/coqueteis/', views_async.coquetel_list, name='coquetel_list_async'),
+    path('async/coqueteis/<int:pk>/', views_async.coquetel_detail, name='coquetel_detail_async'),
+    path('async/clientes/', views_async.cliente_list, name='cliente_list_async'),
+    path('async/clientes/<int:pk>/', views_async.cliente_detail, name='cliente_detail_async'),
+]
+
+for prefixo, viewset, basename in router.registry:
+    if basename in views_async.VIEWSETS:
+        urlpatterns += [
+            path(f'async/api/{prefixo}/', views_async.api_list, {'basename': basename},
+                 name=f'{basename}-list-async'),
+            path(f'async/api/{prefixo}/<int:pk>/', views_async.api_detail, {'basename': basename},
+                 name=f'{basename}-detail-async'),
+        ]
@@ -1,33 +1,61 @@
 
+import csv
+import io
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Prefetch
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, get_object_or_404, redirect
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.urls import reverse_lazy
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 
 # Importar o DRF
 from rest_framework import viewsets
+from rest_framework.decorators import action, api_view
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import OrderingFilter
+from rest_framework.response import Response
 from .serializers import (
     CoquetelSerializer, ClienteSerializer, ServicoSerializer, PacoteSerializer,
     FuncionarioSerializer, ReservaSerializer, FornecedorSerializer,
-    ProdutoSerializer, EventoSerializer
+    ProdutoSerializer, EventoSerializer, FaturamentoDiarioSerializer, RelatorioFaturamentoSerializer,
+    RankingIndicacoesSerializer, PorcaoSerializer, PedidoSerializer, ItemReceitaSerializer, OcupacaoSerializer,
+    VerificarDatasSerializer, FolhaFuncionarioSerializer, FolhaFuncaoSerializer, CoquetelSyncSerializer,
+    ProdutoSyncSerializer, ClienteSyncSerializer, PacoteSyncSerializer,
 ) # Importar os serializers que você criou
+from .pagination import KeysetPagination
+from .cache import CatalogoCacheMixin, PaginaCacheMixin, resumo as resumo_do_cache
+from .condicional import CondicionalMixin
+from .serializacao import ListaRapidaMixin
 
-from .models import Coquetel, Cliente, Servico, Pacote, Funcionario, Reserva, Fornecedor, Produto, Evento
+from .models import (
+    Coquetel, Cliente, Servico, Pacote, Funcionario, Reserva, Fornecedor, Produto, Evento, FaturamentoDiario,
+    Porcao, Pedido, ItemPedido, ItemReceita,
+)
+from . import agenda, escala, exportacao, faturamento, folha, importacao, orcamentos, pedidos, sincronizacao
+from .busca import buscar_clientes, LIMITE_PADRAO as LIMITE_BUSCA
 from .forms import CoquetelForm, ClienteForm 
 
 # VIEWS BASEADAS EM CLASSE (para Coquetel) 
 
 # Requisito: 1 Classes Listar
-class CoquetelListView(ListView):
+class CoquetelListView(PaginaCacheMixin, ListView):
     model = Coquetel
     template_name = 'bar/coquetel_list.html'
     context_object_name = 'coqueteis'
     paginate_by = 5 # Exemplo de paginação
+    queryset = Coquetel.objects.select_related('fornecedor')
+    cache_namespace = 'coquetel' # HTML do cardápio em cache
 
 # Requisito: 1 Classes Detalhar
-class CoquetelDetailView(DetailView):
+class CoquetelDetailView(PaginaCacheMixin, DetailView):
     model = Coquetel
     template_name = 'bar/coquetel_detail.html'
     context_object_name = 'coquetel'
+    queryset = Coquetel.objects.select_related('fornecedor')
+    cache_namespace = 'coquetel'
 
 # Requisito: 1 Classes Criar
 class CoquetelCreateView(CreateView):
@@ -53,18 +81,19 @@ class CoquetelDeleteView(DeleteView):
 
 # Requisito: 1 Método Listar
 def cliente_list(request):
-    clientes = Cliente.objects.all()
+    clientes = Cliente.objects.select_related('indicado_por')
     # Exemplo de filtro (simples)
     query = request.GET.get('q')
     if query:
-        clientes = clientes.filter(nome__icontains=query)
+        # Busca indexada por nome, telefone e email, ordenada por relevância
+        clientes = buscar_clientes(query, clientes)
     
     context = {'clientes': clientes}
     return render(request, 'bar/cliente_list.html', context)
 
 # Requisito: 1 Método Detalhar
 def cliente_detail(request, pk):
-    cliente = get_object_or_404(Cliente, pk=pk)
+    cliente = get_object_or_404(Cliente.objects.select_related('indicado_por'), pk=pk)
     context = {'cliente': cliente}
     return render(request, 'bar/cliente_detail.html', context)
 
@@ -103,49 +132,444 @@ def cliente_delete(request, pk):
     return render(request, 'bar/cliente_confirm_delete.html', context)
 
 # VIEWS PARA API (Django REST Framework)
+# Os querysets carregam as FKs (select_related) e M2Ms (prefetch_related)
+# usadas pelos serializers, para que o número de queries não cresça com as linhas.
+
+# Coquetel, Pacote e Servico mudam pouco: list/retrieve passam pelo cache do
+# catálogo (bar/cache.py), invalidado pelos sinais de bar/signals.py.
+
+# Com `lista_rapida`, o list monta o JSON a partir de values_list(), sem instanciar
+# modelos nem passar pelo to_representation campo a campo (bar/serializacao.py).
+
+# Todos os GETs da API respondem 304 quando nenhum modelo de `versionado_por`
+# mudou desde a ETag/Last-Modified do cliente (bar/condicional.py).
 
 # ViewSet para Coquetel
 # Permite operações CRUD completas (listar, criar, detalhar, atualizar, deletar)
-class CoquetelViewSet(viewsets.ModelViewSet):
-    queryset = Coquetel.objects.all()
+class CoquetelViewSet(CondicionalMixin, CatalogoCacheMixin, ListaRapidaMixin, viewsets.ModelViewSet):
+    versionado_por = (Coquetel, Fornecedor)
+    lista_rapida = True
+    cache_namespace = 'coquetel'
+    queryset = Coquetel.objects.select_related('fornecedor').com_indicadores()
     serializer_class = CoquetelSerializer
+    filter_backends = [OrderingFilter] # ?ordering=-margem_lucro
+    ordering_fields = ['nome', 'preco_custo', 'preco_venda', 'lucro_unitario', 'margem_lucro']
+
+# Hierarquias (Cliente.indicado_por, Funcionario.supervisor): leituras pelo
+# caminho materializado, uma query cada (bar/hierarquia.py).
+class HierarquiaMixin:
+    @action(detail=True)
+    def descendentes(self, request, pk=None):
+        objeto = self.get_object()
+        queryset = self.filter_queryset(self.get_queryset()).descendentes_de(objeto).order_by('caminho')
+        pagina = self.paginate_queryset(queryset)
+        if pagina is not None:
+            return self.get_paginated_response(self.get_serializer(pagina, many=True).data)
+        return Response(self.get_serializer(queryset, many=True).data)
+
+    @action(detail=True)
+    def ancestrais(self, request, pk=None):
+        objeto = self.get_object()
+        # Da raiz até o pai, na ordem do caminho
+        ordem = {pk: i for i, pk in enumerate(objeto.ids_ancestrais)}
+        ancestrais = sorted(self.get_queryset().ancestrais_de(objeto), key=lambda a: ordem[a.pk])
+        return Response(self.get_serializer(ancestrais, many=True).data)
+
+# ?inicio=&fim= (AAAA-MM-DD, inclusivos) na listagem, como intervalo no índice de `campo_periodo`
+class PeriodoMixin:
+    campo_periodo = None
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action != 'list':
+            return queryset
+        try:
+            datas = _intervalo_de_datas(self.request.query_params)
+        except ValueError as erro:
+            raise ValidationError(erro.args[0])
+        return queryset.filter(**exportacao.filtro_de_datas(queryset.model, self.campo_periodo, **datas))
 
 # ViewSet para Cliente
-class ClienteViewSet(viewsets.ModelViewSet):
-    queryset = Cliente.objects.all()
+class ClienteViewSet(CondicionalMixin, ListaRapidaMixin, HierarquiaMixin, viewsets.ModelViewSet):
+    versionado_por = (Cliente,)
+    lista_rapida = True
+    queryset = Cliente.objects.select_related('indicado_por').com_profundidade()
     serializer_class = ClienteSerializer
+    pagination_class = KeysetPagination # Paginação por cursor (tabela grande)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # ?search=ana&limite=20 -> os clientes mais relevantes (bar/busca.py)
+        termo = self.request.query_params.get('search')
+        if termo and self.action == 'list':
+            try:
+                limite = int(self.request.query_params.get('limite', LIMITE_BUSCA))
+            except ValueError:
+                raise ValidationError({'limite': 'Informe um número inteiro.'})
+            queryset = buscar_clientes(termo, queryset, limite)
+        return queryset
+
+    def paginate_queryset(self, queryset):
+        # A busca já devolve só os N mais relevantes, na ordem do ranking
+        if self.request.query_params.get('search'):
+            return None
+        return super().paginate_queryset(queryset)
+
+    def paginar_linhas(self, queryset, colunas):
+        if self.request.query_params.get('search'):
+            return None
+        return super().paginar_linhas(queryset, colunas)
+
+    # /bar/api/clientes/ranking-indicacoes/?por=reservas|indicados&limite=10
+    @action(detail=False, url_path='ranking-indicacoes', versionado_por=(Cliente, Reserva))
+    def ranking_indicacoes(self, request):
+        ordenacao = {'reservas': ['-reservas_rede', '-tamanho_rede'], 'indicados': ['-tamanho_rede', '-reservas_rede']}
+        por = request.query_params.get('por', 'reservas')
+        if por not in ordenacao:
+            raise ValidationError({'por': f"Use um de: {', '.join(ordenacao)}."})
+        try:
+            limite = max(1, min(int(request.query_params.get('limite', 10)), 100))
+        except ValueError:
+            raise ValidationError({'limite': 'Informe um número inteiro.'})
+        ranking = (
+            Cliente.objects.com_tamanho_rede().com_reservas_da_rede()
+            .filter(tamanho_rede__gt=0).order_by(*ordenacao[por], 'pk')
+            .values('id', 'nome', 'email', 'tamanho_rede', 'reservas_rede')[:limite]
+        )
+        return Response(RankingIndicacoesSerializer(ranking, many=True).data)
 
 # ViewSet para Servico
-class ServicoViewSet(viewsets.ModelViewSet):
-    queryset = Servico.objects.all()
+class ServicoViewSet(CondicionalMixin, CatalogoCacheMixin, viewsets.ModelViewSet):
+    versionado_por = (Servico, Funcionario)
+    cache_namespace = 'servico'
+    queryset = Servico.objects.prefetch_related('funcionarios')
     serializer_class = ServicoSerializer
 
 # ViewSet para Funcionario
-class FuncionarioViewSet(viewsets.ModelViewSet):
-    queryset = Funcionario.objects.all()
+class FuncionarioViewSet(CondicionalMixin, ListaRapidaMixin, HierarquiaMixin, viewsets.ModelViewSet):
+    versionado_por = (Funcionario,)
+    lista_rapida = True
+    queryset = Funcionario.objects.select_related('supervisor').com_profundidade()
     serializer_class = FuncionarioSerializer
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # ?funcao=brt&funcao=gar (índice idx_funcionario_funcao)
+        funcoes = self.request.query_params.getlist('funcao')
+        if funcoes and self.action == 'list':
+            queryset = queryset.filter(funcao__in=funcoes)
+        return queryset
+
+    # /bar/api/funcionarios/disponiveis/?inicio=2025-06-06&fim=2025-06-08&funcao=brt
+    @action(detail=False, versionado_por=(Funcionario, Reserva))
+    def disponiveis(self, request):
+        try:
+            datas = _intervalo_de_datas(request.query_params)
+        except ValueError as erro:
+            raise ValidationError(erro.args[0])
+        if not datas['inicio']:
+            raise ValidationError({'inicio': 'Informe a data inicial.'})
+        funcoes = request.query_params.getlist('funcao') or None
+        livres = escala.disponiveis(datas['inicio'], datas['fim'], funcoes).select_related('supervisor')
+        return Response(self.get_serializer(livres, many=True).data)
+
 # ViewSet para Reserva
-class ReservaViewSet(viewsets.ModelViewSet):
-    queryset = Reserva.objects.all()
+class ReservaViewSet(CondicionalMixin, ListaRapidaMixin, PeriodoMixin, viewsets.ModelViewSet):
+    versionado_por = (Reserva, Cliente, Pacote, Funcionario)
+    lista_rapida = True
+    campo_periodo = 'data'
+    queryset = Reserva.objects.select_related('cliente', 'pacote', 'funcionario_responsavel').com_total_estimado()
     serializer_class = ReservaSerializer
+    pagination_class = KeysetPagination # Paginação por cursor (tabela grande)
+    filter_backends = [OrderingFilter] # ?ordering=-total_estimado
+    ordering_fields = ['data', 'convidados', 'total_estimado']
 
 # ViewSet para Pacote
-class PacoteViewSet(viewsets.ModelViewSet):
-    queryset = Pacote.objects.all()
+class PacoteViewSet(CondicionalMixin, CatalogoCacheMixin, viewsets.ModelViewSet):
+    versionado_por = (Pacote, Coquetel, Produto, Servico, Evento)
+    cache_namespace = 'pacote'
+    queryset = Pacote.objects.select_related('coqueteis', 'produtos', 'servicos').prefetch_related('eventos')
     serializer_class = PacoteSerializer
 
 # ViewSet para Fornecedor
-class FornecedorViewSet(viewsets.ModelViewSet):
+class FornecedorViewSet(CondicionalMixin, ListaRapidaMixin, viewsets.ModelViewSet):
+    versionado_por = (Fornecedor,)
+    lista_rapida = True
     queryset = Fornecedor.objects.all()
     serializer_class = FornecedorSerializer
 
 # ViewSet para Produto
-class ProdutoViewSet(viewsets.ModelViewSet):
-    queryset = Produto.objects.all()
+class ProdutoViewSet(CondicionalMixin, ListaRapidaMixin, viewsets.ModelViewSet):
+    versionado_por = (Produto, Fornecedor)
+    lista_rapida = True
+    queryset = Produto.objects.select_related('fornecedor').com_precisa_repor()
     serializer_class = ProdutoSerializer
+    filter_backends = [OrderingFilter]
+    ordering_fields = ['nome', 'preco', 'estoque', 'precisa_repor']
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # Filtro ?precisa_repor=true|false, resolvido no banco
+        precisa_repor = self.request.query_params.get('precisa_repor')
+        if precisa_repor is not None:
+            queryset = queryset.filter(precisa_repor=precisa_repor.lower() in ('1', 'true', 'sim'))
+        return queryset
+
+# Receitas dos coquetéis: cada venda baixa o estoque dos produtos (bar/estoque.py)
+class ItemReceitaViewSet(CondicionalMixin, ListaRapidaMixin, viewsets.ModelViewSet):
+    versionado_por = (ItemReceita, Coquetel, Produto)
+    lista_rapida = True
+    queryset = ItemReceita.objects.select_related('coquetel', 'produto')
+    serializer_class = ItemReceitaSerializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # ?coquetel=3: a receita de um coquetel
+        coquetel = self.request.query_params.get('coquetel')
+        if coquetel and self.action == 'list':
+            if not coquetel.isdigit():
+                raise ValidationError({'coquetel': 'Informe o id do coquetel.'})
+            queryset = queryset.filter(coquetel_id=coquetel)
+        return queryset
 
 # ViewSet para Evento
-class EventoViewSet(viewsets.ModelViewSet):
-    queryset = Evento.objects.all()
-    serializer_class = EventoSerializer
\ No newline at end of file
+class EventoViewSet(CondicionalMixin, ListaRapidaMixin, PeriodoMixin, viewsets.ModelViewSet):
+    versionado_por = (Evento, Cliente)
+    lista_rapida = True
+    campo_periodo = 'datahora'
+    queryset = Evento.objects.select_related('cliente').com_status_pagamento()
+    serializer_class = EventoSerializer
+    pagination_class = KeysetPagination # Paginação por cursor (tabela grande)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # ?pago=false usa o índice parcial dos pendentes (idx_evento_pendente)
+        pago = self.request.query_params.get('pago')
+        if pago is not None and self.action == 'list':
+            queryset = queryset.filter(pago=pago.lower() in ('1', 'true', 'sim'))
+        return queryset
+
+# Contadores de hit/miss do cache do catálogo
+@api_view(['GET'])
+def catalogo_cache_stats(request):
+    return Response(resumo_do_cache())
+
+def _intervalo_de_datas(parametros):
+    """Lê ?inicio= e ?fim= (AAAA-MM-DD); ValueError({campo: mensagem}) se inválidos."""
+    datas = {}
+    for campo in ('inicio', 'fim'):
+        valor = parametros.get(campo)
+        try:
+            datas[campo] = parse_date(valor) if valor else None
+        except ValueError:
+            datas[campo] = None
+        if valor and datas[campo] is None:
+            raise ValueError({campo: 'Data inválida; use AAAA-MM-DD.'})
+    return datas
+
+# Resumo de faturamento (somente leitura; mantido por bar/faturamento.py)
+class FaturamentoDiarioViewSet(CondicionalMixin, ListaRapidaMixin, viewsets.ReadOnlyModelViewSet):
+    versionado_por = (FaturamentoDiario,)
+    lista_rapida = True
+    queryset = FaturamentoDiario.objects.all()
+    serializer_class = FaturamentoDiarioSerializer
+    pagination_class = KeysetPagination
+
+# Porções do cardápio de petiscos
+class PorcaoViewSet(CondicionalMixin, ListaRapidaMixin, viewsets.ModelViewSet):
+    versionado_por = (Porcao,)
+    lista_rapida = True
+    queryset = Porcao.objects.all()
+    serializer_class = PorcaoSerializer
+
+# Pedidos do PDV: leitura pela API, gravação em lote (bar/pedidos.py)
+class PedidoViewSet(CondicionalMixin, viewsets.ReadOnlyModelViewSet):
+    versionado_por = (Pedido, Funcionario, Coquetel, Porcao)
+    queryset = Pedido.objects.select_related('atendente').prefetch_related(
+        Prefetch('itens', queryset=ItemPedido.objects.select_related('coquetel', 'porcao').order_by('pk'))
+    )
+    serializer_class = PedidoSerializer
+    pagination_class = KeysetPagination # Paginação por cursor (tabela grande)
+
+    # POST /bar/api/pedidos/lote/?lote=500 com uma lista JSON de pedidos:
+    # [{"codigo": "...", "atendente": 3, "forma_pagamento": "Pix", "pago": true,
+    #   "itens": [{"coquetel": 7, "quantidade": 2}, {"porcao": 1}]}, ...]
+    @action(detail=False, methods=['post'])
+    def lote(self, request):
+        if not isinstance(request.data, list):
+            raise ValidationError({'detail': 'Envie uma lista JSON de pedidos.'})
+        try:
+            lote = int(request.query_params.get('lote', pedidos.LOTE_PADRAO))
+        except ValueError:
+            raise ValidationError({'lote': 'Informe um número inteiro.'})
+        try:
+            relatorio = pedidos.ingerir(request.data, lote=max(1, lote))
+        except pedidos.ErroPedido as erro:
+            raise ValidationError({'detail': str(erro)})
+        return Response(relatorio)
+
+# Relatório de receita por dia/semana/mês: ?periodo=mes&inicio=2025-01-01&fim=2025-12-31&por=pacote
+@api_view(['GET'])
+def faturamento_relatorio(request):
+    periodo = request.query_params.get('periodo', 'dia')
+    por = request.query_params.get('por')
+    if periodo not in faturamento.PERIODOS:
+        raise ValidationError({'periodo': f"Use um de: {', '.join(faturamento.PERIODOS)}."})
+    if por and por not in faturamento.AGRUPAMENTOS:
+        raise ValidationError({'por': f"Use um de: {', '.join(faturamento.AGRUPAMENTOS)}."})
+    try:
+        datas = _intervalo_de_datas(request.query_params)
+    except ValueError as erro:
+        raise ValidationError(erro.args[0])
+    linhas = faturamento.relatorio(periodo, por=por, **datas)
+    return Response(RelatorioFaturamentoSerializer(linhas, many=True).data)
+
+# Agenda dos locais, lida só de OcupacaoDiaria (bar/agenda.py):
+# ?inicio=2025-06-01&fim=2025-08-29&local=Terraço&local=Salão (90 dias a partir de hoje por padrão)
+@api_view(['GET'])
+def agenda_disponibilidade(request):
+    locais = request.query_params.getlist('local') or [agenda.LOCAL_PADRAO]
+    if len(locais) > agenda.LIMITE_LOCAIS:
+        raise ValidationError({'local': f'Informe no máximo {agenda.LIMITE_LOCAIS} locais.'})
+    try:
+        datas = _intervalo_de_datas(request.query_params)
+        linhas = agenda.disponibilidade(datas['inicio'] or timezone.localdate(), datas['fim'], locais)
+    except ValueError as erro:
+        raise ValidationError(erro.args[0])
+    return Response(OcupacaoSerializer(linhas, many=True).data)
+
+# Datas candidatas do site de reservas: POST {"datas": ["2025-06-06", ...], "locais": ["Terraço"]}
+@api_view(['POST'])
+def agenda_verificar(request):
+    entrada = VerificarDatasSerializer(data=request.data)
+    entrada.is_valid(raise_exception=True)
+    try:
+        linhas = agenda.verificar_datas(entrada.validated_data['datas'],
+                                        entrada.validated_data.get('locais') or [agenda.LOCAL_PADRAO])
+    except ValueError as erro:
+        raise ValidationError(erro.args[0])
+    return Response(OcupacaoSerializer(linhas, many=True).data)
+
+# Orçamentos em lote: POST /bar/api/orcamentos/?margem=30 com uma lista JSON:
+# [{"pacote": 3, "convidados": 80, "duracaoHora": 5, "data": "2025-06-06", "local": "Terraço"}, ...]
+@api_view(['POST'])
+def orcamentos_lote(request):
+    if not isinstance(request.data, list):
+        raise ValidationError({'detail': 'Envie uma lista JSON de orçamentos.'})
+    try:
+        margem = Decimal(request.query_params.get('margem', orcamentos.MARGEM_ALVO))
+    except InvalidOperation:
+        raise ValidationError({'margem': 'Informe um número.'})
+    try:
+        relatorio = orcamentos.orcar(request.data, margem_alvo=margem)
+    except orcamentos.ErroOrcamento as erro:
+        raise ValidationError({'detail': str(erro)})
+    # Valores em texto, como nos DecimalField dos serializers
+    relatorio['orcamentos'] = [
+        {campo: str(valor) if isinstance(valor, Decimal) else valor for campo, valor in orcamento.items()}
+        if orcamento else None
+        for orcamento in relatorio['orcamentos']
+    ]
+    return Response(relatorio)
+
+# Folha de pagamento do mês, lida da foto (bar/folha.py): ?mes=2025-06 (padrão: mês atual) e &por=funcao
+@api_view(['GET'])
+def folha_mensal(request):
+    por = request.query_params.get('por')
+    if por and por != 'funcao':
+        raise ValidationError({'por': 'Use funcao.'})
+    try:
+        mes = folha.mes_de(request.query_params.get('mes') or timezone.localdate())
+    except ValueError as erro:
+        raise ValidationError(erro.args[0])
+    return Response(_folha(folha.obter(mes), por))
+
+FECHAMENTO = {'fechar': folha.fechar, 'reabrir': folha.reabrir}
+
+# POST /bar/api/folha/fechar/?mes=2025-06 (ou reabrir)
+@api_view(['POST'])
+def folha_fechamento(request, acao):
+    if acao not in FECHAMENTO:
+        raise Http404
+    try:
+        mes = folha.mes_de(request.query_params.get('mes', ''))
+    except ValueError as erro:
+        raise ValidationError(erro.args[0])
+    return Response(_folha(FECHAMENTO[acao](mes)))
+
+def _folha(folha_mensal, por=None):
+    linhas = folha.relatorio(folha_mensal, por)
+    serializer = FolhaFuncaoSerializer if por else FolhaFuncionarioSerializer
+    return {
+        'mes': f'{folha_mensal.mes:%Y-%m}',
+        'fechada': folha_mensal.fechada,
+        'calculada_em': folha_mensal.calculada_em,
+        'total': str(sum((linha['total'] if por else linha.total for linha in linhas), Decimal('0.00'))),
+        'linhas': serializer(linhas, many=True).data,
+    }
+
+# Feed incremental dos PDVs (bar/sincronizacao.py): ?desde=<cursor>&modelo=coqueteis&modelo=produtos&limite=1000
+SINCRONIZACAO = {
+    'coqueteis': CoquetelSyncSerializer,
+    'produtos': ProdutoSyncSerializer,
+    'clientes': ClienteSyncSerializer,
+    'pacotes': PacoteSyncSerializer,
+    'porcoes': PorcaoSerializer,
+}
+
+@api_view(['GET'])
+def sincronizar(request):
+    try:
+        desde = request.query_params.get('desde')
+        desde = int(desde) if desde else None
+        limite = int(request.query_params.get('limite', sincronizacao.LIMITE_PADRAO))
+    except ValueError:
+        raise ValidationError({'detail': 'desde e limite devem ser números inteiros.'})
+    try:
+        feed = sincronizacao.alteracoes(desde, request.query_params.getlist('modelo'), limite)
+    except ValueError as erro:
+        raise ValidationError(erro.args[0])
+    feed['alterados'] = {
+        chave: SINCRONIZACAO[chave](objetos, many=True).data for chave, objetos in feed['alterados'].items()
+    }
+    return Response(feed)
+
+# Exportação em massa: /bar/api/exportar/reservas/?formato=ndjson&campos=id,data,cliente__nome&inicio=2025-01-01
+def exportar(request, modelo):
+    formato = request.GET.get('formato', 'csv')
+    campos = [c for c in request.GET.get('campos', '').split(',') if c] or None
+    try:
+        datas = _intervalo_de_datas(request.GET)
+        nomes, linhas = exportacao.linhas(modelo, campos, **datas)
+        conteudo = exportacao.stream(formato, nomes, linhas)
+    except exportacao.ErroExportacao as erro:
+        return JsonResponse({'detail': str(erro)}, status=400)
+    except ValueError as erro:
+        return JsonResponse(erro.args[0], status=400)
+    resposta = StreamingHttpResponse(conteudo, content_type=exportacao.CONTENT_TYPES[formato])
+    resposta['Content-Disposition'] = f'attachment; filename="{modelo}.{formato}"'
+    return resposta
+
+# Importação em massa: POST /bar/api/importar/clientes/ com uma lista JSON ou um CSV (Content-Type: text/csv)
+@api_view(['POST'])
+def importar(request, modelo):
+    if request.content_type.startswith('text/csv'):
+        linhas = csv.DictReader(io.StringIO(request.body.decode('utf-8-sig')))
+    elif isinstance(request.data, list):
+        linhas = request.data
+        # Linhas numeradas a partir de 1, como no relatório da importação
+        invalidas = [posicao for posicao, linha in enumerate(linhas, start=1) if not isinstance(linha, dict)]
+        if invalidas:
+            raise ValidationError({'detail': 'Cada item da lista deve ser um objeto JSON. '
+                                             f"Linhas inválidas: {', '.join(map(str, invalidas))}."})
+    else:
+        raise ValidationError({'detail': 'Envie uma lista JSON de objetos ou um CSV com cabeçalho.'})
+    try:
+        lote = int(request.query_params.get('lote', importacao.LOTE_PADRAO))
+    except ValueError:
+        raise ValidationError({'lote': 'Informe um número inteiro.'})
+    try:
+        relatorio = importacao.importar(modelo, linhas, lote=max(1, lote))
+    except importacao.ErroImportacao as erro:
+        raise ValidationError({'detail': str(erro)})
+    return Response(relatorio)
@@ -0,0 +1,164 @@
+"""
+Variantes assíncronas das views de leitura mais acessadas (cardápio,
+clientes e list/retrieve da API), para o modo ASGI (project/asgi.py). As
+rotas ficam em bar/urls.py, sob o prefixo async/.
+
+Usam o ORM assíncrono (`aget`, `acount`, `aiterator`): enquanto o banco
+responde, o worker atende outras requisições em vez de ficar preso a um
+cliente lento. As respostas são as mesmas das views síncronas — mesmos
+templates, serializers, paginação e cache do catálogo (o HTML em cache é
+compartilhado com as views síncronas).
+
+Só leitura: escritas continuam nas views síncronas de bar/views.py.
+"""
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage, Paginator
+from django.http import Http404, HttpResponse
+from django.shortcuts import render
+from rest_framework.exceptions import APIException
+from rest_framework.renderers import JSONRenderer
+from rest_framework.views import exception_handler
+
+from . import cache, condicional
+from .busca import buscar_clientes
+from .models import Cliente, Coquetel
+from .views import (
+    CoquetelListView, CoquetelViewSet, ClienteViewSet, ServicoViewSet, PacoteViewSet, FuncionarioViewSet,
+    ReservaViewSet, FornecedorViewSet, ProdutoViewSet, EventoViewSet,
+)
+
+# basename da API -> ViewSet síncrono de onde vêm queryset, serializer, filtros e paginação
+VIEWSETS = {
+    'coquetel': CoquetelViewSet,
+    'cliente': ClienteViewSet,
+    'servico': ServicoViewSet,
+    'pacote': PacoteViewSet,
+    'funcionario': FuncionarioViewSet,
+    'reserva': ReservaViewSet,
+    'fornecedor': FornecedorViewSet,
+    'produto': ProdutoViewSet,
+    'evento': EventoViewSet,
+}
+
+CHUNK_SIZE = 500
+
+
+async def _listar(queryset):
+    # prefetch_related no aiterator exige chunk_size
+    return [objeto async for objeto in queryset.aiterator(chunk_size=CHUNK_SIZE)]
+
+
+async def _pagina_em_cache(request, namespace, gerar):
+    # Mesma chave do PaginaCacheMixin: o HTML é compartilhado com a view síncrona
+    caminho = request.get_full_path().replace('/async/', '/', 1)
+    conteudo = await cache.aobter(namespace, f'pagina:{caminho}', gerar)
+    return HttpResponse(conteudo)
+
+
+# Cardápio (CoquetelListView / CoquetelDetailView)
+
+async def coquetel_list(request):
+    async def gerar():
+        queryset = CoquetelListView.queryset.order_by(*Coquetel._meta.ordering or ['pk'])
+        # Paginação numérica como a do ListView: o total vem do acount() e só a página é lida
+        paginator = Paginator(range(await queryset.acount()), CoquetelListView.paginate_by)
+        try:
+            pagina = paginator.page(request.GET.get('page') or 1)
+        except InvalidPage:
+            raise Http404('Página inválida.')
+        pagina.object_list = await _listar(queryset[pagina.start_index() - 1:pagina.end_index()])
+        contexto = {
+            'coqueteis': pagina.object_list, 'page_obj': pagina, 'paginator': paginator,
+            'is_paginated': pagina.has_other_pages(),
+        }
+        return render(request, CoquetelListView.template_name, contexto).content
+    return await _pagina_em_cache(request, 'coquetel', gerar)
+
+
+async def coquetel_detail(request, pk):
+    async def gerar():
+        try:
+            coquetel = await Coquetel.objects.select_related('fornecedor').aget(pk=pk)
+        except Coquetel.DoesNotExist:
+            raise Http404('Coquetel não encontrado.')
+        return render(request, 'bar/coquetel_detail.html', {'coquetel': coquetel}).content
+    return await _pagina_em_cache(request, 'coquetel', gerar)
+
+
+# Clientes (cliente_list / cliente_detail)
+
+async def cliente_list(request):
+    clientes = Cliente.objects.select_related('indicado_por')
+    query = request.GET.get('q')
+    if query:
+        # A busca textual usa SQL próprio (cursor), que não tem versão assíncrona
+        clientes = await sync_to_async(lambda: list(buscar_clientes(query, clientes)))()
+    else:
+        clientes = await _listar(clientes)
+    return render(request, 'bar/cliente_list.html', {'clientes': clientes})
+
+
+async def cliente_detail(request, pk):
+    try:
+        cliente = await Cliente.objects.select_related('indicado_por').aget(pk=pk)
+    except Cliente.DoesNotExist:
+        raise Http404('Cliente não encontrado.')
+    return render(request, 'bar/cliente_detail.html', {'cliente': cliente})
+
+
+# API: list/retrieve dos ViewSets
+
+async def _viewset(basename, request, action, **kwargs):
+    if basename not in VIEWSETS:
+        raise Http404('Recurso desconhecido.')
+    viewset = VIEWSETS[basename](action_map={'get': action}, args=(), kwargs=kwargs, format_kwarg=None)
+    viewset.request = viewset.initialize_request(request, **kwargs)
+    viewset.headers = {}
+    # Autenticação, permissões e throttling como no APIView (podem consultar a sessão no banco)
+    await sync_to_async(viewset.initial)(viewset.request, **kwargs)
+    return viewset
+
+
+def _json(dados, status=200):
+    return HttpResponse(JSONRenderer().render(dados), content_type='application/json', status=status)
+
+
+async def _responder(basename, request, action, gerar, **kwargs):
+    try:
+        viewset = await _viewset(basename, request, action, **kwargs)
+        namespace = getattr(viewset, 'cache_namespace', None)
+        # Chave própria (não a da rota síncrona): os links de paginação apontam para /async/
+        chave = f'{action}:{request.get_full_path()}'
+        dados = await (cache.aobter(namespace, chave, lambda: gerar(viewset)) if namespace else gerar(viewset))
+    except condicional.NaoModificado as nao_modificado:
+        return nao_modificado.resposta
+    except (APIException, Http404) as erro:
+        resposta = exception_handler(erro, {})
+        return _json(resposta.data, status=resposta.status_code)
+    return condicional.aplicar(_json(dados), viewset.validadores)
+
+
+async def api_list(request, basename):
+    async def gerar(viewset):
+        montar = lambda: viewset.filter_queryset(viewset.get_queryset())
+        # Montar a query não toca no banco, exceto a busca de clientes (SQL próprio, síncrono)
+        busca = basename == 'cliente' and request.GET.get('search')
+        queryset = await sync_to_async(montar)() if busca else montar()
+        paginador = viewset.paginator
+        if paginador is not None and not busca:
+            pagina = await paginador.apaginate_queryset(queryset, viewset.request, view=viewset)
+            return paginador.get_paginated_response(viewset.get_serializer(pagina, many=True).data).data
+        return viewset.get_serializer(await _listar(queryset), many=True).data
+    return await _responder(basename, request, 'list', gerar)
+
+
+async def api_detail(request, basename, pk):
+    async def gerar(viewset):
+        queryset = viewset.get_queryset()
+        try:
+            objeto = await queryset.aget(pk=pk)
+        except queryset.model.DoesNotExist:
+            # Mesma mensagem do get_object_or_404 do retrieve síncrono
+            raise Http404(f'No {queryset.model._meta.object_name} matches the given query.')
+        return viewset.get_serializer(objeto).data
+    return await _responder(basename, request, 'retrieve', gerar, pk=pk)
@@ -5,6 +5,21 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+Modo ASGI (uvicorn):
+
+    BAR_SERVIDOR=asgi uvicorn project.asgi:application --workers 4 --no-access-log
+
+As leituras quentes têm versões assíncronas em /bar/async/... (bar/views_async.py);
+as demais rotas rodam como no WSGI, numa thread. Para comparar com o WSGI:
+
+    gunicorn project.wsgi:application --workers 4 --threads 8
+    python manage.py carga_http http://127.0.0.1:8000/bar/api/coqueteis/ --conexoes 64
+    python manage.py carga_http http://127.0.0.1:8000/bar/async/api/coqueteis/ --conexoes 64
+
+O ganho aparece quando o banco responde devagar (PostgreSQL remoto, consultas
+longas): o worker não fica parado esperando. Com SQLite local a carga é de
+CPU e o gunicorn com threads tende a atender mais requisições por segundo.
 """
 
 import os
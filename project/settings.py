@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -42,6 +43,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'bar.perfil.PerfilMiddleware', # Server-Timing e log de lentidão (ver BAR_PERFIL_* abaixo)
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -55,7 +57,7 @@ ROOT_URLCONF = 'project.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'bar.perfil.DjangoTemplates', # DjangoTemplates que mede o tempo de render
         'DIRS': [BASE_DIR / "templates"],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -74,11 +76,125 @@ WSGI_APPLICATION = 'project.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Perfil escolhido pela variável de ambiente BAR_DB: 'sqlite' (padrão) ou 'postgresql'.
+#
+# sqlite: conexões persistentes (CONN_MAX_AGE) com health check, transações
+# IMMEDIATE (evita "database is locked" na promoção de leitura para escrita)
+# e os PRAGMAs de BAR_SQLITE_PRAGMAS aplicados em cada conexão nova
+# (bar/db.py, sinal connection_created).
+#
+# BAR_SERVIDOR=asgi (uvicorn, project/asgi.py): sem conexões persistentes no
+# sqlite, como o Django recomenda sob ASGI (cada requisição assíncrona pode
+# usar uma thread diferente e as conexões persistentes não seriam reaproveitadas).
+#
+# postgresql: pool de conexões do psycopg 3 (OPTIONS['pool']); com pool o
+# CONN_MAX_AGE precisa ser 0.
+
+BAR_DB = os.environ.get('BAR_DB', 'sqlite')
+BAR_SERVIDOR = os.environ.get('BAR_SERVIDOR', 'wsgi')
+
+if BAR_DB == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('BAR_DB_NAME', 'bar'),
+            'USER': os.environ.get('BAR_DB_USER', 'bar'),
+            'PASSWORD': os.environ.get('BAR_DB_PASSWORD', ''),
+            'HOST': os.environ.get('BAR_DB_HOST', 'localhost'),
+            'PORT': os.environ.get('BAR_DB_PORT', '5432'),
+            'CONN_MAX_AGE': 0,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': int(os.environ.get('BAR_DB_POOL_MIN', 2)),
+                    'max_size': int(os.environ.get('BAR_DB_POOL_MAX', 20)),
+                    'timeout': int(os.environ.get('BAR_DB_POOL_TIMEOUT', 10)),
+                },
+            },
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('BAR_DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': int(os.environ.get('BAR_DB_CONN_MAX_AGE', 0 if BAR_SERVIDOR == 'asgi' else 600)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'timeout': 20, # segundos esperando um lock antes de "database is locked"
+                'transaction_mode': 'IMMEDIATE',
+            },
+            # Banco de testes em arquivo (WAL), para exercitar escritas concorrentes
+            'TEST': {'NAME': os.environ.get('BAR_DB_TEST_NAME', BASE_DIR / 'test_db.sqlite3')},
+        }
     }
+
+BAR_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL', # leitores não bloqueiam o escritor
+    'synchronous': 'NORMAL', # seguro com WAL, bem menos fsync
+    'busy_timeout': 20000, # ms
+    'cache_size': -65536, # KiB (64 MiB)
+    'mmap_size': 268435456, # 256 MiB
+    'temp_store': 'MEMORY',
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# 'catalogo' guarda o cardápio e os pacotes (ver bar/cache.py); o tamanho é
+# limitado por MAX_ENTRIES e cada entrada expira após TIMEOUT segundos.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'catalogo': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'bar-catalogo',
+        'TIMEOUT': 300,
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    },
+    # Carimbos do GET condicional (bar/condicional.py) e versões dos namespaces do
+    # 'catalogo' (bar/cache.py). Ficam em disco para todos os workers do
+    # gunicorn/uvicorn verem as escritas uns dos outros; as entradas do
+    # 'catalogo' podem ficar na memória de cada processo porque as chaves levam a
+    # versão. Com mais de uma máquina, use Redis/Memcached aqui.
+    'versoes': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('BAR_CACHE_VERSOES', BASE_DIR / '.cache' / 'versoes'),
+        'TIMEOUT': None,
+    },
+}
+
+# Liga/desliga o cache do catálogo (útil para benchmarks)
+BAR_CATALOGO_CACHE = True
+
+# Liga/desliga ETag/Last-Modified e respostas 304 nos ViewSets
+BAR_GET_CONDICIONAL = True
+
+# Liga/desliga a serialização por values_list() nos ViewSets com `lista_rapida`
+BAR_LISTA_RAPIDA = True
+
+# Perfil por requisição (bar/perfil.py): fração das requisições medidas
+# (0 desliga), e limites em ms para logar requisições e queries lentas
+# (None desliga o log)
+BAR_PERFIL_AMOSTRA = float(os.environ.get('BAR_PERFIL_AMOSTRA', 1.0 if DEBUG else 0.01))
+BAR_PERFIL_REQUISICAO_LENTA_MS = 1000
+BAR_PERFIL_SQL_LENTO_MS = 200
+
+
+# Logging
+# https://docs.djangoproject.com/en/5.2/topics/logging/
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'bar.perfil': {'handlers': ['console'], 'level': 'WARNING', 'propagate': False},
+        'bar.estoque': {'handlers': ['console'], 'level': 'WARNING', 'propagate': False},
+    },
 }
 
 